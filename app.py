@@ -520,6 +520,13 @@ def main():
     except Exception as e:
         st.error(f"Veritabanı güncellenirken hata oluştu: {str(e)}")
     
+    # Arka plan iş kuyruğunu başlat (günün tekrarlayan işlemleri kuyruğa eklenir)
+    try:
+        from services.job_handlers import get_job_queue
+        get_job_queue()
+    except Exception as e:
+        st.error(f"Arka plan işleri başlatılırken hata oluştu: {str(e)}")
+    
     # Oturum kontrolü
     check_auth()
     
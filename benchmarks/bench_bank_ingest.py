@@ -0,0 +1,102 @@
+"""
+Banka senkronizasyonu toplu ekleme kıyaslaması.
+
+Kullanım:
+    python -m benchmarks.bench_bank_ingest --sizes 10000 100000 [--legacy]
+
+Her boyut için boş bir veritabanına ilk senkronizasyon ve aynı verinin
+tekrar senkronizasyonu (tamamı atlanır) süreleri ölçülür. --legacy ile
+satır başına SELECT + db.add yapan eski yol da ölçülür.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models.database import Base, User, BankAccount, Transaction
+from services.banking_service import BankingService
+
+def make_transactions(count: int, account_id: int):
+    """Son bir yıla yayılmış örnek banka işlemleri üretir."""
+    today = datetime.now()
+    descriptions = ["Market alışverişi", "Akaryakıt ödemesi", "Fatura ödemesi", "Maaş ödemesi"]
+    return [
+        {
+            "id": f"tx_{account_id}_{i}",
+            "date": (today - timedelta(days=i % 365)).date(),
+            "amount": (i % 12) * 100 - 200,
+            "description": descriptions[i % len(descriptions)],
+            "currency": "TRY"
+        }
+        for i in range(count)
+    ]
+
+def new_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    user = User(username="bench", email="bench@example.com", hashed_password="x")
+    session.add(user)
+    session.flush()
+    account = BankAccount(user_id=user.id, bank_name="example_bank", account_number="****0000")
+    session.add(account)
+    session.commit()
+    return session, account
+
+def legacy_ingest(service: BankingService, account: BankAccount, transactions) -> int:
+    """Eski satır başına kontrol ve ekleme yolu (karşılaştırma için)."""
+    new_count = 0
+    for transaction in transactions:
+        existing = service.db.query(Transaction).filter(
+            Transaction.user_id == account.user_id,
+            Transaction.external_id == transaction["id"],
+            Transaction.source == f"bank_{account.bank_name}"
+        ).first()
+        if not existing:
+            service.db.add(Transaction(
+                user_id=account.user_id,
+                amount=transaction["amount"],
+                type="income" if transaction["amount"] > 0 else "expense",
+                category=service._guess_category(transaction["description"]),
+                description=transaction["description"],
+                date=transaction["date"],
+                source=f"bank_{account.bank_name}",
+                external_id=transaction["id"]
+            ))
+            new_count += 1
+    service.db.commit()
+    return new_count
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def run(size: int, legacy: bool) -> None:
+    transactions = make_transactions(size, 1)
+
+    session, account = new_session()
+    service = BankingService(session)
+    first, first_time = timed(service.ingest_bank_transactions, account, transactions)
+    again, again_time = timed(service.ingest_bank_transactions, account, transactions)
+    session.close()
+    print(f"{size:>7} satır | toplu  | ilk: {first_time:7.2f} sn ({first['inserted']} eklendi) "
+          f"| tekrar: {again_time:7.2f} sn ({again['skipped']} atlandı)")
+
+    if legacy:
+        session, account = new_session()
+        service = BankingService(session)
+        inserted, first_time = timed(legacy_ingest, service, account, transactions)
+        _, again_time = timed(legacy_ingest, service, account, transactions)
+        session.close()
+        print(f"{size:>7} satır | eski   | ilk: {first_time:7.2f} sn ({inserted} eklendi) "
+              f"| tekrar: {again_time:7.2f} sn")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banka işlemi toplu ekleme kıyaslaması")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--legacy", action="store_true", help="Eski satır başına yolu da ölç")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.legacy)
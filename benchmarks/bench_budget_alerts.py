@@ -0,0 +1,95 @@
+"""
+Bütçe uyarısı değerlendirme kıyaslaması.
+
+Kullanım:
+    python -m benchmarks.bench_budget_alerts --users 10000 [--budgets 5] [--transactions 8]
+
+Her kullanıcıya --budgets kategori bütçesi ve kategori başına bu ay
+--transactions gider eklenir. Eski yöntem (kullanıcı başına bütçe
+sorgusu + bütçe başına işlem sorgusu ve Python'da toplama) ile tüm
+kullanıcıları tek sorguda değerlendiren tarama karşılaştırılır.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from models.database import Base, User, Budget, Transaction, bulk_insert_transactions
+from services.budget_alerts import BudgetAlertEvaluator
+
+CATEGORIES = ["Gıda", "Ulaşım", "Eğlence", "Sağlık", "Giyim", "Fatura", "Kira", "Elektronik"]
+
+def build_database(users: int, budgets: int, transactions: int, seed: int = 42):
+    rng = random.Random(seed)
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    today = date.today()
+    month_start = today.replace(day=1)
+
+    session.execute(insert(User.__table__), [
+        {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x", "is_active": True}
+        for i in range(1, users + 1)
+    ])
+    session.execute(insert(Budget.__table__), [
+        {"user_id": user_id, "name": category, "category": category, "amount": 1000.0,
+         "start_date": month_start, "end_date": month_start + timedelta(days=90)}
+        for user_id in range(1, users + 1)
+        for category in CATEGORIES[:budgets]
+    ])
+    bulk_insert_transactions(session, [
+        {"user_id": user_id, "amount": rng.uniform(10, 250), "type": "expense", "category": category,
+         "date": month_start + timedelta(days=rng.randint(0, today.day - 1)), "description": "bench"}
+        for user_id in range(1, users + 1)
+        for category in CATEGORIES[:budgets]
+        for _ in range(transactions)
+    ])
+    session.commit()
+    return session
+
+def legacy_check(session, user_id: int):
+    """Eski kullanıcı başına, bütçe başına sorgulu kontrol (karşılaştırma için)."""
+    today = date.today()
+    month_start = today.replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    alerts = []
+    budgets = session.query(Budget).filter(
+        Budget.user_id == user_id, Budget.start_date <= today, Budget.end_date >= today
+    ).all()
+    for budget in budgets:
+        expenses = session.query(Transaction).filter(
+            Transaction.user_id == user_id,
+            Transaction.type == "expense",
+            Transaction.category == budget.category,
+            Transaction.date.between(month_start, month_end)
+        ).all()
+        spent = sum(expense.amount for expense in expenses)
+        if spent >= budget.amount * 0.8:
+            alerts.append(budget.id)
+    return alerts
+
+def run(users: int, budgets: int, transactions: int) -> None:
+    session = build_database(users, budgets, transactions)
+
+    start = time.perf_counter()
+    legacy_alerts = sum(len(legacy_check(session, user_id)) for user_id in range(1, users + 1))
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sweep = BudgetAlertEvaluator(session).evaluate()
+    sweep_time = time.perf_counter() - start
+
+    sweep_alerts = sum(len(alerts) for alerts in sweep.values())
+    print(f"{users:>6} kullanıcı x {budgets} bütçe | eski: {legacy_time:6.2f}s ({legacy_alerts} uyarı)"
+          f" | tek sorgu: {sweep_time:6.2f}s ({sweep_alerts} uyarı)")
+    session.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bütçe uyarısı değerlendirme kıyaslaması")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--budgets", type=int, default=5)
+    parser.add_argument("--transactions", type=int, default=8, help="Bütçe başına bu ayki gider sayısı")
+    args = parser.parse_args()
+    for users in args.users:
+        run(users, args.budgets, args.transactions)
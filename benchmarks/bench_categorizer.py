@@ -0,0 +1,61 @@
+"""
+İşlem kategorileme kıyaslaması.
+
+Kullanım:
+    python -m benchmarks.bench_categorizer --sizes 10000 100000 [--merchants 5000]
+
+Eski yöntem (her kategori için her anahtar kelimeyi ayrı ayrı arayan döngü)
+ile derlenmiş tek geçişli motorun toplu kategorileme süreleri karşılaştırılır.
+Açıklamalar sınırlı sayıda işyerinden üretilir; gerçek ekstrelerdeki gibi
+aynı işyeri tekrar tekrar geçer.
+"""
+import argparse
+import random
+import time
+from services.categorizer import Categorizer, DEFAULT_CATEGORY_KEYWORDS
+
+MERCHANT_WORDS = ["MIGROS", "SHELL AKARYAKIT", "TURKCELL FATURA", "ECZANE", "LCW", "TEKNOSA",
+                  "KIRA ODEMESI", "MAAS", "SINEMA", "ONLINE", "KAFE", "OTOPARK"]
+
+def make_descriptions(count: int, merchants: int, seed: int = 42):
+    """Sınırlı sayıda işyerine dağılmış örnek açıklamalar üretir."""
+    rng = random.Random(seed)
+    names = [f"{rng.choice(MERCHANT_WORDS)} {rng.randint(1000, 9999)} ISTANBUL TR" for _ in range(merchants)]
+    return [rng.choice(names) for _ in range(count)]
+
+def legacy_categorize(description: str) -> str:
+    """Eski anahtar kelime döngüsü (karşılaştırma için)."""
+    text_lower = description.lower()
+    matches = {category: 0 for category in DEFAULT_CATEGORY_KEYWORDS}
+    for category, keywords in DEFAULT_CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                matches[category] += 1
+    best = max(matches.items(), key=lambda item: item[1])
+    return best[0] if best[1] else "Diğer"
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def run(size: int, merchants: int) -> None:
+    descriptions = make_descriptions(size, merchants)
+
+    _, legacy_time = timed(lambda: [legacy_categorize(d) for d in descriptions])
+    categorizer = Categorizer()
+    _, cold_time = timed(categorizer.categorize_many, descriptions)
+    _, warm_time = timed(categorizer.categorize_many, descriptions)
+    uncached = Categorizer(memo_size=0)
+    _, uncached_time = timed(uncached.categorize_many, descriptions)
+
+    print(f"{size:>8} satır | eski: {legacy_time:6.2f}s | derlenmiş (önbelleksiz): {uncached_time:6.2f}s"
+          f" | derlenmiş: {cold_time:6.2f}s | tekrar: {warm_time:6.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="İşlem kategorileme kıyaslaması")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--merchants", type=int, default=5000, help="Farklı işyeri sayısı")
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.merchants)
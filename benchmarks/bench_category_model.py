@@ -0,0 +1,71 @@
+"""
+Öğrenilmiş kategori modeli eğitim ve tahmin kıyaslaması.
+
+Kullanım:
+    python -m benchmarks.bench_category_model --size 1000000 [--epochs 1]
+
+Sentetik işyeri açıklamaları (işyeri adı + şube + rastgele referans) ile
+model sıfırdan eğitilir, ardından aynı boyutta yeni açıklamalar toplu
+tahmin edilir ve doğruluk ölçülür. Artımlı güncelleme ile kaydetme/yükleme
+süreleri de raporlanır.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from services.category_model import CategoryModel
+
+MERCHANTS = {
+    "Kafe": ["STARBUCKS", "KAHVE DUNYASI", "CAFFE NERO", "GLORIA JEANS"],
+    "Abonelik": ["NETFLIX.COM", "SPOTIFY", "YOUTUBE PREMIUM", "EXXEN", "DISNEY PLUS"],
+    "Yemek": ["YEMEKSEPETI", "GETIR YEMEK", "TRENDYOL YEMEK", "BURGER KING", "DOMINOS"],
+    "Gıda": ["MIGROS", "CARREFOURSA", "A101", "BIM", "SOK MARKET", "FILE"],
+    "Ulaşım": ["SHELL", "OPET", "BP", "ISTANBULKART", "MARTI", "BITAKSI"],
+    "Giyim": ["ZARA", "LCW", "DEFACTO", "MAVI", "KOTON"],
+    "Elektronik": ["TEKNOSA", "MEDIAMARKT", "VATAN BILGISAYAR", "APPLE STORE"],
+    "Sağlık": ["ECZANE", "ACIBADEM", "MEDICANA", "MEMORIAL"],
+}
+BRANCHES = ["ISTANBUL", "ANKARA", "IZMIR", "KADIKOY", "BESIKTAS", "CANKAYA", "ONLINE", "AVM"]
+
+def make_dataset(count: int, seed: int):
+    """Etiketli sentetik açıklamalar üretir."""
+    rng = random.Random(seed)
+    pairs = [(merchant, category) for category, merchants in MERCHANTS.items() for merchant in merchants]
+    descriptions, categories = [], []
+    for _ in range(count):
+        merchant, category = rng.choice(pairs)
+        descriptions.append(f"{merchant} {rng.choice(BRANCHES)} {rng.randint(100000, 999999)} TR")
+        categories.append(category)
+    return descriptions, categories
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def run(size: int, epochs: int) -> None:
+    train_x, train_y = make_dataset(size, seed=1)
+    test_x, test_y = make_dataset(size, seed=2)
+
+    model, fit_time = timed(CategoryModel().fit, train_x, train_y, epochs=epochs)
+    predictions, predict_time = timed(model.predict, test_x)
+    accuracy = sum(p == y for (p, _), y in zip(predictions, test_y)) / len(test_y)
+    _, partial_time = timed(model.partial_fit, ["PETSHOP KEDI MAMASI"] * 100, ["Evcil Hayvan"] * 100)
+
+    path = os.path.join(tempfile.mkdtemp(), "category_model.joblib")
+    _, save_time = timed(model.save, path)
+    _, load_time = timed(CategoryModel.load, path)
+
+    print(f"{size} satır, {epochs} tur")
+    print(f"  eğitim:       {fit_time:7.2f}s ({size * epochs / fit_time:,.0f} satır/s)")
+    print(f"  toplu tahmin: {predict_time:7.2f}s ({size / predict_time:,.0f} satır/s), doğruluk %{accuracy * 100:.1f}")
+    print(f"  artımlı güncelleme (100 satır): {partial_time * 1000:.0f}ms")
+    print(f"  kaydetme: {save_time:.2f}s, yükleme: {load_time:.2f}s, boyut: {os.path.getsize(path) / 1024:.0f} KB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Öğrenilmiş kategori modeli kıyaslaması")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--epochs", type=int, default=1)
+    args = parser.parse_args()
+    run(args.size, args.epochs)
@@ -0,0 +1,76 @@
+"""
+Giden e-posta kuyruğu kıyaslaması.
+
+Kullanım:
+    python -m benchmarks.bench_mail_queue --messages 2000 [--pool-size 2]
+
+Yerel bir aiosmtpd sunucusuna aynı sayıda mesaj iki yolla gönderilir:
+mesaj başına yeni SMTP bağlantısı (eski EmailService.send_email) ve
+paylaşılan bağlantı havuzu üzerinden partiler halinde gönderen MailQueue.
+Süre ve sunucuda açılan bağlantı sayısı yazdırılır. Gerçek sunucularda her
+bağlantı ayrıca bir STARTTLS el sıkışması ve giriş demektir.
+"""
+import argparse
+import smtplib
+import socket
+import time
+from aiosmtpd.controller import Controller
+from services.mail_queue import MailQueue, SMTPConnectionPool, build_message
+
+class CountingHandler:
+    def __init__(self):
+        self.connections = 0
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 Message accepted"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def run(messages: int, pool_size: int, batch_size: int) -> None:
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    try:
+        emails = [build_message("finans@example.com", f"user{i}@example.com", "Aylık özet", "Merhaba") for i in range(messages)]
+
+        start = time.perf_counter()
+        for msg in emails:
+            server = smtplib.SMTP("127.0.0.1", controller.port)
+            server.ehlo()
+            server.send_message(msg)
+            server.quit()
+        naive_time = time.perf_counter() - start
+        naive_connections = handler.connections
+
+        handler.connections = 0
+        pool = SMTPConnectionPool("127.0.0.1", controller.port, starttls=False, max_size=pool_size)
+        queue = MailQueue(pool, batch_size=batch_size)
+        start = time.perf_counter()
+        queue.start()
+        queue.enqueue_many(emails)
+        queue.stop()
+        pooled_time = time.perf_counter() - start
+
+        print(f"{messages:>6} mesaj | mesaj başına bağlantı: {naive_time:6.2f}s ({naive_connections} bağlantı)"
+              f" | havuzlu kuyruk: {pooled_time:6.2f}s ({handler.connections} bağlantı, {queue.stats['sent']} gönderildi)")
+    finally:
+        controller.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Giden e-posta kuyruğu kıyaslaması")
+    parser.add_argument("--messages", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+    for count in args.messages:
+        run(count, args.pool_size, args.batch_size)
@@ -0,0 +1,126 @@
+"""
+Makbuz ön işleme kıyaslaması (eski yol ve uyarlanabilir hat).
+
+Kullanım:
+    python -m benchmarks.bench_preprocessing --folder ornek_makbuzlar/
+    python -m benchmarks.bench_preprocessing --synthetic 10
+
+Klasördeki her görüntü için iki yolun ön işleme süresi, OCR'a giden
+görüntünün piksel sayısı ve (Tesseract kuruluysa) OCR süresi ile alan
+çıkarım doğruluğu ölçülür. Doğruluk için görüntünün yanında aynı adlı bir
+JSON dosyası beklenir: {"amount": 1234.56, "date": "2024-03-12"}.
+--synthetic ile dönük, gürültülü 12MP sentetik makbuz fotoğrafları üretilir.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import date
+import cv2
+import numpy as np
+from services.receipt_preprocessing import ReceiptPreprocessor, legacy_preprocess
+
+try:
+    import pytesseract
+    from services.ocr_service import OCRService
+except ImportError:
+    pytesseract = None
+
+IMAGE_PATTERNS = ("*.jpg", "*.jpeg", "*.png")
+
+def make_synthetic_receipts(folder: str, count: int, seed: int = 0) -> None:
+    """Koyu zemin üzerinde dönük, gürültülü makbuz fotoğrafları ve doğru değerlerini üretir."""
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        amount = round(float(rng.uniform(10, 5000)), 2)
+        receipt_date = date(2024, 1 + i % 12, 1 + i % 28)
+        integer, fraction = f"{amount:.2f}".split(".")
+        amount_text = f"{int(integer):,}".replace(",", ".") + "," + fraction
+        lines = ["MIGROS TICARET A.S.", f"TARIH: {receipt_date:%d.%m.%Y}", "EKMEK        12,50",
+                 "SUT          34,90", f"TOPLAM      {amount_text}", "KDV           1,20"]
+
+        receipt = np.full((1800, 800), 240, np.uint8)
+        for row, line in enumerate(lines * 3):
+            cv2.putText(receipt, line, (40, 80 + row * 90), cv2.FONT_HERSHEY_SIMPLEX, 1.3, 25, 3)
+        receipt = cv2.resize(receipt, None, fx=1.6, fy=1.6)
+
+        canvas = np.full((3000, 4000), 60, np.uint8)
+        top, left = (3000 - receipt.shape[0]) // 2, (4000 - receipt.shape[1]) // 2
+        canvas[top:top + receipt.shape[0], left:left + receipt.shape[1]] = receipt
+        rotation = cv2.getRotationMatrix2D((2000, 1500), float(rng.uniform(-8, 8)), 1.0)
+        canvas = cv2.warpAffine(canvas, rotation, (4000, 3000), borderValue=60)
+        canvas = np.clip(canvas + rng.normal(0, 6, canvas.shape), 0, 255).astype(np.uint8)
+
+        name = os.path.join(folder, f"receipt_{i:03d}")
+        cv2.imwrite(f"{name}.jpg", cv2.cvtColor(canvas, cv2.COLOR_GRAY2BGR), [cv2.IMWRITE_JPEG_QUALITY, 90])
+        with open(f"{name}.json", "w", encoding="utf-8") as f:
+            json.dump({"amount": amount, "date": receipt_date.isoformat()}, f)
+
+def load_truth(path: str):
+    truth_path = os.path.splitext(path)[0] + ".json"
+    if not os.path.exists(truth_path):
+        return None
+    with open(truth_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def evaluate(paths, name: str, preprocess, extractor) -> None:
+    preprocess_times, ocr_times, pixels = [], [], []
+    correct_amounts = correct_dates = labeled = 0
+
+    for path in paths:
+        image = cv2.imread(path)
+        start = time.perf_counter()
+        processed = preprocess(image)
+        preprocess_times.append(time.perf_counter() - start)
+        pixels.append(processed.size[0] * processed.size[1])
+
+        if extractor is None:
+            continue
+        start = time.perf_counter()
+        text = pytesseract.image_to_string(processed, lang="tur")
+        ocr_times.append(time.perf_counter() - start)
+
+        truth = load_truth(path)
+        if truth:
+            labeled += 1
+            info = extractor.extract_receipt_info(text)
+            correct_amounts += info["amount"] is not None and abs(info["amount"] - truth["amount"]) < 0.01
+            correct_dates += info["date"] is not None and info["date"].isoformat() == truth["date"]
+
+    print(f"{name:>10} | ön işleme: ort {statistics.mean(preprocess_times) * 1000:7.1f}ms"
+          f" | OCR'a giden görüntü: ort {statistics.mean(pixels) / 1e6:5.2f}MP", end="")
+    if ocr_times:
+        print(f" | OCR: ort {statistics.mean(ocr_times) * 1000:7.1f}ms", end="")
+    if labeled:
+        print(f" | tutar %{correct_amounts / labeled * 100:.0f}, tarih %{correct_dates / labeled * 100:.0f}", end="")
+    print()
+
+def run(folder: str) -> None:
+    paths = sorted(path for pattern in IMAGE_PATTERNS for path in glob.glob(os.path.join(folder, pattern)))
+    if not paths:
+        raise SystemExit(f"Klasörde görüntü bulunamadı: {folder}")
+
+    extractor = OCRService(db=None) if pytesseract else None
+    if extractor is None:
+        print("pytesseract bulunamadı; yalnızca ön işleme ölçülüyor.")
+
+    adaptive = ReceiptPreprocessor()
+    print(f"{len(paths)} görüntü")
+    evaluate(paths, "eski", legacy_preprocess, extractor)
+    evaluate(paths, "uyarlanır", lambda image: adaptive(image)[0], extractor)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Makbuz ön işleme kıyaslaması")
+    parser.add_argument("--folder", help="Örnek makbuz klasörü")
+    parser.add_argument("--synthetic", type=int, default=0, help="Üretilecek sentetik makbuz sayısı")
+    args = parser.parse_args()
+
+    if args.folder:
+        run(args.folder)
+    else:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            make_synthetic_receipts(temp_dir, args.synthetic or 10)
+            run(temp_dir)
@@ -0,0 +1,87 @@
+"""
+Makbuz alan çıkarımı kıyaslaması.
+
+Kullanım:
+    python -m benchmarks.bench_receipt_extractor --sizes 10000 100000
+
+Eski yöntem (tutar ve tarih için derlenmemiş desen listelerini sırayla
+tüm metin üzerinde deneyen re.findall döngüleri) ile tek geçişli
+derlenmiş çıkarıcının süreleri karşılaştırılır. Metinler birkaç fiş
+şablonundan rastgele ürün satırlarıyla üretilir.
+"""
+import argparse
+import random
+import re
+import time
+from datetime import datetime
+from services.receipt_extractor import extract_many
+
+ITEMS = ["SÜT 1 LT", "EKMEK", "YOĞURT", "DOMATES KG", "MAKARNA", "DETERJAN", "KAHVE", "PEYNİR"]
+
+def make_receipt(rng: random.Random) -> str:
+    lines = ["MIGROS TICARET A.S.", f"TARİH: {rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.2024 SAAT: 14:35",
+             f"FİŞ NO: {rng.randint(1, 9999):04d}"]
+    total = 0.0
+    for _ in range(rng.randint(3, 25)):
+        price = rng.randint(100, 50000) / 100
+        total += price
+        lines.append(f"{rng.choice(ITEMS):<20}*{price:.2f}".replace(".", ","))
+    amount = f"{total:,.2f}".replace(",", " ").replace(".", ",").replace(" ", ".")
+    lines += [f"TOPKDV              *{total * 0.08:.2f}".replace(".", ","), f"TOPLAM              *{amount}",
+              f"NAKİT               *{amount}", "KASİYER: 12 TEŞEKKÜRLER"]
+    return "\n".join(lines)
+
+def legacy_extract(text: str):
+    """Eski tutar ve tarih çıkarımı (karşılaştırma için)."""
+    amount = None
+    for pattern in [
+        r'(?:TOPLAM|TUTAR|FİYAT|Toplam|Tutar)\s*:?\s*(?:TL)?[₺₤]?\s*([0-9]+[.,][0-9]+)',
+        r'(?:TOPLAM|TUTAR|FİYAT|Toplam|Tutar)\s*:?\s*(?:TL)?[₺₤]?\s*([0-9]+)',
+        r'([0-9]+[.,][0-9]+)\s*(?:TL|₺|₤)',
+        r'(?:TL|₺|₤)\s*([0-9]+[.,][0-9]+)',
+    ]:
+        matches = re.findall(pattern, text)
+        if matches:
+            try:
+                amount = float(matches[0].replace(',', '.'))
+                break
+            except ValueError:
+                continue
+
+    found_date = None
+    for pattern in [r'(\d{2})[./](\d{2})[./](\d{4})', r'(\d{2})-(\d{2})-(\d{4})', r'(\d{4})[./](\d{2})[./](\d{2})']:
+        matches = re.findall(pattern, text)
+        if matches:
+            parts = matches[0]
+            try:
+                year, month, day = parts if len(parts[0]) == 4 else parts[::-1]
+                found_date = datetime(int(year), int(month), int(day)).date()
+                break
+            except ValueError:
+                continue
+    return amount, found_date
+
+def run(size: int) -> None:
+    rng = random.Random(42)
+    texts = [make_receipt(rng) for _ in range(size)]
+
+    start = time.perf_counter()
+    legacy = [legacy_extract(text) for text in texts]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = extract_many(texts)
+    new_time = time.perf_counter() - start
+
+    # Eski yöntem "1.042,50" biçimindeki toplamları binlik ayırıcıda keser
+    legacy_wrong = sum(1 for (amount, _), text in zip(legacy, texts)
+                       if amount is None or f"*{amount:.2f}".replace(".", ",") not in text.split("TOPLAM")[-1])
+    print(f"{size:>8} makbuz | eski: {legacy_time:6.2f}s ({legacy_wrong} hatalı tutar)"
+          f" | tek geçiş: {new_time:6.2f}s ({sum(r['amount'] is None for r in results)} bulunamadı)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Makbuz alan çıkarımı kıyaslaması")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size)
@@ -0,0 +1,90 @@
+"""
+Tekrarlayan işlem üretimi kıyaslaması.
+
+Kullanım:
+    python -m benchmarks.bench_recurring_materializer --series 100000 [--downtime-days 45]
+
+Kullanıcı başına beş seri (günlük, haftalık, aylık, aylık, yıllık) oluşturulur;
+serilerin son işlemi --downtime-days gün öncesidir, yani her seri kesinti
+boyunca kaçırılan dönemleri telafi etmek zorundadır. Seri başına ORM ile
+tek tek işlem ekleyen basit döngü (küçük bir alt kümede ölçülüp ölçeklenir)
+ile toplu, partili üretim karşılaştırılır; ardından aynı günün tekrar
+çalıştırılmasının (idempotent) maliyeti ölçülür.
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from models.database import Base, User, Transaction, RecurringSeries, bulk_insert_transactions
+from services.recurring_service import RecurringService, occurrence_dates
+
+RECURRING_TYPES = ["daily", "weekly", "monthly", "monthly", "yearly"]
+
+def build_database(series: int, downtime_days: int):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    users = series // len(RECURRING_TYPES)
+    last_date = datetime.combine(date.today() - timedelta(days=downtime_days), datetime.min.time())
+
+    session.execute(insert(User.__table__), [
+        {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x", "is_active": True}
+        for i in range(1, users + 1)
+    ])
+    bulk_insert_transactions(session, [
+        {"user_id": user_id, "amount": 100.0, "type": "expense", "category": f"Kategori {index}",
+         "date": last_date, "description": "bench", "is_recurring": True, "recurring_type": recurring_type}
+        for user_id in range(1, users + 1)
+        for index, recurring_type in enumerate(RECURRING_TYPES)
+    ])
+    session.commit()
+    return session
+
+def naive_materialize(session, as_of: date, limit: int) -> int:
+    """Seri başına ORM nesneleriyle ekleme ve commit (karşılaştırma için)."""
+    inserted = 0
+    for series in session.query(RecurringSeries).filter(RecurringSeries.next_date <= as_of).limit(limit).all():
+        for occurred_on in occurrence_dates(series.next_date, series.recurring_type, as_of, series.anchor_date):
+            session.add(Transaction(
+                user_id=series.user_id, amount=series.amount, type=series.type, category=series.category,
+                date=datetime.combine(occurred_on, datetime.min.time()), is_recurring=True,
+                recurring_type=series.recurring_type
+            ))
+            inserted += 1
+        session.commit()
+    return inserted
+
+def run(series: int, downtime_days: int, naive_sample: int) -> None:
+    as_of = date.today()
+
+    session = build_database(naive_sample, downtime_days)
+    start = time.perf_counter()
+    naive_rows = naive_materialize(session, as_of, naive_sample)
+    naive_time = (time.perf_counter() - start) * series / naive_sample
+    session.close()
+
+    session = build_database(series, downtime_days)
+    service = RecurringService(session)
+    start = time.perf_counter()
+    stats = service.materialize_due(as_of)
+    bulk_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rerun = service.materialize_due(as_of)
+    rerun_time = time.perf_counter() - start
+
+    print(f"{series:>7} seri, {downtime_days} gün kesinti | seri başına ORM: ~{naive_time:7.2f}s "
+          f"({naive_rows * series // naive_sample} işlem, {naive_sample} seriden ölçeklendi)"
+          f" | toplu: {bulk_time:6.2f}s ({stats['inserted']} işlem)"
+          f" | tekrar: {rerun_time:5.2f}s ({rerun['inserted']} işlem)")
+    session.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tekrarlayan işlem üretimi kıyaslaması")
+    parser.add_argument("--series", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--downtime-days", type=int, default=45, help="Son işlemden bu yana geçen gün")
+    parser.add_argument("--naive-sample", type=int, default=2000, help="Basit döngünün ölçüldüğü seri sayısı")
+    args = parser.parse_args()
+    for series in args.series:
+        run(series, args.downtime_days, args.naive_sample)
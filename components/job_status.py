@@ -0,0 +1,48 @@
+import time
+import streamlit as st
+from typing import Any, Dict, Optional
+from services.job_handlers import get_job_queue
+
+# Durum etiketleri
+STATUS_LABELS = {
+    "pending": "Sırada",
+    "running": "Çalışıyor",
+    "succeeded": "Tamamlandı",
+    "failed": "Hata"
+}
+
+def job_status(job_id: int, poll_interval: float = 1.0) -> Optional[Dict[str, Any]]:
+    """
+    Arka plan işinin durumunu gösterir; iş bitene kadar sayfayı kısa aralıklarla yeniler.
+
+    Sayfa işi beklemez: her çalıştırmada durum bir kez okunur, iş sürüyorsa
+    ``poll_interval`` sonra sayfa yeniden çalıştırılır.
+
+    Args:
+        job_id: İş ID'si
+        poll_interval: Yenileme aralığı (saniye)
+
+    Returns:
+        İş bittiyse iş bilgileri (sonuç veya hata dahil), sürüyorsa None
+    """
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        st.warning("İş bulunamadı.")
+        return None
+
+    if job["status"] == "succeeded":
+        st.success(STATUS_LABELS["succeeded"])
+        return job
+
+    if job["status"] == "failed":
+        st.error(f"{STATUS_LABELS['failed']}: {job['error']}")
+        if st.button("Tekrar dene", key=f"job_retry_{job_id}"):
+            queue.retry(job_id)
+            st.rerun()
+        return job
+
+    st.progress(job["progress"], text=job["message"] or STATUS_LABELS[job["status"]])
+    time.sleep(poll_interval)
+    st.rerun()
+    return None
@@ -50,12 +50,80 @@ def show_transactions():
                     recurring_type=recurring_type.lower() if recurring_type else None
                 )
                 st.success("İşlem başarıyla eklendi!")
-                # Önbelleği temizle
-                db_service.clear_cache()
                 db.close()
             except Exception as e:
                 st.error(f"İşlem eklenirken hata oluştu: {str(e)}")
 
+    show_transaction_history()
+
+def show_transaction_history():
+    """İşlem geçmişini imleçli sayfalama ile listeler."""
+    st.subheader("📋 İşlem Geçmişi")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        type_filter = st.selectbox("İşlem Tipi", ["Tümü", "Gelir", "Gider"], key="history_type")
+    with col2:
+        per_page = st.selectbox("Sayfa Boyutu", [25, 50, 100], key="history_per_page")
+
+    transaction_type = {"Gelir": "income", "Gider": "expense"}.get(type_filter)
+
+    # Filtre değişirse ilk sayfaya dön; önceki sayfalar için imleç yığını tutulur
+    filter_key = (transaction_type, per_page)
+    if st.session_state.get("history_filter_key") != filter_key:
+        st.session_state.history_filter_key = filter_key
+        st.session_state.history_cursors = [None]
+
+    cursors = st.session_state.history_cursors
+
+    try:
+        from models.database import SessionLocal
+        from services.database_service import DatabaseService
+        db = SessionLocal()
+        try:
+            result = DatabaseService(db).get_user_transactions_page(
+                user_id=st.session_state.user_id,
+                cursor=cursors[-1],
+                per_page=per_page,
+                transaction_type=transaction_type
+            )
+        finally:
+            db.close()
+    except ValueError:
+        # Geçersiz imleç: ilk sayfadan başla
+        st.session_state.history_cursors = [None]
+        st.rerun()
+    except Exception as e:
+        st.error(f"İşlemler yüklenirken hata oluştu: {str(e)}")
+        return
+
+    if not result["transactions"]:
+        st.info("Henüz işlem bulunmuyor.")
+        return
+
+    df = pd.DataFrame([transaction.to_dict() for transaction in result["transactions"]])
+    df["type"] = df["type"].map({"income": "Gelir", "expense": "Gider"}).fillna(df["type"])
+    df = df[["date", "type", "category", "amount", "description"]].rename(columns={
+        "date": "Tarih",
+        "type": "Tip",
+        "category": "Kategori",
+        "amount": "Miktar",
+        "description": "Açıklama"
+    })
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("← Önceki", disabled=len(cursors) == 1, key="history_prev"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Sayfa {len(cursors)} · Toplam {result['total']} işlem")
+    with col3:
+        if st.button("Sonraki →", disabled=not result["has_more"], key="history_next"):
+            cursors.append(result["next_cursor"])
+            st.rerun()
+
 def show_budgets():
     """Bütçe sayfasını gösterir."""
     st.title("💰 Bütçe Planlama")
@@ -95,8 +163,6 @@ def show_budgets():
                     end_date=end_date
                 )
                 st.success("Bütçe başarıyla eklendi!")
-                # Önbelleği temizle
-                db_service.clear_cache()
                 db.close()
             except Exception as e:
                 st.error(f"Bütçe eklenirken hata oluştu: {str(e)}")
@@ -137,8 +203,6 @@ def show_goals():
                     priority=priority.lower()
                 )
                 st.success("Hedef başarıyla eklendi!")
-                # Önbelleği temizle
-                db_service.clear_cache()
                 db.close()
             except Exception as e:
                 st.error(f"Hedef eklenirken hata oluştu: {str(e)}")
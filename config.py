@@ -11,8 +11,42 @@ os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(LOG_DIR, exist_ok=True)
 
 # Database ayarları
+# models.base şeması (utils.db: kategoriler, bildirimler, hedefler)
 DB_PATH = os.path.join(DATA_DIR, "finance.db")
-DATABASE_URL = f"sqlite:///{DB_PATH}"
+DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{DB_PATH}")
+# models.database şeması (kullanıcılar, işlemler, banka hesapları, makbuzlar). İki şemada
+# aynı adlı fakat farklı sütunlu tablolar (users, transactions) olduğundan ayrı dosyadadır.
+FINANCE_DB_PATH = os.path.join(BASE_DIR, "finance.db")
+FINANCE_DATABASE_URL = os.environ.get("FINANCE_DATABASE_URL", f"sqlite:///{FINANCE_DB_PATH}")
+
+# SQLite bağlantı ayarları (her bağlantıda PRAGMA olarak uygulanır)
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", 64 * 1024))  # Bağlantı başına sayfa önbelleği
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))  # Bellek eşlemeli okuma boyutu (byte)
+SQLITE_TEMP_STORE = os.environ.get("SQLITE_TEMP_STORE", "MEMORY")
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+# Sorgu sonucu önbelleği (kullanıcı verisi değiştiğinde ayrıca geçersiz kılınır)
+QUERY_CACHE_TTL_SECONDS = float(os.environ.get("QUERY_CACHE_TTL_SECONDS", 300))
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", 1024))
+CACHE_SWEEP_INTERVAL_SECONDS = float(os.environ.get("CACHE_SWEEP_INTERVAL_SECONDS", 60))
+
+# Banka API yanıt önbelleği (bakiyeler, senkronizasyon sonuçları, hesap özetleri)
+BANK_CACHE_TTL_SECONDS = float(os.environ.get("BANK_CACHE_TTL_SECONDS", 300))
+BANK_CACHE_MAX_ENTRIES = int(os.environ.get("BANK_CACHE_MAX_ENTRIES", 512))
+
+# Öğrenilmiş kategori modelleri (kullanıcı başına, içe aktarımda "Diğer" kalan işlemler için)
+CATEGORY_MODEL_DIR = os.environ.get("CATEGORY_MODEL_DIR", os.path.join(DATA_DIR, "models"))
+CATEGORY_MODEL_MIN_CONFIDENCE = float(os.environ.get("CATEGORY_MODEL_MIN_CONFIDENCE", 0.5))
+CATEGORY_MODEL_MIN_TRAINING_SAMPLES = int(os.environ.get("CATEGORY_MODEL_MIN_TRAINING_SAMPLES", 20))
+
+# Makbuz görüntüleri (içeriğe göre adreslenen dosya deposu)
+RECEIPT_STORE_DIR = os.environ.get("RECEIPT_STORE_DIR", os.path.join(DATA_DIR, "receipts"))
+
+# Arka plan iş kuyruğu (OCR, banka senkronizasyonu, rapor, e-posta)
+JOB_QUEUE_WORKERS = int(os.environ.get("JOB_QUEUE_WORKERS", 2))
+JOB_QUEUE_POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_QUEUE_POLL_INTERVAL_SECONDS", 1.0))
 
 # SMTP Ayarları
 SMTP_SERVER = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
@@ -21,6 +55,15 @@ SMTP_USERNAME = os.environ.get("SMTP_USERNAME", "")
 SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD", "")
 EMAIL_SENDER = SMTP_USERNAME
 
+# Giden e-posta kuyruğu (paylaşılan SMTP bağlantıları, toplu gönderim, yeniden deneme)
+MAIL_QUEUE_POOL_SIZE = int(os.environ.get("MAIL_QUEUE_POOL_SIZE", 2))
+MAIL_QUEUE_BATCH_SIZE = int(os.environ.get("MAIL_QUEUE_BATCH_SIZE", 50))
+MAIL_QUEUE_MAX_RETRIES = int(os.environ.get("MAIL_QUEUE_MAX_RETRIES", 5))
+MAIL_QUEUE_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get("MAIL_QUEUE_MAX_MESSAGES_PER_CONNECTION", 500))
+MAIL_QUEUE_MAX_IDLE_SECONDS = float(os.environ.get("MAIL_QUEUE_MAX_IDLE_SECONDS", 60.0))
+# Süreç kapanırken bekleyen e-postaların gönderilmesi için beklenen en uzun süre (saniye)
+MAIL_QUEUE_SHUTDOWN_TIMEOUT = float(os.environ.get("MAIL_QUEUE_SHUTDOWN_TIMEOUT", 10.0))
+
 # Uygulama ayarları
 APP_NAME = "Kişisel Finans"
 APP_VERSION = "1.0.0"
@@ -47,7 +90,37 @@ settings: Dict[str, Any] = {
     "data_dir": DATA_DIR,
     "log_dir": LOG_DIR,
     "db_path": DB_PATH,
+    "receipt_store_dir": RECEIPT_STORE_DIR,
     "database_url": DATABASE_URL,
+    "finance_db_path": FINANCE_DB_PATH,
+    "finance_database_url": FINANCE_DATABASE_URL,
+    "sqlite": {
+        "journal_mode": SQLITE_JOURNAL_MODE,
+        "synchronous": SQLITE_SYNCHRONOUS,
+        "cache_size_kb": SQLITE_CACHE_SIZE_KB,
+        "mmap_size": SQLITE_MMAP_SIZE,
+        "temp_store": SQLITE_TEMP_STORE,
+        "busy_timeout_ms": SQLITE_BUSY_TIMEOUT_MS,
+    },
+    "query_cache": {
+        "ttl_seconds": QUERY_CACHE_TTL_SECONDS,
+        "max_entries": QUERY_CACHE_MAX_ENTRIES,
+        "sweep_interval_seconds": CACHE_SWEEP_INTERVAL_SECONDS,
+    },
+    "bank_cache": {
+        "ttl_seconds": BANK_CACHE_TTL_SECONDS,
+        "max_entries": BANK_CACHE_MAX_ENTRIES,
+        "sweep_interval_seconds": CACHE_SWEEP_INTERVAL_SECONDS,
+    },
+    "category_model": {
+        "model_dir": CATEGORY_MODEL_DIR,
+        "min_confidence": CATEGORY_MODEL_MIN_CONFIDENCE,
+        "min_training_samples": CATEGORY_MODEL_MIN_TRAINING_SAMPLES,
+    },
+    "job_queue": {
+        "max_workers": JOB_QUEUE_WORKERS,
+        "poll_interval_seconds": JOB_QUEUE_POLL_INTERVAL_SECONDS,
+    },
     "smtp": {
         "server": SMTP_SERVER,
         "port": SMTP_PORT,
@@ -55,6 +128,14 @@ settings: Dict[str, Any] = {
         "password": SMTP_PASSWORD,
         "email_sender": EMAIL_SENDER,
     },
+    "mail_queue": {
+        "pool_size": MAIL_QUEUE_POOL_SIZE,
+        "batch_size": MAIL_QUEUE_BATCH_SIZE,
+        "max_retries": MAIL_QUEUE_MAX_RETRIES,
+        "max_messages_per_connection": MAIL_QUEUE_MAX_MESSAGES_PER_CONNECTION,
+        "max_idle_seconds": MAIL_QUEUE_MAX_IDLE_SECONDS,
+        "shutdown_timeout": MAIL_QUEUE_SHUTDOWN_TIMEOUT,
+    },
     "languages": {
         "default": DEFAULT_LANGUAGE,
         "available": ["tr", "en"]
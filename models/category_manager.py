@@ -4,6 +4,7 @@ import uuid
 from typing import List, Dict, Optional
 
 from models.transaction import TransactionType
+from services.categorizer import set_custom_categories
 
 
 class CustomCategory:
@@ -130,6 +131,11 @@ class CategoryManager:
         data = [c.to_dict() for c in self.categories]
         with open(self.data_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        self._refresh_categorizer()
+    
+    def _refresh_categorizer(self):
+        """Kategori adlarını içe aktarım kategorileme motoruna bildirir."""
+        set_custom_categories(c.name for c in self.categories)
     
     def load_data(self):
         """Dosyadan verileri yükler veya varsayılan kategorileri kullanır."""
@@ -142,6 +148,7 @@ class CategoryManager:
             with open(self.data_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 self.categories = [CustomCategory.from_dict(item) for item in data]
+            self._refresh_categorizer()
             
             # Eğer kategoriler boşsa varsayılanları ekle
             if not self.categories:
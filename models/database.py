@@ -1,15 +1,21 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, ForeignKey, Boolean, LargeBinary, Text, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Boolean, LargeBinary, Text, DateTime, Enum, Index, event, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import relationship, sessionmaker, Session, deferred
+import logging
 import os
+import weakref
 from datetime import datetime, date
+from dateutil.relativedelta import relativedelta
 from enum import Enum as PyEnum
+from config import settings
+from utils.engine import get_engine
+from utils.cache import invalidate_users, PENDING_INVALIDATIONS_KEY
 
-# Veritabanı URL'si
-DATABASE_URL = "sqlite:///./finance.db"
+logger = logging.getLogger(__name__)
 
-# Engine oluşturma
-engine = create_engine(DATABASE_URL)
+# Paylaşılan, ayarlanmış SQLite engine'i (models.base şemasından ayrı dosya)
+engine = get_engine(settings["finance_database_url"])
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -69,6 +75,16 @@ class Transaction(Base):
     # İlişkiler
     user = relationship("User", back_populates="transactions")
     
+    # Servis sorgularının erişim yolları için bileşik indeksler
+    __table_args__ = (
+        # Tarih aralığı sorguları (özetler, trendler, sayfalama)
+        Index("ix_transactions_user_date", "user_id", "date"),
+        # Tip + kategori + tarih filtreleri (bütçe harcamaları, kategori analizleri)
+        Index("ix_transactions_user_type_category_date", "user_id", "type", "category", "date"),
+        # Banka/OCR içe aktarımlarında tekrar kontrolü
+        Index("ux_transactions_user_source_external", "user_id", "source", "external_id", unique=True),
+    )
+    
     def to_dict(self):
         """İşlem bilgilerini sözlük olarak döndürür."""
         return {
@@ -110,6 +126,11 @@ class Budget(Base):
     # İlişkiler
     user = relationship("User", back_populates="budgets")
     
+    __table_args__ = (
+        # İşlem yazımında etkilenen (kullanıcı, kategori) bütçelerini bulmak için
+        Index("ix_budgets_user_category", "user_id", "category"),
+    )
+    
     def to_dict(self):
         """Bütçe bilgilerini sözlük olarak döndürür."""
         return {
@@ -127,6 +148,28 @@ class Budget(Base):
     def __repr__(self):
         return f"<Budget(id={self.id}, user_id={self.user_id}, name={self.name}, amount={self.amount})>"
 
+class BudgetAlertEvent(Base):
+    """
+    Bir bütçe için bir ayda bildirilen eşik aşımı.
+    
+    (bütçe, ay, seviye) benzersizdir; aynı ayda aynı eşik ikinci kez
+    aşıldığında (ör. harcama silinip tekrar eklendiğinde) yeni bildirim
+    oluşturulmaz.
+    """
+    __tablename__ = "budget_alert_events"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    budget_id = Column(Integer, ForeignKey("budgets.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    year_month = Column(String(7), nullable=False)  # "YYYY-MM"
+    level = Column(String(20), nullable=False)  # "budget_warning" veya "budget_alert"
+    spent = Column(Float, nullable=False)  # Eşik aşıldığındaki aylık harcama
+    created_at = Column(DateTime, default=datetime.now)
+    
+    __table_args__ = (
+        Index("ux_budget_alert_events_budget_month_level", "budget_id", "year_month", "level", unique=True),
+    )
+
 class FinancialGoal(Base):
     """Finansal hedef modeli."""
     __tablename__ = "goals"
@@ -179,17 +222,80 @@ class Receipt(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    image = Column(LargeBinary)  # Makbuz görüntüsü
+    # Eski sürümlerde görüntü satırda tutulurdu; yeni makbuzlar dosya deposuna yazılır
+    # (utils.blob_store) ve bu sütun boş kalır. Sorgularda yüklenmemesi için ertelenmiştir.
+    image = deferred(Column(LargeBinary))
     ocr_text = Column(Text)  # OCR ile çıkarılan metin
     amount = Column(Float, nullable=True)  # Tespit edilen tutar
     date = Column(Date, nullable=True)  # Tespit edilen tarih
     category = Column(String, nullable=True)  # Tespit edilen kategori
+    image_hash = Column(String(64), nullable=True)  # Görüntü baytlarının SHA-256 özeti (depo adresi)
+    image_size = Column(Integer, nullable=True)  # Görüntü boyutu (byte)
+    thumbnail_hash = Column(String(64), nullable=True)  # Küçük resmin depo adresi
     created_at = Column(DateTime, default=datetime.now)
     processed = Column(Boolean, default=False)  # İşlenme durumu
     reviewed = Column(Boolean, default=False)  # Kullanıcı tarafından onaylanma durumu
     
     # İlişkiler
     user = relationship("User", back_populates="receipts")
+    
+    __table_args__ = (
+        # Aynı makbuzun tekrar yüklenmesini tespit etmek için
+        Index("ix_receipts_user_image_hash", "user_id", "image_hash"),
+    )
+
+class OCRCacheEntry(Base):
+    """
+    Görüntü içeriğine göre adreslenen OCR metin önbelleği.
+    
+    Anahtar, görüntü baytlarının özeti ile ön işleme ve OCR ayarlarından
+    türetilir; ayarlar değişince eski girdiler kendiliğinden kullanılmaz.
+    """
+    __tablename__ = "ocr_cache"
+    
+    cache_key = Column(String(64), primary_key=True)  # sha256(görüntü özeti + ayarlar)
+    image_hash = Column(String(64), nullable=False, index=True)
+    settings = Column(String, nullable=False)  # Ayarların JSON gösterimi
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+
+class JobStatus(str, PyEnum):
+    """Arka plan işi durumları."""
+    PENDING = "pending"  # Sırada
+    RUNNING = "running"  # Çalışıyor
+    SUCCEEDED = "succeeded"  # Tamamlandı
+    FAILED = "failed"  # Hata ile bitti
+
+class Job(Base):
+    """
+    Arka planda çalıştırılan iş (OCR, banka senkronizasyonu, rapor, e-posta).
+    
+    Sayfalar işi kuyruğa ekleyip durumunu bu tablodan okur. Aynı
+    idempotency_key ile eklenen iş tekrar oluşturulmaz; yarıda kalan
+    (running) işler kuyruk yeniden başladığında tekrar sıraya alınır.
+    """
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)  # İş türü (ör. "report_export")
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    idempotency_key = Column(String(255), nullable=True, unique=True)
+    payload = Column(Text, nullable=False, default="{}")  # JSON
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    progress = Column(Float, nullable=False, default=0.0)  # 0-1 arası
+    message = Column(String, nullable=True)  # Son ilerleme mesajı
+    result = Column(Text, nullable=True)  # JSON
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # Sıradaki işleri ekleme sırasıyla almak için
+        Index("ix_jobs_status_id", "status", "id"),
+        Index("ix_jobs_user_created", "user_id", "created_at"),
+    )
 
 class BankAccount(Base):
     __tablename__ = "bank_accounts"
@@ -204,9 +310,558 @@ class BankAccount(Base):
     last_sync = Column(DateTime)  # Son senkronizasyon zamanı
     is_active = Column(Boolean, default=True)  # Hesap aktif mi
     
+    # Artımlı senkronizasyon imleci (en son alınan işlem)
+    sync_cursor_date = Column(DateTime, nullable=True)  # En son işlem tarihi
+    sync_cursor_external_id = Column(String(255), nullable=True)  # En son işlemin dış ID'si
+    sync_cursor_token = Column(String, nullable=True)  # Banka API devam token'ı
+    
     # İlişkiler
     user = relationship("User", back_populates="bank_accounts")
 
+class MonthlyRollup(Base):
+    """
+    Aylık işlem özeti (kullanıcı, ay, tip, kategori bazında toplam ve adet).
+    
+    İşlem eklendiğinde, güncellendiğinde veya silindiğinde ORM flush'ı
+    sırasında artımlı olarak güncellenir; özet sorguları ham işlem
+    satırları yerine bu tabloyu okur.
+    """
+    __tablename__ = "monthly_rollups"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    year_month = Column(String(7), primary_key=True)  # "YYYY-MM"
+    type = Column(Enum(TransactionType), primary_key=True)
+    category = Column(String(100), primary_key=True)
+    
+    total_amount = Column(Float, default=0.0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f"<MonthlyRollup(user_id={self.user_id}, year_month={self.year_month}, type={self.type}, category={self.category}, total={self.total_amount})>"
+
+class RecurringSeries(Base):
+    """
+    Tekrarlayan işlem serisi (kullanıcı, kategori, tip, tekrar türü).
+    
+    Aynı anahtarlı tekrarlayan işlemler tek seri olarak tutulur. Seri, işlem
+    eklendiğinde, güncellendiğinde veya silindiğinde ORM flush'ı sırasında
+    güncellenir. İşlem tarihleri anchor_date + k·aralık olarak hesaplanır (ay
+    sonu serileri kaymaz); next_date son işlemden ve üretilmiş son dönemden
+    (materialized_through) sonraki ilk tarihtir ve indekslidir, böylece vadesi
+    gelen seriler tek aralık sorgusuyla bulunur.
+    """
+    __tablename__ = "recurring_series"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    type = Column(Enum(TransactionType), nullable=False)
+    category = Column(String(100), nullable=False)
+    recurring_type = Column(Enum(RecurringType), nullable=False)
+    
+    amount = Column(Float, nullable=False)  # Son işlemin tutarı
+    anchor_date = Column(Date, nullable=False)  # Seri oluşturulurken ilk işlemin tarihi; takvimin başlangıcı
+    last_date = Column(Date, nullable=False)  # Son işlemin tarihi
+    next_date = Column(Date, nullable=False)  # Beklenen sonraki işlem tarihi
+    # Üretilmiş son dönem; yalnızca ileri gider, silinen üretilmiş işlemler tekrar üretilmez
+    materialized_through = Column(Date, nullable=True)
+    
+    __table_args__ = (
+        Index("ux_recurring_series_key", "user_id", "category", "type", "recurring_type", unique=True),
+        # Vadesi gelen serilerin tüm kullanıcılar için aralık sorgusu
+        Index("ix_recurring_series_next_date", "next_date"),
+    )
+    
+    def __repr__(self):
+        return f"<RecurringSeries(id={self.id}, user_id={self.user_id}, category={self.category}, recurring_type={self.recurring_type}, next_date={self.next_date})>"
+
+# Rollup anahtarını belirleyen işlem alanları
+ROLLUP_FIELDS = ("user_id", "type", "category", "date", "amount")
+
+def _transaction_rollup_values(transaction: Transaction, committed: bool = False):
+    """
+    İşlemin rollup anahtarını ve tutarını döndürür.
+    
+    committed True ise flush öncesi veritabanındaki (eski) değerler kullanılır.
+    """
+    state = inspect(transaction)
+    values = {}
+    for field in ROLLUP_FIELDS:
+        history = state.attrs[field].history
+        if committed and history.deleted:
+            values[field] = history.deleted[0]
+        else:
+            values[field] = getattr(transaction, field)
+    
+    if values["date"] is None or values["amount"] is None or values["type"] is None:
+        return None
+    
+    key = (
+        values["user_id"],
+        values["date"].strftime("%Y-%m"),
+        TransactionType(values["type"]),
+        values["category"]
+    )
+    return key, values["amount"]
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    """Rollup alanlarında eski değerin geçmişte tutulmasını sağlar."""
+
+# Süresi dolmuş (expired) nesnelerde de eski değer yüklensin ki
+# güncellemelerde eski özet satırından düşülebilsin
+for _field in ROLLUP_FIELDS:
+    event.listen(getattr(Transaction, _field), "set", _keep_previous_value, active_history=True)
+
+def apply_rollup_deltas(connection, deltas: dict) -> None:
+    """
+    Rollup farklarını (anahtar -> [tutar, adet]) tabloya tek bir upsert ile uygular.
+    
+    Satırlar executemany ile gönderilir; tek bir çok satırlı VALUES ifadesi
+    çok sayıda anahtarda SQLite'ın parametre sınırını aşar.
+    """
+    rows = [
+        {
+            "user_id": user_id,
+            "year_month": year_month,
+            "type": transaction_type,
+            "category": category,
+            "total_amount": amount,
+            "transaction_count": count
+        }
+        for (user_id, year_month, transaction_type, category), (amount, count) in deltas.items()
+        if amount or count
+    ]
+    if not rows:
+        return
+    
+    table = MonthlyRollup.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.year_month, table.c.type, table.c.category],
+        set_={
+            "total_amount": table.c.total_amount + stmt.excluded.total_amount,
+            "transaction_count": table.c.transaction_count + stmt.excluded.transaction_count
+        }
+    )
+    connection.execute(stmt, rows)
+    
+    # Silinen işlemler sonrası boşalan özet satırlarını temizle
+    if any(row["transaction_count"] < 0 for row in rows):
+        connection.execute(table.delete().where(table.c.transaction_count <= 0))
+
+# Commit'e kadar uygulanan özet farklarının session.info içindeki anahtarı
+PENDING_ROLLUP_DELTAS_KEY = "pending_rollup_deltas"
+
+def record_pending_rollup_deltas(session, deltas: dict) -> None:
+    """
+    Oturumun açık veritabanı işleminde uygulanan özet farklarını biriktirir.
+    
+    Commit öncesi dinleyiciler (ör. bütçe eşiği kontrolü) hangi özet
+    satırlarının ne kadar değiştiğini buradan okur; farklar commit veya
+    rollback ile bırakılır.
+    """
+    pending = session.info.setdefault(PENDING_ROLLUP_DELTAS_KEY, {})
+    for key, (amount, count) in deltas.items():
+        delta = pending.setdefault(key, [0.0, 0])
+        delta[0] += amount
+        delta[1] += count
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_rollup_deltas(session):
+    """Biten veritabanı işleminin özet farklarını bırakır."""
+    session.info.pop(PENDING_ROLLUP_DELTAS_KEY, None)
+
+@event.listens_for(Session, "after_flush")
+def _update_monthly_rollups(session, flush_context):
+    """
+    Flush edilen işlem değişikliklerini aylık özet tablosuna yansıtır.
+    
+    after_flush aşamasında new/dirty/deleted listeleri ve öznitelik
+    geçmişi hâlâ flush öncesi durumu gösterir.
+    """
+    deltas = {}
+    
+    def add_delta(values, sign):
+        if values is None:
+            return
+        key, amount = values
+        delta = deltas.setdefault(key, [0.0, 0])
+        delta[0] += sign * amount
+        delta[1] += sign
+    
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            add_delta(_transaction_rollup_values(obj), 1)
+    
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and session.is_modified(obj):
+            old_values = _transaction_rollup_values(obj, committed=True)
+            new_values = _transaction_rollup_values(obj)
+            if old_values != new_values:
+                add_delta(old_values, -1)
+                add_delta(new_values, 1)
+    
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            add_delta(_transaction_rollup_values(obj, committed=True), -1)
+    
+    if deltas:
+        apply_rollup_deltas(session.connection(), deltas)
+        record_pending_rollup_deltas(session, deltas)
+
+# Tekrar türüne göre ardışık işlemler arasındaki takvim aralığı (ay sonları kırpılır)
+RECURRING_INTERVALS = {
+    RecurringType.DAILY: relativedelta(days=1),
+    RecurringType.WEEKLY: relativedelta(weeks=1),
+    RecurringType.MONTHLY: relativedelta(months=1),
+    RecurringType.YEARLY: relativedelta(years=1),
+}
+
+# Seri anahtarını ve son işlemini belirleyen işlem alanları
+SERIES_FIELDS = ("user_id", "type", "category", "date", "amount", "is_recurring", "recurring_type")
+
+for _field in ("is_recurring", "recurring_type"):
+    event.listen(getattr(Transaction, _field), "set", _keep_previous_value, active_history=True)
+
+def series_key(user_id, transaction_type, category, recurring_type):
+    """Tekrarlayan işlem serisinin anahtarını (kullanıcı, kategori, tip, tekrar türü) döndürür."""
+    return (user_id, category, TransactionType(transaction_type), RecurringType(recurring_type))
+
+def _transaction_series_values(transaction: Transaction, committed: bool = False):
+    """
+    Tekrarlayan işlemin seri anahtarını, tarihini ve tutarını döndürür.
+    
+    İşlem tekrarlayan değilse None döner. committed True ise flush öncesi
+    veritabanındaki (eski) değerler kullanılır.
+    """
+    state = inspect(transaction)
+    values = {}
+    for field in SERIES_FIELDS:
+        history = state.attrs[field].history
+        if committed and history.deleted:
+            values[field] = history.deleted[0]
+        else:
+            values[field] = getattr(transaction, field)
+    
+    if not values["is_recurring"] or values["recurring_type"] is None or values["date"] is None or values["type"] is None:
+        return None
+    
+    occurred_on = values["date"].date() if isinstance(values["date"], datetime) else values["date"]
+    key = series_key(values["user_id"], values["type"], values["category"], values["recurring_type"])
+    return key, occurred_on, values["amount"]
+
+def occurrence_index(anchor_date: date, recurring_type, after: date) -> int:
+    """anchor_date + k·aralık tarihi after'dan sonra olan en küçük k'yı (k >= 0) döndürür."""
+    interval = RECURRING_INTERVALS[RecurringType(recurring_type)]
+    if interval.months or interval.years:
+        months = interval.years * 12 + interval.months
+        index = ((after.year - anchor_date.year) * 12 + after.month - anchor_date.month) // months
+    else:
+        index = (after - anchor_date).days // interval.days
+    index = max(index, 0)
+    # Tahmin ay sonu kırpması nedeniyle en fazla bir adım geride kalır
+    while anchor_date + interval * index <= after:
+        index += 1
+    return index
+
+def next_series_date(anchor_date: date, recurring_type, after: date) -> date:
+    """Serinin takviminde (anchor_date + k·aralık) after'dan sonraki ilk tarihi döndürür."""
+    interval = RECURRING_INTERVALS[RecurringType(recurring_type)]
+    return anchor_date + interval * occurrence_index(anchor_date, recurring_type, after)
+
+def series_row(key, last_date, amount, anchor_date, materialized_through=None) -> dict:
+    """Seri tablosu satırını (next_date takvime göre hesaplanmış) döndürür."""
+    user_id, category, transaction_type, recurring_type = key
+    return {
+        "user_id": user_id,
+        "category": category,
+        "type": transaction_type,
+        "recurring_type": recurring_type,
+        "amount": amount,
+        "anchor_date": anchor_date,
+        "last_date": last_date,
+        "next_date": next_series_date(anchor_date, recurring_type, max(last_date, materialized_through or last_date)),
+        "materialized_through": materialized_through
+    }
+
+def _series_upsert(newer_only: bool):
+    """
+    Seri satırı upsert ifadesi; newer_only ise yalnızca daha yeni son işlem yazılır.
+    
+    Mevcut serinin takvim başlangıcı ve üretim sınırı korunur.
+    """
+    table = RecurringSeries.__table__
+    stmt = sqlite_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.category, table.c.type, table.c.recurring_type],
+        set_={
+            "amount": stmt.excluded.amount,
+            "anchor_date": func.coalesce(table.c.anchor_date, stmt.excluded.anchor_date),
+            "last_date": stmt.excluded.last_date,
+            "next_date": stmt.excluded.next_date
+        },
+        where=(stmt.excluded.last_date >= table.c.last_date) if newer_only else None
+    )
+
+def _existing_series(connection, keys) -> dict:
+    """Anahtarları verilen serilerin (anchor_date, materialized_through) değerlerini döndürür."""
+    keys = set(keys)
+    if not keys:
+        return {}
+    table = RecurringSeries.__table__
+    rows = connection.execute(
+        select(
+            table.c.user_id, table.c.type, table.c.category, table.c.recurring_type,
+            table.c.anchor_date, table.c.materialized_through
+        ).where(table.c.user_id.in_({key[0] for key in keys}))
+    )
+    existing = {}
+    for row in rows:
+        key = series_key(row.user_id, row.type, row.category, row.recurring_type)
+        if key in keys:
+            existing[key] = (row.anchor_date, row.materialized_through)
+    return existing
+
+def apply_series_occurrences(connection, occurrences: dict) -> None:
+    """
+    Yeni tekrarlayan işlemleri (seri anahtarı -> (tarih, tutar)) serilere yansıtır.
+    
+    Seri yoksa işlemin tarihi takvim başlangıcı olarak oluşturulur; varsa
+    yalnızca daha yeni (veya aynı) tarihli işlem son işlemi ve next_date'i
+    değiştirir.
+    """
+    if occurrences:
+        existing = _existing_series(connection, occurrences)
+        rows = []
+        for key, (last_date, amount) in occurrences.items():
+            anchor_date, materialized_through = existing.get(key, (None, None))
+            rows.append(series_row(key, last_date, amount, anchor_date or last_date, materialized_through))
+        connection.execute(_series_upsert(newer_only=True), rows)
+
+def refresh_recurring_series(connection, keys) -> None:
+    """
+    Serileri işlem tablosundaki en son tekrarlayan işlemden yeniden hesaplar.
+    
+    Güncellenen veya silinen işlemlerden etkilenen seriler için kullanılır;
+    tekrarlayan işlemi kalmayan seri silinir. Son işlem silinse bile next_date
+    üretilmiş son dönemin (materialized_through) gerisine düşmez.
+    """
+    table = RecurringSeries.__table__
+    existing = _existing_series(connection, keys)
+    for key in keys:
+        user_id, category, transaction_type, recurring_type = key
+        series_transactions = select(Transaction.date, Transaction.amount).where(
+            Transaction.user_id == user_id,
+            Transaction.type == transaction_type,
+            Transaction.category == category,
+            Transaction.is_recurring == True,
+            Transaction.recurring_type == recurring_type
+        )
+        latest = connection.execute(
+            series_transactions.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(1)
+        ).first()
+        
+        if latest is None:
+            connection.execute(table.delete().where(
+                table.c.user_id == user_id,
+                table.c.category == category,
+                table.c.type == transaction_type,
+                table.c.recurring_type == recurring_type
+            ))
+        else:
+            last_date = latest.date.date() if isinstance(latest.date, datetime) else latest.date
+            anchor_date, materialized_through = existing.get(key, (None, None))
+            if anchor_date is None:
+                # Yeni oluşan seri (ör. kategorisi değişen işlem) ilk işleminden başlar
+                first = connection.execute(series_transactions.order_by(Transaction.date, Transaction.id).limit(1)).first()
+                anchor_date = first.date.date() if isinstance(first.date, datetime) else first.date
+            connection.execute(
+                _series_upsert(newer_only=False),
+                [series_row(key, last_date, latest.amount, anchor_date, materialized_through)]
+            )
+
+@event.listens_for(Session, "after_flush")
+def _update_recurring_series(session, flush_context):
+    """
+    Flush edilen tekrarlayan işlem değişikliklerini seri tablosuna yansıtır.
+    
+    Yeni işlemler serinin son işlemini tek upsert ile ilerletir; güncellenen
+    veya silinen işlemlerin eski ve yeni serileri işlem tablosundan yeniden
+    hesaplanır.
+    """
+    occurrences = {}
+    refresh_keys = set()
+    
+    def add_occurrence(values):
+        if values is None:
+            return
+        key, occurred_on, amount = values
+        if key not in occurrences or occurred_on >= occurrences[key][0]:
+            occurrences[key] = (occurred_on, amount)
+    
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            add_occurrence(_transaction_series_values(obj))
+    
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and session.is_modified(obj):
+            old_values = _transaction_series_values(obj, committed=True)
+            new_values = _transaction_series_values(obj)
+            if old_values != new_values:
+                refresh_keys.update(values[0] for values in (old_values, new_values) if values is not None)
+    
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            values = _transaction_series_values(obj, committed=True)
+            if values is not None:
+                refresh_keys.add(values[0])
+    
+    # Yeniden hesaplanan seriler yeni işlemleri de işlem tablosundan görür
+    occurrences = {key: value for key, value in occurrences.items() if key not in refresh_keys}
+    if occurrences:
+        apply_series_occurrences(session.connection(), occurrences)
+    if refresh_keys:
+        refresh_recurring_series(session.connection(), refresh_keys)
+
+# Değiştiğinde kullanıcının sorgu önbelleğini geçersiz kılan modeller
+CACHE_INVALIDATING_MODELS = (Transaction, Budget, FinancialGoal)
+
+@event.listens_for(Session, "after_flush")
+def _collect_query_cache_invalidations(session, flush_context):
+    """
+    Verisi değişen kullanıcıları commit'te önbellekten silinmek üzere işaretler.
+
+    Commit'e kadar bu kullanıcıların sorgu sonuçları önbelleğe yazılmaz
+    (bkz. utils.cache.cached_query).
+    """
+    pending = session.info.setdefault(PENDING_INVALIDATIONS_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, CACHE_INVALIDATING_MODELS):
+            pending.add(obj.user_id)
+            # Kayıt başka bir kullanıcıya taşındıysa eski kullanıcı da etkilenir
+            pending.update(inspect(obj).attrs.user_id.history.deleted or ())
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_query_cache(session):
+    """Commit edilen değişikliklerden etkilenen kullanıcıların önbelleğini temizler."""
+    pending = session.info.pop(PENDING_INVALIDATIONS_KEY, None)
+    if pending:
+        invalidate_users(pending)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_query_cache_invalidations(session):
+    """Geri alınan değişiklikler için bekleyen geçersiz kılmaları bırakır."""
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
+
+# Toplu eklemede tek INSERT ifadesine konan satır sayısı
+BULK_INSERT_CHUNK_SIZE = 2000
+
+# Toplu eklemenin ON CONFLICT ile dayandığı tekil (user_id, source, external_id) indeksi
+EXTERNAL_ID_INDEX = "ux_transactions_user_source_external"
+
+# İndeksin bulunduğu doğrulanmış engine'ler (migration sonradan oluşturabileceği için yalnızca olumlu sonuç saklanır)
+_external_id_index_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+# Dış kimlik aramasında IN listesindeki en fazla değer
+EXTERNAL_ID_LOOKUP_BATCH_SIZE = 500
+
+def has_external_id_index(connection) -> bool:
+    """İşlem tablosunda tekil (user_id, source, external_id) indeksinin bulunup bulunmadığını döndürür."""
+    if connection.engine in _external_id_index_engines:
+        return True
+    present = any(
+        row[1] == EXTERNAL_ID_INDEX and row[2]
+        for row in connection.exec_driver_sql("PRAGMA index_list(transactions)")
+    )
+    if present:
+        _external_id_index_engines.add(connection.engine)
+    return present
+
+def _without_known_external_ids(connection, rows: list) -> list:
+    """Veritabanında veya listede daha önce geçen (user_id, source, external_id) satırlarını çıkarır."""
+    table = Transaction.__table__
+    external_ids = sorted({row["external_id"] for row in rows if row.get("external_id") is not None})
+    known = set()
+    for offset in range(0, len(external_ids), EXTERNAL_ID_LOOKUP_BATCH_SIZE):
+        known.update(tuple(key) for key in connection.execute(
+            select(table.c.user_id, table.c.source, table.c.external_id).where(
+                table.c.external_id.in_(external_ids[offset:offset + EXTERNAL_ID_LOOKUP_BATCH_SIZE])
+            )
+        ))
+
+    new_rows = []
+    for row in rows:
+        if row.get("external_id") is not None and row.get("source") is not None:
+            key = (row["user_id"], row["source"], row["external_id"])
+            if key in known:
+                continue
+            known.add(key)
+        new_rows.append(row)
+    return new_rows
+
+def bulk_insert_transactions(session, rows: list, chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> int:
+    """
+    İşlem satırlarını ORM'i atlayarak toplu ekler.
+
+    (user_id, source, external_id) benzersiz indeksine takılan satırlar
+    INSERT ... ON CONFLICT DO NOTHING ile sessizce atlanır; indeks yoksa
+    (migration'ı yapılmamış eski veritabanı) bilinen satırlar eklemeden
+    önce sorguyla ayıklanır ve düz INSERT kullanılır. ORM flush'ı
+    kullanılmadığı için aylık özet tablosu ve tekrarlayan işlem serileri
+    eklenen satırlardan burada güncellenir ve etkilenen kullanıcılar
+    commit'te önbellekten silinmek üzere işaretlenir. Commit çağıranın
+    sorumluluğundadır.
+
+    Args:
+        session: Veritabanı oturumu
+        rows: Transaction tablosu sütunlarıyla sözlükler
+        chunk_size: Tek ifadede eklenecek satır sayısı
+
+    Returns:
+        Eklenen satır sayısı
+    """
+    table = Transaction.__table__
+    connection = session.connection()
+    deltas = {}
+    occurrences = {}
+    inserted = 0
+
+    stmt = sqlite_insert(table)
+    if has_external_id_index(connection):
+        stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.user_id, table.c.source, table.c.external_id])
+    else:
+        # Tekrar eden kayıtlar yüzünden indeks oluşturulamamış eski veritabanı
+        # (bkz. utils/migrate_db.py): bilinen kayıtlar eklemeden önce ayıklanır
+        logger.warning(f"'{EXTERNAL_ID_INDEX}' indeksi yok; migrate_db çalıştırılmalı. Tekrar kontrolü sorguyla yapılıyor.")
+        rows = _without_known_external_ids(connection, rows)
+
+    for offset in range(0, len(rows), chunk_size):
+        chunk_stmt = stmt.returning(
+            table.c.user_id, table.c.type, table.c.category, table.c.date, table.c.amount,
+            table.c.is_recurring, table.c.recurring_type
+        )
+
+        for row in connection.execute(chunk_stmt, rows[offset:offset + chunk_size]):
+            key = (row.user_id, row.date.strftime("%Y-%m"), TransactionType(row.type), row.category)
+            delta = deltas.setdefault(key, [0.0, 0])
+            delta[0] += row.amount
+            delta[1] += 1
+            inserted += 1
+
+            if row.is_recurring and row.recurring_type is not None:
+                occurred_on = row.date.date()
+                recurring_key = series_key(row.user_id, row.type, row.category, row.recurring_type)
+                if recurring_key not in occurrences or occurred_on >= occurrences[recurring_key][0]:
+                    occurrences[recurring_key] = (occurred_on, row.amount)
+
+    apply_series_occurrences(connection, occurrences)
+    if deltas:
+        apply_rollup_deltas(connection, deltas)
+        record_pending_rollup_deltas(session, deltas)
+        session.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).update(key[0] for key in deltas)
+
+    return inserted
+
 # Veritabanı tablolarını oluştur
 def init_db():
     Base.metadata.create_all(bind=engine)
@@ -1,21 +1,82 @@
+import copy
 import requests
 import json
 import hashlib
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional, Tuple, Union
 from sqlalchemy.orm import Session
-from models.database import User, BankAccount, Transaction
-import time
+from models.database import User, BankAccount, Transaction, bulk_insert_transactions
+from config import settings
+from utils.cache import TTLCache
+from services.categorizer import get_categorizer
+from services.category_model import category_models
+from services.budget_alerts import watch_budget_alerts
+from utils.rate_limiter import RateLimiter
+
+# API uç noktaları. "simulate" True olan bankalar için gerçek istek yerine
+# örnek veri üretilir; "rate_limit" bankaya saniyede gönderilebilecek istek sayısıdır.
+DEFAULT_API_ENDPOINTS = {
+    "example_bank": {
+        "base_url": "https://api.example-bank.com/v1",
+        "accounts": "/accounts",
+        "transactions": "/accounts/{account_id}/transactions",
+        "balance": "/accounts/{account_id}/balance",
+        "rate_limit": 5,
+        "simulate": True
+    },
+    "other_bank": {
+        "base_url": "https://api.other-bank.com/v2",
+        "accounts": "/user/accounts",
+        "transactions": "/account/{account_id}/transactions",
+        "balance": "/account/{account_id}/balance",
+        "rate_limit": 2,
+        "simulate": True
+    }
+}
+
+# Artımlı senkronizasyonda geç kaydedilen işlemler için imleçten geriye bakılan gün sayısı
+SYNC_OVERLAP_DAYS = 3
+
+# Süreç genelinde paylaşılan banka yanıt önbelleği
+bank_cache = TTLCache(
+    max_entries=settings["bank_cache"]["max_entries"],
+    ttl=settings["bank_cache"]["ttl_seconds"],
+    sweep_interval=settings["bank_cache"]["sweep_interval_seconds"]
+)
+
+# Tekrar denenebilir HTTP durum kodları
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+class BankAPIError(Exception):
+    """Banka API çağrısı hatası; retryable geçici hataları belirtir."""
+    
+    def __init__(self, message: str, retryable: bool = False, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status_code = status_code
 
 class BankingService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        api_endpoints: Optional[Dict] = None,
+        request_timeout: float = 10,
+        cache: Optional[TTLCache] = None,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
         """
         Bankacılık API entegrasyonu için servis.
         
         Args:
             db: Veritabanı oturumu
+            api_endpoints: Banka uç noktaları (varsayılan: DEFAULT_API_ENDPOINTS)
+            request_timeout: HTTP istek zaman aşımı (saniye)
+            cache: Yanıt önbelleği (varsayılan: süreç genelinde paylaşılan bank_cache)
+            rate_limiter: Her banka isteğinden önce beklenen hız sınırlayıcı (varsayılan: sınırsız)
         """
         self.db = db
+        self.request_timeout = request_timeout
+        self.rate_limiter = rate_limiter
         
         # API anahtarları - gerçek uygulamada çevresel değişkenlerden alınmalı
         self.api_keys = {
@@ -24,25 +85,10 @@ class BankingService:
         }
         
         # API uç noktaları
-        self.api_endpoints = {
-            "example_bank": {
-                "base_url": "https://api.example-bank.com/v1",
-                "accounts": "/accounts",
-                "transactions": "/accounts/{account_id}/transactions",
-                "balance": "/accounts/{account_id}/balance"
-            },
-            "other_bank": {
-                "base_url": "https://api.other-bank.com/v2",
-                "accounts": "/user/accounts",
-                "transactions": "/account/{account_id}/transactions",
-                "balance": "/account/{account_id}/balance"
-            }
-        }
+        self.api_endpoints = copy.deepcopy(api_endpoints or DEFAULT_API_ENDPOINTS)
         
-        # Önbellek için
-        self._cache = {}
-        self._cache_expiry = {}
-        self._cache_ttl = 300  # 5 dakika
+        # Bakiye, senkronizasyon sonucu ve hesap özeti önbelleği
+        self._cache = cache if cache is not None else bank_cache
     
     def add_bank_account(
         self, 
@@ -89,6 +135,8 @@ class BankingService:
         self.db.commit()
         self.db.refresh(bank_account)
         
+        self._cache.delete(("summary", user_id))
+        
         return bank_account
     
     def get_user_accounts(self, user_id: int) -> List[BankAccount]:
@@ -107,14 +155,26 @@ class BankingService:
     def sync_account_transactions(
         self, 
         account_id: int, 
-        days_back: int = 30
+        days_back: int = 30,
+        incremental: bool = True,
+        overlap_days: int = SYNC_OVERLAP_DAYS,
+        use_cache: bool = True
     ) -> Dict:
         """
         Banka hesabı işlemlerini senkronize eder.
         
+        Artımlı modda hesabın senkronizasyon imleci varsa yalnızca imleç
+        tarihinden overlap_days gün öncesinden itibaren işlemler istenir;
+        geç kaydedilen işlemler bu örtüşme penceresinde yakalanır. İmleç
+        yoksa (ilk senkronizasyon) veya incremental False ise son days_back
+        gün çekilir.
+        
         Args:
             account_id: Hesap ID
-            days_back: Kaç gün geriye gidilecek
+            days_back: Tam senkronizasyonda kaç gün geriye gidilecek
+            incremental: İmleçten devam et
+            overlap_days: İmleç tarihinden geriye örtüşme penceresi (gün)
+            use_cache: False ise önbellekteki son sonucu yok sayıp hemen senkronize et
             
         Returns:
             Senkronizasyon sonuçları
@@ -128,68 +188,195 @@ class BankingService:
         if bank_name not in self.api_endpoints:
             raise ValueError(f"Desteklenmeyen banka: {bank_name}")
         
-        # Önbellekte varsa ve güncel ise, önbellekten döndür
-        cache_key = f"transactions_{account_id}"
-        if self._is_cached(cache_key):
-            return self._get_from_cache(cache_key)
+        # Son başarılı sonuç önbellekteyse onu döndür; eşzamanlı istekler tek senkronizasyonu bekler
+        cache_key = ("transactions", account_id)
+        if not use_cache:
+            self._cache.delete(cache_key)
         
+        result = self._cache.get_or_load(
+            cache_key,
+            lambda: self._sync_account(account, days_back, incremental, overlap_days),
+            should_cache=lambda result: result.get("success", False)
+        )
+        return dict(result)
+    
+    def _sync_account(self, account: BankAccount, days_back: int, incremental: bool, overlap_days: int) -> Dict:
+        """Hesabı bankadan çekilen işlemlerle senkronize eder (önbelleksiz)."""
+        account_id = account.id
+        if incremental and account.sync_cursor_date:
+            mode = "incremental"
+            since = account.sync_cursor_date.date() - timedelta(days=overlap_days)
+            continuation_token = account.sync_cursor_token
+        else:
+            mode = "full"
+            since = (datetime.now() - timedelta(days=days_back)).date()
+            continuation_token = None
+        
+        totals = {"total": 0, "inserted": 0, "skipped": 0, "failed": 0}
         try:
-            # Gerçek API çağrısı simülasyonu
-            transactions = self._simulate_bank_api_call(account, days_back)
-            
-            # İşlemleri veritabanına ekle
-            new_count = 0
-            for transaction in transactions:
-                # İşlem daha önce eklenmiş mi kontrol et
-                existing = self.db.query(Transaction).filter(
-                    Transaction.user_id == account.user_id,
-                    Transaction.external_id == transaction["id"],
-                    Transaction.source == f"bank_{bank_name}"
-                ).first()
+            # Banka devam token'ı döndürdükçe sonraki sayfaları çek; her sayfa ayrı commit
+            # edilir, böylece yarıda kesilen senkronizasyon kaydedilen token'dan devam eder
+            while True:
+                transactions, next_token = self._fetch_bank_transactions(account, since, continuation_token)
                 
-                if not existing:
-                    # Yeni işlem oluştur
-                    new_transaction = Transaction(
-                        user_id=account.user_id,
-                        amount=transaction["amount"],
-                        type="income" if transaction["amount"] > 0 else "expense",
-                        category=self._guess_category(transaction["description"]),
-                        description=transaction["description"],
-                        date=transaction["date"],
-                        source=f"bank_{bank_name}",
-                        external_id=transaction["id"]
-                    )
-                    
-                    self.db.add(new_transaction)
-                    new_count += 1
-            
-            if new_count > 0:
+                # İşlemleri toplu olarak veritabanına ekle
+                ingest_result = self.ingest_bank_transactions(account, transactions)
+                totals["total"] += len(transactions)
+                for key in ("inserted", "skipped", "failed"):
+                    totals[key] += ingest_result[key]
+                
+                # İmleci en son alınan işleme ilerlet (geriye almadan)
+                latest = ingest_result["latest"]
+                if latest and (account.sync_cursor_date is None or latest[0] >= account.sync_cursor_date):
+                    account.sync_cursor_date, account.sync_cursor_external_id = latest
+                account.sync_cursor_token = next_token
+                
+                # Son senkronizasyon tarihini güncelle
+                account.last_sync = datetime.now()
                 self.db.commit()
-            
-            # Son senkronizasyon tarihini güncelle
-            account.last_sync = datetime.now()
-            self.db.commit()
+                
+                if next_token is None:
+                    break
+                continuation_token = next_token
             
             result = {
                 "success": True,
                 "account_id": account_id,
-                "total_transactions": len(transactions),
-                "new_transactions": new_count,
+                "mode": mode,
+                "since": since,
+                "total_transactions": totals["total"],
+                "new_transactions": totals["inserted"],
+                "skipped_transactions": totals["skipped"],
+                "failed_transactions": totals["failed"],
                 "last_sync": account.last_sync
             }
             
-            # Önbelleğe ekle
-            self._add_to_cache(cache_key, result)
+            # Yeni işlemler bakiyeyi ve hesap özetini değiştirebilir
+            self._cache.delete(("balance", account_id))
+            self._cache.delete(("summary", account.user_id))
             
             return result
         
         except Exception as e:
+            self.db.rollback()
+            if totals["inserted"]:
+                # Önceki sayfalar commit edildi
+                self._cache.delete(("balance", account_id))
+                self._cache.delete(("summary", account.user_id))
             return {
                 "success": False,
                 "account_id": account_id,
-                "error": str(e)
+                "error": str(e),
+                "retryable": getattr(e, "retryable", False)
             }
     
+    def reset_sync_cursor(self, account_id: int) -> None:
+        """Hesabın senkronizasyon imlecini sıfırlar; sonraki senkronizasyon tam yapılır."""
+        account = self.db.query(BankAccount).filter(BankAccount.id == account_id).first()
+        if not account:
+            raise ValueError("Hesap bulunamadı")
+        
+        account.sync_cursor_date = None
+        account.sync_cursor_external_id = None
+        account.sync_cursor_token = None
+        self.db.commit()
+        self._cache.delete(("transactions", account_id))
+    
+    def ingest_bank_transactions(self, account: BankAccount, transactions: List[Dict]) -> Dict:
+        """
+        Bankadan gelen işlemleri toplu olarak veritabanına ekler.
+        
+        Hesabın bilinen external_id'leri, gelen işlemlerin tarih aralığı için
+        tek sorguda okunur; yeni satırlar (user_id, source, external_id)
+        benzersiz indeksine karşı INSERT ... ON CONFLICT DO NOTHING ile
+        parçalar halinde eklenir. Eksik veya hatalı satırlar eklenmez ve
+        başarısız sayılır.
+        
+        Args:
+            account: Banka hesabı
+            transactions: Banka API'sinden gelen işlemler (id, date, amount, description)
+            
+        Returns:
+            {"inserted": eklenen, "skipped": zaten kayıtlı, "failed": hatalı, "errors": [...],
+             "latest": en yeni geçerli işlemin (tarih, external_id) ikilisi veya None}
+        """
+        source = f"bank_{account.bank_name}"
+        rows = []
+        errors = []
+        batch_ids = set()
+        skipped = 0
+        
+        for transaction in transactions:
+            try:
+                external_id = str(transaction["id"])
+                amount = float(transaction["amount"])
+                transaction_date = transaction["date"]
+                if not isinstance(transaction_date, date):
+                    transaction_date = datetime.fromisoformat(str(transaction_date))
+                if not isinstance(transaction_date, datetime):
+                    transaction_date = datetime.combine(transaction_date, datetime.min.time())
+                description = transaction.get("description") or ""
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append({"id": transaction.get("id") if isinstance(transaction, dict) else None, "error": str(e)})
+                continue
+            
+            # Aynı toplu istekte tekrarlanan işlemler
+            if external_id in batch_ids:
+                skipped += 1
+                continue
+            batch_ids.add(external_id)
+            
+            rows.append({
+                "user_id": account.user_id,
+                "amount": amount,
+                "type": "income" if amount > 0 else "expense",
+                "category": None,
+                "description": description,
+                "date": transaction_date,
+                "is_recurring": False,
+                "source": source,
+                "external_id": external_id
+            })
+        
+        if rows:
+            # Kategoriler tek geçişte, kullanıcının kategorileme motoruyla belirlenir;
+            # eşleşmeyenler kullanıcının öğrenilmiş modeliyle toplu tahmin edilir
+            descriptions = [row["description"] for row in rows]
+            categories = category_models.refine(
+                account.user_id, descriptions, get_categorizer(account.user_id).categorize_many(descriptions)
+            )
+            for row, category in zip(rows, categories):
+                row["category"] = category
+            
+            # Pencere içindeki bilinen işlemleri tek sorguda oku
+            known_ids = {
+                external_id for (external_id,) in self.db.query(Transaction.external_id).filter(
+                    Transaction.user_id == account.user_id,
+                    Transaction.source == source,
+                    Transaction.date >= min(row["date"] for row in rows),
+                    Transaction.date <= max(row["date"] for row in rows)
+                )
+            }
+            new_rows = [row for row in rows if row["external_id"] not in known_ids]
+            
+            inserted = bulk_insert_transactions(self.db, new_rows) if new_rows else 0
+            # Pencere dışında kalan kopyalar benzersiz indekse takılarak atlanır
+            skipped += len(rows) - inserted
+            watch_budget_alerts(self.db)
+            self.db.commit()
+        else:
+            inserted = 0
+        
+        latest = max(((row["date"], row["external_id"]) for row in rows), default=None)
+        
+        return {
+            "inserted": inserted,
+            "skipped": skipped,
+            "failed": len(errors),
+            "errors": errors,
+            "latest": latest
+        }
+    
     def get_account_balance(self, account_id: int) -> Dict:
         """
         Banka hesabının güncel bakiyesini getirir.
@@ -204,26 +391,24 @@ class BankingService:
         if not account:
             raise ValueError("Hesap bulunamadı")
         
-        # Önbellekte varsa ve güncel ise, önbellekten döndür
-        cache_key = f"balance_{account_id}"
-        if self._is_cached(cache_key):
-            return self._get_from_cache(cache_key)
-        
-        try:
-            # Gerçek API çağrısı simülasyonu
-            balance_info = self._simulate_balance_api_call(account)
-            
-            # Önbelleğe ekle
-            self._add_to_cache(cache_key, balance_info)
-            
-            return balance_info
+        def load_balance() -> Dict:
+            try:
+                # Gerçek API çağrısı simülasyonu
+                return self._simulate_balance_api_call(account)
+            except Exception as e:
+                return {
+                    "success": False,
+                    "account_id": account_id,
+                    "error": str(e)
+                }
         
-        except Exception as e:
-            return {
-                "success": False,
-                "account_id": account_id,
-                "error": str(e)
-            }
+        # Önbellekte varsa ve güncel ise, önbellekten döndür
+        balance_info = self._cache.get_or_load(
+            ("balance", account_id),
+            load_balance,
+            should_cache=lambda result: result.get("success", False)
+        )
+        return dict(balance_info)
     
     def remove_bank_account(self, account_id: int) -> bool:
         """
@@ -241,12 +426,14 @@ class BankingService:
         
         try:
             # Hesabı sil
+            user_id = account.user_id
             self.db.delete(account)
             self.db.commit()
             
             # Önbelleği temizle
-            self._clear_cache(f"transactions_{account_id}")
-            self._clear_cache(f"balance_{account_id}")
+            self._cache.delete(("transactions", account_id))
+            self._cache.delete(("balance", account_id))
+            self._cache.delete(("summary", user_id))
             
             return True
         
@@ -264,6 +451,11 @@ class BankingService:
         Returns:
             Hesap özeti
         """
+        summary = self._cache.get_or_load(("summary", user_id), lambda: self._build_account_summary(user_id))
+        return {**summary, "accounts": [dict(account) for account in summary["accounts"]]}
+    
+    def _build_account_summary(self, user_id: int) -> Dict:
+        """Hesap özetini bakiyelerden oluşturur (önbelleksiz)."""
         accounts = self.get_user_accounts(user_id)
         
         total_balance = 0
@@ -300,32 +492,66 @@ class BankingService:
         """
         return hashlib.sha256(token.encode()).hexdigest()
     
-    def _guess_category(self, description: str) -> str:
+    def _guess_category(self, description: str, user_id: Optional[int] = None) -> str:
         """
         İşlem açıklamasına göre kategori tahmin eder.
         """
-        description_lower = description.lower()
-        
-        # Kategori anahtar kelimeleri
-        categories = {
-            "Gıda": ["market", "migros", "a101", "şok", "carrefour", "bim"],
-            "Ulaşım": ["akaryakıt", "benzin", "taksi", "otobüs", "metro"],
-            "Kira": ["kira", "emlak"],
-            "Fatura": ["elektrik", "su", "doğalgaz", "internet", "telefon"],
-            "Maaş": ["maaş", "ücret", "ödeme"]
-        }
+        return get_categorizer(user_id).categorize(description)
+    
+    def _fetch_bank_transactions(
+        self,
+        account: BankAccount,
+        since: date,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Bankanın işlem uç noktasından since tarihinden itibaren işlemleri getirir.
+        
+        Returns:
+            (işlemler, bankanın döndürdüğü devam token'ı veya None)
+        
+        Raises:
+            BankAPIError: İstek başarısız olursa (geçici hatalarda retryable=True)
+        """
+        endpoint = self.api_endpoints[account.bank_name]
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        if endpoint.get("simulate"):
+            # Gerçek API çağrısı simülasyonu
+            days_back = (datetime.now().date() - since).days + 1
+            return self._simulate_bank_api_call(account, days_back), None
         
-        for category, keywords in categories.items():
-            for keyword in keywords:
-                if keyword in description_lower:
-                    return category
+        url = endpoint["base_url"] + endpoint["transactions"].format(account_id=account.account_number)
+        params = {"from": since.isoformat()}
+        if continuation_token:
+            params["cursor"] = continuation_token
         
-        return "Diğer"
+        try:
+            response = requests.get(
+                url,
+                params=params,
+                headers={"X-API-Key": self.api_keys.get(account.bank_name, "")},
+                timeout=self.request_timeout
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise BankAPIError(f"Banka API'sine ulaşılamadı: {e}", retryable=True) from e
+        
+        if response.status_code != 200:
+            raise BankAPIError(
+                f"Banka API hatası: HTTP {response.status_code}",
+                retryable=response.status_code in RETRYABLE_STATUS_CODES,
+                status_code=response.status_code
+            )
+        
+        payload = response.json()
+        return payload.get("transactions", []), payload.get("next_cursor")
     
     def _simulate_bank_api_call(self, account: BankAccount, days_back: int) -> List[Dict]:
         """
         Banka API çağrısı simülasyonu.
         Gerçek uygulamada bu, gerçek bir API çağrısı olacak.
+        
+        Aynı gün için her çağrıda aynı işlemler (aynı ID'lerle) üretilir.
         """
         # Gerçek bir API yerine sahte veri döndür
         transactions = []
@@ -333,23 +559,24 @@ class BankingService:
         # Bugünden itibaren geriye doğru işlemler oluştur
         for i in range(days_back):
             day = datetime.now() - timedelta(days=i)
+            day_number = day.toordinal()
             
             # Her gün için 1-3 arası işlem oluştur
-            num_transactions = (i % 3) + 1
+            num_transactions = (day_number % 3) + 1
             for j in range(num_transactions):
                 # İşlem tutarı: -200 ile 1000 TL arası
-                amount = ((i * j) % 12) * 100 - 200
+                amount = ((day_number * j) % 12) * 100 - 200
                 
                 # İşlem açıklaması
                 if amount > 0:
                     description = "Gelen havale" if j % 2 == 0 else "Maaş ödemesi"
                 else:
                     categories = ["Market alışverişi", "Akaryakıt ödemesi", "Fatura ödemesi", "Kira ödemesi"]
-                    description = categories[(i + j) % len(categories)]
+                    description = categories[(day_number + j) % len(categories)]
                 
                 # İşlem oluştur
                 transaction = {
-                    "id": f"tx_{account.id}_{i}_{j}_{int(time.time())}",
+                    "id": f"tx_{account.id}_{day:%Y%m%d}_{j}",
                     "date": day.date(),
                     "amount": amount,
                     "description": description,
@@ -376,44 +603,3 @@ class BankingService:
             "currency": "TRY",
             "as_of": datetime.now()
         }
-    
-    # Önbellek metodları
-    def _add_to_cache(self, key: str, data: any) -> None:
-        """
-        Veriyi önbelleğe ekler.
-        """
-        self._cache[key] = data
-        self._cache_expiry[key] = time.time() + self._cache_ttl
-    
-    def _get_from_cache(self, key: str) -> any:
-        """
-        Veriyi önbellekten alır.
-        """
-        return self._cache.get(key)
-    
-    def _is_cached(self, key: str) -> bool:
-        """
-        Verinin önbellekte olup olmadığını ve geçerli olup olmadığını kontrol eder.
-        """
-        if key not in self._cache:
-            return False
-        
-        if time.time() > self._cache_expiry.get(key, 0):
-            # Süresi dolmuş, önbellekten kaldır
-            self._clear_cache(key)
-            return False
-        
-        return True
-    
-    def _clear_cache(self, key: str = None) -> None:
-        """
-        Önbelleği temizler.
-        """
-        if key:
-            if key in self._cache:
-                del self._cache[key]
-            if key in self._cache_expiry:
-                del self._cache_expiry[key]
-        else:
-            self._cache = {}
-            self._cache_expiry = {} 
\ No newline at end of file
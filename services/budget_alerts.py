@@ -0,0 +1,304 @@
+import logging
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, event, func, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from models.database import Budget, BudgetAlertEvent, MonthlyRollup, TransactionType, PENDING_ROLLUP_DELTAS_KEY
+from utils.config import BUDGET_WARNING_THRESHOLD, BUDGET_DANGER_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Harcama limitin bu oranını geçtiğinde uyarı verilir
+BUDGET_WARNING_RATIO = BUDGET_WARNING_THRESHOLD / 100
+
+# Harcama limitin bu oranını geçtiğinde tehlike (budget_alert) bildirilir
+BUDGET_DANGER_RATIO = BUDGET_DANGER_THRESHOLD / 100
+
+# Oturumun bir sonraki commit'inde eşik kontrolü yapılacağını gösteren session.info anahtarı
+WATCH_BUDGET_ALERTS_KEY = "watch_budget_alerts"
+
+# Commit sonrası gönderilecek eşik bildirimlerinin session.info anahtarı
+PENDING_BUDGET_ALERTS_KEY = "pending_budget_alerts"
+
+# IN listesindeki en fazla kullanıcı sayısı (SQLite parametre sınırının altında)
+USER_BATCH_SIZE = 500
+
+def classify_budget(
+    spent: float,
+    limit: float,
+    warning_ratio: float = BUDGET_WARNING_RATIO,
+    danger_ratio: float = BUDGET_DANGER_RATIO
+) -> Optional[str]:
+    """Harcamaya göre uyarı türünü döndürür ("budget_alert", "budget_warning" veya None)."""
+    if spent >= limit * danger_ratio:
+        return "budget_alert"
+    if spent >= limit * warning_ratio:
+        return "budget_warning"
+    return None
+
+def alert_levels(
+    spent: float,
+    limit: float,
+    warning_ratio: float = BUDGET_WARNING_RATIO,
+    danger_ratio: float = BUDGET_DANGER_RATIO
+) -> List[str]:
+    """Harcamanın ulaştığı eşik seviyelerini küçükten büyüğe döndürür."""
+    levels = []
+    if spent >= limit * warning_ratio:
+        levels.append("budget_warning")
+    if spent >= limit * danger_ratio:
+        levels.append("budget_alert")
+    return levels
+
+class BudgetAlertEvaluator:
+    """
+    Aktif bütçelerin bu ayki harcamalarını toplu olarak değerlendirir.
+
+    Harcamalar işlem satırlarından değil, işlem yazımlarında güncellenen
+    aylık özet tablosundan (monthly_rollups) okunur. Her bütçe özet
+    tablosunun birincil anahtarıyla (kullanıcı, ay, tip, kategori)
+    eşleştirildiğinden bir kullanıcının ya da tüm kullanıcıların bütçeleri
+    tek sorguda değerlendirilir.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        warning_ratio: float = BUDGET_WARNING_RATIO,
+        danger_ratio: float = BUDGET_DANGER_RATIO
+    ):
+        self.db = db
+        self.warning_ratio = warning_ratio
+        self.danger_ratio = danger_ratio
+
+    def budget_spending(
+        self,
+        user_ids: Optional[Iterable[int]] = None,
+        as_of: Optional[date] = None,
+        categories: Optional[Iterable[Tuple[int, str]]] = None
+    ) -> List[Dict]:
+        """
+        Aktif bütçeleri ve bu ayki kategori harcamalarını döndürür.
+
+        Args:
+            user_ids: Değerlendirilecek kullanıcılar (varsayılan: tüm kullanıcılar)
+            as_of: Değerlendirme tarihi (varsayılan: bugün)
+            categories: Yalnızca bu (kullanıcı ID, kategori) çiftlerinin bütçeleri
+
+        Returns:
+            [{"budget_id", "user_id", "category", "limit", "spent"}], kullanıcıya
+            ve en yeni bütçeye göre sıralı
+        """
+        as_of = as_of or date.today()
+        if isinstance(as_of, datetime):
+            as_of = as_of.date()
+        month_key = as_of.strftime("%Y-%m")
+
+        query = self.db.query(
+            Budget.id, Budget.user_id, Budget.category, Budget.amount,
+            func.coalesce(MonthlyRollup.total_amount, 0.0)
+        ).outerjoin(MonthlyRollup, and_(
+            MonthlyRollup.user_id == Budget.user_id,
+            MonthlyRollup.year_month == month_key,
+            MonthlyRollup.type == TransactionType.EXPENSE,
+            MonthlyRollup.category == Budget.category
+        )).filter(
+            Budget.start_date <= as_of,
+            Budget.end_date >= as_of
+        ).order_by(Budget.user_id, Budget.start_date.desc(), Budget.id)
+
+        if categories is not None:
+            # (kullanıcı, kategori) IN (VALUES ...) SQLite'ta indeks taramasına dönüşür;
+            # OR ile bağlanan eşitlikler her çift için indeks araması yapar
+            categories = sorted(set(categories))
+            batches = [
+                query.filter(or_(*(
+                    and_(Budget.user_id == user_id, Budget.category == category)
+                    for user_id, category in categories[offset:offset + USER_BATCH_SIZE]
+                )))
+                for offset in range(0, len(categories), USER_BATCH_SIZE)
+            ]
+        elif user_ids is None:
+            batches = [query]
+        else:
+            user_ids = sorted(set(user_ids))
+            batches = [
+                query.filter(Budget.user_id.in_(user_ids[offset:offset + USER_BATCH_SIZE]))
+                for offset in range(0, len(user_ids), USER_BATCH_SIZE)
+            ]
+
+        return [
+            {"budget_id": budget_id, "user_id": user_id, "category": category, "limit": limit, "spent": spent}
+            for batch in batches
+            for budget_id, user_id, category, limit, spent in batch
+        ]
+
+    def evaluate(self, user_ids: Optional[Iterable[int]] = None, as_of: Optional[date] = None) -> Dict[int, List[Dict]]:
+        """
+        Bütçe uyarılarını kullanıcı bazında döndürür.
+
+        Args:
+            user_ids: Değerlendirilecek kullanıcılar (varsayılan: tüm kullanıcılar; zamanlanmış tarama)
+            as_of: Değerlendirme tarihi (varsayılan: bugün)
+
+        Returns:
+            {kullanıcı ID: [{"type", "budget_id", "category", "limit", "spent", "remaining"}]};
+            uyarısı olmayan kullanıcılar dahil edilmez
+        """
+        alerts: Dict[int, List[Dict]] = {}
+        for row in self.budget_spending(user_ids, as_of):
+            alert_type = classify_budget(row["spent"], row["limit"], self.warning_ratio, self.danger_ratio)
+            if alert_type is None:
+                continue
+            alerts.setdefault(row["user_id"], []).append({
+                "type": alert_type,
+                "budget_id": row["budget_id"],
+                "category": row["category"],
+                "limit": row["limit"],
+                "spent": row["spent"],
+                "remaining": row["limit"] - row["spent"]
+            })
+        return alerts
+
+    def record_crossings(self, deltas: Dict, as_of: Optional[date] = None) -> List[Dict]:
+        """
+        İşlem yazımından sonra yeni aşılan bütçe eşiklerini kaydeder ve döndürür.
+
+        Yalnızca bu ay gideri artan (kullanıcı, kategori) çiftlerinin bütçeleri
+        tek sorguda okunur; harcama, yazımla birlikte güncellenen aylık özet
+        satırından gelir. Ulaşılan her seviye budget_alert_events tablosuna
+        ON CONFLICT DO NOTHING ile yazılır; yalnızca ilk kez yazılan
+        seviyeler yeni aşım sayılır, böylece aynı aşım iki kez bildirilmez.
+
+        Args:
+            deltas: Özet farkları ((kullanıcı, ay, tip, kategori) -> [tutar, adet])
+            as_of: Değerlendirme tarihi (varsayılan: bugün)
+
+        Returns:
+            Bütçe başına en yüksek yeni seviyenin uyarısı
+            [{"type", "budget_id", "user_id", "category", "limit", "spent", "remaining", "year_month"}]
+        """
+        as_of = as_of or date.today()
+        if isinstance(as_of, datetime):
+            as_of = as_of.date()
+        month_key = as_of.strftime("%Y-%m")
+
+        categories = {
+            (user_id, category)
+            for (user_id, year_month, transaction_type, category), (amount, _) in deltas.items()
+            if year_month == month_key and transaction_type == TransactionType.EXPENSE and amount > 0
+        }
+        if not categories:
+            return []
+
+        budgets = {}
+        events = []
+        for row in self.budget_spending(as_of=as_of, categories=categories):
+            levels = alert_levels(row["spent"], row["limit"], self.warning_ratio, self.danger_ratio)
+            if not levels:
+                continue
+            budgets[row["budget_id"]] = row
+            events.extend(
+                {"budget_id": row["budget_id"], "user_id": row["user_id"], "year_month": month_key,
+                 "level": level, "spent": row["spent"], "created_at": datetime.now()}
+                for level in levels
+            )
+        if not events:
+            return []
+
+        table = BudgetAlertEvent.__table__
+        stmt = sqlite_insert(table).on_conflict_do_nothing(
+            index_elements=[table.c.budget_id, table.c.year_month, table.c.level]
+        ).returning(table.c.budget_id, table.c.level)
+        new_levels = {}
+        for budget_id, level in self.db.connection().execute(stmt, events):
+            new_levels.setdefault(budget_id, set()).add(level)
+
+        alerts = []
+        for budget_id, levels in new_levels.items():
+            row = budgets[budget_id]
+            alerts.append({
+                "type": "budget_alert" if "budget_alert" in levels else "budget_warning",
+                "budget_id": budget_id,
+                "user_id": row["user_id"],
+                "category": row["category"],
+                "limit": row["limit"],
+                "spent": row["spent"],
+                "remaining": row["limit"] - row["spent"],
+                "year_month": month_key
+            })
+        return alerts
+
+def notify_budget_alert(alert: Dict) -> None:
+    """Yeni aşılan bütçe eşiği için NotificationService üzerinden bildirim oluşturur."""
+    # notification_service bu modülü içe aktardığı için burada yüklenir
+    from models.notification import NotificationType
+    from services.notification_service import NotificationService
+    from utils.db import db_session
+
+    percent = alert["spent"] / alert["limit"] * 100 if alert["limit"] else 100
+    if alert["type"] == "budget_alert" and alert["spent"] >= alert["limit"]:
+        title = f"Bütçe aşıldı: {alert['category']}"
+        message = f"{alert['category']} bütçenizi aştınız: ₺{alert['spent']:,.2f} / ₺{alert['limit']:,.2f}."
+    elif alert["type"] == "budget_alert":
+        title = f"Bütçe sınırında: {alert['category']}"
+        message = (f"{alert['category']} bütçenizin %{percent:.0f}'ini kullandınız, limite çok yaklaştınız: "
+                   f"₺{alert['spent']:,.2f} / ₺{alert['limit']:,.2f}.")
+    else:
+        title = f"Bütçe uyarısı: {alert['category']}"
+        message = (f"{alert['category']} bütçenizin %{percent:.0f}'ini kullandınız: "
+                   f"₺{alert['spent']:,.2f} / ₺{alert['limit']:,.2f}.")
+
+    with db_session() as session:
+        NotificationService(session).create_notification(
+            user_id=alert["user_id"],
+            title=title,
+            message=message,
+            notification_type=NotificationType.BUDGET,
+            source_id=alert["budget_id"],
+            data=alert
+        )
+
+# Yeni eşik aşımlarını ileten fonksiyon (testlerde değiştirilebilir)
+alert_notifier = notify_budget_alert
+
+def watch_budget_alerts(session: Session) -> None:
+    """
+    Oturumun bir sonraki commit'inde bütçe eşiklerinin kontrol edilmesini sağlar.
+
+    İşlem ekleyen yollar (elle ekleme, banka senkronizasyonu, OCR) commit'ten
+    önce çağırır. Commit sırasında yalnızca bu veritabanı işleminde gideri
+    artan bütçeler kontrol edilir; yeni aşılan eşikler commit başarılı
+    olduktan sonra bildirilir, rollback'te bildirim gönderilmez.
+    """
+    session.info[WATCH_BUDGET_ALERTS_KEY] = True
+
+@event.listens_for(Session, "before_commit")
+def _record_budget_crossings(session):
+    """İzlenen oturumda commit edilecek işlemlerin aştığı bütçe eşiklerini kaydeder."""
+    if not session.info.pop(WATCH_BUDGET_ALERTS_KEY, False):
+        return
+    # Bekleyen değişiklikler özet tablosuna yansısın
+    session.flush()
+    deltas = session.info.pop(PENDING_ROLLUP_DELTAS_KEY, None)
+    if not deltas:
+        return
+    alerts = BudgetAlertEvaluator(session).record_crossings(deltas)
+    if alerts:
+        session.info.setdefault(PENDING_BUDGET_ALERTS_KEY, []).extend(alerts)
+
+@event.listens_for(Session, "after_commit")
+def _send_budget_alerts(session):
+    """Commit edilen eşik aşımlarını bildirir; bildirim hatası commit'i etkilemez."""
+    for alert in session.info.pop(PENDING_BUDGET_ALERTS_KEY, ()):
+        try:
+            alert_notifier(alert)
+        except Exception:
+            logger.exception(f"Bütçe bildirimi gönderilemedi: budget_id={alert['budget_id']}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_budget_alerts(session):
+    """Geri alınan veritabanı işleminin bekleyen kontrol ve bildirimlerini bırakır."""
+    session.info.pop(WATCH_BUDGET_ALERTS_KEY, None)
+    session.info.pop(PENDING_BUDGET_ALERTS_KEY, None)
@@ -0,0 +1,224 @@
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Varsayılan kategori anahtar kelimeleri (banka ve makbuz içe aktarımları için ortak).
+# Eşit skorda sözlükteki sıra önceliklidir.
+DEFAULT_CATEGORY_KEYWORDS: Dict[str, List[str]] = {
+    "Gıda": ["market", "migros", "a101", "şok", "carrefour", "bim", "makarna", "pirinç", "ekmek",
+             "sebze", "meyve", "süt", "yoğurt", "peynir", "et", "tavuk", "balık", "bakkal", "manav"],
+    "Maaş": ["maaş", "ücret"],
+    "Sağlık": ["eczane", "hastane", "ilaç", "muayene", "doktor", "vitamin", "bandaj", "sağlık"],
+    "Ulaşım": ["akaryakıt", "benzin", "dizel", "lpg", "otobüs", "metro", "taksi", "bilet", "opet",
+               "shell", "bp", "petrol", "otopark", "ulaşım", "yol", "tren", "uçak"],
+    "Eğlence": ["sinema", "tiyatro", "konser", "festival", "müze", "park", "eğlence", "oyun"],
+    "Giyim": ["mağaza", "lcw", "defacto", "h&m", "zara", "giyim", "ayakkabı", "çanta", "takı", "aksesuar"],
+    "Elektronik": ["teknoloji", "telefon", "bilgisayar", "tablet", "kulaklık", "şarj", "vatan",
+                   "mediamarkt", "teknosa", "elektronik"],
+    "Kira": ["kira", "konut", "emlak", "apartman"],
+    "Fatura": ["elektrik", "su", "doğalgaz", "internet", "telefon", "fatura", "ödeme"]
+}
+
+DEFAULT_CATEGORY = "Diğer"
+
+# Bu uzunluktan kısa anahtar kelimeler yalnızca tam kelime olarak eşleşir
+SHORT_KEYWORD_LENGTH = 3
+
+# Banka ekstreleri çoğunlukla ASCII büyük harf gelir ("ODEME", "MIGROS"); eşleştirme
+# Türkçe karakterlerden arındırılmış metin üzerinde yapılır. "I" ve "İ" lower() ile
+# "i" ve "i̇" olur; birleşik nokta (U+0307) silinir.
+_TURKISH_ASCII = str.maketrans({
+    "ı": "i", "ö": "o", "ü": "u", "ş": "s", "ç": "c", "ğ": "g", "â": "a", "î": "i", "û": "u", "\u0307": None
+})
+
+def normalize_text(text: str) -> str:
+    """Metni küçük harfe ve Türkçe karakterleri ASCII karşılıklarına çevirir."""
+    text = text.lower()
+    return text if text.isascii() else text.translate(_TURKISH_ASCII)
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Kelimelerden ortak önekleri birleştirilmiş bir regex deseni oluşturur.
+
+    Tek bir alternasyon yerine önek ağacı kullanmak, regex motorunun her
+    konumda tüm kelimeleri tek tek denemesini önler.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        ends_here = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            body = ("(?:" + body + ")?") if len(branches) == 1 and len(body) > 1 else body + "?"
+        return body
+
+    return build(trie)
+
+class Categorizer:
+    """
+    İşlem açıklamalarını anahtar kelimelere göre kategorilere ayıran derlenmiş motor.
+
+    Tüm anahtar kelimeler tek bir regex'e (önek ağacı) derlenir; metin bir
+    kez taranır ve en çok farklı anahtar kelimesi eşleşen kategori seçilir
+    (eşitlikte tanım sırası önceliklidir). Sık tekrarlanan açıklamalar
+    (aynı işyeri) için sonuçlar LRU önbellekte tutulur. ``reload`` ile
+    anahtar kelimeler çalışırken atomik olarak değiştirilebilir.
+    """
+
+    def __init__(
+        self,
+        keywords: Optional[Dict[str, List[str]]] = None,
+        default: str = DEFAULT_CATEGORY,
+        memo_size: int = 50000
+    ):
+        self.default = default
+        self.memo_size = memo_size
+        self.reload(keywords if keywords is not None else DEFAULT_CATEGORY_KEYWORDS)
+
+    def reload(self, keywords: Dict[str, List[str]]) -> None:
+        """Anahtar kelimeleri yeniden derler; önbellek sıfırlanır."""
+        priority = {}
+        keyword_categories: Dict[str, List[str]] = {}
+        for category, category_keywords in keywords.items():
+            priority.setdefault(category, len(priority))
+            for keyword in category_keywords:
+                folded = normalize_text(keyword.strip())
+                if folded and category not in keyword_categories.setdefault(folded, []):
+                    keyword_categories[folded].append(category)
+
+        # Kısa anahtar kelimeler ("et", "su", "bp") yalnızca tam kelime olarak eşleşir;
+        # aksi halde "netflix" veya "sushi" gibi açıklamalar yanlış kategoriye düşer
+        long_keywords = [keyword for keyword in keyword_categories if len(keyword) >= SHORT_KEYWORD_LENGTH]
+        short_keywords = [keyword for keyword in keyword_categories if len(keyword) < SHORT_KEYWORD_LENGTH]
+        alternatives = []
+        if long_keywords:
+            alternatives.append(_trie_pattern(long_keywords))
+        if short_keywords:
+            alternatives.append(r"\b" + _trie_pattern(short_keywords) + r"\b")
+
+        # İleri bakış (lookahead) iç içe geçen kelimeleri de ("otopark" içindeki "park") yakalar
+        pattern = re.compile("(?=(" + "|".join(alternatives) + "))") if alternatives else None
+        default = self.default
+
+        def match(description: str) -> str:
+            if pattern is None:
+                return default
+
+            matched = set(pattern.findall(normalize_text(description)))
+            if not matched:
+                return default
+
+            scores: Dict[str, int] = {}
+            for keyword in matched:
+                for category in keyword_categories[keyword]:
+                    scores[category] = scores.get(category, 0) + 1
+
+            return min(scores, key=lambda category: (-scores[category], priority[category]))
+
+        # Önbellek ham açıklamaya göre tutulur; tekrar eden işyerleri normalleştirilmeden döner.
+        # Derlenmiş durum tek atamayla değişir; eşzamanlı okuyucular eski ya da yeni motoru görür.
+        self._match = lru_cache(maxsize=self.memo_size)(match)
+
+    def categorize(self, description: Optional[str]) -> str:
+        """Tek bir açıklamanın kategorisini döndürür."""
+        if not description:
+            return self.default
+        return self._match(description)
+
+    def categorize_many(self, descriptions: Iterable[Optional[str]]) -> List[str]:
+        """Açıklama listesinin kategorilerini aynı sırayla döndürür."""
+        match = self._match
+        default = self.default
+        return [match(description) if description else default for description in descriptions]
+
+    def cache_info(self):
+        """Açıklama önbelleğinin isabet/ıska bilgisini döndürür."""
+        return self._match.cache_info()
+
+# Kullanıcı tanımlı kategori adları (None anahtarı: uygulama geneli, CategoryManager)
+_custom_categories: Dict[Optional[int], List[str]] = {}
+_categorizers: "OrderedDict[Optional[int], Categorizer]" = OrderedDict()
+_lock = threading.RLock()
+
+# Bellekte tutulan kullanıcı bazlı motor sayısı
+MAX_USER_CATEGORIZERS = 256
+
+def _keywords_for(user_id: Optional[int]) -> Dict[str, List[str]]:
+    """Varsayılan anahtar kelimelere kullanıcı tanımlı kategori adlarını ekler."""
+    keywords = {category: list(words) for category, words in DEFAULT_CATEGORY_KEYWORDS.items()}
+    scopes = [None] if user_id is None else [None, user_id]
+    for scope in scopes:
+        for name in _custom_categories.get(scope, []):
+            # Kategori adı kendi anahtar kelimesi olarak kullanılır ("Kahve" -> "kahve")
+            keywords.setdefault(name, [])
+            if name not in keywords[name]:
+                keywords[name].append(name)
+    return keywords
+
+def _load_user_categories(user_id: int) -> List[str]:
+    """Kullanıcının kategori adlarını CategoryService üzerinden yükler."""
+    # category_service bu modülü içe aktardığından ilk kullanımda yüklenir
+    from services.category_service import CategoryService
+
+    return [category.name for category in CategoryService().get_categories_by_user(user_id)]
+
+# Kullanıcı kategorilerini ilk kullanımda yükleyen fonksiyon; motoru kullanan her
+# modül (banka senkronizasyonu, OCR, arka plan işleri) aynı yükleyiciyi görür
+_user_category_loader: Optional[Callable[[int], List[str]]] = _load_user_categories
+
+def register_user_category_loader(loader: Callable[[int], List[str]]) -> None:
+    """Kullanıcının kategori adlarını ilk kullanımda yükleyecek fonksiyonu kaydeder."""
+    global _user_category_loader
+    _user_category_loader = loader
+
+def set_custom_categories(names: Iterable[str], user_id: Optional[int] = None) -> None:
+    """
+    Kullanıcı tanımlı kategori adlarını günceller ve ilgili motoru yeniden derler.
+
+    Args:
+        names: Kategori adları
+        user_id: Kullanıcı ID'si (None ise uygulama geneli kategoriler)
+    """
+    with _lock:
+        _custom_categories[user_id] = [name for name in dict.fromkeys(names) if name]
+        if user_id is None:
+            # Genel kategoriler tüm kullanıcı motorlarını etkiler
+            _categorizers.clear()
+        else:
+            _categorizers.pop(user_id, None)
+
+def invalidate_user_categories(user_id: int) -> None:
+    """Kullanıcının kategori adlarını unutur; bir sonraki kullanımda yeniden yüklenir."""
+    with _lock:
+        _custom_categories.pop(user_id, None)
+        _categorizers.pop(user_id, None)
+
+def get_categorizer(user_id: Optional[int] = None) -> Categorizer:
+    """Uygulama geneli veya kullanıcıya özel paylaşılan kategorileme motorunu döndürür."""
+    with _lock:
+        categorizer = _categorizers.get(user_id)
+        if categorizer is not None:
+            _categorizers.move_to_end(user_id)
+            return categorizer
+
+        if user_id is not None and user_id not in _custom_categories and _user_category_loader:
+            try:
+                _custom_categories[user_id] = list(_user_category_loader(user_id))
+            except Exception:
+                _custom_categories[user_id] = []
+
+        categorizer = Categorizer(_keywords_for(user_id))
+        _categorizers[user_id] = categorizer
+        while len(_categorizers) > MAX_USER_CATEGORIZERS:
+            _categorizers.popitem(last=False)
+        return categorizer
@@ -0,0 +1,345 @@
+import copy
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import joblib
+import numpy as np
+import sklearn
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sqlalchemy.orm import Session
+from models.database import Transaction
+from services.categorizer import DEFAULT_CATEGORY, DEFAULT_CATEGORY_KEYWORDS, normalize_text
+from config import settings
+
+# Kayıtlı model biçiminin sürümü; öznitelik çıkarımı değişirse artırılmalıdır
+MODEL_VERSION = 1
+
+# Referans ve şube numaraları işyerini belirlemez; tek bir "0"a indirgenir
+_DIGITS = re.compile(r"\d+")
+
+def prepare_description(description: Optional[str]) -> str:
+    """Açıklamayı öznitelik çıkarımı için normalleştirir."""
+    return _DIGITS.sub("0", normalize_text(description or ""))
+
+class CategoryModel:
+    """
+    İşlem açıklamasından kategori tahmin eden öğrenilmiş model.
+
+    Açıklamalar karakter n-gramlarına ayrılıp sabit boyutlu bir uzaya
+    hash'lenir (sözlük tutulmaz, yeni işyerleri için yeniden eğitim
+    gerekmez) ve doğrusal bir sınıflandırıcı (SGD, lojistik kayıp) ile
+    sınıflandırılır. ``partial_fit`` ile model kullanıcı düzeltmeleriyle
+    artımlı olarak güncellenir; daha önce görülmemiş kategoriler de
+    eklenebilir.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, ngram_range: Tuple[int, int] = (2, 4), alpha: float = 1e-5):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.alpha = alpha
+        self.vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=self.ngram_range,
+            n_features=n_features,
+            lowercase=False,
+            alternate_sign=False
+        )
+        self.classifier: Optional[SGDClassifier] = None
+        self.n_samples = 0
+        self.trained_at: Optional[datetime] = None
+
+    def transform(self, descriptions: Sequence[str]):
+        """
+        Açıklamaları öznitelik matrisine çevirir.
+
+        Ekstrelerde aynı işyeri tekrar tekrar geçtiğinden yalnızca farklı
+        (normalleştirilmiş) açıklamalar vektörleştirilir, satırlar sonra
+        asıl sıraya göre çoğaltılır.
+        """
+        positions: Dict[str, int] = {}
+        inverse = [positions.setdefault(prepare_description(description), len(positions)) for description in descriptions]
+        return self.vectorizer.transform(list(positions))[np.asarray(inverse, dtype=np.intp)]
+
+    @property
+    def classes(self) -> List[str]:
+        return [] if self.classifier is None else list(self.classifier.classes_)
+
+    def fit(self, descriptions: Sequence[str], categories: Sequence[str], epochs: int = 5,
+            batch_size: int = 10000, random_state: int = 0) -> "CategoryModel":
+        """
+        Modeli sıfırdan eğitir.
+
+        Args:
+            descriptions: İşlem açıklamaları
+            categories: Açıklamalara karşılık gelen kategoriler
+            epochs: Veri üzerinden geçiş sayısı
+            batch_size: Sınıflandırıcıya bir adımda verilen satır sayısı
+            random_state: Karıştırma tohumu
+
+        Returns:
+            Eğitilmiş model
+        """
+        if len(descriptions) != len(categories):
+            raise ValueError("Açıklama ve kategori sayıları eşleşmiyor")
+        if not descriptions:
+            raise ValueError("Eğitim verisi boş")
+
+        self.classifier = None
+        self.n_samples = 0
+        rng = np.random.default_rng(random_state)
+        features = self.transform(descriptions)
+        labels = np.asarray(categories, dtype=object)
+
+        for _ in range(epochs):
+            order = rng.permutation(len(labels))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                self._partial_fit(features[batch], labels[batch])
+
+        self.n_samples = len(descriptions)
+        self.trained_at = datetime.now()
+        return self
+
+    def partial_fit(self, descriptions: Sequence[str], categories: Sequence[str]) -> "CategoryModel":
+        """Modeli yeni etiketli örneklerle artımlı olarak günceller."""
+        if len(descriptions) != len(categories):
+            raise ValueError("Açıklama ve kategori sayıları eşleşmiyor")
+        if descriptions:
+            self._partial_fit(self.transform(descriptions), categories)
+            self.n_samples += len(descriptions)
+            self.trained_at = datetime.now()
+        return self
+
+    def _partial_fit(self, features, categories: Sequence[str]) -> None:
+        labels = np.asarray(categories, dtype=object)
+
+        if self.classifier is None:
+            # Varsayılan kategoriler baştan sınıf listesine eklenir; böylece model hep
+            # çok sınıflı (OvR) kalır ve yeni kategoriler yalnızca satır ekleyerek büyür
+            classes = np.unique(np.concatenate([labels, list(DEFAULT_CATEGORY_KEYWORDS), [DEFAULT_CATEGORY]]).astype(str))
+            # Sınıf başına ikili modeller (OvR) çekirdeklere dağıtılarak eğitilir
+            self.classifier = SGDClassifier(loss="log_loss", alpha=self.alpha, n_jobs=-1, random_state=0)
+            self.classifier.partial_fit(features, labels.astype(str), classes=classes)
+            return
+
+        unseen = set(labels) - set(self.classifier.classes_)
+        if unseen:
+            self._add_classes(unseen)
+        self.classifier.partial_fit(features, labels.astype(str))
+
+    def _add_classes(self, new_classes: Iterable[str]) -> None:
+        """
+        Eğitilmiş sınıflandırıcıya sıfır ağırlıklı yeni sınıflar ekler.
+
+        Yeni dizilerle sınıflandırıcının bir kopyası oluşturulup tek atamayla
+        yerine konur; eşzamanlı ``predict`` sınıf listesi ile ağırlıkları hiçbir
+        zaman farklı boyutlarda görmez.
+        """
+        old_classes = self.classifier.classes_
+        classes = np.unique(np.concatenate([old_classes, list(new_classes)]).astype(str))
+        positions = np.searchsorted(classes, old_classes)
+
+        classifier = copy.copy(self.classifier)
+        coef = np.zeros((len(classes), classifier.coef_.shape[1]), dtype=classifier.coef_.dtype)
+        coef[positions] = classifier.coef_
+        intercept = np.zeros(len(classes), dtype=classifier.intercept_.dtype)
+        intercept[positions] = classifier.intercept_
+
+        classifier.classes_ = classes
+        classifier.coef_ = coef
+        classifier.intercept_ = intercept
+        self.classifier = classifier
+
+    def predict(self, descriptions: Sequence[str]) -> List[Tuple[str, float]]:
+        """
+        Açıklamaların kategorilerini toplu olarak tahmin eder.
+
+        Returns:
+            Her açıklama için (kategori, olasılık) ikilisi
+        """
+        # Sınıflandırıcı bir kez okunur; eşzamanlı güncelleme yenisini yerine koyabilir
+        classifier = self.classifier
+        if classifier is None:
+            raise ValueError("Model henüz eğitilmedi")
+        if not len(descriptions):
+            return []
+
+        probabilities = classifier.predict_proba(self.transform(descriptions))
+        best = probabilities.argmax(axis=1)
+        classes = classifier.classes_
+        return [(classes[index], float(probabilities[row, index])) for row, index in enumerate(best)]
+
+    def save(self, path: str) -> None:
+        """Modeli sürüm bilgisiyle birlikte diske atomik olarak kaydeder."""
+        if self.classifier is None:
+            raise ValueError("Model henüz eğitilmedi")
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = {
+            "version": MODEL_VERSION,
+            "sklearn_version": sklearn.__version__,
+            "n_features": self.n_features,
+            "ngram_range": self.ngram_range,
+            "alpha": self.alpha,
+            "n_samples": self.n_samples,
+            "trained_at": self.trained_at,
+            "classifier": self.classifier
+        }
+        temp_path = f"{path}.tmp"
+        joblib.dump(payload, temp_path, compress=3)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CategoryModel":
+        """
+        Kayıtlı modeli yükler.
+
+        Raises:
+            ValueError: Model biçimi veya scikit-learn sürümü uyumsuzsa
+        """
+        payload = joblib.load(path)
+        if not isinstance(payload, dict) or payload.get("version") != MODEL_VERSION:
+            raise ValueError("Model sürümü uyumsuz, yeniden eğitilmeli")
+        if payload.get("sklearn_version") != sklearn.__version__:
+            raise ValueError("Model farklı bir scikit-learn sürümüyle kaydedilmiş, yeniden eğitilmeli")
+
+        model = cls(n_features=payload["n_features"], ngram_range=payload["ngram_range"], alpha=payload["alpha"])
+        model.classifier = payload["classifier"]
+        model.n_samples = payload["n_samples"]
+        model.trained_at = payload["trained_at"]
+        return model
+
+class CategoryModelStore:
+    """
+    Kullanıcı başına kategori modellerini diskte saklayan ve bellekte tutan depo.
+
+    Modeller ``model_dir/category_model_<kullanıcı>.joblib`` dosyalarında
+    tutulur. Eğitilmiş modeli olmayan kullanıcılar için tahmin yapılmaz;
+    ilk kategori düzeltmesinde yeterli etiketli işlem varsa model eğitilir.
+    Eğitim ve güncelleme kullanıcı başına kilitle yapılır; depo kilidi yalnızca
+    bellekteki model tablosunu korur, böylece bir kullanıcının eğitimi diğer
+    kullanıcıları bekletmez.
+    """
+
+    def __init__(
+        self,
+        model_dir: str = settings["category_model"]["model_dir"],
+        min_confidence: float = settings["category_model"]["min_confidence"],
+        min_training_samples: int = settings["category_model"]["min_training_samples"]
+    ):
+        self.model_dir = model_dir
+        self.min_confidence = min_confidence
+        self.min_training_samples = min_training_samples
+        self._models: Dict[int, CategoryModel] = {}
+        self._user_locks: Dict[int, threading.RLock] = {}
+        self._lock = threading.RLock()
+
+    def model_path(self, user_id: int) -> str:
+        return os.path.join(self.model_dir, f"category_model_{user_id}.joblib")
+
+    def _user_lock(self, user_id: int) -> threading.RLock:
+        with self._lock:
+            return self._user_locks.setdefault(user_id, threading.RLock())
+
+    def get(self, user_id: int) -> Optional[CategoryModel]:
+        """Kullanıcının modelini döndürür; yoksa veya uyumsuzsa None."""
+        with self._lock:
+            model = self._models.get(user_id)
+            if model is not None:
+                return model
+
+            path = self.model_path(user_id)
+            if not os.path.exists(path):
+                return None
+            try:
+                model = CategoryModel.load(path)
+            except (ValueError, OSError, EOFError):
+                # Uyumsuz veya bozuk model yok sayılır; sonraki eğitimde üzerine yazılır
+                return None
+            self._models[user_id] = model
+            return model
+
+    def train(self, db: Session, user_id: int) -> Optional[CategoryModel]:
+        """
+        Kullanıcının etiketli işlemlerinden modeli yeniden eğitir ve kaydeder.
+
+        Args:
+            db: Veritabanı oturumu
+            user_id: Kullanıcı ID'si
+
+        Returns:
+            Eğitilen model veya yeterli etiketli işlem yoksa None
+        """
+        rows = db.query(Transaction.description, Transaction.category).filter(
+            Transaction.user_id == user_id,
+            Transaction.description.isnot(None),
+            Transaction.description != "",
+            Transaction.category != DEFAULT_CATEGORY
+        ).all()
+        if len(rows) < self.min_training_samples:
+            return None
+
+        with self._user_lock(user_id):
+            model = CategoryModel().fit([row[0] for row in rows], [row[1] for row in rows])
+            model.save(self.model_path(user_id))
+            with self._lock:
+                self._models[user_id] = model
+        return model
+
+    def learn(self, db: Session, user_id: int, descriptions: Sequence[str], categories: Sequence[str]) -> Optional[CategoryModel]:
+        """
+        Kullanıcının kategori düzeltmelerini modele işler.
+
+        Model varsa artımlı olarak güncellenip kaydedilir; yoksa kullanıcının
+        geçmişinden eğitilir (düzeltmeler veritabanına yazılmış olmalıdır).
+        """
+        with self._user_lock(user_id):
+            model = self.get(user_id)
+            if model is None:
+                return self.train(db, user_id)
+
+            labeled = [(d, c) for d, c in zip(descriptions, categories) if d and c and c != DEFAULT_CATEGORY]
+            if labeled:
+                model.partial_fit([d for d, _ in labeled], [c for _, c in labeled])
+                model.save(self.model_path(user_id))
+            return model
+
+    def refine(self, user_id: int, descriptions: Sequence[str], categories: Sequence[str]) -> List[str]:
+        """
+        Anahtar kelimelerle "Diğer" kalan açıklamaları modelle kategorilendirir.
+
+        Args:
+            user_id: Kullanıcı ID'si
+            descriptions: İşlem açıklamaları
+            categories: Anahtar kelime motorunun kategorileri
+
+        Returns:
+            Güvenli tahminlerle güncellenmiş kategori listesi
+        """
+        categories = list(categories)
+        pending = [i for i, category in enumerate(categories) if category == DEFAULT_CATEGORY and descriptions[i]]
+        if not pending:
+            return categories
+
+        model = self.get(user_id)
+        if model is None:
+            return categories
+
+        for i, (category, confidence) in zip(pending, model.predict([descriptions[i] for i in pending])):
+            if confidence >= self.min_confidence:
+                categories[i] = category
+        return categories
+
+    def forget(self, user_id: int) -> None:
+        """Kullanıcının modelini bellekten ve diskten siler."""
+        with self._user_lock(user_id), self._lock:
+            self._models.pop(user_id, None)
+            path = self.model_path(user_id)
+            if os.path.exists(path):
+                os.remove(path)
+
+# Uygulama genelinde paylaşılan model deposu
+category_models = CategoryModelStore()
@@ -2,6 +2,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from models.category import Category
 from utils.db import db_session
+from services.categorizer import invalidate_user_categories
 
 class CategoryService:
     """Kategori (Category) verilerini yöneten servis sınıfı."""
@@ -50,6 +51,7 @@ class CategoryService:
             session.add(new_category)
             session.commit()
             session.refresh(new_category)
+            invalidate_user_categories(user_id)
             return new_category
     
     def create_category(self, name: str, user_id: int, color: str = "#3498db", icon: str = "tag") -> Category:
@@ -64,6 +66,7 @@ class CategoryService:
             session.add(category)
             session.commit()
             session.refresh(category)
+            invalidate_user_categories(user_id)
             return category
     
     def update_category(
@@ -88,6 +91,7 @@ class CategoryService:
                 
             session.commit()
             session.refresh(category)
+            invalidate_user_categories(category.user_id)
             return category
     
     def delete_category(self, category_id: int) -> bool:
@@ -97,6 +101,8 @@ class CategoryService:
             if not category:
                 return False
                 
+            user_id = category.user_id
             session.delete(category)
             session.commit()
-            return True 
\ No newline at end of file
+            invalidate_user_categories(user_id)
+            return True
\ No newline at end of file
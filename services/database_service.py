@@ -1,14 +1,28 @@
+import base64
+import json
 from sqlalchemy.orm import Session
 from models.database import User, Transaction, Budget, FinancialGoal
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from utils.logger import FinanceLogger
-from sqlalchemy import func, desc, and_
-from functools import lru_cache
+from sqlalchemy import func, desc, and_, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from utils.cache import cached_query, query_cache
+from services.rollup_service import RollupService
+from services.budget_alerts import watch_budget_alerts
+from services.job_queue import JobQueue
+from services.job_handlers import get_job_queue
 
 class DatabaseService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, job_queue: Optional[JobQueue] = None):
+        """
+        Args:
+            db: Veritabanı oturumu
+            job_queue: Model güncellemesi gibi arka plan işlerinin ekleneceği kuyruk
+                (varsayılan: uygulama genelinde paylaşılan kuyruk)
+        """
         self.db = db
+        self.job_queue = job_queue
         self.logger = FinanceLogger()
 
     # Kullanıcı işlemleri
@@ -34,12 +48,10 @@ class DatabaseService:
     def get_user(self, user_id: int) -> Optional[User]:
         return self.db.query(User).filter(User.id == user_id).first()
 
-    @lru_cache(maxsize=100)
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Kullanıcı adına göre kullanıcıyı getirir."""
         return self.db.query(User).filter(User.username == username).first()
 
-    @lru_cache(maxsize=100)
     def get_user_by_email(self, email: str) -> Optional[User]:
         """E-posta adresine göre kullanıcıyı getirir."""
         return self.db.query(User).filter(User.email == email).first()
@@ -57,7 +69,6 @@ class DatabaseService:
         """Nesneyi yeniler."""
         self.db.refresh(obj)
 
-    @lru_cache(maxsize=100)
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """ID'ye göre kullanıcıyı getirir."""
         return self.db.query(User).filter(User.id == user_id).first()
@@ -91,6 +102,8 @@ class DatabaseService:
             recurring_type=recurring_type
         )
         self.db.add(transaction)
+        # Aşılan bütçe eşikleri commit sırasında tespit edilip bildirilir
+        watch_budget_alerts(self.db)
         self.db.commit()
         self.db.refresh(transaction)
         
@@ -110,11 +123,76 @@ class DatabaseService:
         
         return transaction
 
-    def get_user_transactions(
-        self, 
-        user_id: int, 
-        page: int = 1, 
-        per_page: int = 10,
+    def update_transaction(self, transaction_id: int, **changes) -> Optional[Transaction]:
+        """
+        İşlemi günceller.
+        
+        Aylık özet tablosu ORM flush'ı sırasında eski ve yeni değerlere göre güncellenir.
+        
+        Args:
+            transaction_id: İşlem ID'si
+            **changes: Güncellenecek alanlar (amount, type, category, description, date, ...)
+            
+        Returns:
+            Güncellenen işlem veya bulunamazsa None
+        """
+        transaction = self.db.query(Transaction).filter(Transaction.id == transaction_id).first()
+        if not transaction:
+            return None
+        
+        for key, value in changes.items():
+            if not hasattr(Transaction, key):
+                raise ValueError(f"Geçersiz işlem alanı: {key}")
+            setattr(transaction, key, value)
+        
+        self.db.commit()
+        self.db.refresh(transaction)
+        
+        # Kullanıcının kategori düzeltmesi arka planda öğrenilmiş kategori modeline
+        # işlenir; model eğitimi sayfayı bekletmez
+        if "category" in changes and transaction.description:
+            try:
+                queue = self.job_queue or get_job_queue()
+                queue.submit(
+                    "category_learn",
+                    {"descriptions": [transaction.description], "categories": [transaction.category]},
+                    user_id=transaction.user_id
+                )
+            except (ValueError, SQLAlchemyError):
+                # İş eklenemezse işlem güncellemesi yine de geçerlidir
+                pass
+        
+        self.logger.log_transaction(
+            transaction.user_id,
+            "update",
+            {
+                "transaction_id": transaction_id,
+                **{key: value.isoformat() if isinstance(value, (date, datetime)) else value
+                   for key, value in changes.items()}
+            }
+        )
+        
+        return transaction
+
+    def delete_transaction(self, transaction_id: int) -> bool:
+        """
+        İşlemi siler; aylık özet tablosu flush sırasında güncellenir.
+        """
+        transaction = self.db.query(Transaction).filter(Transaction.id == transaction_id).first()
+        if not transaction:
+            return False
+        
+        user_id = transaction.user_id
+        self.db.delete(transaction)
+        self.db.commit()
+        
+        self.logger.log_transaction(user_id, "delete", {"transaction_id": transaction_id})
+        
+        return True
+
+    def _filtered_transactions_query(
+        self,
+        user_id: int,
         transaction_type: Optional[str] = None,
         category: Optional[str] = None,
         min_amount: Optional[float] = None,
@@ -123,14 +201,10 @@ class DatabaseService:
         end_date: Optional[date] = None,
         source_filter: Optional[str] = None,
         days_back: Optional[int] = None
-    ) -> Dict:
-        """
-        Kullanıcının işlemlerini getirir.
-        """
-        # Toplam işlem sayısı
+    ):
+        """Kullanıcının işlemleri için filtrelenmiş sorguyu oluşturur."""
         query = self.db.query(Transaction).filter(Transaction.user_id == user_id)
         
-        # Filtreleme
         if transaction_type:
             query = query.filter(Transaction.type == transaction_type)
         if category:
@@ -148,15 +222,65 @@ class DatabaseService:
         if days_back:
             past_date = datetime.now().date() - timedelta(days=days_back)
             query = query.filter(Transaction.date >= past_date)
-            
-        total_transactions = query.count()
+        
+        return query
+
+    @cached_query("transaction_count")
+    def count_user_transactions(
+        self,
+        user_id: int,
+        transaction_type: Optional[str] = None,
+        category: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        source_filter: Optional[str] = None,
+        days_back: Optional[int] = None
+    ) -> int:
+        """
+        Filtrelere uyan işlem sayısını döndürür.
+        
+        Sonuç sorgu önbelleğinde tutulur; sayfa geçişlerinde tüm filtrelenmiş
+        küme yeniden sayılmaz ve kullanıcının işlemleri değiştiğinde silinir.
+        """
+        return self._filtered_transactions_query(
+            user_id, transaction_type, category, min_amount, max_amount,
+            start_date, end_date, source_filter, days_back
+        ).order_by(None).count()
+
+    def get_user_transactions(
+        self, 
+        user_id: int, 
+        page: int = 1, 
+        per_page: int = 10,
+        transaction_type: Optional[str] = None,
+        category: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        source_filter: Optional[str] = None,
+        days_back: Optional[int] = None
+    ) -> Dict:
+        """
+        Kullanıcının işlemlerini sayfa numarasıyla (OFFSET) getirir.
+        
+        Derin sayfalar için get_user_transactions_page (imleçli sayfalama) tercih edilmelidir.
+        """
+        filters = (transaction_type, category, min_amount, max_amount, start_date, end_date, source_filter, days_back)
+        query = self._filtered_transactions_query(user_id, *filters)
+        
+        # Toplam işlem sayısı
+        total_transactions = self.count_user_transactions(user_id, *filters)
         
         # Toplam sayfa sayısı
         total_pages = (total_transactions + per_page - 1) // per_page
         
         # İşlemleri getir
         transactions = query.order_by(
-            Transaction.date.desc()
+            Transaction.date.desc(),
+            Transaction.id.desc()
         ).offset(
             (page - 1) * per_page
         ).limit(per_page).all()
@@ -169,7 +293,88 @@ class DatabaseService:
             "total_pages": total_pages
         }
 
-    @lru_cache(maxsize=100)
+    @staticmethod
+    def encode_transaction_cursor(transaction: Transaction) -> str:
+        """İşlemin (tarih, id) konumunu opak bir sayfa imlecine dönüştürür."""
+        payload = json.dumps({"d": transaction.date.isoformat(), "i": transaction.id}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_transaction_cursor(cursor: str) -> Tuple[datetime, int]:
+        """
+        Sayfa imlecini (tarih, id) ikilisine çözer.
+        
+        Raises:
+            ValueError: İmleç geçersizse
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return datetime.fromisoformat(payload["d"]), int(payload["i"])
+        except (ValueError, TypeError, KeyError, UnicodeError) as e:
+            raise ValueError("Geçersiz sayfa imleci") from e
+
+    def get_user_transactions_page(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        per_page: int = 50,
+        include_total: bool = True,
+        transaction_type: Optional[str] = None,
+        category: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        source_filter: Optional[str] = None,
+        days_back: Optional[int] = None
+    ) -> Dict:
+        """
+        Kullanıcının işlemlerini (tarih, id) üzerinden imleçli sayfalama ile getirir.
+        
+        OFFSET yerine son görülen işlemin konumundan devam edildiği için her
+        sayfa (user_id, date) indeksi üzerinden sabit maliyetle okunur.
+        
+        Args:
+            user_id: Kullanıcı ID'si
+            cursor: Önceki sayfanın next_cursor değeri (None ise ilk sayfa)
+            per_page: Sayfa başına işlem sayısı
+            include_total: Önbellekli toplam işlem sayısını da döndür
+            
+        Returns:
+            {"transactions", "next_cursor", "has_more", "per_page", "total"}
+            
+        Raises:
+            ValueError: İmleç veya sayfa boyutu geçersizse
+        """
+        if per_page <= 0:
+            raise ValueError("Sayfa boyutu pozitif olmalıdır")
+        
+        filters = (transaction_type, category, min_amount, max_amount, start_date, end_date, source_filter, days_back)
+        query = self._filtered_transactions_query(user_id, *filters)
+        
+        if cursor:
+            cursor_date, cursor_id = self.decode_transaction_cursor(cursor)
+            query = query.filter(tuple_(Transaction.date, Transaction.id) < tuple_(cursor_date, cursor_id))
+        
+        # Sonraki sayfanın varlığını anlamak için bir fazla kayıt oku
+        rows = query.order_by(
+            Transaction.date.desc(),
+            Transaction.id.desc()
+        ).limit(per_page + 1).all()
+        
+        has_more = len(rows) > per_page
+        transactions = rows[:per_page]
+        
+        return {
+            "transactions": transactions,
+            "next_cursor": self.encode_transaction_cursor(transactions[-1]) if has_more else None,
+            "has_more": has_more,
+            "per_page": per_page,
+            "total": self.count_user_transactions(user_id, *filters) if include_total else None
+        }
+
+    @cached_query("transaction_summary")
     def get_transaction_summary(
         self, 
         user_id: int, 
@@ -177,6 +382,18 @@ class DatabaseService:
         end_date: date
     ) -> Dict:
         """Belirli bir tarih aralığındaki işlem özetini getirir."""
+        # Aralık tam aylardan oluşuyorsa aylık özet tablosunu kullan
+        month_range = RollupService.full_month_range(start_date, end_date)
+        if month_range:
+            totals = RollupService(self.db).get_type_category_totals(user_id, *month_range)
+            total_income = sum(totals["income"].values())
+            total_expense = sum(totals["expense"].values())
+            return {
+                "total_income": total_income,
+                "total_expense": total_expense,
+                "net_amount": total_income - total_expense
+            }
+        
         # SQL ile direkt hesaplama
         result = self.db.query(
             func.sum(Transaction.amount).filter(Transaction.type == "income").label("total_income"),
@@ -356,6 +573,7 @@ class DatabaseService:
         
         return goal
 
+    @cached_query("category_summary")
     def get_category_summary(
         self, 
         user_id: int, 
@@ -363,6 +581,19 @@ class DatabaseService:
         end_date: date
     ) -> List[Dict]:
         """Kategori bazlı özet bilgileri getirir."""
+        # Aralık tam aylardan oluşuyorsa aylık özet tablosunu kullan
+        month_range = RollupService.full_month_range(start_date, end_date)
+        if month_range:
+            totals = RollupService(self.db).get_category_totals(user_id, *month_range)
+            return [
+                {
+                    "category": category,
+                    "total_expense": values["total"],
+                    "transaction_count": values["count"]
+                }
+                for category, values in totals.items()
+            ]
+        
         result = self.db.query(
             Transaction.category,
             func.sum(Transaction.amount).filter(Transaction.type == "expense").label("total_expense"),
@@ -415,12 +646,25 @@ class DatabaseService:
             "active_goals": active_goals
         }
 
-    def clear_cache(self):
-        """Önbelleği temizler."""
-        self.get_user_by_username.cache_clear()
-        self.get_user_by_email.cache_clear()
-        self.get_user_by_id.cache_clear()
-        self.get_transaction_summary.cache_clear()
+    def clear_cache(self, user_id: Optional[int] = None) -> None:
+        """
+        Sorgu önbelleğini temizler.
+        
+        İşlem, bütçe ve hedef değişikliklerinde ilgili kullanıcının girdileri
+        commit sırasında zaten silinir; bu metot elle temizleme içindir.
+        
+        Args:
+            user_id: Sadece bu kullanıcının girdilerini sil (None ise tümü)
+        """
+        if user_id is None:
+            query_cache.clear()
+        else:
+            query_cache.invalidate_user(user_id)
+
+    @staticmethod
+    def cache_stats() -> Dict:
+        """Paylaşılan sorgu önbelleğinin boyut ve isabet/ıska sayaçlarını döndürür."""
+        return query_cache.stats()
 
     # Yedekleme ve geri yükleme işlemleri
     def restore_from_backup(self, category: str) -> bool:
@@ -441,6 +685,7 @@ class DatabaseService:
             self.db.rollback()
             raise e 
 
+    @cached_query("transaction_categories")
     def get_user_transaction_categories(self, user_id: int) -> List[str]:
         """
         Kullanıcının tüm işlem kategorilerini getirir.
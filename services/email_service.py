@@ -1,11 +1,16 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import logging
 import os
+from services.mail_queue import build_message, get_mail_queue, get_smtp_pool
 
 class EmailService:
-    """E-posta gönderimi için servis sınıfı."""
+    """
+    E-posta gönderimi için servis sınıfı.
+    
+    SMTP bağlantıları aynı sunucu ve kullanıcı için süreç genelinde
+    paylaşılan bir havuzdan alınır (bkz. services.mail_queue); her mesaj
+    için yeniden STARTTLS ve giriş yapılmaz. Bildirim e-postaları arka
+    plan kuyruğuna eklenir ve partiler halinde gönderilir.
+    """
     
     def __init__(self, smtp_server=None, smtp_port=None, smtp_user=None, smtp_password=None):
         """
@@ -52,33 +57,59 @@ class EmailService:
             return False
             
         try:
-            # E-posta mesajı oluştur
-            msg = MIMEMultipart()
-            msg['From'] = self.smtp_user
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # İçerik türüne göre ekle
-            if is_html:
-                msg.attach(MIMEText(body, 'html'))
-            else:
-                msg.attach(MIMEText(body, 'plain'))
-                
-            # SMTP sunucusuna bağlan
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()  # TLS güvenlik bağlantısını başlat
-            server.login(self.smtp_user, self.smtp_password)
-            
-            # E-postayı gönder
-            server.send_message(msg)
-            server.quit()
-            
+            # Paylaşılan havuzdaki bağlantı üzerinden gönder
+            self._pool().send(build_message(self.smtp_user, to_email, subject, body, is_html))
             self.logger.info(f"E-posta başarıyla gönderildi: {to_email}")
             return True
             
         except Exception as e:
             self.logger.error(f"E-posta gönderilirken hata oluştu: {str(e)}")
             return False
+    
+    def queue_email(self, to_email, subject, body, is_html=False):
+        """
+        E-postayı giden e-posta kuyruğuna ekler; gönderim arka planda yapılır.
+        
+        Args:
+            to_email: Alıcı e-posta adresi
+            subject: E-posta konusu
+            body: E-posta içeriği
+            is_html: İçeriğin HTML olup olmadığı (varsayılan: False)
+            
+        Returns:
+            bool: E-posta kuyruğa eklendiyse True, aksi halde False
+        """
+        return self.queue_emails([{"to": to_email, "subject": subject, "body": body, "is_html": is_html}]) == 1
+    
+    def queue_emails(self, emails):
+        """
+        Çok sayıda e-postayı tek seferde kuyruğa ekler (ör. tüm kullanıcılara aylık özet).
+        
+        Mesajlar havuz boyutu kadar bağlantı üzerinden partiler halinde
+        gönderilir; alıcı sayısı kadar TLS oturumu açılmaz.
+        
+        Args:
+            emails: [{"to", "subject", "body", "is_html"}] sözlükleri
+            
+        Returns:
+            int: Kuyruğa eklenen e-posta sayısı (alıcısı olmayanlar atlanır)
+        """
+        if not self.is_configured():
+            self.logger.error("SMTP ayarları yapılandırılmamış!")
+            return 0
+        
+        messages = [
+            build_message(self.smtp_user, email["to"], email["subject"], email["body"], email.get("is_html", False))
+            for email in emails
+            if email.get("to")
+        ]
+        if messages:
+            get_mail_queue(self._pool()).enqueue_many(messages)
+        return len(messages)
+    
+    def _pool(self):
+        """Bu SMTP ayarları için paylaşılan bağlantı havuzunu döndürür."""
+        return get_smtp_pool(self.smtp_server, int(self.smtp_port), self.smtp_user, self.smtp_password)
             
     def send_notification_email(self, user, notification):
         """
@@ -89,7 +120,7 @@ class EmailService:
             notification: Bildirim nesnesi
             
         Returns:
-            bool: E-posta gönderimi başarılı ise True, aksi halde False
+            bool: E-posta kuyruğa eklendiyse True, aksi halde False
         """
         # Kullanıcının bildirim tercihlerini kontrol et
         user_prefs = user.get_notification_preferences()
@@ -145,5 +176,5 @@ class EmailService:
         </html>
         """
         
-        # E-postayı gönder
-        return self.send_email(user.email, subject, html_content, is_html=True) 
\ No newline at end of file
+        # E-postayı kuyruğa ekle (gönderim arka planda yapılır)
+        return self.queue_email(user.email, subject, html_content, is_html=True) 
\ No newline at end of file
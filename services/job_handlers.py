@@ -0,0 +1,186 @@
+import threading
+from datetime import date
+from typing import Dict, Optional
+from config import settings
+from services.job_queue import JobContext, JobQueue
+from utils.blob_store import receipt_store
+
+# Uygulama genelinde paylaşılan kuyruk (Streamlit yeniden çalıştırmalarında korunur)
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+# Tekrarlayan işlem üretiminin en son kuyruğa eklendiği gün
+_materialization_scheduled_on: Optional[date] = None
+
+def ocr_receipt_job(payload: Dict, context: JobContext) -> Dict:
+    """
+    Depodaki makbuz görüntüsünü okur, OCR uygular ve (save ise) makbuzu kaydeder.
+
+    Payload: {"image_hash", "save"}
+    """
+    # pytesseract yalnızca OCR işi çalıştığında gerekir
+    from services.ocr_service import OCRService
+
+    image_data = receipt_store.read(payload["image_hash"])
+    service = OCRService(context.session)
+    context.report_progress(0.1, "Makbuz okunuyor")
+    info = service.process_receipt_image(image_data)
+    result = {"amount": info["amount"], "date": info["date"], "category": info["category"], "text": info["text"]}
+
+    if payload.get("save", True):
+        context.report_progress(0.8, "Makbuz kaydediliyor")
+        receipt = service.save_receipt(context.user_id, image_data, info)
+        result.update({"receipt_id": receipt.id, "category": receipt.category})
+    return result
+
+def bank_sync_job(payload: Dict, context: JobContext) -> Dict:
+    """
+    Kullanıcının (veya verilen) banka hesaplarını senkronize eder.
+
+    Payload: {"account_ids"} (isteğe bağlı; yoksa kullanıcının tüm aktif hesapları).
+    Banka hız sınırlayıcıları sync_scheduler modülünde işler arasında paylaşılır.
+    """
+    from services.sync_scheduler import SyncScheduler
+
+    scheduler = SyncScheduler(session_factory=context.queue.session_factory)
+    context.report_progress(0.1, "Banka hesapları senkronize ediliyor")
+    if payload.get("account_ids"):
+        return scheduler.sync_accounts(payload["account_ids"])
+    return scheduler.sync_user_accounts(context.user_id)
+
+def report_export_job(payload: Dict, context: JobContext) -> Dict:
+    """
+    Aylık raporu oluşturup Excel dosyasına yazar.
+
+    Payload: {"year", "month", "filename"}
+    """
+    from services.report_service import ReportService
+
+    service = ReportService(context.session)
+    context.report_progress(0.1, "Rapor hazırlanıyor")
+    report = service.generate_monthly_report(context.user_id, payload["year"], payload["month"])
+    context.report_progress(0.6, "Excel dosyası yazılıyor")
+    service.export_to_excel(report, payload["filename"])
+    return {"filename": payload["filename"]}
+
+def send_email_job(payload: Dict, context: JobContext) -> Dict:
+    """
+    E-posta gönderir; gönderilemezse iş hata ile biter (tekrar denenebilir).
+
+    Payload: {"to", "subject", "body", "is_html"}
+    """
+    from services.email_service import EmailService
+
+    if not EmailService().send_email(payload["to"], payload["subject"], payload["body"], payload.get("is_html", False)):
+        raise ValueError(f"E-posta gönderilemedi: {payload['to']}")
+    return {"to": payload["to"]}
+
+def recurring_materialize_job(payload: Dict, context: JobContext) -> Dict:
+    """
+    Tüm kullanıcıların vadesi gelen tekrarlayan işlemlerini oluşturur.
+
+    Payload: {"as_of"} (ISO tarih; yoksa bugün)
+    """
+    from services.recurring_service import RecurringService
+
+    as_of = date.fromisoformat(payload["as_of"]) if payload.get("as_of") else None
+    context.report_progress(0.1, "Tekrarlayan işlemler oluşturuluyor")
+    return RecurringService(context.session).materialize_due(as_of)
+
+def category_learn_job(payload: Dict, context: JobContext) -> Dict:
+    """
+    Kullanıcının kategori düzeltmelerini öğrenilmiş kategori modeline işler.
+
+    Payload: {"descriptions", "categories"}
+    """
+    from services.category_model import category_models
+
+    context.report_progress(0.1, "Kategori modeli güncelleniyor")
+    model = category_models.learn(context.session, context.user_id, payload["descriptions"], payload["categories"])
+    return {"trained": model is not None, "n_samples": model.n_samples if model else 0}
+
+DEFAULT_JOB_HANDLERS = {
+    "ocr_receipt": ocr_receipt_job,
+    "bank_sync": bank_sync_job,
+    "report_export": report_export_job,
+    "send_email": send_email_job,
+    "recurring_materialize": recurring_materialize_job,
+    "category_learn": category_learn_job
+}
+
+def register_default_handlers(queue: JobQueue) -> JobQueue:
+    """Uygulamanın iş türlerini kuyruğa kaydeder."""
+    for kind, handler in DEFAULT_JOB_HANDLERS.items():
+        queue.register(kind, handler)
+    return queue
+
+def submit_receipt_ocr(queue: JobQueue, user_id: int, image_data: bytes, save: bool = True) -> int:
+    """
+    Makbuz görüntüsünü depoya yazar ve OCR işini kuyruğa ekler.
+
+    Aynı kullanıcı aynı görüntüyü tekrar gönderirse mevcut iş döndürülür.
+
+    Returns:
+        İş ID'si
+    """
+    digest, _ = receipt_store.put(image_data)
+    return queue.submit(
+        "ocr_receipt",
+        {"image_hash": digest, "save": save},
+        user_id=user_id,
+        idempotency_key=f"ocr_receipt:{user_id}:{digest}:{int(save)}"
+    )
+
+def submit_recurring_materialization(queue: JobQueue, as_of: Optional[date] = None) -> int:
+    """
+    Günün tekrarlayan işlem üretimini kuyruğa ekler.
+
+    Aynı gün için tekrar gönderilirse (ör. birden fazla uygulama süreci)
+    mevcut iş döndürülür.
+
+    Returns:
+        İş ID'si
+    """
+    as_of = (as_of or date.today()).isoformat()
+    return queue.submit(
+        "recurring_materialize",
+        {"as_of": as_of},
+        idempotency_key=f"recurring_materialize:{as_of}"
+    )
+
+def schedule_recurring_materialization(queue: JobQueue, today: Optional[date] = None) -> Optional[int]:
+    """
+    Günün tekrarlayan işlem üretimini süreç içinde gün başına bir kez kuyruğa ekler.
+
+    Uzun süre açık kalan süreçte gün değiştikten sonraki ilk çağrı yeni
+    günün işini ekler; aynı gündeki sonraki çağrılar veritabanına gitmez.
+
+    Returns:
+        İş ID'si; bu gün için zaten eklendiyse None
+    """
+    global _materialization_scheduled_on
+    today = today or date.today()
+    if _materialization_scheduled_on == today:
+        return None
+    job_id = submit_recurring_materialization(queue, today)
+    _materialization_scheduled_on = today
+    return job_id
+
+def get_job_queue() -> JobQueue:
+    """
+    Varsayılan işleyicileri kayıtlı, çalışan paylaşılan kuyruğu döndürür.
+
+    Uygulama açılışta (app.main) çağırır; kesinti sırasında kaçırılan ve
+    gün içinde vadesi gelen tekrarlayan işlemler bu sayede üretilir.
+    """
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                queue = register_default_handlers(JobQueue(
+                    max_workers=settings["job_queue"]["max_workers"],
+                    poll_interval=settings["job_queue"]["poll_interval_seconds"]
+                ))
+                queue.start()
+                _job_queue = queue
+    schedule_recurring_materialization(_job_queue)
+    return _job_queue
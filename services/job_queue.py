@@ -0,0 +1,351 @@
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.database import SessionLocal, Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+def make_idempotency_key(kind: str, payload: Dict) -> str:
+    """İş türü ve içerikten kararlı bir tekrar önleme anahtarı üretir."""
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{kind}:{hashlib.sha256(encoded.encode('utf-8')).hexdigest()}"
+
+def _job_to_dict(job: Job) -> Dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "user_id": job.user_id,
+        "status": job.status.value,
+        "progress": job.progress,
+        "message": job.message,
+        "result": json.loads(job.result) if job.result is not None else None,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+class JobContext:
+    """İşleyiciye verilen bağlam: işin kendi oturumu ve ilerleme bildirimi."""
+
+    def __init__(self, queue: "JobQueue", job_id: int, user_id: Optional[int], session: Session):
+        self.queue = queue
+        self.job_id = job_id
+        self.user_id = user_id
+        self.session = session
+
+    def report_progress(self, progress: float, message: Optional[str] = None) -> None:
+        """
+        İşin ilerlemesini kaydeder; sayfalar bu değeri okur.
+
+        İşleyicinin oturumundaki yarım değişiklikler commit edilmesin diye
+        ayrı bir kısa oturum kullanılır.
+        """
+        session = self.queue.session_factory()
+        try:
+            session.query(Job).filter(Job.id == self.job_id).update(
+                {Job.progress: min(1.0, max(0.0, float(progress))), Job.message: message},
+                synchronize_session=False
+            )
+            session.commit()
+        finally:
+            session.close()
+
+JobHandler = Callable[[Dict, JobContext], Any]
+
+class JobQueue:
+    """
+    SQLite ``jobs`` tablosuna dayalı, süreç içi arka plan iş kuyruğu.
+
+    Ağır işler (OCR, banka senkronizasyonu, Excel dışa aktarma, e-posta)
+    sayfa içinde beklenmeden kuyruğa eklenir ve bir iş parçacığı havuzunda
+    çalıştırılır; sayfa ``get`` ile durumu yoklar. Aynı idempotency
+    anahtarıyla tekrar eklenen iş yeniden oluşturulmaz (Streamlit yeniden
+    çalıştırmalarında çift gönderim). Bir iş, durumu pending -> running
+    olarak koşullu güncellenerek sahiplenilir; birden çok işçi aynı işi
+    alamaz. ``start`` önceki süreçte yarıda kalan işleri yeniden sıraya
+    alır.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_workers: int = 2,
+        poll_interval: float = 1.0
+    ):
+        if max_workers <= 0:
+            raise ValueError("İşçi sayısı pozitif olmalıdır")
+
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self._handlers: Dict[str, JobHandler] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._slots = threading.Semaphore(max_workers)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """
+        İş türü için işleyici kaydeder.
+
+        Args:
+            kind: İş türü
+            handler: (payload, context) alan ve JSON'a çevrilebilir sonuç döndüren fonksiyon
+        """
+        self._handlers[kind] = handler
+
+    def submit(
+        self,
+        kind: str,
+        payload: Optional[Dict] = None,
+        user_id: Optional[int] = None,
+        idempotency_key: Optional[str] = None
+    ) -> int:
+        """
+        İşi kuyruğa ekler.
+
+        Args:
+            kind: İş türü
+            payload: İşleyiciye verilecek JSON'a çevrilebilir parametreler
+            user_id: İşin sahibi olan kullanıcı
+            idempotency_key: Verilirse aynı anahtarlı mevcut iş döndürülür
+
+        Returns:
+            İş ID'si
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Bilinmeyen iş türü: {kind}")
+
+        session = self.session_factory()
+        try:
+            if idempotency_key is not None:
+                existing = self._find_by_key(session, idempotency_key)
+                if existing is not None:
+                    return existing
+
+            job = Job(
+                kind=kind,
+                user_id=user_id,
+                idempotency_key=idempotency_key,
+                payload=json.dumps(payload or {}, ensure_ascii=False, default=str),
+                status=JobStatus.PENDING
+            )
+            session.add(job)
+            try:
+                session.commit()
+            except IntegrityError:
+                # Aynı anahtarlı iş eşzamanlı olarak eklendi
+                session.rollback()
+                return self._find_by_key(session, idempotency_key)
+            job_id = job.id
+        finally:
+            session.close()
+
+        self._wakeup.set()
+        return job_id
+
+    def _find_by_key(self, session: Session, idempotency_key: str) -> Optional[int]:
+        row = session.query(Job.id).filter(Job.idempotency_key == idempotency_key).first()
+        return row[0] if row else None
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """İşin durumunu, ilerlemesini ve sonucunu döndürür (yoksa None)."""
+        session = self.session_factory()
+        try:
+            job = session.query(Job).filter(Job.id == job_id).first()
+            return _job_to_dict(job) if job else None
+        finally:
+            session.close()
+
+    def list_jobs(self, user_id: int, limit: int = 20) -> List[Dict]:
+        """Kullanıcının en son işlerini döndürür."""
+        session = self.session_factory()
+        try:
+            jobs = session.query(Job).filter(Job.user_id == user_id).order_by(Job.id.desc()).limit(limit).all()
+            return [_job_to_dict(job) for job in jobs]
+        finally:
+            session.close()
+
+    def retry(self, job_id: int) -> bool:
+        """Hata ile biten işi tekrar sıraya alır."""
+        return self._transition(job_id, JobStatus.FAILED, {
+            Job.status: JobStatus.PENDING, Job.error: None, Job.progress: 0.0, Job.message: None, Job.finished_at: None
+        })
+
+    def recover(self) -> int:
+        """
+        Yarıda kalan (running) işleri tekrar sıraya alır.
+
+        Süreç iş sırasında kapandıysa bu işler hiçbir işçiye ait değildir.
+        Yalnızca kuyruk başlatılırken, başka bir süreç aynı veritabanında
+        iş çalıştırmıyorken çağrılmalıdır.
+
+        Returns:
+            Sıraya alınan iş sayısı
+        """
+        session = self.session_factory()
+        try:
+            count = session.query(Job).filter(Job.status == JobStatus.RUNNING).update(
+                {Job.status: JobStatus.PENDING, Job.progress: 0.0, Job.message: None},
+                synchronize_session=False
+            )
+            session.commit()
+        finally:
+            session.close()
+        if count:
+            logger.info(f"{count} yarım kalan iş tekrar sıraya alındı.")
+        return count
+
+    def _transition(self, job_id: int, expected: JobStatus, values: Dict) -> bool:
+        """İşin durumu beklenen durumdaysa günceller (koşullu güncelleme)."""
+        session = self.session_factory()
+        try:
+            updated = session.query(Job).filter(Job.id == job_id, Job.status == expected).update(
+                values, synchronize_session=False
+            )
+            session.commit()
+        finally:
+            session.close()
+        if updated:
+            self._wakeup.set()
+        return bool(updated)
+
+    def claim(self) -> Optional[int]:
+        """
+        Sıradaki işi bu süreç için sahiplenir.
+
+        Returns:
+            Sahiplenilen iş ID'si; sırada iş yoksa None
+        """
+        if not self._handlers:
+            return None
+        session = self.session_factory()
+        try:
+            while True:
+                row = session.query(Job.id).filter(
+                    Job.status == JobStatus.PENDING,
+                    Job.kind.in_(list(self._handlers))
+                ).order_by(Job.id).first()
+                if row is None:
+                    return None
+
+                claimed = session.query(Job).filter(Job.id == row[0], Job.status == JobStatus.PENDING).update(
+                    {Job.status: JobStatus.RUNNING, Job.started_at: datetime.now(), Job.attempts: Job.attempts + 1},
+                    synchronize_session=False
+                )
+                session.commit()
+                if claimed:
+                    return row[0]
+                # Başka bir işçi önce aldı; sıradakini dene
+        finally:
+            session.close()
+
+    def run_job(self, job_id: int) -> None:
+        """Sahiplenilmiş işi çalıştırır ve sonucunu kaydeder."""
+        session = self.session_factory()
+        try:
+            job = session.query(Job).filter(Job.id == job_id).one()
+            kind = job.kind
+            handler = self._handlers[kind]
+            payload = json.loads(job.payload)
+            user_id = job.user_id
+            session.rollback()
+
+            try:
+                result = handler(payload, JobContext(self, job_id, user_id, session))
+                values = {
+                    Job.status: JobStatus.SUCCEEDED,
+                    Job.progress: 1.0,
+                    Job.result: json.dumps(result, ensure_ascii=False, default=str),
+                    Job.error: None
+                }
+            except Exception as e:
+                session.rollback()
+                logger.exception(f"İş #{job_id} ({kind}) hata ile bitti")
+                values = {Job.status: JobStatus.FAILED, Job.error: f"{type(e).__name__}: {e}"}
+
+            values[Job.finished_at] = datetime.now()
+            session.query(Job).filter(Job.id == job_id).update(values, synchronize_session=False)
+            session.commit()
+        finally:
+            session.close()
+
+    def run_pending(self, max_jobs: Optional[int] = None) -> int:
+        """
+        Sıradaki işleri çağıran iş parçacığında sırayla çalıştırır (testler ve komut satırı için).
+
+        Returns:
+            Çalıştırılan iş sayısı
+        """
+        count = 0
+        while max_jobs is None or count < max_jobs:
+            job_id = self.claim()
+            if job_id is None:
+                break
+            self.run_job(job_id)
+            count += 1
+        return count
+
+    def start(self) -> None:
+        """Yarım kalan işleri sıraya alır ve işçi havuzunu başlatır."""
+        with self._lock:
+            if self._dispatcher is not None:
+                return
+            self.recover()
+            self._stopping.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job-worker")
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="job-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Yeni iş almayı durdurur; ``wait`` ise çalışan işlerin bitmesini bekler."""
+        with self._lock:
+            if self._dispatcher is None:
+                return
+            self._stopping.set()
+            self._wakeup.set()
+            self._dispatcher.join()
+            self._executor.shutdown(wait=wait)
+            self._dispatcher = None
+            self._executor = None
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None
+
+    def _dispatch_loop(self) -> None:
+        while not self._stopping.is_set():
+            # Boş işçi olmadan iş sahiplenilmez; sahiplenilen iş hemen çalışır
+            if not self._slots.acquire(timeout=self.poll_interval):
+                continue
+            try:
+                job_id = self.claim()
+            except Exception:
+                logger.exception("Sıradaki iş alınamadı")
+                job_id = None
+
+            if job_id is None:
+                self._slots.release()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._executor.submit(self._run_and_release, job_id)
+
+    def _run_and_release(self, job_id: int) -> None:
+        try:
+            self.run_job(job_id)
+        except Exception:
+            logger.exception(f"İş #{job_id} kaydedilemedi")
+        finally:
+            self._slots.release()
+            self._wakeup.set()
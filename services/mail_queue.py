@@ -0,0 +1,451 @@
+import atexit
+import hashlib
+import heapq
+import itertools
+import logging
+import random
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Süreç genelinde paylaşılan havuzlar ve kuyruklar ((sunucu, port, kullanıcı, parola özeti) -> nesne)
+_pools: Dict[Tuple, "SMTPConnectionPool"] = {}
+_queues: Dict[Tuple, "MailQueue"] = {}
+_registry_lock = threading.Lock()
+
+def build_message(sender: str, to_email: str, subject: str, body: str, is_html: bool = False) -> MIMEMultipart:
+    """Gönderici, alıcı, konu ve (düz metin veya HTML) içerikten e-posta mesajı oluşturur."""
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html' if is_html else 'plain'))
+    return msg
+
+def is_transient(error: Exception) -> bool:
+    """Gönderim hatasının yeniden denenebilir (bağlantı hatası veya 4xx) olup olmadığını döndürür."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    # smtplib.SMTPException OSError'dan türer; diğer SMTP hataları kalıcıdır
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+def connection_usable(error: Exception) -> bool:
+    """Mesaj hatasından sonra aynı SMTP bağlantısıyla gönderime devam edilip edilemeyeceğini döndürür."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    if isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        # 421: sunucu bağlantıyı kapatıyor
+        return error.smtp_code != 421
+    return False
+
+class PooledConnection:
+    """Havuzdan alınan SMTP bağlantısı ve bu bağlantıyla gönderilen mesaj sayısı."""
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def send(self, message: Message) -> None:
+        """Mesajı bu bağlantı üzerinden gönderir."""
+        self.smtp.send_message(message)
+        self.sent += 1
+        self.last_used = time.monotonic()
+
+class SMTPConnectionPool:
+    """
+    Aynı SMTP sunucusuna açılmış, tekrar kullanılan bağlantı havuzu.
+
+    Bağlantı (EHLO, STARTTLS, giriş) ilk ihtiyaçta açılır ve gönderimden
+    sonra havuza geri konur; sonraki mesajlar aynı TLS oturumunu kullanır.
+    Aynı anda en fazla max_size bağlantı açık olur. max_idle_seconds'tan
+    uzun süre boşta kalan (sunucunun kapatmış olabileceği) bağlantılar ve
+    max_messages_per_connection mesaja ulaşan bağlantılar kapatılıp yenisi
+    açılır.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        max_size: int = 2,
+        max_messages_per_connection: int = 500,
+        max_idle_seconds: float = 60.0,
+        timeout: float = 30.0,
+        smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP
+    ):
+        if max_size <= 0:
+            raise ValueError("Havuz boyutu pozitif olmalıdır")
+        if max_messages_per_connection <= 0:
+            raise ValueError("Bağlantı başına mesaj sayısı pozitif olmalıdır")
+
+        self.host = host
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.max_size = max_size
+        self.max_messages_per_connection = max_messages_per_connection
+        self.max_idle_seconds = max_idle_seconds
+        self.timeout = timeout
+        self.smtp_factory = smtp_factory
+        # Şimdiye kadar açılan bağlantı (TLS oturumu) sayısı
+        self.opened = 0
+        self._idle: List[PooledConnection] = []
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+
+    def _open(self) -> PooledConnection:
+        """Yeni bir bağlantı açar; STARTTLS ve giriş bir kez yapılır."""
+        smtp = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            self._close(smtp)
+            raise
+        with self._lock:
+            self.opened += 1
+        return PooledConnection(smtp)
+
+    @staticmethod
+    def _close(smtp: smtplib.SMTP) -> None:
+        """Bağlantıyı QUIT ile kapatır; kopmuş bağlantılarda hatayı yok sayar."""
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def acquire(self) -> PooledConnection:
+        """Boştaki bir bağlantıyı veya (yoksa) yeni bir bağlantı döndürür; havuz doluysa bekler."""
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    return self._open()
+                if time.monotonic() - connection.last_used <= self.max_idle_seconds:
+                    return connection
+                self._close(connection.smtp)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, connection: PooledConnection, discard: bool = False) -> None:
+        """
+        Bağlantıyı havuza geri verir.
+
+        Args:
+            connection: acquire ile alınan bağlantı
+            discard: Bağlantı koptuysa veya durumu belirsizse True; bağlantı kapatılır
+        """
+        try:
+            if discard or connection.sent >= self.max_messages_per_connection:
+                self._close(connection.smtp)
+            else:
+                with self._lock:
+                    self._idle.append(connection)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """Bağlantıyı blok boyunca ödünç verir; bağlantıyı bozan hatalarda bağlantı kapatılır."""
+        connection = self.acquire()
+        discard = False
+        try:
+            yield connection
+        except Exception as e:
+            discard = not connection_usable(e)
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+    def send(self, message: Message) -> None:
+        """Tek mesajı havuzdaki bir bağlantı üzerinden eşzamanlı gönderir."""
+        with self.connection() as connection:
+            connection.send(message)
+
+    def close(self) -> None:
+        """Boştaki tüm bağlantıları kapatır."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._close(connection.smtp)
+
+class _QueuedMail:
+    """Kuyruktaki mesaj ve deneme sayısı."""
+
+    __slots__ = ("id", "message", "attempts")
+
+    def __init__(self, mail_id: int, message: Message):
+        self.id = mail_id
+        self.message = message
+        self.attempts = 0
+
+class MailQueue:
+    """
+    Giden e-postaları arka plan iş parçacıklarında, paylaşılan SMTP
+    bağlantıları üzerinden gönderen bellek içi kuyruk.
+
+    ``enqueue`` mesajı sıraya koyup hemen döner; istek iş parçacığı SMTP
+    sunucusunu beklemez. Her işçi gönderime hazır en fazla batch_size
+    mesajı alır ve havuzdan aldığı tek bağlantı üzerinden art arda
+    gönderir; toplu gönderimler (ör. tüm kullanıcılara aylık özet)
+    binlerce TLS oturumu yerine havuz boyutu kadar bağlantı açar. Geçici
+    hatalar (4xx, kopan bağlantı, açılamayan bağlantı) üstel ve rastgele
+    dağıtılmış (full jitter) bekleme ile max_retries kez yeniden denenir;
+    kalıcı hatalar (5xx) denenmez. Bağlantı bir partinin ortasında koparsa
+    partinin denenmemiş mesajları beklemeden yeni bağlantıyla gönderilir.
+
+    Kuyruk süreç içidir; süreç kapanırken ``stop`` bekleyen mesajları
+    gönderir. Kaybolmaması gereken tekil e-postalar için iş kuyruğundaki
+    ``send_email`` işi kullanılabilir.
+    """
+
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        batch_size: int = 50,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        workers: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if batch_size <= 0:
+            raise ValueError("Parti boyutu pozitif olmalıdır")
+        if max_retries < 0:
+            raise ValueError("Yeniden deneme sayısı negatif olamaz")
+
+        self.pool = pool
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Havuzdan fazla işçi bağlantı beklemekten başka iş yapmaz
+        self.workers = min(workers or pool.max_size, pool.max_size)
+        self._clock = clock
+        self._heap: List[Tuple[float, int, _QueuedMail]] = []
+        self._ids = itertools.count(1)
+        self._unfinished = 0
+        self._stats = {"queued": 0, "sent": 0, "failed": 0, "retried": 0}
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Deneme numarasına göre tam rastgele (full jitter) bekleme süresini döndürür."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def enqueue(self, message: Message) -> int:
+        """
+        Mesajı gönderim kuyruğuna ekler ve hemen döner.
+
+        Returns:
+            Kuyruk içi mesaj ID'si
+        """
+        return self.enqueue_many([message])[0]
+
+    def enqueue_many(self, messages: Iterable[Message]) -> List[int]:
+        """
+        Mesajları tek kilitle kuyruğa ekler (toplu gönderimler için).
+
+        Returns:
+            Kuyruk içi mesaj ID'leri
+        """
+        now = self._clock()
+        ids = []
+        with self._condition:
+            for message in messages:
+                mail = _QueuedMail(next(self._ids), message)
+                heapq.heappush(self._heap, (now, mail.id, mail))
+                ids.append(mail.id)
+            self._unfinished += len(ids)
+            self._stats["queued"] += len(ids)
+            self._condition.notify_all()
+        return ids
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """{"queued", "sent", "failed", "retried", "pending"} sayaçları."""
+        with self._condition:
+            return dict(self._stats, pending=self._unfinished)
+
+    def start(self) -> None:
+        """İşçi iş parçacıklarını başlatır (zaten çalışıyorsa bir şey yapmaz)."""
+        with self._condition:
+            if self._threads:
+                return
+            self._stopping = False
+            self._threads = [
+                threading.Thread(target=self._run, name=f"mail-queue-{index}", daemon=True)
+                for index in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Kuyruktaki tüm mesajlar gönderilene veya kalıcı olarak başarısız olana kadar bekler.
+
+        Returns:
+            Kuyruk boşaldıysa True, süre dolduysa False
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """
+        Bekleyen mesajları (en fazla timeout saniye) gönderir, işçileri durdurur ve bağlantıları kapatır.
+
+        Returns:
+            Kuyruk boşaltılarak durdurulduysa True
+        """
+        drained = self.flush(timeout)
+        with self._condition:
+            self._stopping = True
+            threads, self._threads = self._threads, []
+            self._condition.notify_all()
+        for thread in threads:
+            thread.join()
+        self.pool.close()
+        return drained
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            self._deliver(batch)
+
+    def _take_batch(self) -> Optional[List[_QueuedMail]]:
+        """Gönderime hazır en fazla batch_size mesajı sıradan alır; durdurulursa None döndürür."""
+        with self._condition:
+            while not self._stopping:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                now = self._clock()
+                wait = self._heap[0][0] - now
+                if wait > 0:
+                    self._condition.wait(wait)
+                    continue
+                batch = []
+                while self._heap and len(batch) < self.batch_size and self._heap[0][0] <= now:
+                    batch.append(heapq.heappop(self._heap)[2])
+                return batch
+            return None
+
+    def _deliver(self, batch: List[_QueuedMail]) -> None:
+        """Partiyi tek bağlantı üzerinden gönderir."""
+        try:
+            connection = self.pool.acquire()
+        except Exception as e:
+            logger.warning(f"SMTP bağlantısı açılamadı ({self.pool.host}:{self.pool.port}): {str(e)}")
+            for mail in batch:
+                self._retry_or_fail(mail, e)
+            return
+
+        discard = False
+        try:
+            for index, mail in enumerate(batch):
+                try:
+                    connection.send(mail.message)
+                except Exception as e:
+                    # SMTP dışı hatalar (ör. bozuk mesaj) kalıcı sayılır, bağlantı kapatılır
+                    self._retry_or_fail(mail, e)
+                    if not connection_usable(e):
+                        discard = True
+                        self._requeue(batch[index + 1:])
+                        return
+                else:
+                    self._finish(mail, True)
+        finally:
+            self.pool.release(connection, discard=discard)
+
+    def _requeue(self, mails: List[_QueuedMail], delay: float = 0.0) -> None:
+        if not mails:
+            return
+        ready_at = self._clock() + delay
+        with self._condition:
+            for mail in mails:
+                heapq.heappush(self._heap, (ready_at, mail.id, mail))
+            self._condition.notify_all()
+
+    def _retry_or_fail(self, mail: _QueuedMail, error: Exception) -> None:
+        mail.attempts += 1
+        if is_transient(error) and mail.attempts <= self.max_retries:
+            with self._condition:
+                self._stats["retried"] += 1
+            self._requeue([mail], self.backoff_delay(mail.attempts - 1))
+            return
+        logger.error(f"E-posta gönderilemedi ({mail.message['To']}, {mail.attempts} deneme): {str(error)}")
+        self._finish(mail, False)
+
+    def _finish(self, mail: _QueuedMail, sent: bool) -> None:
+        with self._condition:
+            self._stats["sent" if sent else "failed"] += 1
+            self._unfinished -= 1
+            self._condition.notify_all()
+
+def _registry_key(host: str, port: int, username: Optional[str], password: Optional[str]) -> Tuple:
+    """
+    Havuz/kuyruk kayıt anahtarını döndürür.
+
+    Parola değişince (ör. ayarlardan güncellenince) eski kimlik bilgileriyle
+    açılmış havuz kullanılmasın diye anahtara parolanın özeti eklenir.
+    """
+    password_digest = hashlib.sha256((password or "").encode("utf-8")).hexdigest()
+    return (host, int(port), username, password_digest)
+
+def get_smtp_pool(host: str, port: int, username: Optional[str] = None, password: Optional[str] = None) -> SMTPConnectionPool:
+    """Aynı sunucu ve kimlik bilgileri için süreç genelinde paylaşılan bağlantı havuzunu döndürür."""
+    key = _registry_key(host, port, username, password)
+    with _registry_lock:
+        if key not in _pools:
+            config = settings["mail_queue"]
+            _pools[key] = SMTPConnectionPool(
+                host, int(port), username, password,
+                max_size=config["pool_size"],
+                max_messages_per_connection=config["max_messages_per_connection"],
+                max_idle_seconds=config["max_idle_seconds"]
+            )
+        return _pools[key]
+
+def get_mail_queue(pool: SMTPConnectionPool) -> MailQueue:
+    """
+    Havuz için çalışan, süreç genelinde paylaşılan giden e-posta kuyruğunu döndürür.
+
+    Süreç kapanırken kuyruk durdurulur; bekleyen mesajlar en fazla
+    shutdown_timeout saniye boyunca gönderilmeye çalışılır.
+    """
+    key = _registry_key(pool.host, pool.port, pool.username, pool.password)
+    with _registry_lock:
+        if key not in _queues:
+            config = settings["mail_queue"]
+            queue = MailQueue(pool, batch_size=config["batch_size"], max_retries=config["max_retries"])
+            queue.start()
+            atexit.register(queue.stop, config["shutdown_timeout"])
+            _queues[key] = queue
+        return _queues[key]
@@ -1,13 +1,10 @@
 from datetime import datetime, timedelta, date
 from typing import List, Dict, Any, Optional, Tuple, Union
 from sqlalchemy.orm import Session
-from models.database import Transaction, Budget, FinancialGoal
+from models.database import FinancialGoal
 from models.notification import Notification, NotificationType
 from models.notification_preferences import NotificationPreferences, NotificationChannel
 from models.user import User
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import os
 import logging
 from models.user_preferences import UserPreferences
@@ -15,6 +12,9 @@ from config import settings  # Sadece settings'i import et
 from services.user_service import UserService
 import json
 from services.email_service import EmailService
+from services.mail_queue import build_message, get_mail_queue, get_smtp_pool
+from services.budget_alerts import BudgetAlertEvaluator
+from services.recurring_service import RecurringService
 from utils.db import db_session
 
 # Loglama yapılandırması
@@ -35,49 +35,20 @@ class NotificationService:
 
     def check_budget_alerts(self, user_id: int) -> List[Dict[str, Any]]:
         """Bütçe aşımı uyarılarını kontrol eder."""
-        alerts = []
-        current_date = datetime.now()
-        
-        # Aktif bütçeleri al
-        budgets = self.db.query(Budget).filter(
-            Budget.user_id == user_id,
-            Budget.start_date <= current_date,
-            Budget.end_date >= current_date
-        ).order_by(Budget.start_date.desc()).all()
+        # Bu ayki kategori harcamaları aylık özet tablosundan tek sorguyla okunur
+        return BudgetAlertEvaluator(self.db).evaluate([user_id]).get(user_id, [])
+    
+    def check_all_budget_alerts(self, as_of: Optional[date] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Tüm kullanıcıların bütçe uyarılarını tek sorguda kontrol eder (zamanlanmış tarama).
         
-        for budget in budgets:
-            # Bu ayki harcamaları hesapla
-            month_start = current_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            expenses = self.db.query(Transaction).filter(
-                Transaction.user_id == user_id,
-                Transaction.type == "expense",
-                Transaction.category == budget.category,
-                Transaction.date.between(month_start, month_end)
-            ).all()
-            
-            total_expenses = sum(expense.amount for expense in expenses)
+        Args:
+            as_of: Değerlendirme tarihi (varsayılan: bugün)
             
-            # Bütçe limitini kontrol et
-            if total_expenses >= budget.amount:
-                alerts.append({
-                    "type": "budget_alert",
-                    "category": budget.category,
-                    "limit": budget.amount,
-                    "spent": total_expenses,
-                    "remaining": budget.amount - total_expenses
-                })
-            elif total_expenses >= budget.amount * 0.8:  # %80 uyarısı
-                alerts.append({
-                    "type": "budget_warning",
-                    "category": budget.category,
-                    "limit": budget.amount,
-                    "spent": total_expenses,
-                    "remaining": budget.amount - total_expenses
-                })
-        
-        return alerts
+        Returns:
+            {kullanıcı ID: uyarılar}; uyarısı olmayan kullanıcılar dahil edilmez
+        """
+        return BudgetAlertEvaluator(self.db).evaluate(as_of=as_of)
 
     def check_goal_reminders(self, user_id: int) -> List[Dict[str, Any]]:
         """Hedef hatırlatmalarını kontrol eder."""
@@ -109,64 +80,23 @@ class NotificationService:
         return reminders
 
     def check_recurring_transactions(self, user_id: int) -> List[Dict[str, Any]]:
-        """Tekrarlayan işlem hatırlatmalarını kontrol eder."""
-        reminders = []
-        current_date = date.today()  # datetime yerine date kullan
-        
-        # Tekrarlayan işlemleri al
-        transactions = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.is_recurring == True
-        ).all()
+        """Tekrarlayan işlem hatırlatmalarını kontrol eder (seri başına bir hatırlatma)."""
+        # Vadesi gelen seriler indeksli next_date üzerinde tek sorguyla bulunur
+        return RecurringService(self.db).reminders(user_id)
+    
+    def check_all_recurring_transactions(self, as_of: Optional[date] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Tüm kullanıcıların tekrarlayan işlem hatırlatmalarını tek sorguda kontrol eder.
         
-        for transaction in transactions:
-            # Son işlem tarihini kontrol et
-            last_transaction = self.db.query(Transaction).filter(
-                Transaction.user_id == user_id,
-                Transaction.category == transaction.category,
-                Transaction.type == transaction.type,
-                Transaction.is_recurring == True
-            ).order_by(Transaction.date.desc()).first()
+        Args:
+            as_of: Değerlendirme tarihi (varsayılan: bugün)
             
-            if last_transaction:
-                # Transaction.date'i date objesine çevir
-                last_date = last_transaction.date.date() if isinstance(last_transaction.date, datetime) else last_transaction.date
-                days_since_last = (current_date - last_date).days
-                
-                # Tekrar sıklığına göre kontrol et
-                if transaction.recurring_type == "daily" and days_since_last >= 1:
-                    reminders.append({
-                        "type": "recurring_reminder",
-                        "category": transaction.category,
-                        "amount": transaction.amount,
-                        "frequency": "günlük",
-                        "last_date": last_date
-                    })
-                elif transaction.recurring_type == "weekly" and days_since_last >= 7:
-                    reminders.append({
-                        "type": "recurring_reminder",
-                        "category": transaction.category,
-                        "amount": transaction.amount,
-                        "frequency": "haftalık",
-                        "last_date": last_date
-                    })
-                elif transaction.recurring_type == "monthly" and days_since_last >= 30:
-                    reminders.append({
-                        "type": "recurring_reminder",
-                        "category": transaction.category,
-                        "amount": transaction.amount,
-                        "frequency": "aylık",
-                        "last_date": last_date
-                    })
-                elif transaction.recurring_type == "yearly" and days_since_last >= 365:
-                    reminders.append({
-                        "type": "recurring_reminder",
-                        "category": transaction.category,
-                        "amount": transaction.amount,
-                        "frequency": "yıllık",
-                        "last_date": last_date
-                    })
-        
+        Returns:
+            {kullanıcı ID: hatırlatmalar}; hatırlatması olmayan kullanıcılar dahil edilmez
+        """
+        reminders = {}
+        for reminder in RecurringService(self.db).reminders(as_of=as_of):
+            reminders.setdefault(reminder["user_id"], []).append(reminder)
         return reminders
 
     def get_all_notifications(self, user_id: int, 
@@ -377,17 +307,19 @@ class NotificationService:
                     if preferences.get_channel_preference(notification_type.name.lower(), NotificationChannel.EMAIL.value):
                         channels.append(NotificationChannel.EMAIL)
                 
+                # Uygulama içi bildirimler veritabanına kaydedilir; e-posta
+                # commit'ten sonra kuyruğa eklenir, veritabanı işlemi SMTP'yi beklemez
+                session.commit()
+                logger.info(f"Bildirim oluşturuldu: ID={notification.id}, User={user_id}, Type={notification_type}")
+                
                 # Bildirimi kanallara gönder
                 for channel in channels:
                     try:
                         if channel == NotificationChannel.EMAIL:
                             self._send_email_notification(user, notification)
-                        # Uygulama içi bildirimler otomatik olarak veritabanına kaydedildi
                     except Exception as e:
                         logger.error(f"Bildirim gönderme hatası ({channel}): {str(e)}")
                 
-                session.commit()
-                logger.info(f"Bildirim oluşturuldu: ID={notification.id}, User={user_id}, Type={notification_type}")
                 return notification
                 
         except Exception as e:
@@ -537,28 +469,18 @@ class NotificationService:
             </html>
             """
             
-            # E-posta oluştur
-            msg = MIMEMultipart()
-            msg['From'] = self.email_config["sender_email"]
-            msg['To'] = user.email
-            msg['Subject'] = subject
-            
-            # HTML içerik ekle
-            msg.attach(MIMEText(html_content, 'html'))
-            
-            # SMTP sunucuya bağlan
-            server = smtplib.SMTP(self.email_config["smtp_server"], self.email_config["smtp_port"])
-            server.starttls()
-            
-            # Şifre varsa giriş yap
-            if self.email_config["sender_password"]:
-                server.login(self.email_config["sender_email"], self.email_config["sender_password"])
-            
-            # E-postayı gönder
-            server.send_message(msg)
-            server.quit()
-            
-            logger.info(f"E-posta gönderildi: user_id={user.id}, email={user.email}, notification_id={notification.id}")
+            # E-postayı paylaşılan bağlantı havuzunun kuyruğuna ekle (gönderim arka planda yapılır)
+            pool = get_smtp_pool(
+                self.email_config["smtp_server"],
+                self.email_config["smtp_port"],
+                self.email_config["sender_email"],
+                self.email_config["sender_password"]
+            )
+            get_mail_queue(pool).enqueue(
+                build_message(self.email_config["sender_email"], user.email, subject, html_content, is_html=True)
+            )
+            
+            logger.info(f"E-posta kuyruğa eklendi: user_id={user.id}, email={user.email}, notification_id={notification.id}")
             return True
             
         except Exception as e:
@@ -0,0 +1,72 @@
+import hashlib
+import json
+from typing import Dict, Iterable, Optional
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from models.database import OCRCacheEntry, Receipt
+
+def image_hash(image_data: bytes) -> str:
+    """Görüntü baytlarının SHA-256 özetini döndürür."""
+    return hashlib.sha256(image_data).hexdigest()
+
+def settings_fingerprint(settings: Dict) -> str:
+    """Ayarların sıralı JSON gösterimini döndürür."""
+    return json.dumps(settings, sort_keys=True, ensure_ascii=False)
+
+def ocr_cache_key(image_digest: str, settings: Dict) -> str:
+    """Görüntü özeti ve ön işleme/OCR ayarlarından önbellek anahtarı üretir."""
+    return hashlib.sha256(f"{image_digest}:{settings_fingerprint(settings)}".encode("utf-8")).hexdigest()
+
+class OCRResultCache:
+    """
+    OCR metnini görüntü içeriği ve ayarlara göre veritabanında saklayan önbellek.
+
+    Aynı makbuzun tekrar yüklenmesinde veya yalnızca alan çıkarımı
+    değiştiğinde Tesseract tekrar çalıştırılmaz; metin önbellekten okunur.
+    """
+
+    def __init__(self, db: Session, settings: Dict):
+        self.db = db
+        self.settings = dict(settings)
+
+    def key_for(self, image_digest: str) -> str:
+        return ocr_cache_key(image_digest, self.settings)
+
+    def get(self, image_digest: str) -> Optional[str]:
+        """Görüntü için önbellekteki OCR metnini döndürür."""
+        entry = self.db.query(OCRCacheEntry.text).filter(OCRCacheEntry.cache_key == self.key_for(image_digest)).first()
+        return entry[0] if entry else None
+
+    def get_many(self, image_digests: Iterable[str]) -> Dict[str, str]:
+        """Birden çok görüntü için önbellekteki metinleri tek sorguda döndürür (özet -> metin)."""
+        keys = {self.key_for(digest): digest for digest in set(image_digests)}
+        if not keys:
+            return {}
+        rows = self.db.query(OCRCacheEntry.cache_key, OCRCacheEntry.text).filter(
+            OCRCacheEntry.cache_key.in_(list(keys))
+        ).all()
+        return {keys[cache_key]: text for cache_key, text in rows}
+
+    def set(self, image_digest: str, text: str) -> None:
+        """
+        OCR metnini önbelleğe yazar; aynı anahtar zaten varsa dokunulmaz.
+
+        Yazma çağıranın işlemi içinde (savepoint ile) yapılır ve çağıranın
+        commit'iyle kalıcı olur; oturum burada commit veya rollback edilmez.
+        """
+        statement = sqlite_insert(OCRCacheEntry.__table__).values(
+            cache_key=self.key_for(image_digest),
+            image_hash=image_digest,
+            settings=settings_fingerprint(self.settings),
+            text=text
+        ).on_conflict_do_nothing(index_elements=["cache_key"])
+        # Eşzamanlı bir istek aynı görüntüyü önce kaydetmişse satır atlanır
+        with self.db.begin_nested():
+            self.db.execute(statement)
+
+def find_duplicate_receipt(db: Session, user_id: int, image_digest: str) -> Optional[Receipt]:
+    """Kullanıcının aynı görüntüyle daha önce kaydettiği makbuzu döndürür."""
+    return db.query(Receipt).filter(
+        Receipt.user_id == user_id,
+        Receipt.image_hash == image_digest
+    ).order_by(Receipt.id).first()
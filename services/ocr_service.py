@@ -1,24 +1,60 @@
+import io
 import os
-import re
+import time
 import cv2
 import numpy as np
 import pytesseract
 from PIL import Image
 from datetime import datetime
+from functools import partial
 from sqlalchemy.orm import Session
 from models.database import Transaction, Receipt
-from typing import Dict, List, Optional, Tuple, Union
+from services.categorizer import get_categorizer
+from services.category_model import category_models
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from services.receipt_batch import iter_receipt_images, process_in_parallel
+from services.receipt_extractor import extract_fields, extract_merchant, reextract_receipts
+from services.ocr_cache import OCRResultCache, find_duplicate_receipt, image_hash
+from utils.blob_store import BlobStore, make_thumbnail, receipt_store
+from services.receipt_preprocessing import ReceiptPreprocessor, legacy_preprocess
+from services.budget_alerts import watch_budget_alerts
+
+# Ön işleme adımları değiştiğinde artırılmalıdır (önbellekteki eski OCR metinleri kullanılmaz)
+PREPROCESS_VERSIONS = {
+    "legacy": "gray-gauss5-otsu/1",
+    "adaptive": "adaptive/1"
+}
+
+def _process_receipt_bytes(tesseract_cmd: str, preprocessing: str, image_data: bytes) -> Dict:
+    """İşçi süreçte tek bir makbuz görüntüsünü işler (veritabanı kullanmaz)."""
+    return OCRService(db=None, tesseract_path=tesseract_cmd, preprocessing=preprocessing).process_receipt_image(image_data)
 
 class OCRService:
-    def __init__(self, db: Session, tesseract_path: Optional[str] = None):
+    def __init__(
+        self,
+        db: Session,
+        tesseract_path: Optional[str] = None,
+        store: Optional[BlobStore] = None,
+        preprocessing: str = "legacy"
+    ):
         """
         OCR servisini başlatır.
         
         Args:
             db: Veritabanı oturumu
             tesseract_path: Tesseract OCR binary'sinin yolu (Windows için gerekli)
+            store: Makbuz görüntü deposu (varsayılan: paylaşılan depo)
+            preprocessing: "legacy" (varsayılan) veya "adaptive" (kırpma, DPI normalleştirme,
+                kaliteye göre adımlar; doğruluğu benchmarks/bench_preprocessing.py ile
+                örnek makbuzlarda ölçülmeden varsayılan yapılmamalıdır)
         """
+        if preprocessing not in PREPROCESS_VERSIONS:
+            raise ValueError(f"Geçersiz ön işleme modu: {preprocessing}")
+        
         self.db = db
+        self.store = store or receipt_store
+        self.preprocessing = preprocessing
+        self.preprocessor = ReceiptPreprocessor() if preprocessing == "adaptive" else None
         
         # Tesseract yolunu belirle
         if tesseract_path:
@@ -26,58 +62,172 @@ class OCRService:
         elif os.environ.get("TESSERACT_PATH"):
             pytesseract.pytesseract.tesseract_cmd = os.environ.get("TESSERACT_PATH")
         
-        # Kategori kelimeleri - gelişmiş karşılık tablosu
-        self.category_keywords = {
-            "Gıda": ["market", "migros", "a101", "şok", "carrefour", "bim", "makarna", "pirinç", "ekmek", 
-                     "sebze", "meyve", "süt", "yoğurt", "peynir", "et", "tavuk", "balık", "bakkal", "manav"],
-            "Sağlık": ["eczane", "hastane", "ilaç", "muayene", "doktor", "vitamin", "bandaj", "sağlık"],
-            "Ulaşım": ["akaryakıt", "benzin", "dizel", "lpg", "otobüs", "metro", "taksi", "bilet", "opet", 
-                       "shell", "bp", "petrol", "otopark", "ulaşım", "yol", "tren", "uçak"],
-            "Eğlence": ["sinema", "tiyatro", "konser", "festival", "müze", "park", "eğlence", "oyun"],
-            "Giyim": ["mağaza", "lcw", "defacto", "h&m", "zara", "giyim", "ayakkabı", "çanta", "takı", "aksesuar"],
-            "Elektronik": ["teknoloji", "telefon", "bilgisayar", "tablet", "kulaklık", "şarj", "vatan", 
-                          "mediamarkt", "teknosa", "elektronik"],
-            "Kira": ["kira", "konut", "emlak", "apartman"],
-            "Fatura": ["elektrik", "su", "doğalgaz", "internet", "telefon", "fatura", "ödeme"]
-        }
+        # Ön işleme ve OCR ayarları; OCR metin önbelleğinin anahtarına dahildir
+        preprocess_version = PREPROCESS_VERSIONS[preprocessing]
+        if self.preprocessor is not None:
+            preprocess_version += f":{self.preprocessor.target_dpi}dpi"
+        self.ocr_settings = {"lang": "tur", "config": "", "preprocess": preprocess_version}
+        self.ocr_cache = OCRResultCache(db, self.ocr_settings) if db is not None else None
     
-    def process_receipt_image(self, image_data: Union[str, bytes, np.ndarray]) -> Dict:
+    def process_receipt_image(self, image_data: Union[str, bytes, np.ndarray], use_cache: bool = True) -> Dict:
         """
         Makbuz görüntüsünü işler ve bilgileri çıkarır.
         
+        Aynı görüntü aynı ayarlarla daha önce okunduysa OCR metni önbellekten
+        alınır; yalnızca alan çıkarımı yeniden yapılır.
+        
         Args:
             image_data: Görüntü verisi (dosya yolu, bytes veya numpy array)
+            use_cache: OCR metin önbelleği kullanılsın mı
+            
+        Returns:
+            Çıkarılan bilgileri, görüntü özetini, aşama sürelerini (saniye) ve
+            ön işleme raporunu ("preprocessing") içeren sözlük
+        """
+        timings = {}
+        
+        # Dosya yolunda baytlar okunur; önbellek anahtarı ham baytlardan hesaplanır
+        if isinstance(image_data, str):
+            with open(image_data, "rb") as f:
+                image_data = f.read()
+        digest = image_hash(image_data) if isinstance(image_data, bytes) else None
+        cache = self.ocr_cache if use_cache and digest else None
+        
+        text = None
+        if cache is not None:
+            start = time.perf_counter()
+            text = cache.get(digest)
+            timings["cache"] = time.perf_counter() - start
+        cached = text is not None
+        preprocessing_report = None
+        
+        if not cached:
+            # Görüntüyü yükle
+            start = time.perf_counter()
+            if isinstance(image_data, bytes):
+                nparr = np.frombuffer(image_data, np.uint8)
+                image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            else:  # Numpy array
+                image = image_data
+            if image is None:
+                raise ValueError("Görüntü okunamadı")
+            timings["decode"] = time.perf_counter() - start
+            
+            # Görüntü ön işleme
+            start = time.perf_counter()
+            processed_image, preprocessing_report = self._preprocess_image(image)
+            timings["preprocess"] = time.perf_counter() - start
+            
+            # OCR ile metni çıkar
+            start = time.perf_counter()
+            text = pytesseract.image_to_string(
+                processed_image, lang=self.ocr_settings["lang"], config=self.ocr_settings["config"]
+            )
+            timings["ocr"] = time.perf_counter() - start
+            
+            if cache is not None:
+                cache.set(digest, text)
+        
+        result = self._build_result(text, digest, cached, timings)
+        result["preprocessing"] = preprocessing_report
+        return result
+    
+    def extract_receipt_info(self, text: str) -> Dict:
+        """
+        OCR metninden tutar, tarih ve kategoriyi çıkarır (OCR yapılmaz).
+        
+        Tutar ve tarih tek geçişte taranan adaylardan seçilir
+        (services.receipt_extractor).
+        
+        Args:
+            text: OCR ile çıkarılan metin
+            
+        Returns:
+            {"amount", "date", "merchant", "category", "confidence": {"amount", "date"}}
+        """
+        fields = extract_fields(text)
+        return {
+            "amount": fields["amount"],
+            "date": fields["date"],
+            "merchant": extract_merchant(text),
+            "category": self._extract_category(text),
+            "confidence": fields["confidence"]
+        }
+    
+    def reextract_receipts(self, user_id: Optional[int] = None, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Kayıtlı makbuzların tutar ve tarihini saklanan OCR metninden yeniden çıkarır.
+        
+        Args:
+            user_id: Yalnızca bu kullanıcının makbuzları (varsayılan: tümü)
+            batch_size: Partideki makbuz sayısı
             
         Returns:
-            Çıkarılan bilgileri içeren sözlük
+            {"scanned", "updated"}
         """
-        # Görüntüyü yükle
-        if isinstance(image_data, str):  # Dosya yolu
-            image = cv2.imread(image_data)
-        elif isinstance(image_data, bytes):  # Bytes
-            nparr = np.frombuffer(image_data, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        else:  # Numpy array
-            image = image_data
-        
-        # Görüntü ön işleme
-        processed_image = self._preprocess_image(image)
-        
-        # OCR ile metni çıkar
-        text = pytesseract.image_to_string(processed_image, lang='tur')
-        
-        # Bilgileri çıkar
-        amount = self._extract_amount(text)
-        date = self._extract_date(text)
-        category = self._extract_category(text)
+        return reextract_receipts(self.db, user_id=user_id, batch_size=batch_size)
+    
+    def _build_result(self, text: str, digest: Optional[str], cached: bool, timings: Dict) -> Dict:
+        """OCR metninden alanları çıkarıp işleme sonucunu oluşturur."""
+        start = time.perf_counter()
+        info = self.extract_receipt_info(text)
+        timings["extract"] = time.perf_counter() - start
         
         return {
             "text": text,
-            "amount": amount,
-            "date": date,
-            "category": category
+            **info,
+            "image_hash": digest,
+            "cached": cached,
+            "timings": timings
         }
     
+    def _cached_result(self, image_data: bytes) -> Optional[Dict]:
+        """Görüntünün OCR metni önbellekteyse işleme sonucunu döndürür."""
+        if self.ocr_cache is None:
+            return None
+        
+        start = time.perf_counter()
+        digest = image_hash(image_data)
+        text = self.ocr_cache.get(digest)
+        if text is None:
+            return None
+        return self._build_result(text, digest, True, {"cache": time.perf_counter() - start})
+    
+    def process_receipt_batch(
+        self,
+        sources: Iterable[Union[str, bytes, Tuple[str, bytes]]],
+        max_workers: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Çok sayıda makbuzu (dosya yolları, baytlar veya zip arşivleri) paralel işler.
+        
+        Çözme, ön işleme ve OCR çekirdek sayısı kadar süreçte yapılır; sonuçlar
+        her makbuz bittikçe döndürülür. OCR metni önbellekte olan makbuzlar
+        havuza gönderilmeden hemen döner. Okunamayan makbuzlar tüm toplu
+        işlemi durdurmaz, ``error`` alanıyla döner.
+        
+        Args:
+            sources: Makbuz kaynakları
+            max_workers: Süreç sayısı (varsayılan: çekirdek sayısı)
+            
+        Yields:
+            {"index", "name", "result", "error", "elapsed", "queued", "completed_at"};
+            ``result`` process_receipt_image çıktısıdır (aşama süreleri dahil)
+        """
+        worker = partial(_process_receipt_bytes, pytesseract.pytesseract.tesseract_cmd, self.preprocessing)
+        for item in process_in_parallel(
+            iter_receipt_images(sources), worker, max_workers=max_workers, precheck=self._cached_result
+        ):
+            result = item["result"]
+            # İşçi süreçler veritabanına erişmez; yeni OCR metinleri burada önbelleğe yazılır
+            if result and not result["cached"] and self.ocr_cache is not None:
+                self.ocr_cache.set(result["image_hash"], result["text"])
+            yield item
+    
+    def find_duplicate_receipt(self, user_id: int, image_data: bytes) -> Optional[Receipt]:
+        """Kullanıcının aynı görüntüyle daha önce kaydettiği makbuzu döndürür."""
+        return find_duplicate_receipt(self.db, user_id, image_hash(image_data))
+    
     def save_receipt(self, user_id: int, image_data: bytes, receipt_info: Dict) -> Receipt:
         """
         Makbuz bilgilerini veritabanına kaydeder.
@@ -88,16 +238,34 @@ class OCRService:
             receipt_info: Makbuz bilgileri
             
         Returns:
-            Kaydedilen makbuz nesnesi
+            Kaydedilen makbuz nesnesi; aynı görüntü daha önce kaydedildiyse
+            yeni makbuz ve işlem oluşturulmaz, mevcut makbuz döndürülür
         """
+        digest = image_hash(image_data)
+        duplicate = find_duplicate_receipt(self.db, user_id, digest)
+        if duplicate:
+            return duplicate
+        
+        # Anahtar kelimelerle bulunamayan kategoriyi kullanıcının öğrenilmiş modeliyle işyeri
+        # adından tahmin et; model işlem açıklamalarıyla eğitildiğinden fişin tamamı verilmez
+        merchant = receipt_info.get("merchant") or ""
+        category = category_models.refine(user_id, [merchant], [receipt_info["category"]])[0]
+        
+        # Görüntü ve küçük resmi dosya deposuna yaz; satırda yalnızca adresleri tutulur
+        _, image_size = self.store.put(image_data)
+        thumbnail = make_thumbnail(image_data)
+        thumbnail_hash = self.store.put(thumbnail)[0] if thumbnail else None
+        
         # Makbuzu kaydet
         receipt = Receipt(
             user_id=user_id,
-            image=image_data,
             ocr_text=receipt_info["text"],
             amount=receipt_info["amount"],
             date=receipt_info["date"],
-            category=receipt_info["category"]
+            category=category,
+            image_hash=digest,
+            image_size=image_size,
+            thumbnail_hash=thumbnail_hash
         )
         
         self.db.add(receipt)
@@ -109,16 +277,41 @@ class OCRService:
             user_id=user_id,
             amount=receipt_info["amount"],
             type="expense",
-            category=receipt_info["category"],
+            category=category,
             description=f"OCR ile eklendi - Makbuz #{receipt.id}",
             date=receipt_info["date"] or datetime.now().date()
         )
         
         self.db.add(transaction)
+        watch_budget_alerts(self.db)
         self.db.commit()
         
         return receipt
     
+    def open_receipt_image(self, receipt: Receipt) -> BinaryIO:
+        """
+        Makbuz görüntüsünü akış olarak açar.
+        
+        Henüz depoya taşınmamış eski makbuzlarda görüntü satırdan okunur.
+        
+        Args:
+            receipt: Makbuz
+            
+        Returns:
+            Okunabilir dosya nesnesi
+        """
+        if receipt.image_hash and self.store.exists(receipt.image_hash):
+            return self.store.open(receipt.image_hash)
+        if receipt.image is not None:
+            return io.BytesIO(receipt.image)
+        raise ValueError("Makbuz görüntüsü bulunamadı")
+    
+    def get_receipt_thumbnail(self, receipt: Receipt) -> Optional[bytes]:
+        """Makbuzun küçük resmini döndürür (yoksa None)."""
+        if receipt.thumbnail_hash and self.store.exists(receipt.thumbnail_hash):
+            return self.store.read(receipt.thumbnail_hash)
+        return None
+    
     def get_user_receipts(self, user_id: int, page: int = 1, per_page: int = 10) -> Dict:
         """
         Kullanıcıya ait makbuzları getirir.
@@ -154,7 +347,7 @@ class OCRService:
             "total_pages": total_pages
         }
     
-    def _preprocess_image(self, image: np.ndarray) -> Image.Image:
+    def _preprocess_image(self, image: np.ndarray) -> Tuple[Image.Image, Optional[Dict]]:
         """
         OCR için görüntüye ön işleme uygular.
         
@@ -162,21 +355,12 @@ class OCRService:
             image: İşlenecek görüntü
             
         Returns:
-            İşlenmiş görüntü
+            (işlenmiş görüntü, ön işleme raporu: aşama süreleri, seçilen adımlar,
+            kalite ölçüleri; eski yöntemde None)
         """
-        # Gri tonlamaya dönüştür
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Gürültü azaltma
-        denoised = cv2.GaussianBlur(gray, (5, 5), 0)
-        
-        # Binarizasyon
-        _, binary = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # PIL formatına dönüştür
-        pil_image = Image.fromarray(binary)
-        
-        return pil_image
+        if self.preprocessor is None:
+            return legacy_preprocess(image), None
+        return self.preprocessor(image)
     
     def _extract_amount(self, text: str) -> Optional[float]:
         """
@@ -188,25 +372,7 @@ class OCRService:
         Returns:
             Tutar (varsa)
         """
-        # Farklı tutar formatları için regex
-        patterns = [
-            r'(?:TOPLAM|TUTAR|FİYAT|Toplam|Tutar)\s*:?\s*(?:TL)?[₺₤]?\s*([0-9]+[.,][0-9]+)',  # TOPLAM: 123,45
-            r'(?:TOPLAM|TUTAR|FİYAT|Toplam|Tutar)\s*:?\s*(?:TL)?[₺₤]?\s*([0-9]+)',  # TOPLAM: 123
-            r'([0-9]+[.,][0-9]+)\s*(?:TL|₺|₤)',  # 123,45 TL
-            r'(?:TL|₺|₤)\s*([0-9]+[.,][0-9]+)',  # TL 123,45
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                # İlk bulunan tutarı al
-                amount_str = matches[0].replace(',', '.') if ',' in matches[0] else matches[0]
-                try:
-                    return float(amount_str)
-                except ValueError:
-                    continue
-        
-        return None
+        return extract_fields(text)["amount"]
     
     def _extract_date(self, text: str) -> Optional[datetime.date]:
         """
@@ -218,29 +384,7 @@ class OCRService:
         Returns:
             Tarih (varsa)
         """
-        # Farklı tarih formatları için regex
-        patterns = [
-            r'(\d{2})[./](\d{2})[./](\d{4})',  # 31/12/2023 veya 31.12.2023
-            r'(\d{2})-(\d{2})-(\d{4})',  # 31-12-2023
-            r'(\d{4})[./](\d{2})[./](\d{2})'  # 2023/12/31 veya 2023.12.31
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                # İlk bulunan tarihi al
-                date_parts = matches[0]
-                try:
-                    if len(date_parts[0]) == 4:  # yyyy/mm/dd
-                        year, month, day = date_parts
-                    else:  # dd/mm/yyyy
-                        day, month, year = date_parts
-                    
-                    return datetime(int(year), int(month), int(day)).date()
-                except (ValueError, IndexError):
-                    continue
-        
-        return None
+        return extract_fields(text)["date"]
     
     def _extract_category(self, text: str) -> str:
         """
@@ -252,22 +396,5 @@ class OCRService:
         Returns:
             Kategori
         """
-        text_lower = text.lower()
-        
-        # Kategori eşleşme sayıları
-        category_matches = {category: 0 for category in self.category_keywords}
-        
-        # Her kategori için anahtar kelimeleri ara
-        for category, keywords in self.category_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    category_matches[category] += 1
-        
-        # En çok eşleşen kategoriyi bul
-        best_category = max(category_matches.items(), key=lambda x: x[1])
-        
-        # Eşleşme yoksa "Diğer" döndür
-        if best_category[1] == 0:
-            return "Diğer"
-        
-        return best_category[0] 
\ No newline at end of file
+        # Banka içe aktarımıyla ortak, derlenmiş kategorileme motoru
+        return get_categorizer().categorize(text) 
\ No newline at end of file
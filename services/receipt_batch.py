@@ -0,0 +1,126 @@
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+# Toplu yüklemede (zip) kabul edilen görüntü uzantıları
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+ReceiptSource = Union[str, bytes, Tuple[str, bytes]]
+
+def iter_receipt_images(sources: Iterable[ReceiptSource]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Makbuz kaynaklarını (ad, görüntü baytları) ikililerine açar.
+
+    Kaynak bir dosya yolu, ham bayt, (ad, bayt) ikilisi ya da bunlardan
+    herhangi biri olarak verilmiş bir zip arşivi olabilir; zip içindeki
+    görüntü dosyaları sırayla döndürülür.
+
+    Args:
+        sources: Makbuz kaynakları
+
+    Yields:
+        (ad, görüntü baytları)
+    """
+    for position, source in enumerate(sources):
+        if isinstance(source, tuple):
+            name, data = source
+        elif isinstance(source, str):
+            name = source
+            with open(source, "rb") as f:
+                data = f.read()
+        elif isinstance(source, (bytes, bytearray)):
+            name, data = f"receipt_{position}", bytes(source)
+        else:
+            raise ValueError(f"Desteklenmeyen makbuz kaynağı: {type(source).__name__}")
+
+        if zipfile.is_zipfile(io.BytesIO(data)):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in archive.infolist():
+                    if not member.is_dir() and member.filename.lower().endswith(IMAGE_EXTENSIONS):
+                        yield member.filename, archive.read(member)
+        else:
+            yield name, data
+
+def _limit_native_threads() -> None:
+    """İşçi süreçlerde Tesseract/OpenMP iş parçacıklarını bire indirir (çekirdek başına tek süreç)."""
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+def _run_job(worker: Callable[[bytes], Dict], data: bytes) -> Dict:
+    """Tek bir makbuzu işçi süreçte işler; hatalar sonuç olarak döndürülür."""
+    start = time.perf_counter()
+    try:
+        result = worker(data)
+        error = None
+    except Exception as e:
+        result, error = None, f"{type(e).__name__}: {e}"
+    return {"result": result, "error": error, "elapsed": time.perf_counter() - start}
+
+def process_in_parallel(
+    images: Iterable[Tuple[str, bytes]],
+    worker: Callable[[bytes], Dict],
+    max_workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    precheck: Optional[Callable[[bytes], Optional[Dict]]] = None
+) -> Iterator[Dict]:
+    """
+    Görüntüleri süreç havuzunda işler ve her biri bittikçe sonucunu döndürür.
+
+    Aynı anda en fazla ``max_pending`` görüntü havuza gönderilir; böylece
+    büyük yüklemelerde tüm görüntüler belleğe alınmaz. Sonuçlar bitiş
+    sırasıyla gelir; giriş sırası ``index`` alanındadır.
+
+    Args:
+        images: (ad, görüntü baytları) ikilileri
+        worker: Görüntü baytlarını işleyen, modül düzeyinde (pickle edilebilir) fonksiyon
+        max_workers: Süreç sayısı (varsayılan: çekirdek sayısı)
+        max_pending: Havuzda bekleyebilecek en fazla görüntü (varsayılan: 2 * süreç sayısı)
+        precheck: Ana süreçte çağrılır; sonuç döndürürse görüntü havuza gönderilmez (ör. önbellek)
+
+    Yields:
+        {"index", "name", "result", "error", "elapsed", "queued"}
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * max_workers
+    batch_start = time.perf_counter()
+    pending = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_limit_native_threads) as executor:
+        def drain(return_when):
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                index, name, submitted = pending.pop(future)
+                outcome = future.result()
+                yield {
+                    "index": index,
+                    "name": name,
+                    **outcome,
+                    # Gönderimden sonuca kadar geçen süre (kuyrukta bekleme dahil)
+                    "queued": time.perf_counter() - submitted - outcome["elapsed"],
+                    "completed_at": time.perf_counter() - batch_start
+                }
+
+        for index, (name, data) in enumerate(images):
+            if precheck is not None:
+                start = time.perf_counter()
+                result = precheck(data)
+                if result is not None:
+                    yield {
+                        "index": index,
+                        "name": name,
+                        "result": result,
+                        "error": None,
+                        "elapsed": time.perf_counter() - start,
+                        "queued": 0.0,
+                        "completed_at": time.perf_counter() - batch_start
+                    }
+                    continue
+
+            if len(pending) >= max_pending:
+                yield from drain(FIRST_COMPLETED)
+            pending[executor.submit(_run_job, worker, data)] = (index, name, time.perf_counter())
+
+        while pending:
+            yield from drain(FIRST_COMPLETED)
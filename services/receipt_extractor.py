@@ -0,0 +1,297 @@
+import re
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from models.database import Receipt
+from services.categorizer import normalize_text
+
+# Tutar etiketlerinin güven puanları (etiketler normalize_text ile ASCII'ye çevrilmiş hâlleriyle).
+# Ödeme satırları (nakit/kart) genellikle toplama eşittir; KDV ve para üstü toplam değildir.
+AMOUNT_LABELS: Dict[str, float] = {
+    "genel toplam": 0.95,
+    "toplam": 0.9,
+    "tutar": 0.8,
+    "nakit": 0.7,
+    "kredi karti": 0.7,
+    "fiyat": 0.5,
+    "ara toplam": 0.4,
+    "topkdv": 0.1,
+    "kdv": 0.1,
+    "para ustu": 0.05
+}
+DATE_LABELS = ("tarih",)
+
+# Etiketsiz tutarların güven puanları
+CURRENCY_AMOUNT_CONFIDENCE = 0.5
+CURRENCY_INTEGER_CONFIDENCE = 0.3
+PLAIN_AMOUNT_CONFIDENCE = 0.2
+# Etiketli satırdaki tam sayılar (adet, ürün sayısı olabilir) etiket puanının bu oranını alır
+LABELED_INTEGER_FACTOR = 0.5
+
+LABELED_DATE_CONFIDENCE = 0.9
+PLAIN_DATE_CONFIDENCE = 0.6
+
+# İşyeri adı fişin başındaki bu kadar satırda aranır
+MERCHANT_SEARCH_LINES = 5
+
+# OCR çıktısında Türkçe harfler ASCII olarak da okunabilir ("TOPLAM", "KREDI KARTI")
+_LETTER_VARIANTS = {"i": "[iıİI]", "u": "[uüUÜ]", "o": "[oöOÖ]", "s": "[sşSŞ]", "c": "[cçCÇ]", "g": "[gğGĞ]"}
+
+def _label_pattern(label: str) -> str:
+    return "".join(r"\s*" if char == " " else _LETTER_VARIANTS.get(char, re.escape(char)) for char in label)
+
+# Uzun etiketler önce denenir ("ARA TOPLAM" içindeki "TOPLAM", "TOPKDV" içindeki "KDV" ayrı eşleşmez)
+_LABELS = sorted(list(AMOUNT_LABELS) + list(DATE_LABELS), key=len, reverse=True)
+# OCR boşlukları atlayabilir ("ARATOPLAM"); etiketler boşluksuz hâlleriyle eşlenir
+_LABEL_KEYS = {label.replace(" ", ""): label for label in _LABELS}
+
+# Tüm alanlar için tek desen; metin finditer ile bir kez taranır. Satır sonları belirteç
+# olarak eşlenmez (eşleşme başına maliyet); satır numarası str.count ile bulunur.
+_TOKEN_PATTERN = re.compile(
+    # Ön eleme: belirteçler yalnızca bu karakterlerle başlar; diğer konumlarda alternatifler denenmez
+    r"(?=[\d%₺₤" + "".join(sorted({label[0] + label[0].upper() for label in _LABELS})) + "Tt])(?:"
+    r"(?P<label>(?<!\w)(?:" + "|".join(_label_pattern(label) for label in _LABELS) + r"))"
+    # 31.12.2023, 31/12/2023, 31-12-2023
+    r"|(?P<dmy>(?P<d1>\d{2})[./-](?P<m1>\d{2})[./-](?P<y1>\d{4})(?!\d))"
+    # 2023.12.31, 2023/12/31
+    r"|(?P<ymd>(?P<y2>\d{4})[./](?P<m2>\d{2})[./](?P<d2>\d{2})(?!\d))"
+    # % ile başlayan oranlar (KDV %8) tutar değildir
+    r"|(?P<percent>%\s*\d+)"
+    # 1.234,56 / 1,234.56 / 1234,56 / 1234
+    r"|(?P<amount>(?P<whole>\d{1,3}(?:[.,]\d{3})+|\d+)(?:[.,](?P<fraction>\d{1,2}))?(?!\d|[.,]\d))"
+    r"|(?P<currency>(?<!\w)TL(?!\w)|[₺₤]))",
+    re.IGNORECASE
+)
+
+def parse_amount(token: str) -> float:
+    """
+    Binlik ve ondalık ayırıcılı tutarı sayıya çevirir.
+
+    Son ayırıcıdan sonra 1-2 hane varsa ondalık, 3 hane varsa binlik
+    ayırıcı kabul edilir: "1.234,56" -> 1234.56, "1,234.56" -> 1234.56,
+    "1.234" -> 1234.0, "12,5" -> 12.5.
+    """
+    last = max(token.rfind("."), token.rfind(","))
+    if last == -1:
+        return float(token)
+    integer, fraction = token[:last], token[last + 1:]
+    if len(fraction) == 3:
+        integer, fraction = token, ""
+    digits = integer.replace(".", "").replace(",", "")
+    return float(f"{digits}.{fraction}" if fraction else digits)
+
+def _adjacent(text: str, previous_end: int, start: int, line_start: int) -> bool:
+    """Önceki belirteç aynı satırda ve yalnızca boşlukla ayrılmış mı."""
+    return previous_end >= line_start and (previous_end == start or text[previous_end:start].isspace())
+
+def find_candidates(text: str) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Metni tek geçişte tarayıp tüm aday tutar ve tarihleri toplar.
+
+    Tutarlar aynı satırda kendilerinden önce gelen etikete (TOPLAM, KDV...)
+    ve yanlarındaki para birimine göre puanlanır. Etiketsiz tam sayılar
+    (fiş no, saat) aday sayılmaz.
+
+    Args:
+        text: OCR ile çıkarılan metin
+
+    Returns:
+        (tutar adayları, tarih adayları); her aday
+        {"value", "position", "line", "label", "confidence"}
+    """
+    amounts: List[Dict] = []
+    dates: List[Dict] = []
+    text = text or ""
+    line = 0
+    line_start = 0
+    label = None
+    label_end = 0
+    # Para birimi sembolü tutardan önce veya sonra gelebilir; yalnızca boşlukla ayrılmışsa sayılır
+    previous_kind = None
+    previous_end = 0
+    previous_amount = None
+
+    for match in _TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        start, end = match.span()
+        newlines = text.count("\n", line_start, start)
+        if newlines:
+            line += newlines
+            line_start = text.rfind("\n", line_start, start) + 1
+        # Etiket yalnızca kendi satırındaki değerlere uygulanır
+        current_label = label if label_end >= line_start else None
+        if kind == "label":
+            label = _LABEL_KEYS.get("".join(normalize_text(match.group()).split()))
+            label_end = end
+        elif kind == "dmy" or kind == "ymd":
+            if kind == "dmy":
+                day, month, year = match.group("d1", "m1", "y1")
+            else:
+                year, month, day = match.group("y2", "m2", "d2")
+            try:
+                value = date(int(year), int(month), int(day))
+            except ValueError:
+                pass
+            else:
+                labeled = current_label in DATE_LABELS
+                dates.append({
+                    "value": value,
+                    "position": start,
+                    "line": line,
+                    "label": current_label if labeled else None,
+                    "confidence": LABELED_DATE_CONFIDENCE if labeled else PLAIN_DATE_CONFIDENCE
+                })
+        elif kind == "amount":
+            # parse_amount ile aynı kural; ayırıcılar desende ayrıştırılmıştır
+            whole, fraction = match.group("whole", "fraction")
+            is_integer = fraction is None and whole.isdigit()
+            value = whole if whole.isdigit() else whole.replace(".", "").replace(",", "")
+            candidate = {
+                "value": float(f"{value}.{fraction}" if fraction else value),
+                "position": start,
+                "line": line,
+                "label": current_label if current_label in AMOUNT_LABELS else None,
+                "confidence": 0.0,
+                "integer": is_integer
+            }
+            if candidate["label"]:
+                candidate["confidence"] = AMOUNT_LABELS[current_label] * (LABELED_INTEGER_FACTOR if is_integer else 1.0)
+            elif previous_kind == "currency" and _adjacent(text, previous_end, start, line_start):
+                candidate["confidence"] = CURRENCY_INTEGER_CONFIDENCE if is_integer else CURRENCY_AMOUNT_CONFIDENCE
+            elif not is_integer:
+                candidate["confidence"] = PLAIN_AMOUNT_CONFIDENCE
+            amounts.append(candidate)
+            previous_amount = candidate
+        elif kind == "currency":
+            if previous_kind == "amount" and previous_amount["label"] is None and _adjacent(text, previous_end, start, line_start):
+                previous_amount["confidence"] = max(
+                    previous_amount["confidence"],
+                    CURRENCY_INTEGER_CONFIDENCE if previous_amount["integer"] else CURRENCY_AMOUNT_CONFIDENCE
+                )
+        previous_kind = kind
+        previous_end = end
+
+    for candidate in amounts:
+        del candidate["integer"]
+    return [c for c in amounts if c["confidence"] > 0], dates
+
+def extract_fields(text: str) -> Dict:
+    """
+    Metinden en olası tutarı ve tarihi seçer.
+
+    Tutar en yüksek puanlı adaydır; eşitlikte metinde en son geçen seçilir
+    (toplam satırı fişin sonundadır). Tarih en yüksek puanlı adaylardan
+    metinde ilk geçenidir.
+
+    Args:
+        text: OCR ile çıkarılan metin
+
+    Returns:
+        {"amount", "date", "confidence": {"amount", "date"}}
+    """
+    amounts, dates = find_candidates(text)
+    best_amount = max(amounts, key=lambda c: (c["confidence"], c["position"]), default=None)
+    best_date = max(dates, key=lambda c: (c["confidence"], -c["position"]), default=None)
+    return {
+        "amount": best_amount["value"] if best_amount else None,
+        "date": best_date["value"] if best_date else None,
+        "confidence": {
+            "amount": best_amount["confidence"] if best_amount else 0.0,
+            "date": best_date["confidence"] if best_date else 0.0
+        }
+    }
+
+def extract_merchant(text: str) -> Optional[str]:
+    """
+    Fişin başındaki işyeri adını döndürür.
+
+    İşyeri adı fişin ilk satırlarındadır; harfleri rakamlarından fazla olan
+    (tarih, fiş no ve tutar satırı olmayan) ilk satır seçilir.
+
+    Args:
+        text: OCR ile çıkarılan metin
+
+    Returns:
+        İşyeri adı; bulunamazsa None
+    """
+    lines = [line.strip() for line in (text or "").splitlines() if line.strip()]
+    for line in lines[:MERCHANT_SEARCH_LINES]:
+        letters = sum(char.isalpha() for char in line)
+        digits = sum(char.isdigit() for char in line)
+        if letters >= 3 and letters > digits:
+            return line
+    return None
+
+def extract_many(
+    texts: Iterable[str],
+    categorize_many: Optional[Callable[[List[str]], List[str]]] = None
+) -> List[Dict]:
+    """
+    Çok sayıda OCR metninden alanları çıkarır.
+
+    Args:
+        texts: OCR metinleri
+        categorize_many: Verilirse kategoriler bu fonksiyonla toplu olarak eklenir
+            (ör. ``get_categorizer().categorize_many``)
+
+    Returns:
+        Her metin için extract_fields çıktısı (ve varsa "category")
+    """
+    texts = [text or "" for text in texts]
+    results = [extract_fields(text) for text in texts]
+    if categorize_many is not None:
+        for result, category in zip(results, categorize_many(texts)):
+            result["category"] = category
+    return results
+
+def reextract_receipts(db: Session, user_id: Optional[int] = None, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Kayıtlı makbuzların OCR metinlerinden tutar ve tarihi yeniden çıkarır.
+
+    OCR tekrar çalıştırılmaz; yalnızca ``Receipt.ocr_text`` okunur. Makbuzlar
+    id sırasıyla partiler hâlinde taranır, yalnızca değişen satırlar toplu
+    güncellenir ve her parti ayrı commit edilir. Kategori kullanıcı
+    tarafından düzeltilmiş olabileceğinden değiştirilmez; bağlı işlemlere
+    dokunulmaz. Değeri bulunamayan alanlar mevcut değerle korunur.
+
+    Args:
+        db: Veritabanı oturumu
+        user_id: Yalnızca bu kullanıcının makbuzları (varsayılan: tümü)
+        batch_size: Partideki makbuz sayısı
+
+    Returns:
+        {"scanned", "updated"}
+    """
+    if batch_size <= 0:
+        raise ValueError("Parti boyutu pozitif olmalıdır")
+
+    scanned = updated = 0
+    last_id = 0
+    while True:
+        query = db.query(Receipt.id, Receipt.ocr_text, Receipt.amount, Receipt.date).filter(
+            Receipt.id > last_id,
+            Receipt.ocr_text.isnot(None)
+        )
+        if user_id is not None:
+            query = query.filter(Receipt.user_id == user_id)
+        rows = query.order_by(Receipt.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        changes = []
+        for row, fields in zip(rows, extract_many(row.ocr_text for row in rows)):
+            amount = fields["amount"] if fields["amount"] is not None else row.amount
+            receipt_date = fields["date"] if fields["date"] is not None else row.date
+            if isinstance(receipt_date, datetime):
+                receipt_date = receipt_date.date()
+            if amount != row.amount or receipt_date != row.date:
+                changes.append({"id": row.id, "amount": amount, "date": receipt_date})
+
+        if changes:
+            db.bulk_update_mappings(Receipt, changes)
+            db.commit()
+        scanned += len(rows)
+        updated += len(changes)
+        last_id = rows[-1].id
+
+    return {"scanned": scanned, "updated": updated}
@@ -0,0 +1,218 @@
+import time
+from typing import Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from PIL import Image
+
+# Termal makbuzlar genellikle 80 mm (~3.15 inç) genişliğindedir
+RECEIPT_WIDTH_INCHES = 3.15
+TARGET_DPI = 300
+
+# Makbuz sınırı küçültülmüş kopya üzerinde aranır (uzun kenar, piksel)
+DETECTION_MAX_SIDE = 1000
+# Bulunan sınır görüntünün en az bu oranını kaplamalıdır
+MIN_RECEIPT_AREA_RATIO = 0.2
+
+# Kalite eşikleri (0-255 gri ton ölçeğinde)
+LOW_CONTRAST_STD = 40.0
+NOISE_THRESHOLD = 3.0
+UNEVEN_LIGHTING_STD = 25.0
+MIN_SKEW_DEGREES = 0.5
+MAX_SKEW_DEGREES = 15.0
+
+def legacy_preprocess(image: np.ndarray) -> Image.Image:
+    """Eski ön işleme: tam çözünürlükte gri ton -> 5x5 Gauss -> Otsu."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    denoised = cv2.GaussianBlur(gray, (5, 5), 0)
+    _, binary = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return Image.fromarray(binary)
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+def measure_quality(gray: np.ndarray) -> Dict[str, float]:
+    """
+    Gri tonlu görüntünün kalite ölçülerini hesaplar.
+
+    Returns:
+        contrast: parlaklık standart sapması
+        noise: medyan filtreye göre ortalama mutlak fark (tuz-biber/sensör gürültüsü)
+        lighting: 8x8 bloklara göre ortalama parlaklığın standart sapması (dengesiz ışık)
+        skew: yazı satırlarının tahmini eğimi (derece)
+    """
+    height, width = gray.shape
+    # Ölçümler küçük kopyada yapılır; gürültü küçültmeyle yumuşayacağından
+    # tam çözünürlükteki orta bölgeden ölçülür
+    scale = min(1.0, DETECTION_MAX_SIDE / max(height, width))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    top, left = max(0, height // 2 - 256), max(0, width // 2 - 256)
+    center = np.ascontiguousarray(gray[top:top + 512, left:left + 512])
+
+    contrast = float(small.std())
+    noise = float(cv2.absdiff(center, cv2.medianBlur(center, 3)).mean())
+    blocks = cv2.resize(small, (8, 8), interpolation=cv2.INTER_AREA)
+    lighting = float(blocks.std()) if height >= 8 and width >= 8 else 0.0
+
+    return {"contrast": contrast, "noise": noise, "lighting": lighting, "skew": estimate_skew(small)}
+
+def estimate_skew(gray: np.ndarray) -> float:
+    """Koyu (yazı) piksellerin en küçük çevreleyen dikdörtgeninden eğim açısını tahmin eder."""
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    # Harfleri satırlar halinde birleştir; tek tek harfler yerine satır eğimi ölçülür
+    lines = cv2.dilate(ink, cv2.getStructuringElement(cv2.MORPH_RECT, (25, 3)))
+    points = cv2.findNonZero(lines)
+    if points is None or len(points) < 50:
+        return 0.0
+
+    (_, _), (w, h), angle = cv2.minAreaRect(points)
+    # OpenCV açıyı (0, 90] aralığında verir; yatay eksene göre en küçük açıya çevir
+    if w < h:
+        angle -= 90
+    if angle > 45:
+        angle -= 90
+    elif angle < -45:
+        angle += 90
+    return float(angle) if abs(angle) <= MAX_SKEW_DEGREES else 0.0
+
+def plan_steps(quality: Dict[str, float]) -> List[str]:
+    """Ölçülen kaliteye göre uygulanacak ön işleme adımlarını seçer."""
+    steps = []
+    if quality["noise"] >= NOISE_THRESHOLD:
+        steps.append("denoise")
+    if quality["contrast"] < LOW_CONTRAST_STD:
+        steps.append("contrast")
+    if abs(quality["skew"]) >= MIN_SKEW_DEGREES:
+        steps.append("deskew")
+    # Dengesiz ışıkta tek bir global eşik (Otsu) makbuzun bir kısmını siler
+    steps.append("adaptive_threshold" if quality["lighting"] >= UNEVEN_LIGHTING_STD else "otsu")
+    return steps
+
+def find_receipt_quad(image: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Makbuzun dört köşesini küçültülmüş kopya üzerinde bulur.
+
+    Returns:
+        Tam çözünürlük koordinatlarında 4x2 köşe dizisi veya bulunamazsa None
+    """
+    height, width = image.shape[:2]
+    scale = min(1.0, DETECTION_MAX_SIDE / max(height, width))
+    small = cv2.resize(to_gray(image), None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else to_gray(image)
+
+    blurred = cv2.GaussianBlur(small, (5, 5), 0)
+    edges = cv2.Canny(blurred, 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+
+    contour = max(contours, key=cv2.contourArea)
+    small_area = small.shape[0] * small.shape[1]
+    if cv2.contourArea(contour) < MIN_RECEIPT_AREA_RATIO * small_area:
+        return None
+    # Görüntünün tamamını kaplayan sınır kırpma kazandırmaz
+    if cv2.contourArea(contour) > 0.98 * small_area:
+        return None
+
+    approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+    quad = approx.reshape(-1, 2) if len(approx) == 4 else cv2.boxPoints(cv2.minAreaRect(contour))
+    return (np.asarray(quad, dtype=np.float32) / scale)
+
+def order_quad(quad: np.ndarray) -> np.ndarray:
+    """Köşeleri sol üst, sağ üst, sağ alt, sol alt sırasına dizer."""
+    sums = quad.sum(axis=1)
+    diffs = np.diff(quad, axis=1).ravel()
+    return np.array([quad[sums.argmin()], quad[diffs.argmin()], quad[sums.argmax()], quad[diffs.argmax()]], dtype=np.float32)
+
+class ReceiptPreprocessor:
+    """
+    Makbuz fotoğrafları için uyarlanabilir ön işleme hattı.
+
+    1. Makbuz sınırı küçültülmüş kopyada bulunur, tam çözünürlükte perspektif
+       düzeltmesiyle kırpılır.
+    2. Makbuz hedef DPI'daki genişliğe ölçeklenir (12MP fotoğraflar OCR için
+       gereğinden büyüktür; küçük görüntüler büyütülür).
+    3. Kalite ölçülür; gürültü azaltma, kontrast, eğim düzeltme ve eşikleme
+       yöntemi ölçülere göre seçilir.
+
+    Her aşamanın süresi ve seçilen adımlar rapor olarak döndürülür.
+    """
+
+    def __init__(self, target_dpi: int = TARGET_DPI, receipt_width_inches: float = RECEIPT_WIDTH_INCHES):
+        self.target_dpi = target_dpi
+        self.receipt_width_inches = receipt_width_inches
+
+    @property
+    def target_width(self) -> int:
+        return int(round(self.target_dpi * self.receipt_width_inches))
+
+    def __call__(self, image: np.ndarray) -> Tuple[Image.Image, Dict]:
+        """
+        Görüntüyü OCR için hazırlar.
+
+        Args:
+            image: BGR veya gri tonlu görüntü
+
+        Returns:
+            (işlenmiş PIL görüntüsü, {"timings", "steps", "quality", "scale", "cropped", "size"})
+        """
+        timings = {}
+
+        start = time.perf_counter()
+        quad = find_receipt_quad(image)
+        if quad is not None:
+            image = self._warp(image, order_quad(quad))
+        timings["crop"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        gray = to_gray(image)
+        scale = self.target_width / gray.shape[1]
+        if abs(scale - 1) > 0.05:
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interpolation)
+        timings["resize"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        quality = measure_quality(gray)
+        steps = plan_steps(quality)
+        timings["measure"] = time.perf_counter() - start
+
+        for step in steps:
+            start = time.perf_counter()
+            gray = getattr(self, f"_{step}")(gray, quality)
+            timings[step] = time.perf_counter() - start
+
+        return Image.fromarray(gray), {
+            "timings": timings,
+            "steps": steps,
+            "quality": quality,
+            "scale": scale,
+            "cropped": quad is not None,
+            "size": (gray.shape[1], gray.shape[0])
+        }
+
+    def _warp(self, image: np.ndarray, quad: np.ndarray) -> np.ndarray:
+        top_left, top_right, bottom_right, bottom_left = quad
+        width = int(max(np.linalg.norm(top_right - top_left), np.linalg.norm(bottom_right - bottom_left)))
+        height = int(max(np.linalg.norm(bottom_left - top_left), np.linalg.norm(bottom_right - top_right)))
+        target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+        return cv2.warpPerspective(image, cv2.getPerspectiveTransform(quad, target), (width, height))
+
+    def _denoise(self, gray: np.ndarray, quality: Dict) -> np.ndarray:
+        return cv2.medianBlur(gray, 3)
+
+    def _contrast(self, gray: np.ndarray, quality: Dict) -> np.ndarray:
+        return cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(gray)
+
+    def _deskew(self, gray: np.ndarray, quality: Dict) -> np.ndarray:
+        height, width = gray.shape
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), quality["skew"], 1.0)
+        return cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+    def _otsu(self, gray: np.ndarray, quality: Dict) -> np.ndarray:
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return binary
+
+    def _adaptive_threshold(self, gray: np.ndarray, quality: Dict) -> np.ndarray:
+        # Blok boyutu yaklaşık iki satır yüksekliğinde seçilir (hedef DPI'a göre)
+        block_size = max(15, int(self.target_dpi / 10) | 1)
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, block_size, 15)
@@ -0,0 +1,274 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import Date, bindparam, func
+from sqlalchemy.orm import Session
+from models.database import (
+    RecurringSeries, RecurringType, Transaction, RECURRING_INTERVALS,
+    bulk_insert_transactions, next_series_date, occurrence_index, series_key, series_row
+)
+from services.budget_alerts import watch_budget_alerts
+
+# Hatırlatmalarda gösterilen tekrar sıklığı adları
+FREQUENCY_LABELS = {
+    RecurringType.DAILY: "günlük",
+    RecurringType.WEEKLY: "haftalık",
+    RecurringType.MONTHLY: "aylık",
+    RecurringType.YEARLY: "yıllık",
+}
+
+# Üretilen işlemlerin kaynağı; external_id "<seri ID>:<tarih>" olur
+RECURRING_SOURCE = "recurring"
+
+# Tek veritabanı işleminde üretilen seri sayısı
+MATERIALIZE_BATCH_SIZE = 1000
+
+def occurrence_dates(next_date: date, recurring_type: RecurringType, as_of: date,
+                     anchor_date: Optional[date] = None) -> List[date]:
+    """
+    Seri için next_date'ten as_of'a kadar (dahil) üretilmesi gereken tarihleri döndürür.
+
+    Tarihler serinin takvim başlangıcından (anchor_date, verilmezse next_date)
+    katlar halinde hesaplanır; böylece ay sonuna denk gelen seriler ne tek
+    çalıştırmada ne de ardışık çalıştırmalarda kayar (31 Ocak, 29 Şubat, 31 Mart).
+    """
+    interval = RECURRING_INTERVALS[RecurringType(recurring_type)]
+    if next_date > as_of:
+        return []
+    anchor_date = anchor_date or next_date
+    first = occurrence_index(anchor_date, recurring_type, next_date - timedelta(days=1))
+
+    # Gün/hafta aralıkları sabit uzunluktadır; relativedelta yalnızca ay/yıl için gerekir
+    if not interval.months and not interval.years:
+        step = timedelta(days=interval.days)
+        start = anchor_date + step * first
+        if start > as_of:
+            return []
+        return [start + step * i for i in range((as_of - start).days // interval.days + 1)]
+
+    dates = []
+    occurred_on = anchor_date + interval * first
+    while occurred_on <= as_of:
+        dates.append(occurred_on)
+        occurred_on = anchor_date + interval * (first + len(dates))
+    return dates
+
+class RecurringService:
+    """
+    Tekrarlayan işlem serilerini (recurring_series) okuyan, vadesi gelen
+    işlemlerini üreten ve seri tablosunu yeniden oluşturan servis.
+
+    Seriler işlem yazımlarında ORM flush'ı sırasında güncellenir (bkz.
+    models.database._update_recurring_series); vadesi gelen seriler indeksli
+    next_date üzerinde tek aralık sorgusuyla bulunur.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def due_series(self, user_id: Optional[int] = None, as_of: Optional[date] = None) -> List[RecurringSeries]:
+        """
+        Sonraki işlem tarihi gelmiş veya geçmiş serileri döndürür.
+
+        Args:
+            user_id: Sadece bu kullanıcının serileri (None ise tüm kullanıcılar)
+            as_of: Değerlendirme tarihi (varsayılan: bugün)
+
+        Returns:
+            next_date'e göre sıralı seriler
+        """
+        as_of = as_of or date.today()
+        if isinstance(as_of, datetime):
+            as_of = as_of.date()
+
+        query = self.db.query(RecurringSeries).filter(RecurringSeries.next_date <= as_of)
+        if user_id is not None:
+            query = query.filter(RecurringSeries.user_id == user_id)
+        return query.order_by(RecurringSeries.next_date, RecurringSeries.id).all()
+
+    def reminders(self, user_id: Optional[int] = None, as_of: Optional[date] = None) -> List[Dict]:
+        """
+        Vadesi gelen seriler için hatırlatmaları döndürür (seri başına bir hatırlatma).
+
+        Args:
+            user_id: Sadece bu kullanıcının hatırlatmaları (None ise tüm kullanıcılar)
+            as_of: Değerlendirme tarihi (varsayılan: bugün)
+
+        Returns:
+            [{"type", "user_id", "series_id", "category", "amount", "frequency", "last_date", "next_date"}]
+        """
+        return [
+            {
+                "type": "recurring_reminder",
+                "user_id": series.user_id,
+                "series_id": series.id,
+                "category": series.category,
+                "amount": series.amount,
+                "frequency": FREQUENCY_LABELS[series.recurring_type],
+                "last_date": series.last_date,
+                "next_date": series.next_date
+            }
+            for series in self.due_series(user_id, as_of)
+        ]
+
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """
+        Seri tablosunu işlem tablosundan yeniden oluşturur (geriye dönük doldurma).
+
+        Args:
+            user_id: Sadece bu kullanıcıyı yeniden oluştur (None ise tümü)
+
+        Returns:
+            Oluşturulan seri sayısı
+        """
+        table = RecurringSeries.__table__
+        delete_stmt = table.delete()
+        existing_query = self.db.query(
+            RecurringSeries.user_id, RecurringSeries.type, RecurringSeries.category,
+            RecurringSeries.recurring_type, RecurringSeries.materialized_through
+        ).filter(RecurringSeries.materialized_through.isnot(None))
+        query = self.db.query(
+            Transaction.user_id, Transaction.type, Transaction.category,
+            Transaction.recurring_type, Transaction.date, Transaction.amount
+        ).filter(
+            Transaction.is_recurring == True,
+            Transaction.recurring_type.isnot(None)
+        )
+        if user_id is not None:
+            delete_stmt = delete_stmt.where(table.c.user_id == user_id)
+            existing_query = existing_query.filter(RecurringSeries.user_id == user_id)
+            query = query.filter(Transaction.user_id == user_id)
+
+        # Üretim sınırı işlemlerden türetilemez; silinen üretilmiş işlemler tekrar üretilmesin diye korunur
+        materialized = {
+            series_key(row.user_id, row.type, row.category, row.recurring_type): row.materialized_through
+            for row in existing_query
+        }
+
+        # Tarihe göre sıralı okunduğundan her serinin ilk işlemi takvim başlangıcı olur,
+        # son işlemi en son yazılır
+        anchors = {}
+        occurrences = {}
+        for row in query.order_by(Transaction.date, Transaction.id):
+            occurred_on = row.date.date() if isinstance(row.date, datetime) else row.date
+            key = series_key(row.user_id, row.type, row.category, row.recurring_type)
+            anchors.setdefault(key, occurred_on)
+            occurrences[key] = (occurred_on, row.amount)
+
+        try:
+            connection = self.db.connection()
+            connection.execute(delete_stmt)
+            if occurrences:
+                connection.execute(table.insert(), [
+                    series_row(key, last_date, amount, anchors[key], materialized.get(key))
+                    for key, (last_date, amount) in occurrences.items()
+                ])
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+        return len(occurrences)
+
+    def materialize_due(self, as_of: Optional[date] = None, batch_size: int = MATERIALIZE_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Vadesi gelen tüm serilerin işlemlerini toplu olarak oluşturur.
+
+        Seriler ID sırasıyla partiler halinde okunur; kesinti sonrası kaçırılan
+        dönemler de dahil her serinin as_of'a kadarki tüm işlemleri tek toplu
+        eklemede yazılır. Aynı veritabanı işleminde serinin üretim sınırı
+        (materialized_through) ve next_date'i ilerletilir ve parti commit edilir;
+        kullanıcının sildiği üretilmiş işlemler bu yüzden tekrar üretilmez. Her
+        işlemin external_id'si (seri, dönem) ikilisidir; aynı dönem ikinci kez
+        eklenmez, bu yüzden birden fazla işçinin aynı anda çalıştırması güvenlidir.
+
+        Args:
+            as_of: Bu tarihe kadar (dahil) vadesi gelen işlemler üretilir (varsayılan: bugün)
+            batch_size: Bir veritabanı işleminde işlenen seri sayısı
+
+        Returns:
+            {"series": işlenen seri, "inserted": eklenen işlem, "skipped": zaten var olan işlem}
+        """
+        if batch_size <= 0:
+            raise ValueError("Parti boyutu pozitif olmalıdır")
+        as_of = as_of or date.today()
+        if isinstance(as_of, datetime):
+            as_of = as_of.date()
+
+        stats = {"series": 0, "inserted": 0, "skipped": 0}
+        last_id = 0
+        while True:
+            batch = self.db.query(
+                RecurringSeries.id, RecurringSeries.user_id, RecurringSeries.type, RecurringSeries.category,
+                RecurringSeries.recurring_type, RecurringSeries.amount, RecurringSeries.anchor_date,
+                RecurringSeries.last_date, RecurringSeries.next_date, RecurringSeries.materialized_through
+            ).filter(
+                RecurringSeries.next_date <= as_of,
+                RecurringSeries.id > last_id
+            ).order_by(RecurringSeries.id).limit(batch_size).all()
+            if not batch:
+                break
+
+            periods = {
+                series.id: occurrence_dates(series.next_date, series.recurring_type, as_of, series.anchor_date)
+                for series in batch
+            }
+            rows = [
+                {
+                    "user_id": series.user_id,
+                    "amount": series.amount,
+                    "type": series.type,
+                    "category": series.category,
+                    "description": f"Tekrarlayan işlem ({FREQUENCY_LABELS[series.recurring_type]})",
+                    "date": datetime.combine(occurred_on, time.min),
+                    "is_recurring": True,
+                    "recurring_type": series.recurring_type,
+                    "source": RECURRING_SOURCE,
+                    "external_id": f"{series.id}:{occurred_on.isoformat()}"
+                }
+                for series in batch
+                for occurred_on in periods[series.id]
+            ]
+
+            try:
+                inserted = bulk_insert_transactions(self.db, rows)
+                self._advance_materialized(batch, periods)
+                watch_budget_alerts(self.db)
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                raise e
+
+            stats["series"] += len(batch)
+            stats["inserted"] += inserted
+            stats["skipped"] += len(rows) - inserted
+            last_id = batch[-1].id
+
+        return stats
+
+    def _advance_materialized(self, batch, periods: Dict[int, List[date]]) -> None:
+        """Serilerin üretim sınırını (yalnızca ileri) ve next_date'ini üretilen son döneme taşır."""
+        table = RecurringSeries.__table__
+        params = []
+        for series in batch:
+            if not periods[series.id]:
+                continue
+            through = periods[series.id][-1]
+            if series.materialized_through and series.materialized_through > through:
+                through = series.materialized_through
+            anchor_date = series.anchor_date or series.next_date
+            params.append({
+                "series_id": series.id,
+                "through": through,
+                "next": next_series_date(anchor_date, series.recurring_type, max(through, series.last_date))
+            })
+        if params:
+            self.db.connection().execute(
+                table.update().where(table.c.id == bindparam("series_id")).values(
+                    materialized_through=func.max(
+                        func.coalesce(table.c.materialized_through, bindparam("through", type_=Date)),
+                        bindparam("through", type_=Date)
+                    ),
+                    next_date=func.max(table.c.next_date, bindparam("next", type_=Date))
+                ),
+                params
+            )
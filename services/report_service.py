@@ -2,10 +2,16 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Any, Optional
-from models.database import Transaction, Budget, FinancialGoal
+from typing import List, Dict, Any, Optional, Tuple
+from models.database import Transaction, TransactionType, Budget, FinancialGoal, MonthlyRollup
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, cast, Integer, String
+from services.rollup_service import RollupService
+from utils.date_utils import PERIOD_GRANULARITIES, period_start, shift_period, period_label
+
+# Trend grafiği başlık ve eksen etiketleri
+TREND_TITLES = {"day": "Günlük", "week": "Haftalık", "month": "Aylık", "quarter": "Çeyreklik"}
+TREND_AXIS_TITLES = {"day": "Gün", "week": "Hafta", "month": "Ay", "quarter": "Çeyrek"}
 
 class ReportService:
     def __init__(self, db: Session):
@@ -19,37 +25,56 @@ class ReportService:
         category_filter: Optional[str] = None,
         min_amount: Optional[float] = None,
         max_amount: Optional[float] = None,
-        transaction_type: Optional[str] = None
+        transaction_type: Optional[str] = None,
+        include_transactions: bool = True
     ) -> Dict:
-        """Aylık finansal rapor oluşturur."""
+        """
+        Aylık finansal rapor oluşturur.
+        
+        Toplamlar, kategori bazlı harcamalar ve bütçe harcamaları tek bir
+        gruplanmış SQL sorgusuyla hesaplanır; işlem satırları yalnızca
+        include_transactions True ise yüklenir.
+        
+        Args:
+            user_id: Kullanıcı ID'si
+            year: Rapor yılı
+            month: Rapor ayı
+            category_filter: Sadece bu kategoriyi dahil et
+            min_amount: Minimum işlem tutarı
+            max_amount: Maksimum işlem tutarı
+            transaction_type: Sadece bu işlem tipini dahil et
+            include_transactions: İşlem satırları rapora eklensin mi
+            
+        Returns:
+            Rapor sözlüğü
+        """
         # Tarih aralığını belirle
-        start_date = date(year, month, 1)
-        if month == 12:
-            end_date = date(year + 1, 1, 1)
-        else:
-            end_date = date(year, month + 1, 1)
+        start_date, end_date = self._month_range(year, month)
         
-        # İşlemleri filtrele
-        query = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= start_date,
-            Transaction.date < end_date
+        # İşlem filtreleri
+        conditions = self._transaction_filters(
+            user_id, start_date, end_date,
+            category_filter=category_filter,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            transaction_type=transaction_type
         )
         
-        if category_filter:
-            query = query.filter(Transaction.category == category_filter)
-        if min_amount is not None:
-            query = query.filter(Transaction.amount >= min_amount)
-        if max_amount is not None:
-            query = query.filter(Transaction.amount <= max_amount)
-        if transaction_type:
-            query = query.filter(Transaction.type == transaction_type)
-        
-        transactions = query.all()
+        # Tip ve kategori bazında toplamlar: tutar filtresi yoksa aylık özet
+        # tablosundan, aksi halde ham işlemlerden tek sorguyla
+        if min_amount is None and max_amount is None:
+            month_key = self._period_key(year, month)
+            totals = RollupService(self.db).get_type_category_totals(
+                user_id, month_key, month_key,
+                category=category_filter,
+                transaction_type=transaction_type
+            )
+        else:
+            totals = self._aggregate_by_type_and_category(conditions)
         
         # Özet hesapla
-        total_income = sum(t.amount for t in transactions if t.type == "income")
-        total_expense = sum(t.amount for t in transactions if t.type == "expense")
+        total_income = sum(totals["income"].values())
+        total_expense = sum(totals["expense"].values())
         
         summary = {
             "total_income": total_income,
@@ -58,12 +83,7 @@ class ReportService:
         }
         
         # Kategori bazlı harcamalar
-        expense_by_category = {}
-        for t in transactions:
-            if t.type == "expense":
-                if t.category not in expense_by_category:
-                    expense_by_category[t.category] = 0
-                expense_by_category[t.category] += t.amount
+        expense_by_category = dict(totals["expense"])
         
         # Bütçe performansı
         budgets = self.db.query(Budget).filter(
@@ -72,15 +92,7 @@ class ReportService:
             Budget.end_date >= start_date
         ).all()
         
-        budget_performance = {}
-        for budget in budgets:
-            budget_transactions = [t for t in transactions if t.category == budget.category]
-            spent = sum(t.amount for t in budget_transactions if t.type == "expense")
-            budget_performance[budget.category] = {
-                "limit": budget.amount,
-                "spent": spent,
-                "remaining": budget.amount - spent
-            }
+        budget_performance = self._budget_performance(budgets, expense_by_category)
         
         # Hedef ilerlemesi
         goals = self.db.query(FinancialGoal).filter(
@@ -88,6 +100,109 @@ class ReportService:
             FinancialGoal.deadline >= start_date
         ).all()
         
+        goal_progress = self._goal_progress(goals)
+        
+        # İşlem satırları sadece istenirse yüklenir
+        transactions = []
+        if include_transactions:
+            transactions = self.db.query(Transaction).filter(*conditions).all()
+        
+        return {
+            "summary": summary,
+            "expense_by_category": expense_by_category,
+            "budget_performance": budget_performance,
+            "goal_progress": goal_progress,
+            "transactions": transactions
+        }
+
+    def _month_range(self, year: int, month: int) -> Tuple[date, date]:
+        """
+        Ayın başlangıç tarihini ve bir sonraki ayın ilk gününü döndürür.
+        """
+        start_date = date(year, month, 1)
+        if month == 12:
+            end_date = date(year + 1, 1, 1)
+        else:
+            end_date = date(year, month + 1, 1)
+        return start_date, end_date
+
+    def _transaction_filters(
+        self,
+        user_id: int,
+        start_date: date,
+        end_date: date,
+        category_filter: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        transaction_type: Optional[str] = None
+    ) -> List:
+        """
+        Rapor sorguları için işlem filtre koşullarını oluşturur.
+        """
+        conditions = [
+            Transaction.user_id == user_id,
+            Transaction.date >= start_date,
+            Transaction.date < end_date
+        ]
+        
+        if category_filter:
+            conditions.append(Transaction.category == category_filter)
+        if min_amount is not None:
+            conditions.append(Transaction.amount >= min_amount)
+        if max_amount is not None:
+            conditions.append(Transaction.amount <= max_amount)
+        if transaction_type:
+            conditions.append(Transaction.type == transaction_type)
+        
+        return conditions
+
+    def _aggregate_by_type_and_category(self, conditions: List) -> Dict[str, Dict[str, float]]:
+        """
+        İşlem tutarlarını SQL tarafında tip ve kategoriye göre toplar.
+        
+        Args:
+            conditions: İşlem filtre koşulları
+            
+        Returns:
+            {"income": {kategori: toplam}, "expense": {kategori: toplam}}
+        """
+        rows = self.db.query(
+            Transaction.type,
+            Transaction.category,
+            func.sum(Transaction.amount).label("total")
+        ).filter(
+            *conditions
+        ).group_by(
+            Transaction.type,
+            Transaction.category
+        ).all()
+        
+        totals = {"income": {}, "expense": {}}
+        for row in rows:
+            row_type = row.type.value if isinstance(row.type, TransactionType) else row.type
+            if row_type in totals:
+                totals[row_type][row.category] = row.total or 0
+        
+        return totals
+
+    def _budget_performance(self, budgets: List[Budget], expense_by_category: Dict[str, float]) -> Dict[str, Dict]:
+        """
+        Bütçe limitlerini kategori bazlı harcamalarla eşleştirir.
+        """
+        budget_performance = {}
+        for budget in budgets:
+            spent = expense_by_category.get(budget.category, 0)
+            budget_performance[budget.category] = {
+                "limit": budget.amount,
+                "spent": spent,
+                "remaining": budget.amount - spent
+            }
+        return budget_performance
+
+    def _goal_progress(self, goals: List[FinancialGoal]) -> List[Dict]:
+        """
+        Hedeflerin ilerleme bilgilerini rapor formatına dönüştürür.
+        """
         goal_progress = []
         for goal in goals:
             goal_progress.append({
@@ -98,14 +213,7 @@ class ReportService:
                 "deadline": goal.deadline,
                 "priority": goal.priority
             })
-        
-        return {
-            "summary": summary,
-            "expense_by_category": expense_by_category,
-            "budget_performance": budget_performance,
-            "goal_progress": goal_progress,
-            "transactions": transactions
-        }
+        return goal_progress
 
     def create_expense_chart(self, expense_data: Dict[str, float]) -> Optional[go.Figure]:
         """Harcama dağılımı grafiği oluşturur."""
@@ -343,6 +451,10 @@ class ReportService:
         """
         İki dönem arasında karşılaştırmalı analiz yapar.
         
+        Her iki dönem tek bir gruplanmış sorguyla hesaplanır; bütçe ve hedefler
+        bir kez yüklenip iki dönem için ortak kullanılır. Dönem raporları
+        işlem satırlarını içermez.
+        
         Args:
             user_id: Kullanıcı ID'si
             current_year: Mevcut yıl
@@ -352,42 +464,190 @@ class ReportService:
         Returns:
             Karşılaştırmalı analiz sonuçları
         """
-        # Mevcut dönem için tarih aralığını belirle
-        current_start_date = date(current_year, current_month, 1)
-        if current_month == 12:
-            current_end_date = date(current_year + 1, 1, 1) - timedelta(days=1)
-        else:
-            current_end_date = date(current_year, current_month + 1, 1) - timedelta(days=1)
-        
         # Karşılaştırma dönemini belirle
-        if comparison_type == "previous_month":
-            if current_month == 1:
-                previous_year = current_year - 1
-                previous_month = 12
-            else:
-                previous_year = current_year
-                previous_month = current_month - 1
-        elif comparison_type == "previous_year":
-            previous_year = current_year - 1
-            previous_month = current_month
-        else:  # custom
-            previous_year = current_year
-            previous_month = current_month - 1  # varsayılan olarak bir önceki ay
-        
-        previous_start_date = date(previous_year, previous_month, 1)
-        if previous_month == 12:
-            previous_end_date = date(previous_year + 1, 1, 1) - timedelta(days=1)
-        else:
-            previous_end_date = date(previous_year, previous_month + 1, 1) - timedelta(days=1)
+        if comparison_type == "previous_year":
+            previous_year, previous_month = current_year - 1, current_month
+        else:  # previous_month, custom: varsayılan olarak bir önceki ay
+            previous_start = shift_period(date(current_year, current_month, 1), "month", -1)
+            previous_year, previous_month = previous_start.year, previous_start.month
+        
+        current_period = (current_year, current_month)
+        previous_period = (previous_year, previous_month)
+        
+        reports = self.get_period_reports(user_id, [current_period, previous_period])
+        current_report = reports[self._period_key(*current_period)]
+        previous_report = reports[self._period_key(*previous_period)]
+        
+        return {
+            "current_report": current_report,
+            "previous_report": previous_report,
+            "comparison": self._build_comparison(
+                current_report, previous_report, current_period, previous_period
+            )
+        }
+
+    def compare_periods(
+        self,
+        user_id: int,
+        current_periods: List[Tuple[int, int]],
+        previous_periods: List[Tuple[int, int]]
+    ) -> Dict:
+        """
+        İki dönem listesini sıra sıra karşılaştırır (ör. son 12 ay ile bir yıl önceki aynı aylar).
+        
+        Tüm dönemler tek bir tarama ile hesaplanır.
+        
+        Args:
+            user_id: Kullanıcı ID'si
+            current_periods: (yıl, ay) listesi
+            previous_periods: Karşılaştırılacak (yıl, ay) listesi, current_periods ile aynı uzunlukta
+            
+        Returns:
+            Dönem raporları ve karşılaştırmalar
+        """
+        if len(current_periods) != len(previous_periods):
+            raise ValueError("Karşılaştırılan dönem listeleri aynı uzunlukta olmalı")
+        
+        reports = self.get_period_reports(user_id, list(current_periods) + list(previous_periods))
+        
+        comparisons = []
+        for current_period, previous_period in zip(current_periods, previous_periods):
+            comparisons.append(self._build_comparison(
+                reports[self._period_key(*current_period)],
+                reports[self._period_key(*previous_period)],
+                current_period,
+                previous_period
+            ))
+        
+        return {
+            "reports": reports,
+            "comparisons": comparisons
+        }
+
+    def generate_year_over_year_analysis(
+        self,
+        user_id: int,
+        year: int,
+        month: int,
+        months: int = 12
+    ) -> Dict:
+        """
+        Verilen aya kadar olan son n ayı bir yıl önceki aynı aylarla karşılaştırır.
+        """
+        last_month = date(year, month, 1)
+        current_periods = []
+        for offset in range(months - 1, -1, -1):
+            period = shift_period(last_month, "month", -offset)
+            current_periods.append((period.year, period.month))
+        previous_periods = [(y - 1, m) for y, m in current_periods]
+        
+        return self.compare_periods(user_id, current_periods, previous_periods)
+
+    def get_period_reports(self, user_id: int, periods: List[Tuple[int, int]]) -> Dict[str, Dict]:
+        """
+        Birden çok ay için özet raporları tek sorguyla oluşturur.
+        
+        Toplamlar aylık özet tablosundan okunur; bütçe ve hedefler tüm
+        dönemler için bir kez sorgulanır.
+        
+        Args:
+            user_id: Kullanıcı ID'si
+            periods: (yıl, ay) listesi
+            
+        Returns:
+            "YYYY-MM" anahtarlı rapor sözlüğü
+        """
+        ranges = {}
+        for year, month in periods:
+            ranges[self._period_key(year, month)] = self._month_range(year, month)
+        
+        if not ranges:
+            return {}
+        
+        # Tüm dönemlerin toplamları aylık özet tablosundan tek sorguyla okunur
+        rows = self.db.query(
+            MonthlyRollup.year_month,
+            MonthlyRollup.type,
+            MonthlyRollup.category,
+            MonthlyRollup.total_amount
+        ).filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.year_month.in_(list(ranges))
+        ).all()
+        
+        totals = {key: {"income": {}, "expense": {}} for key in ranges}
+        for row in rows:
+            row_type = row.type.value if isinstance(row.type, TransactionType) else row.type
+            if row_type in totals[row.year_month]:
+                totals[row.year_month][row_type][row.category] = row.total_amount or 0
+        
+        # Bütçe ve hedefler tüm dönemler için bir kez yüklenir
+        first_start = min(start for start, _ in ranges.values())
+        last_end = max(end for _, end in ranges.values())
+        
+        budgets = self.db.query(Budget).filter(
+            Budget.user_id == user_id,
+            Budget.start_date <= last_end,
+            Budget.end_date >= first_start
+        ).all()
         
-        # Mevcut dönem raporu
-        current_report = self.generate_monthly_report(user_id, current_year, current_month)
+        goals = self.db.query(FinancialGoal).filter(
+            FinancialGoal.user_id == user_id,
+            FinancialGoal.deadline >= first_start
+        ).all()
         
-        # Karşılaştırma dönemi raporu
-        previous_report = self.generate_monthly_report(user_id, previous_year, previous_month)
+        reports = {}
+        for key, (start, end) in ranges.items():
+            total_income = sum(totals[key]["income"].values())
+            total_expense = sum(totals[key]["expense"].values())
+            expense_by_category = dict(totals[key]["expense"])
+            
+            period_budgets = [b for b in budgets if b.start_date <= end and b.end_date >= start]
+            period_goals = [g for g in goals if g.deadline >= start]
+            
+            reports[key] = {
+                "summary": {
+                    "total_income": total_income,
+                    "total_expense": total_expense,
+                    "net_amount": total_income - total_expense
+                },
+                "expense_by_category": expense_by_category,
+                "budget_performance": self._budget_performance(period_budgets, expense_by_category),
+                "goal_progress": self._goal_progress(period_goals),
+                "transactions": []
+            }
         
-        # Karşılaştırmalı analiz
-        comparison = {
+        return reports
+
+    def _previous_month(self, value: date) -> Tuple[int, int]:
+        """
+        Verilen tarihten önceki ayın (yıl, ay) bilgisini döndürür.
+        """
+        previous = shift_period(value, "month", -1)
+        return previous.year, previous.month
+
+    def _period_key(self, year: int, month: int) -> str:
+        """
+        Dönem raporları için "YYYY-MM" anahtarını döndürür.
+        """
+        return f"{year:04d}-{month:02d}"
+
+    def _build_comparison(
+        self,
+        current_report: Dict,
+        previous_report: Dict,
+        current_period: Tuple[int, int],
+        previous_period: Tuple[int, int]
+    ) -> Dict:
+        """
+        İki dönem raporundan karşılaştırma sözlüğünü oluşturur.
+        """
+        current_year, current_month = current_period
+        previous_year, previous_month = previous_period
+        current_start_date, current_end_date = self._month_range(current_year, current_month)
+        previous_start_date, previous_end_date = self._month_range(previous_year, previous_month)
+        
+        return {
             "income_change": {
                 "amount": current_report["summary"]["total_income"] - previous_report["summary"]["total_income"],
                 "percentage": self._calculate_percentage_change(
@@ -417,21 +677,15 @@ class ReportService:
                 "year": current_year,
                 "month": current_month,
                 "start_date": current_start_date,
-                "end_date": current_end_date
+                "end_date": current_end_date - timedelta(days=1)
             },
             "previous_period": {
                 "year": previous_year,
                 "month": previous_month,
                 "start_date": previous_start_date,
-                "end_date": previous_end_date
+                "end_date": previous_end_date - timedelta(days=1)
             }
         }
-        
-        return {
-            "current_report": current_report,
-            "previous_report": previous_report,
-            "comparison": comparison
-        }
     
     def _calculate_percentage_change(self, old_value: float, new_value: float) -> float:
         """
@@ -573,69 +827,127 @@ class ReportService:
         
         return fig
         
-    def create_trend_chart(self, user_id: int, months: int = 6) -> go.Figure:
-        """
-        Son n ay için gelir/gider trendini gösteren çizgi grafiği oluşturur.
+    def get_trend_data(
+        self,
+        user_id: int,
+        periods: int = 6,
+        granularity: str = "month",
+        end_date: Optional[date] = None
+    ) -> List[Dict]:
         """
-        today = date.today()
-        end_date = date(today.year, today.month, 1)
+        Son n dönem için gelir/gider/net tutarlarını tek bir gruplanmış sorguyla getirir.
         
-        # Son n ayın başlangıç tarihini bul
-        if today.month <= months:
-            start_year = today.year - 1
-            start_month = 12 - (months - today.month)
-        else:
-            start_year = today.year
-            start_month = today.month - months
+        Aylık ve çeyreklik trendler aylık özet tablosunu, günlük ve haftalık
+        trendler ham işlemleri kullanır. Dönemler, end_date'in içinde bulunduğu dönemden önceki n tam dönemdir;
+        işlem olmayan dönemler sıfır değerleriyle döner.
+        
+        Args:
+            user_id: Kullanıcı ID'si
+            periods: Dönem sayısı
+            granularity: Dönem aralığı ("day", "week", "month", "quarter")
+            end_date: Referans tarih (varsayılan: bugün)
             
-        start_date = date(start_year, start_month, 1)
+        Returns:
+            Dönem başına özet sözlüklerinin listesi
+        """
+        if granularity not in PERIOD_GRANULARITIES:
+            raise ValueError(f"Desteklenmeyen dönem aralığı: {granularity}")
         
-        # Her ay için toplam gelir ve giderleri hesapla
-        monthly_data = []
-        current_date = start_date
+        range_end = period_start(end_date or date.today(), granularity)
+        range_start = shift_period(range_end, granularity, -periods)
         
-        while current_date < end_date:
-            year = current_date.year
-            month = current_date.month
+        totals = {}
+        if granularity in ("month", "quarter"):
+            # Aylık ve çeyreklik trendler aylık özet tablosundan hesaplanır
+            monthly_totals = RollupService(self.db).get_monthly_totals(
+                user_id,
+                self._period_key(range_start.year, range_start.month),
+                self._period_key(*self._previous_month(range_end))
+            )
+            for year_month, month_totals in monthly_totals.items():
+                year, month = map(int, year_month.split("-"))
+                key = period_start(date(year, month, 1), granularity).isoformat()
+                for row_type, total in month_totals.items():
+                    totals[(key, row_type)] = totals.get((key, row_type), 0) + total
+        else:
+            bucket = self._period_bucket_expression(granularity).label("bucket")
             
-            # Ayın son gününü hesapla
-            if month == 12:
-                next_month = date(year + 1, 1, 1)
-            else:
-                next_month = date(year, month + 1, 1)
-                
-            # Bu ay için tüm işlemleri getir
-            transactions = self.db.query(Transaction).filter(
+            rows = self.db.query(
+                bucket,
+                Transaction.type,
+                func.sum(Transaction.amount).label("total")
+            ).filter(
                 Transaction.user_id == user_id,
-                Transaction.date >= current_date,
-                Transaction.date < next_month
+                Transaction.date >= range_start,
+                Transaction.date < range_end
+            ).group_by(
+                bucket,
+                Transaction.type
             ).all()
             
-            # Gelir ve giderleri hesapla
-            total_income = sum(t.amount for t in transactions if t.type == "income")
-            total_expense = sum(t.amount for t in transactions if t.type == "expense")
-            net_amount = total_income - total_expense
+            # Sonuçları dönem anahtarına göre yerleştir
+            for row in rows:
+                row_type = row.type.value if isinstance(row.type, TransactionType) else row.type
+                totals[(row.bucket, row_type)] = row.total or 0
+        
+        trend_data = []
+        current_date = range_start
+        while current_date < range_end:
+            key = current_date.isoformat()
+            total_income = totals.get((key, "income"), 0)
+            total_expense = totals.get((key, "expense"), 0)
             
-            monthly_data.append({
-                "year": year,
-                "month": month,
+            trend_data.append({
+                "year": current_date.year,
+                "month": current_date.month,
                 "date": current_date,
+                "label": period_label(current_date, granularity),
                 "total_income": total_income,
                 "total_expense": total_expense,
-                "net_amount": net_amount
+                "net_amount": total_income - total_expense
             })
             
-            # Bir sonraki aya geç
-            if month == 12:
-                current_date = date(year + 1, 1, 1)
-            else:
-                current_date = date(year, month + 1, 1)
+            current_date = shift_period(current_date, granularity)
+        
+        return trend_data
+
+    def _period_bucket_expression(self, granularity: str):
+        """
+        İşlem tarihini dönem başlangıcına (YYYY-MM-DD) indirgeyen SQLite ifadesini döndürür.
+        """
+        if granularity == "day":
+            return func.date(Transaction.date)
+        if granularity == "week":
+            # Bir sonraki pazara git ve 6 gün geri gel: haftanın pazartesisi
+            return func.date(Transaction.date, "weekday 0", "-6 days")
+        if granularity == "month":
+            return func.date(Transaction.date, "start of month")
+        if granularity == "quarter":
+            month_offset = (cast(func.strftime("%m", Transaction.date), Integer) - 1) % 3
+            return func.date(
+                Transaction.date,
+                "start of month",
+                "-" + cast(month_offset, String) + " months"
+            )
+        
+        raise ValueError(f"Desteklenmeyen dönem aralığı: {granularity}")
+
+    def create_trend_chart(self, user_id: int, months: int = 6, granularity: str = "month") -> go.Figure:
+        """
+        Son n dönem için gelir/gider trendini gösteren çizgi grafiği oluşturur.
+        
+        Args:
+            user_id: Kullanıcı ID'si
+            months: Gösterilecek dönem sayısı
+            granularity: Dönem aralığı ("day", "week", "month", "quarter")
+        """
+        monthly_data = self.get_trend_data(user_id, periods=months, granularity=granularity)
         
         # Grafik oluştur
         fig = go.Figure()
         
         # X ekseni için tarih etiketleri
-        date_labels = [f"{d['month']}/{d['year']}" for d in monthly_data]
+        date_labels = [d["label"] for d in monthly_data]
         
         # Gelir çizgisi
         fig.add_trace(go.Scatter(
@@ -685,14 +997,14 @@ class ReportService:
         # Grafik ayarları
         fig.update_layout(
             title={
-                'text': "Aylık Finansal Trend",
+                'text': f"{TREND_TITLES[granularity]} Finansal Trend",
                 'y':0.95,
                 'x':0.5,
                 'xanchor': 'center',
                 'yanchor': 'top',
                 'font': {'size': 24}
             },
-            xaxis_title="Ay",
+            xaxis_title=TREND_AXIS_TITLES[granularity],
             yaxis_title="Miktar (₺)",
             showlegend=True,
             legend=dict(
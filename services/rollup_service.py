@@ -0,0 +1,215 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from models.database import MonthlyRollup, Transaction, TransactionType
+
+class RollupService:
+    """
+    Aylık işlem özet tablosunu (monthly_rollups) okuyan ve yeniden oluşturan servis.
+
+    Özet satırları işlem yazımlarında ORM flush'ı sırasında artımlı olarak
+    güncellenir (bkz. models.database._update_monthly_rollups); bu servis
+    yalnızca okuma ve toplu yeniden oluşturma işlemlerini sağlar.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def month_key(value: date) -> str:
+        """Tarihin ait olduğu ay anahtarını ("YYYY-MM") döndürür."""
+        return value.strftime("%Y-%m")
+
+    @staticmethod
+    def full_month_range(start_date: date, end_date: date) -> Optional[Tuple[str, str]]:
+        """
+        Tarih aralığı tam aylardan oluşuyorsa ilk ve son ay anahtarlarını döndürür.
+
+        Bitiş tarihi bir ayın ilk günü ise (dışlayıcı sınır) bir önceki ay,
+        ayın son günü ise o ay son ay kabul edilir. Aralık tam aylara
+        denk gelmiyorsa None döner.
+
+        Args:
+            start_date: Başlangıç tarihi
+            end_date: Bitiş tarihi
+
+        Returns:
+            (ilk_ay, son_ay) veya None
+        """
+        if isinstance(start_date, datetime) or isinstance(end_date, datetime):
+            return None
+        if start_date.day != 1:
+            return None
+
+        if end_date.day == 1:
+            last_month_day = end_date - timedelta(days=1)
+        elif (end_date + timedelta(days=1)).day == 1:
+            last_month_day = end_date
+        else:
+            return None
+
+        if last_month_day < start_date:
+            return None
+
+        return RollupService.month_key(start_date), RollupService.month_key(last_month_day)
+
+    def get_type_category_totals(
+        self,
+        user_id: int,
+        start_month: str,
+        end_month: str,
+        category: Optional[str] = None,
+        transaction_type: Optional[str] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Ay aralığı için tip ve kategori bazlı toplamları döndürür.
+
+        Args:
+            user_id: Kullanıcı ID'si
+            start_month: İlk ay ("YYYY-MM")
+            end_month: Son ay ("YYYY-MM", dahil)
+            category: Sadece bu kategori
+            transaction_type: Sadece bu işlem tipi
+
+        Returns:
+            {"income": {kategori: toplam}, "expense": {kategori: toplam}}
+        """
+        query = self.db.query(
+            MonthlyRollup.type,
+            MonthlyRollup.category,
+            func.sum(MonthlyRollup.total_amount).label("total")
+        ).filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.year_month >= start_month,
+            MonthlyRollup.year_month <= end_month
+        )
+
+        if category:
+            query = query.filter(MonthlyRollup.category == category)
+        if transaction_type:
+            query = query.filter(MonthlyRollup.type == transaction_type)
+
+        rows = query.group_by(MonthlyRollup.type, MonthlyRollup.category).all()
+
+        totals = {"income": {}, "expense": {}}
+        for row in rows:
+            row_type = row.type.value if isinstance(row.type, TransactionType) else row.type
+            if row_type in totals:
+                totals[row_type][row.category] = row.total or 0
+
+        return totals
+
+    def get_category_totals(
+        self,
+        user_id: int,
+        start_month: str,
+        end_month: str,
+        transaction_type: str = "expense",
+        categories: Optional[List[str]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Ay aralığı için kategori bazlı toplam ve işlem adedini döndürür.
+
+        Returns:
+            {kategori: {"total": toplam, "count": adet}}
+        """
+        query = self.db.query(
+            MonthlyRollup.category,
+            func.sum(MonthlyRollup.total_amount).label("total"),
+            func.sum(MonthlyRollup.transaction_count).label("count")
+        ).filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.type == transaction_type,
+            MonthlyRollup.year_month >= start_month,
+            MonthlyRollup.year_month <= end_month
+        )
+
+        if categories is not None:
+            query = query.filter(MonthlyRollup.category.in_(categories))
+
+        rows = query.group_by(MonthlyRollup.category).all()
+
+        return {
+            row.category: {"total": row.total or 0, "count": row.count or 0}
+            for row in rows
+        }
+
+    def get_monthly_totals(self, user_id: int, start_month: str, end_month: str) -> Dict[str, Dict[str, float]]:
+        """
+        Ay aralığındaki her ay için gelir ve gider toplamlarını döndürür.
+
+        Returns:
+            {"YYYY-MM": {"income": toplam, "expense": toplam}}
+        """
+        rows = self.db.query(
+            MonthlyRollup.year_month,
+            MonthlyRollup.type,
+            func.sum(MonthlyRollup.total_amount).label("total")
+        ).filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.year_month >= start_month,
+            MonthlyRollup.year_month <= end_month
+        ).group_by(
+            MonthlyRollup.year_month,
+            MonthlyRollup.type
+        ).all()
+
+        totals = {}
+        for row in rows:
+            row_type = row.type.value if isinstance(row.type, TransactionType) else row.type
+            month_totals = totals.setdefault(row.year_month, {"income": 0, "expense": 0})
+            if row_type in month_totals:
+                month_totals[row_type] = row.total or 0
+
+        return totals
+
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """
+        Özet tablosunu işlem tablosundan yeniden oluşturur (geriye dönük doldurma).
+
+        Args:
+            user_id: Sadece bu kullanıcıyı yeniden oluştur (None ise tümü)
+
+        Returns:
+            Oluşturulan özet satırı sayısı
+        """
+        table = MonthlyRollup.__table__
+        year_month = func.strftime("%Y-%m", Transaction.date)
+
+        delete_stmt = table.delete()
+        select_stmt = self.db.query(
+            Transaction.user_id,
+            year_month,
+            Transaction.type,
+            Transaction.category,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id)
+        )
+
+        if user_id is not None:
+            delete_stmt = delete_stmt.where(table.c.user_id == user_id)
+            select_stmt = select_stmt.filter(Transaction.user_id == user_id)
+
+        select_stmt = select_stmt.group_by(
+            Transaction.user_id,
+            year_month,
+            Transaction.type,
+            Transaction.category
+        )
+
+        try:
+            self.db.execute(delete_stmt)
+            self.db.execute(table.insert().from_select(
+                ["user_id", "year_month", "type", "category", "total_amount", "transaction_count"],
+                select_stmt.statement
+            ))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+        count_query = self.db.query(func.count()).select_from(MonthlyRollup)
+        if user_id is not None:
+            count_query = count_query.filter(MonthlyRollup.user_id == user_id)
+        return count_query.scalar()
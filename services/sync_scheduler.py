@@ -0,0 +1,158 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+from models.database import SessionLocal, BankAccount
+from services.banking_service import BankingService, DEFAULT_API_ENDPOINTS
+from utils.rate_limiter import RateLimiter
+
+# Süreç genelinde paylaşılan banka bazlı hız sınırlayıcılar; her iş ayrı
+# SyncScheduler oluştursa da aynı bankaya giden istekler ortak sınıra tabidir
+_rate_limiters: Dict[tuple, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+def shared_rate_limiter(bank_name: str, rate: float) -> RateLimiter:
+    """Banka ve hız için süreç genelinde paylaşılan hız sınırlayıcıyı döndürür."""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get((bank_name, rate))
+        if limiter is None:
+            limiter = _rate_limiters[(bank_name, rate)] = RateLimiter(rate)
+        return limiter
+
+class SyncScheduler:
+    """
+    Banka hesabı senkronizasyonlarını sınırlı bir iş parçacığı havuzunda paralel çalıştırır.
+
+    Her hesap kendi oturumu ve BankingService örneğiyle senkronize edilir;
+    aynı bankaya giden her istek, süreç genelinde paylaşılan banka bazlı hız
+    sınırına (api_endpoints içindeki rate_limit) tabidir. Geçici hatalar (retryable) üstel ve
+    rastgele dağıtılmış (jitter) bekleme ile yeniden denenir.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_workers: int = 4,
+        api_endpoints: Optional[Dict] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        days_back: int = 30,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        if max_workers <= 0:
+            raise ValueError("İşçi sayısı pozitif olmalıdır")
+
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self.api_endpoints = api_endpoints or DEFAULT_API_ENDPOINTS
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.days_back = days_back
+        self._sleep = sleep
+
+    def _rate_limiter(self, bank_name: str) -> Optional[RateLimiter]:
+        """Banka için paylaşılan hız sınırlayıcıyı döndürür (sınır yoksa None)."""
+        rate = self.api_endpoints.get(bank_name, {}).get("rate_limit")
+        if not rate:
+            return None
+        return shared_rate_limiter(bank_name, rate)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Deneme numarasına göre tam rastgele (full jitter) bekleme süresini döndürür."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _sync_one(self, account_id: int, bank_name: str) -> Dict:
+        """Tek bir hesabı kendi oturumunda, yeniden denemelerle senkronize eder."""
+        session = self.session_factory()
+        started = time.perf_counter()
+        try:
+            # Sınırlayıcı her HTTP isteğinde (sayfa başına) BankingService içinde alınır
+            service = BankingService(
+                session,
+                api_endpoints=self.api_endpoints,
+                rate_limiter=self._rate_limiter(bank_name)
+            )
+            attempt = 0
+
+            while True:
+                try:
+                    result = service.sync_account_transactions(account_id, days_back=self.days_back)
+                except ValueError as e:
+                    result = {"success": False, "account_id": account_id, "error": str(e), "retryable": False}
+
+                if result.get("success") or not result.get("retryable") or attempt >= self.max_retries:
+                    break
+
+                self._sleep(self.backoff_delay(attempt))
+                attempt += 1
+
+            result["attempts"] = attempt + 1
+            result["elapsed"] = time.perf_counter() - started
+            return result
+        finally:
+            session.close()
+
+    def sync_accounts(self, account_ids: List[int]) -> Dict:
+        """
+        Verilen hesapları paralel olarak senkronize eder.
+
+        Args:
+            account_ids: Senkronize edilecek hesap ID'leri
+
+        Returns:
+            {"results": [...], "succeeded": adet, "failed": adet, "elapsed": saniye}
+        """
+        session = self.session_factory()
+        try:
+            accounts = session.query(BankAccount.id, BankAccount.bank_name).filter(
+                BankAccount.id.in_(account_ids)
+            ).all()
+        finally:
+            session.close()
+
+        bank_names = {account.id: account.bank_name for account in accounts}
+        started = time.perf_counter()
+        results = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bank-sync") as executor:
+            futures = {
+                executor.submit(self._sync_one, account_id, bank_names[account_id]): account_id
+                for account_id in account_ids
+                if account_id in bank_names
+            }
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append({"success": False, "account_id": futures[future], "error": str(e)})
+
+        for account_id in account_ids:
+            if account_id not in bank_names:
+                results.append({"success": False, "account_id": account_id, "error": "Hesap bulunamadı"})
+
+        succeeded = sum(1 for result in results if result.get("success"))
+        return {
+            "results": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "elapsed": time.perf_counter() - started
+        }
+
+    def sync_user_accounts(self, user_id: int) -> Dict:
+        """Kullanıcının tüm aktif banka hesaplarını paralel olarak senkronize eder."""
+        session = self.session_factory()
+        try:
+            account_ids = [
+                account_id for (account_id,) in session.query(BankAccount.id).filter(
+                    BankAccount.user_id == user_id,
+                    BankAccount.is_active == True
+                )
+            ]
+        finally:
+            session.close()
+
+        return self.sync_accounts(account_ids)
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from models.transaction import Transaction
 from models.category import Category
 from utils.db import db_session
@@ -115,29 +116,34 @@ class TransactionService:
             return True
     
     def get_monthly_totals(self, months: int = 6) -> dict:
-        """Son n aydaki aylık toplam gelir ve giderleri hesaplar."""
+        """Son n aydaki aylık toplam gelir ve giderleri tek bir gruplanmış sorguyla hesaplar."""
         today = datetime.now()
         start_date = today.replace(day=1) - timedelta(days=30 * (months - 1))
         
+        result = {}
+        for month in range(months):
+            month_date = start_date.replace(day=1) + timedelta(days=30 * month)
+            month_name = month_date.strftime("%Y-%m")
+            result[month_name] = {"income": 0, "expense": 0}
+        
+        month_expr = func.strftime("%Y-%m", Transaction.date)
+        
         with db_session() as session:
-            transactions = session.query(Transaction).filter(
-                Transaction.date >= start_date,
-                Transaction.date <= today
-            ).all()
-            
-            result = {}
-            for month in range(months):
-                month_date = start_date.replace(day=1) + timedelta(days=30 * month)
-                month_name = month_date.strftime("%Y-%m")
-                result[month_name] = {"income": 0, "expense": 0}
+            rows = session.query(
+                month_expr.label("month"),
+                Transaction.type,
+                func.sum(Transaction.amount).label("total")
+            ).filter(
+                Transaction.date >= start_date.date(),
+                Transaction.date <= today.date()
+            ).group_by(month_expr, Transaction.type).all()
             
-            for t in transactions:
-                month_name = t.date.strftime("%Y-%m")
-                if month_name in result:
-                    if t.type == "income":
-                        result[month_name]["income"] += t.amount
+            for row in rows:
+                if row.month in result:
+                    if row.type == "income":
+                        result[row.month]["income"] += row.total or 0
                     else:
-                        result[month_name]["expense"] += t.amount
+                        result[row.month]["expense"] += row.total or 0
             
             return result
             
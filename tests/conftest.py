@@ -0,0 +1,22 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models.database import Base
+from services import categorizer
+
+@pytest.fixture
+def db_session():
+    """Her test için boş bir bellek içi veritabanı oturumu oluşturur."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
+
+@pytest.fixture(autouse=True)
+def no_user_category_loader(monkeypatch):
+    """Kategorileme motorunun testlerde uygulama veritabanından kategori yüklemesini engeller."""
+    monkeypatch.setattr(categorizer, "_user_category_loader", None)
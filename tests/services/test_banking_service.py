@@ -0,0 +1,186 @@
+import pytest
+from datetime import date, timedelta
+from models.database import User, BankAccount, Transaction, MonthlyRollup
+from services.banking_service import BankingService, bank_cache
+from services.rollup_service import RollupService
+from utils.fake_bank_server import FakeBankServer
+
+@pytest.fixture(autouse=True)
+def clear_bank_cache():
+    """Paylaşılan banka önbelleğini testler arasında temizler."""
+    bank_cache.clear()
+    yield
+    bank_cache.clear()
+
+@pytest.fixture
+def account(db_session):
+    """Test için kullanıcı ve banka hesabı oluşturur."""
+    user = User(username="bank_user", email="bank@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.flush()
+    account = BankAccount(user_id=user.id, bank_name="example_bank", account_number="****1234")
+    db_session.add(account)
+    db_session.commit()
+    return account
+
+def _rollup_rows(db_session):
+    return {
+        (r.year_month, r.type.value, r.category): (r.total_amount, r.transaction_count)
+        for r in db_session.query(MonthlyRollup).all()
+    }
+
+def test_ingest_counts_inserted_skipped_failed(db_session, account):
+    """Toplu eklemenin eklenen, atlanan ve hatalı satırları doğru saydığını test eder."""
+    service = BankingService(db_session)
+    incoming = [
+        {"id": "a", "date": date(2024, 5, 1), "amount": 5000, "description": "Maaş ödemesi"},
+        {"id": "b", "date": date(2024, 5, 2), "amount": -150, "description": "Migros market"},
+        {"id": "b", "date": date(2024, 5, 2), "amount": -150, "description": "Migros market"},
+        {"id": "c", "date": "2024-06-03", "amount": -80, "description": "Taksi"},
+        {"id": "d", "date": date(2024, 5, 4), "description": "Tutar yok"},
+        {"id": "e", "date": "geçersiz", "amount": -10, "description": "Hatalı tarih"},
+    ]
+
+    result = service.ingest_bank_transactions(account, incoming)
+    assert (result["inserted"], result["skipped"], result["failed"]) == (3, 1, 2)
+
+    # Aynı veri tekrar geldiğinde hiçbir satır eklenmemeli
+    result = service.ingest_bank_transactions(account, incoming[:4])
+    assert (result["inserted"], result["skipped"], result["failed"]) == (0, 4, 0)
+    assert db_session.query(Transaction).count() == 3
+
+def test_ingest_skips_duplicates_outside_window(db_session, account):
+    """Tarihi değişmiş bir kopyanın benzersiz indeks ile atlandığını test eder."""
+    service = BankingService(db_session)
+    service.ingest_bank_transactions(account, [
+        {"id": "x", "date": date(2024, 1, 10), "amount": -40, "description": "Otobüs"}
+    ])
+
+    result = service.ingest_bank_transactions(account, [
+        {"id": "x", "date": date(2024, 3, 10), "amount": -40, "description": "Otobüs"},
+        {"id": "y", "date": date(2024, 3, 11), "amount": -60, "description": "Otobüs"},
+    ])
+
+    assert (result["inserted"], result["skipped"]) == (1, 1)
+
+def test_ingest_without_unique_index_falls_back_to_lookup(db_session, account):
+    """Migration'ı yapılmamış (tekil indeksi olmayan) veritabanında kopyaların sorguyla ayıklandığını test eder."""
+    db_session.connection().exec_driver_sql("DROP INDEX ux_transactions_user_source_external")
+    db_session.commit()
+    service = BankingService(db_session)
+    service.ingest_bank_transactions(account, [
+        {"id": "x", "date": date(2024, 1, 10), "amount": -40, "description": "Otobüs"}
+    ])
+
+    result = service.ingest_bank_transactions(account, [
+        {"id": "x", "date": date(2024, 3, 10), "amount": -40, "description": "Otobüs"},
+        {"id": "y", "date": date(2024, 3, 11), "amount": -60, "description": "Otobüs"},
+    ])
+
+    assert (result["inserted"], result["skipped"]) == (1, 1)
+    assert sorted(t.external_id for t in db_session.query(Transaction)) == ["x", "y"]
+
+def test_ingest_maintains_monthly_rollups(db_session, account):
+    """ORM dışı toplu eklemenin aylık özet tablosunu güncellediğini test eder."""
+    service = BankingService(db_session)
+    service.ingest_bank_transactions(account, [
+        {"id": str(i), "date": date(2024, 5 + i % 2, 1 + i), "amount": -10 * (i + 1), "description": "Market"}
+        for i in range(10)
+    ])
+
+    incremental = _rollup_rows(db_session)
+    RollupService(db_session).rebuild()
+    assert incremental == _rollup_rows(db_session)
+    assert incremental[("2024-05", "expense", "Gıda")] == (-250, 5)
+
+def test_incremental_sync_requests_only_delta(db_session, account):
+    """İmleç sonrası senkronizasyonun yalnızca örtüşme penceresini çektiğini test eder."""
+    first = BankingService(db_session).sync_account_transactions(account.id, days_back=30)
+    assert first["mode"] == "full"
+    assert first["new_transactions"] == first["total_transactions"] > 0
+
+    db_session.refresh(account)
+    assert account.sync_cursor_date.date() == date.today()
+    assert account.sync_cursor_external_id.startswith(f"tx_{account.id}_{date.today():%Y%m%d}")
+
+    second = BankingService(db_session).sync_account_transactions(account.id, overlap_days=2, use_cache=False)
+    assert second["mode"] == "incremental"
+    assert second["since"] == date.today() - timedelta(days=2)
+    assert second["total_transactions"] < first["total_transactions"]
+    assert second["new_transactions"] == 0
+
+def test_incremental_sync_sends_cursor_to_bank(db_session, account):
+    """HTTP bankalarında pencere başlangıcının gönderildiğini ve tüm sayfaların çekildiğini test eder."""
+    with FakeBankServer(transactions_per_account=10, page_size=4) as server:
+        account.bank_name = "fake_bank"
+        db_session.commit()
+        endpoints = {"fake_bank": server.endpoint()}
+
+        first = BankingService(db_session, api_endpoints=endpoints).sync_account_transactions(account.id, days_back=30)
+        result = BankingService(db_session, api_endpoints=endpoints).sync_account_transactions(account.id, use_cache=False)
+
+        queries = [entry["query"] for entry in server.request_log]
+
+    assert [query.get("cursor") for query in queries[:3]] == [
+        None, [f"{account.account_number}:4"], [f"{account.account_number}:8"]
+    ]
+    assert all(query["from"] == [(date.today() - timedelta(days=30)).isoformat()] for query in queries[:3])
+    assert (first["total_transactions"], first["new_transactions"]) == (10, 10)
+    assert account.sync_cursor_token is None
+
+    # Önceki senkronizasyon tamamlandığı için devam token'ı gönderilmez
+    assert queries[3] == {"from": [(date.today() - timedelta(days=3)).isoformat()]}
+    assert len(queries) == 4
+    assert result["new_transactions"] == 0
+    assert result["skipped_transactions"] == 4
+
+def test_interrupted_sync_resumes_from_saved_token(db_session, account, monkeypatch):
+    """Sayfalar arasında kesilen senkronizasyonun kaydedilen token'dan devam ettiğini test eder."""
+    original = BankingService._fetch_bank_transactions
+    calls = []
+
+    def failing_second_page(self, bank_account, since, continuation_token=None):
+        calls.append(continuation_token)
+        if len(calls) == 2:
+            raise RuntimeError("bağlantı koptu")
+        return original(self, bank_account, since, continuation_token)
+
+    monkeypatch.setattr(BankingService, "_fetch_bank_transactions", failing_second_page)
+    with FakeBankServer(transactions_per_account=10, page_size=4) as server:
+        account.bank_name = "fake_bank"
+        db_session.commit()
+        endpoints = {"fake_bank": server.endpoint()}
+
+        failed = BankingService(db_session, api_endpoints=endpoints).sync_account_transactions(account.id, days_back=30)
+        assert not failed["success"]
+        assert account.sync_cursor_token == f"{account.account_number}:4"
+        assert db_session.query(Transaction).count() == 4
+
+        resumed = BankingService(db_session, api_endpoints=endpoints).sync_account_transactions(
+            account.id, overlap_days=30
+        )
+
+    assert calls[2] == f"{account.account_number}:4"
+    assert resumed["new_transactions"] == 6
+    assert db_session.query(Transaction).count() == 10
+    assert account.sync_cursor_token is None
+
+def test_balance_cache_shared_across_service_instances(db_session, account, monkeypatch):
+    """Bakiye yanıtının servis örnekleri arasında paylaşıldığını ve senkronizasyonla yenilendiğini test eder."""
+    calls = []
+    original = BankingService._simulate_balance_api_call
+
+    def counting_balance_call(self, bank_account):
+        calls.append(bank_account.id)
+        return original(self, bank_account)
+
+    monkeypatch.setattr(BankingService, "_simulate_balance_api_call", counting_balance_call)
+
+    BankingService(db_session).get_account_summary(account.user_id)
+    BankingService(db_session).get_account_balance(account.id)
+    BankingService(db_session).get_account_summary(account.user_id)
+    assert calls == [account.id]
+
+    BankingService(db_session).sync_account_transactions(account.id)
+    BankingService(db_session).get_account_summary(account.user_id)
+    assert calls == [account.id, account.id]
@@ -0,0 +1,129 @@
+from datetime import date
+import pytest
+from sqlalchemy import event
+from models.database import User, Budget, BudgetAlertEvent, Transaction
+from services import budget_alerts
+from services.budget_alerts import BudgetAlertEvaluator, classify_budget, watch_budget_alerts
+from services.database_service import DatabaseService
+
+AS_OF = date(2024, 5, 15)
+
+@pytest.fixture
+def sent_alerts(monkeypatch):
+    """Commit sonrası gönderilen eşik bildirimlerini toplar."""
+    sent = []
+    monkeypatch.setattr(budget_alerts, "alert_notifier", sent.append)
+    return sent
+
+def _add_user(db_session, name, budgets, expenses):
+    """Kullanıcı, (kategori, limit) bütçeleri ve (kategori, tutar, tarih) giderleri ekler."""
+    user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.flush()
+    for category, limit in budgets:
+        db_session.add(Budget(user_id=user.id, name=category, category=category, amount=limit,
+                              start_date=date(2024, 1, 1), end_date=date(2024, 12, 31)))
+    for category, amount, day in expenses:
+        db_session.add(Transaction(user_id=user.id, amount=amount, type="expense", category=category, date=day))
+    db_session.commit()
+    return user.id
+
+def test_classify_budget_thresholds():
+    """Tehlike (%95) ve uyarı (%80) eşiklerinin doğru sınıflandırıldığını test eder."""
+    assert classify_budget(100, 100) == "budget_alert"
+    assert classify_budget(95, 100) == "budget_alert"
+    assert classify_budget(94.99, 100) == "budget_warning"
+    assert classify_budget(80, 100) == "budget_warning"
+    assert classify_budget(79.99, 100) is None
+
+def test_evaluate_uses_current_month_spending(db_session):
+    """Bu ayki harcamaların bütçelerle karşılaştırıldığını, diğer ayların sayılmadığını test eder."""
+    user_id = _add_user(db_session, "alice", [("Gıda", 1000), ("Ulaşım", 500), ("Eğlence", 300)], [
+        ("Gıda", 600, date(2024, 5, 2)),
+        ("Gıda", 250, date(2024, 5, 10)),
+        ("Gıda", 900, date(2024, 4, 28)),  # Geçen ay
+        ("Ulaşım", 550, date(2024, 5, 3)),
+        ("Eğlence", 100, date(2024, 5, 3))
+    ])
+
+    alerts = BudgetAlertEvaluator(db_session).evaluate([user_id], as_of=AS_OF)
+
+    assert {(a["type"], a["category"], a["spent"], a["remaining"]) for a in alerts[user_id]} == {
+        ("budget_warning", "Gıda", 850, 150),
+        ("budget_alert", "Ulaşım", 550, -50)
+    }
+
+def test_sweep_covers_all_users_in_one_query(db_session):
+    """Tüm kullanıcıların tek sorguyla değerlendirildiğini ve süresi dolan bütçelerin atlandığını test eder."""
+    over = _add_user(db_session, "over", [("Gıda", 100)], [("Gıda", 150, date(2024, 5, 1))])
+    under = _add_user(db_session, "under", [("Gıda", 100)], [("Gıda", 10, date(2024, 5, 1))])
+    no_spending = _add_user(db_session, "idle", [("Gıda", 100)], [])
+    expired = _add_user(db_session, "expired", [], [("Gıda", 500, date(2024, 5, 1))])
+    db_session.add(Budget(user_id=expired, name="Eski", category="Gıda", amount=100,
+                          start_date=date(2023, 1, 1), end_date=date(2023, 12, 31)))
+    db_session.commit()
+
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    evaluator = BudgetAlertEvaluator(db_session)
+    alerts = evaluator.evaluate(as_of=AS_OF)
+
+    assert len(statements) == 1
+    assert list(alerts) == [over]
+    spending = {row["user_id"]: row["spent"] for row in evaluator.budget_spending(as_of=AS_OF)}
+    assert spending == {over: 150, under: 10, no_spending: 0}
+    assert evaluator.evaluate([under, no_spending], as_of=AS_OF) == {}
+
+def test_transaction_write_notifies_each_threshold_crossing_once(db_session, sent_alerts, tmp_path, monkeypatch):
+    """Eşiklerin işlem eklenirken aşıldığı anda ve yalnızca bir kez bildirildiğini test eder."""
+    monkeypatch.chdir(tmp_path)
+    today = date.today()
+    user_id = _add_user(db_session, "bob", [], [])
+    db_session.add(Budget(user_id=user_id, name="Market", category="Gıda", amount=1000,
+                          start_date=today.replace(day=1), end_date=today))
+    db_session.commit()
+    service = DatabaseService(db_session)
+
+    def spend(amount, category="Gıda"):
+        return service.create_transaction(user_id, amount, "expense", category, "test", today)
+
+    spend(500)
+    spend(200, "Ulaşım")
+    assert sent_alerts == []
+
+    spend(350)  # %85
+    spend(50)   # %90, uyarı zaten gönderildi
+    assert [(a["type"], a["spent"], a["remaining"]) for a in sent_alerts] == [("budget_warning", 850, 150)]
+
+    transaction = spend(200)  # %110
+    assert [a["type"] for a in sent_alerts] == ["budget_warning", "budget_alert"]
+
+    # Silinip tekrar eklenen harcama aynı aşımı yeniden bildirmez
+    service.delete_transaction(transaction.id)
+    spend(200)
+    assert len(sent_alerts) == 2
+    assert db_session.query(BudgetAlertEvent).count() == 2
+
+def test_crossing_is_only_notified_for_committed_watched_writes(db_session, sent_alerts):
+    """Geri alınan veya izlenmeyen yazımlarda bildirim gönderilmediğini test eder."""
+    today = date.today()
+    user_id = _add_user(db_session, "carol", [], [])
+    db_session.add(Budget(user_id=user_id, name="Eğlence", category="Eğlence", amount=100,
+                          start_date=today.replace(day=1), end_date=today))
+    db_session.commit()
+
+    db_session.add(Transaction(user_id=user_id, amount=150, type="expense", category="Eğlence", date=today))
+    watch_budget_alerts(db_session)
+    db_session.flush()
+    db_session.rollback()
+    assert sent_alerts == []
+
+    # Aynı anda iki eşiği birden aşan harcama yalnızca en yüksek seviyeyi bildirir
+    db_session.add(Transaction(user_id=user_id, amount=150, type="expense", category="Eğlence", date=today))
+    db_session.commit()
+    assert sent_alerts == []
+    db_session.add(Transaction(user_id=user_id, amount=1, type="expense", category="Eğlence", date=today))
+    watch_budget_alerts(db_session)
+    db_session.commit()
+    assert [(a["type"], a["spent"]) for a in sent_alerts] == [("budget_alert", 151)]
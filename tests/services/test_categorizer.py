@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+import pytest
+from services import categorizer as categorizer_module
+from services.categorizer import Categorizer, get_categorizer, set_custom_categories, invalidate_user_categories
+
+# Testlerden önce kayıtlı varsayılan yükleyici (fixture'lar bunu devre dışı bırakır)
+DEFAULT_LOADER = categorizer_module._user_category_loader
+
+@pytest.fixture(autouse=True)
+def reset_registry(monkeypatch):
+    """Paylaşılan kategorileme motorlarını testler arasında sıfırlar."""
+    monkeypatch.setattr(categorizer_module, "_custom_categories", {})
+    monkeypatch.setattr(categorizer_module, "_categorizers", categorizer_module.OrderedDict())
+    monkeypatch.setattr(categorizer_module, "_user_category_loader", None)
+
+@pytest.mark.parametrize("description, expected", [
+    ("Migros market", "Gıda"),
+    ("MIGROS SANAL MARKET", "Gıda"),
+    ("SHELL AKARYAKIT ISTANBUL", "Ulaşım"),
+    ("İSTANBUL ELEKTRİK FATURASI", "Fatura"),
+    ("Fatura ödemesi", "Fatura"),
+    ("MAAS ODEMESI", "Maaş"),
+    ("Eczane ilaç", "Sağlık"),
+    ("Netflix", "Diğer"),
+    ("Sushi restoran", "Diğer"),
+    ("", "Diğer"),
+    (None, "Diğer"),
+])
+def test_default_keywords(description, expected):
+    """Varsayılan anahtar kelimelerle büyük/küçük harf ve Türkçe karakterden bağımsız eşleşmeyi test eder."""
+    assert Categorizer().categorize(description) == expected
+
+def test_most_distinct_keywords_win_and_ties_follow_order():
+    """En çok farklı anahtar kelimesi eşleşen kategorinin, eşitlikte ilk tanımlananın seçildiğini test eder."""
+    categorizer = Categorizer({"A": ["elma", "armut"], "B": ["kiraz"], "C": ["armut"]})
+
+    assert categorizer.categorize("kiraz armut elma elma") == "A"
+    assert categorizer.categorize("kiraz armut") == "A"
+    assert categorizer.categorize("kiraz") == "B"
+
+def test_categorize_many_matches_single_calls_and_memoizes():
+    """Toplu kategorilemenin tekil sonuçlarla aynı olduğunu ve tekrarları önbellekten verdiğini test eder."""
+    categorizer = Categorizer()
+    descriptions = ["Migros", "Taksi", None, "Migros", "Kira ödemesi"] * 100
+
+    assert categorizer.categorize_many(descriptions) == [categorizer.categorize(d) for d in descriptions]
+    assert categorizer.cache_info().currsize == 3
+
+def test_reload_swaps_keywords():
+    """Anahtar kelimelerin çalışırken yeniden derlenebildiğini test eder."""
+    categorizer = Categorizer({"Gıda": ["market"]})
+    assert categorizer.categorize("kahve dükkanı") == "Diğer"
+
+    categorizer.reload({"Kafe": ["kahve"]})
+
+    assert categorizer.categorize("kahve dükkanı") == "Kafe"
+    assert categorizer.categorize("market") == "Diğer"
+
+def test_custom_categories_are_picked_up_on_change():
+    """Kullanıcı kategorilerinin eklenince yeni motora yansıdığını test eder."""
+    assert get_categorizer(7).categorize("Kırtasiye alışverişi") == "Diğer"
+
+    set_custom_categories(["Kırtasiye"], user_id=7)
+
+    assert get_categorizer(7).categorize("KIRTASIYE ALISVERISI") == "Kırtasiye"
+    assert get_categorizer(8).categorize("Kırtasiye alışverişi") == "Diğer"
+
+def test_user_categories_load_lazily_and_invalidate():
+    """Kullanıcı kategorilerinin ilk kullanımda yüklendiğini ve geçersiz kılınınca yenilendiğini test eder."""
+    stored = {5: ["Evcil Hayvan"]}
+    calls = []
+
+    def loader(user_id):
+        calls.append(user_id)
+        return stored.get(user_id, [])
+
+    categorizer_module.register_user_category_loader(loader)
+
+    assert get_categorizer(5).categorize("evcil hayvan maması") == "Evcil Hayvan"
+    assert get_categorizer(5).categorize("evcil hayvan maması") == "Evcil Hayvan"
+    assert calls == [5]
+
+    stored[5] = ["Mama"]
+    invalidate_user_categories(5)
+
+    assert get_categorizer(5).categorize("evcil hayvan maması") == "Mama"
+    assert calls == [5, 5]
+
+def test_default_loader_reads_categories_from_category_service(monkeypatch):
+    """Varsayılan yükleyicinin category_service içe aktarılmadan kayıtlı olduğunu test eder."""
+    from services.category_service import CategoryService
+
+    assert DEFAULT_LOADER is categorizer_module._load_user_categories
+    monkeypatch.setattr(CategoryService, "get_categories_by_user",
+                        lambda self, user_id: [SimpleNamespace(name="Evcil Hayvan")])
+    categorizer_module.register_user_category_loader(DEFAULT_LOADER)
+
+    assert get_categorizer(11).categorize("evcil hayvan maması") == "Evcil Hayvan"
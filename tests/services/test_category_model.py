@@ -0,0 +1,193 @@
+import threading
+import joblib
+import pytest
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models.database import Base, User, BankAccount, Transaction
+from services.banking_service import BankingService, bank_cache
+from services.category_model import CategoryModel, CategoryModelStore
+from services.database_service import DatabaseService
+from services.job_handlers import register_default_handlers
+from services.job_queue import JobQueue
+
+LABELED = [
+    ("STARBUCKS KADIKOY", "Kafe"), ("Starbucks Besiktas", "Kafe"), ("STARBUCKS ISTINYE", "Kafe"),
+    ("NETFLIX.COM", "Abonelik"), ("Spotify AB Stockholm", "Abonelik"), ("NETFLIX AYLIK", "Abonelik"),
+    ("YEMEKSEPETI SIPARIS", "Yemek"), ("Yemeksepeti Online", "Yemek"), ("GETIR YEMEK", "Yemek"),
+] * 5
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Modelleri geçici dizinde tutan ve paylaşılan deponun yerine geçen model deposu."""
+    store = CategoryModelStore(model_dir=str(tmp_path / "models"), min_confidence=0.4, min_training_samples=10)
+    for module in ("services.category_model", "services.banking_service"):
+        monkeypatch.setattr(f"{module}.category_models", store)
+    bank_cache.clear()
+    yield store
+    bank_cache.clear()
+
+@pytest.fixture
+def user(db_session):
+    user = User(username="model_user", email="model@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+def _trained_model():
+    return CategoryModel(n_features=2 ** 16).fit([d for d, _ in LABELED], [c for _, c in LABELED])
+
+def test_predicts_merchants_from_labeled_history():
+    """Etiketli açıklamalardan eğitilen modelin benzer işyerlerini doğru tahmin ettiğini test eder."""
+    predictions = _trained_model().predict(["STARBUCKS LEVENT", "netflix.com premium", "Yemeksepeti"])
+
+    assert [category for category, _ in predictions] == ["Kafe", "Abonelik", "Yemek"]
+    assert all(0 < confidence <= 1 for _, confidence in predictions)
+
+def test_partial_fit_learns_new_category():
+    """Artımlı eğitimin daha önce görülmemiş bir kategoriyi eklediğini test eder."""
+    model = _trained_model()
+    assert "Evcil Hayvan" not in model.classes
+
+    model.partial_fit(["PETSHOP KEDI MAMASI"] * 10, ["Evcil Hayvan"] * 10)
+
+    assert "Evcil Hayvan" in model.classes
+    assert model.predict(["petshop mama"])[0][0] == "Evcil Hayvan"
+    assert model.predict(["STARBUCKS MODA"])[0][0] == "Kafe"
+
+def test_save_and_load_round_trip(tmp_path):
+    """Kaydedilen modelin aynı tahminleri verdiğini ve sürüm uyumsuzluğunun reddedildiğini test eder."""
+    model = _trained_model()
+    path = str(tmp_path / "model.joblib")
+    model.save(path)
+
+    loaded = CategoryModel.load(path)
+    assert loaded.predict(["NETFLIX"]) == model.predict(["NETFLIX"])
+    assert loaded.n_samples == len(LABELED)
+
+    payload = joblib.load(path)
+    payload["version"] = -1
+    joblib.dump(payload, path)
+    with pytest.raises(ValueError):
+        CategoryModel.load(path)
+
+def test_bank_ingest_uses_model_for_unmatched_rows(db_session, user, store):
+    """Anahtar kelimeyle eşleşmeyen banka işlemlerinin kullanıcı modeliyle kategorilendiğini test eder."""
+    db_session.add_all([
+        Transaction(user_id=user.id, amount=-50, type="expense", category=category,
+                    description=description, date=datetime(2024, 1, 1))
+        for description, category in LABELED
+    ])
+    db_session.commit()
+    assert store.train(db_session, user.id) is not None
+
+    account = BankAccount(user_id=user.id, bank_name="example_bank", account_number="****9999")
+    db_session.add(account)
+    db_session.commit()
+    BankingService(db_session).ingest_bank_transactions(account, [
+        {"id": "1", "date": date(2024, 2, 1), "amount": -90, "description": "STARBUCKS NISANTASI"},
+        {"id": "2", "date": date(2024, 2, 2), "amount": -300, "description": "MIGROS MARKET"},
+    ])
+
+    categories = dict(db_session.query(Transaction.external_id, Transaction.category).filter(
+        Transaction.external_id.isnot(None)
+    ).all())
+    assert categories == {"1": "Kafe", "2": "Gıda"}
+
+def test_recategorization_trains_then_updates_model(db_session, user, store, tmp_path, monkeypatch):
+    """Kategori düzeltmesinin önce modeli eğittiğini, sonra artımlı güncellediğini test eder."""
+    monkeypatch.chdir(tmp_path)
+    db_session.add_all([
+        Transaction(user_id=user.id, amount=-50, type="expense", category=category,
+                    description=description, date=datetime(2024, 1, 1))
+        for description, category in LABELED
+    ])
+    pet = Transaction(user_id=user.id, amount=-120, type="expense", category="Diğer",
+                      description="PETSHOP KEDI MAMASI", date=datetime(2024, 1, 2))
+    db_session.add(pet)
+    db_session.commit()
+    queue = register_default_handlers(JobQueue(sessionmaker(bind=db_session.get_bind())))
+    service = DatabaseService(db_session, job_queue=queue)
+
+    service.update_transaction(db_session.query(Transaction).first().id, category="Kafe")
+    # Model güncellemesi arka plan işidir; iş çalışana kadar model eğitilmez
+    assert store.get(user.id) is None
+    assert queue.run_pending() == 1
+    model = store.get(user.id)
+    assert model is not None and "Evcil Hayvan" not in model.classes
+
+    for _ in range(5):
+        service.update_transaction(pet.id, category="Evcil Hayvan")
+    assert queue.run_pending() == 5
+
+    reloaded = CategoryModelStore(model_dir=store.model_dir).get(user.id)
+    assert reloaded.predict(["PETSHOP MAMA"])[0][0] == "Evcil Hayvan"
+
+def test_training_one_user_does_not_block_others(tmp_path, monkeypatch):
+    """Bir kullanıcının modeli eğitilirken diğer kullanıcıların modellerine erişilebildiğini test eder."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'models.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    db.add_all([User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in (1, 2)])
+    db.flush()
+    db.add_all([
+        Transaction(user_id=user_id, amount=-50, type="expense", category=category,
+                    description=description, date=datetime(2024, 1, 1))
+        for user_id in (1, 2) for description, category in LABELED
+    ])
+    db.commit()
+    db.close()
+
+    store = CategoryModelStore(model_dir=str(tmp_path / "models"), min_training_samples=10)
+    store.learn(session_factory(), 2, [], [])
+
+    started, release = threading.Event(), threading.Event()
+    original_fit = CategoryModel.fit
+
+    def blocking_fit(self, *args, **kwargs):
+        started.set()
+        release.wait(timeout=5)
+        return original_fit(self, *args, **kwargs)
+
+    monkeypatch.setattr(CategoryModel, "fit", blocking_fit)
+    trainer = threading.Thread(target=store.learn, args=(session_factory(), 1, ["STARBUCKS"], ["Kafe"]))
+    trainer.start()
+    try:
+        assert started.wait(timeout=5)
+        other = threading.Thread(target=store.learn, args=(session_factory(), 2, ["NETFLIX"], ["Abonelik"]))
+        other.start()
+        other.join(timeout=2)
+        assert not other.is_alive()
+        assert store.get(2) is not None
+    finally:
+        release.set()
+        trainer.join(timeout=10)
+        engine.dispose()
+
+    assert store.get(1) is not None
+
+def test_predict_sees_consistent_classes_while_adding_categories():
+    """Yeni kategori eklenirken eşzamanlı tahminin sınıf listesi ile ağırlıkları tutarlı gördüğünü test eder."""
+    model = _trained_model()
+    errors = []
+    stop = threading.Event()
+
+    def predict_loop():
+        while not stop.is_set():
+            try:
+                model.predict(["STARBUCKS LEVENT", "PETSHOP MAMA"])
+            except Exception as e:
+                errors.append(e)
+
+    reader = threading.Thread(target=predict_loop)
+    reader.start()
+    try:
+        for i in range(30):
+            model.partial_fit([f"YENI ISYERI {i}"], [f"Kategori {i}"])
+    finally:
+        stop.set()
+        reader.join(timeout=5)
+
+    assert errors == []
+    assert "Kategori 29" in model.classes
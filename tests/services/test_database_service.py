@@ -0,0 +1,81 @@
+import pytest
+from datetime import datetime, timedelta
+from models.database import User, Transaction
+from services.database_service import DatabaseService
+
+@pytest.fixture
+def db_service(db_session, tmp_path, monkeypatch):
+    """Log dosyalarını geçici dizine yazan DatabaseService oluşturur."""
+    monkeypatch.chdir(tmp_path)
+    service = DatabaseService(db_session)
+    service.clear_cache()
+    return service
+
+@pytest.fixture
+def test_user(db_session):
+    """Aynı güne düşen işlemleri de içeren örnek geçmişi olan kullanıcı oluşturur."""
+    user = User(username="pager", email="pager@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.flush()
+
+    start = datetime(2024, 1, 1)
+    db_session.add_all([
+        Transaction(
+            user_id=user.id,
+            amount=10 + i,
+            type="expense" if i % 2 else "income",
+            category="Gıda",
+            # Her gün üç işlem: aynı tarihli kayıtlar id ile sıralanmalı
+            date=start + timedelta(days=i // 3)
+        )
+        for i in range(23)
+    ])
+    db_session.commit()
+    return user
+
+def test_keyset_pages_match_offset_order(db_service, test_user):
+    """İmleçli sayfaların OFFSET sıralamasıyla aynı ve eksiksiz olduğunu test eder."""
+    expected = [
+        t.id for t in db_service.get_user_transactions(test_user.id, per_page=100)["transactions"]
+    ]
+
+    seen = []
+    cursor = None
+    while True:
+        page = db_service.get_user_transactions_page(test_user.id, cursor=cursor, per_page=5)
+        assert page["total"] == 23
+        seen.extend(t.id for t in page["transactions"])
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            break
+        cursor = page["next_cursor"]
+
+    assert seen == expected
+    assert len(seen) == 23
+
+def test_keyset_page_applies_filters(db_service, test_user):
+    """Filtrelerin imleçli sayfalamada da uygulandığını test eder."""
+    first = db_service.get_user_transactions_page(test_user.id, per_page=4, transaction_type="income")
+    second = db_service.get_user_transactions_page(
+        test_user.id, cursor=first["next_cursor"], per_page=4, transaction_type="income"
+    )
+
+    assert first["total"] == 12
+    assert all(t.type.value == "income" for t in first["transactions"] + second["transactions"])
+    assert not {t.id for t in first["transactions"]} & {t.id for t in second["transactions"]}
+
+def test_transaction_count_cached_until_write(db_service, db_session, test_user):
+    """Toplam sayının önbellekten okunduğunu ve yeni işlemle güncellendiğini test eder."""
+    assert db_service.count_user_transactions(test_user.id) == 23
+    hits = db_service.cache_stats()["hits"]
+    assert db_service.get_user_transactions_page(test_user.id, per_page=5)["total"] == 23
+    assert db_service.cache_stats()["hits"] == hits + 1
+
+    db_session.add(Transaction(user_id=test_user.id, amount=1, type="expense", category="Gıda", date=datetime(2024, 2, 1)))
+    db_session.commit()
+    assert db_service.get_user_transactions_page(test_user.id, per_page=5)["total"] == 24
+
+def test_invalid_cursor_raises(db_service, test_user):
+    """Bozuk imlecin ValueError ürettiğini test eder."""
+    with pytest.raises(ValueError):
+        db_service.get_user_transactions_page(test_user.id, cursor="bozuk-imlec")
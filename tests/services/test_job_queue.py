@@ -0,0 +1,209 @@
+import hashlib
+import threading
+import time
+from datetime import date
+import pytest
+from sqlalchemy.orm import sessionmaker
+from models.database import Base, Job, JobStatus, Transaction, User
+from services import job_handlers
+from services.job_queue import JobQueue, make_idempotency_key
+from utils.blob_store import BlobStore
+from utils.engine import create_sqlite_engine
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """İşçi iş parçacıklarının paylaşabileceği dosya tabanlı (WAL) test veritabanı."""
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def user_id(session_factory):
+    session = session_factory()
+    user = User(username="job_user", email="job@example.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+    user_id = user.id
+    session.close()
+    return user_id
+
+def _wait_for(queue, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"İş #{job_id} zamanında bitmedi")
+
+def test_job_runs_and_records_progress_and_result(session_factory, user_id):
+    """İşin sonucunun, ilerlemesinin ve sahibinin kaydedildiğini test eder."""
+    queue = JobQueue(session_factory)
+    progress_seen = []
+
+    def handler(payload, context):
+        context.report_progress(0.5, "yarısı")
+        progress_seen.append(queue.get(context.job_id)["progress"])
+        return {"total": payload["a"] + payload["b"], "user_id": context.user_id}
+
+    queue.register("add", handler)
+    job_id = queue.submit("add", {"a": 2, "b": 3}, user_id=user_id)
+
+    assert queue.get(job_id)["status"] == "pending"
+    assert queue.run_pending() == 1
+
+    job = queue.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"total": 5, "user_id": user_id}
+    assert (job["progress"], job["attempts"]) == (1.0, 1)
+    assert progress_seen == [0.5]
+    assert [j["id"] for j in queue.list_jobs(user_id)] == [job_id]
+
+def test_idempotency_key_deduplicates_submissions(session_factory):
+    """Aynı anahtarla tekrar gönderilen işin yeniden oluşturulmadığını test eder."""
+    queue = JobQueue(session_factory)
+    queue.register("export", lambda payload, context: payload)
+    key = make_idempotency_key("export", {"year": 2024, "month": 3})
+
+    first = queue.submit("export", {"year": 2024, "month": 3}, idempotency_key=key)
+    second = queue.submit("export", {"year": 2024, "month": 3}, idempotency_key=key)
+    other = queue.submit("export", {"year": 2024, "month": 4},
+                         idempotency_key=make_idempotency_key("export", {"month": 4, "year": 2024}))
+
+    assert first == second != other
+    assert key == make_idempotency_key("export", {"month": 3, "year": 2024})
+    assert queue.run_pending() == 2
+
+    with pytest.raises(ValueError):
+        queue.submit("unknown")
+
+def test_failed_job_records_error_and_can_be_retried(session_factory):
+    """Hata veren işin hata mesajıyla bittiğini ve tekrar sıraya alınabildiğini test eder."""
+    queue = JobQueue(session_factory)
+    calls = []
+
+    def flaky(payload, context):
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("SMTP bağlantısı kurulamadı")
+        return "ok"
+
+    queue.register("email", flaky)
+    job_id = queue.submit("email")
+    queue.run_pending()
+
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "ValueError: SMTP bağlantısı kurulamadı"
+
+    assert queue.retry(job_id)
+    assert not queue.retry(job_id)
+    queue.run_pending()
+    assert (queue.get(job_id)["status"], queue.get(job_id)["attempts"]) == ("succeeded", 2)
+
+def test_restart_resumes_interrupted_jobs(session_factory):
+    """Süreç kapanırken çalışan ve sırada bekleyen işlerin yeniden başlatmada çalıştığını test eder."""
+    first = JobQueue(session_factory)
+    first.register("work", lambda payload, context: payload["n"])
+    interrupted = first.submit("work", {"n": 1})
+    waiting = first.submit("work", {"n": 2})
+    # İş sahiplenildi ama süreç sonucu yazamadan kapandı
+    assert first.claim() == interrupted
+
+    restarted = JobQueue(session_factory, max_workers=2, poll_interval=0.05)
+    restarted.register("work", lambda payload, context: payload["n"] * 10)
+    restarted.start()
+    try:
+        assert _wait_for(restarted, interrupted)["result"] == 10
+        assert _wait_for(restarted, waiting)["result"] == 20
+    finally:
+        restarted.stop()
+    assert not restarted.running
+
+def test_worker_pool_runs_jobs_concurrently_without_double_claims(session_factory):
+    """İşlerin paralel çalıştığını ve hiçbir işin iki kez çalışmadığını test eder."""
+    queue = JobQueue(session_factory, max_workers=4, poll_interval=0.05)
+    lock = threading.Lock()
+    active, peak, runs = [0], [0], []
+
+    def slow(payload, context):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            runs.append(payload["n"])
+        time.sleep(0.2)
+        with lock:
+            active[0] -= 1
+        return payload["n"]
+
+    queue.register("slow", slow)
+    job_ids = [queue.submit("slow", {"n": n}) for n in range(8)]
+    started = time.perf_counter()
+    queue.start()
+    try:
+        for job_id in job_ids:
+            _wait_for(queue, job_id)
+    finally:
+        queue.stop()
+
+    assert sorted(runs) == list(range(8))
+    assert peak[0] > 1
+    # Sıralı çalışsaydı 1.6 saniye sürerdi
+    assert time.perf_counter() - started < 1.4
+
+    session = session_factory()
+    try:
+        assert session.query(Job).filter(Job.status == JobStatus.SUCCEEDED).count() == 8
+    finally:
+        session.close()
+
+def test_receipt_ocr_submission_is_deduplicated_per_image(session_factory, user_id, tmp_path, monkeypatch):
+    """Aynı makbuzun tekrar gönderilmesinde görüntünün depoya bir kez yazıldığını ve işin tekrarlanmadığını test eder."""
+    store = BlobStore(str(tmp_path / "receipts"))
+    monkeypatch.setattr(job_handlers, "receipt_store", store)
+    queue = job_handlers.register_default_handlers(JobQueue(session_factory))
+
+    first = job_handlers.submit_receipt_ocr(queue, user_id, b"receipt-image")
+    second = job_handlers.submit_receipt_ocr(queue, user_id, b"receipt-image")
+
+    assert first == second
+    job = queue.get(first)
+    assert (job["kind"], job["status"], job["user_id"]) == ("ocr_receipt", "pending", user_id)
+    assert store.exists(hashlib.sha256(b"receipt-image").hexdigest())
+
+def test_recurring_materialization_runs_once_per_day(session_factory, user_id):
+    """Günlük tekrarlayan işlem üretiminin gün başına bir kez kuyruğa alınıp çalıştığını test eder."""
+    session = session_factory()
+    session.add(Transaction(user_id=user_id, amount=9000, type="expense", category="Kira",
+                            date=date(2024, 1, 1), is_recurring=True, recurring_type="monthly"))
+    session.commit()
+    session.close()
+    queue = job_handlers.register_default_handlers(JobQueue(session_factory))
+
+    first = job_handlers.submit_recurring_materialization(queue, date(2024, 3, 5))
+    assert job_handlers.submit_recurring_materialization(queue, date(2024, 3, 5)) == first
+    assert queue.run_pending() == 1
+
+    assert queue.get(first)["result"] == {"series": 1, "inserted": 2, "skipped": 0}
+
+def test_shared_queue_schedules_materialization_each_day(session_factory, monkeypatch):
+    """Açılışta alınan paylaşılan kuyruğun günün üretimini ekleyip gün değişince yenisini eklediğini test eder."""
+    monkeypatch.setattr(job_handlers, "JobQueue", lambda **options: JobQueue(session_factory, **options))
+    monkeypatch.setattr(job_handlers, "_job_queue", None)
+    monkeypatch.setattr(job_handlers, "_materialization_scheduled_on", None)
+
+    queue = job_handlers.get_job_queue()
+    try:
+        assert queue.running
+        assert job_handlers.get_job_queue() is queue
+        assert job_handlers.schedule_recurring_materialization(queue) is None
+        next_day = job_handlers.schedule_recurring_materialization(queue, date(2099, 1, 2))
+    finally:
+        queue.stop()
+
+    session = session_factory()
+    keys = [key for (key,) in session.query(Job.idempotency_key).filter(Job.kind == "recurring_materialize").order_by(Job.id)]
+    session.close()
+    assert keys == [f"recurring_materialize:{date.today().isoformat()}", "recurring_materialize:2099-01-02"]
+    assert next_day is not None
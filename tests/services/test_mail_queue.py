@@ -0,0 +1,142 @@
+import socket
+import pytest
+import services.mail_queue as mail_queue_module
+from services.mail_queue import MailQueue, SMTPConnectionPool, build_message, get_mail_queue, get_smtp_pool
+
+controller_module = pytest.importorskip("aiosmtpd.controller")
+
+class RecordingHandler:
+    """Gelen mesajları ve bağlantıları kaydeden, alıcıya göre hata döndüren SMTP işleyicisi."""
+
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+        self.attempts = {}
+        self.dropped = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        self.peers.add(session.peer)
+        self.attempts[address] = self.attempts.get(address, 0) + 1
+        if address.startswith("bad@"):
+            return "550 Mailbox unavailable"
+        # İlk denemede geçici hata
+        if address.startswith("busy@") and self.attempts[address] == 1:
+            return "451 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        # İlk denemede sunucu bağlantıyı kapatıyor
+        if "drop@example.com" in envelope.rcpt_tos and "drop@example.com" not in self.dropped:
+            self.dropped.add("drop@example.com")
+            return "421 Closing connection"
+        self.messages.extend(envelope.rcpt_tos)
+        return "250 Message accepted"
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def smtp_server():
+    """Yerel aiosmtpd sunucusunu başlatır."""
+    handler = RecordingHandler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        yield handler, controller.port
+    finally:
+        controller.stop()
+
+def _message(to_email):
+    return build_message("finans@example.com", to_email, "Aylık özet", "Merhaba")
+
+def test_bulk_send_reuses_pooled_connections(smtp_server):
+    """Toplu gönderimin mesaj başına değil havuz boyutu kadar bağlantı açtığını test eder."""
+    handler, port = smtp_server
+    pool = SMTPConnectionPool("127.0.0.1", port, starttls=False, max_size=2)
+    queue = MailQueue(pool, batch_size=50)
+    queue.start()
+
+    queue.enqueue_many(_message(f"user{i}@example.com") for i in range(300))
+
+    assert queue.stop(timeout=30)
+    assert sorted(handler.messages) == sorted(f"user{i}@example.com" for i in range(300))
+    assert pool.opened <= 2
+    assert len(handler.peers) == pool.opened
+    assert queue.stats == {"queued": 300, "sent": 300, "failed": 0, "retried": 0, "pending": 0}
+
+def test_connection_recycled_after_message_limit(smtp_server):
+    """Bağlantının belirli mesaj sayısından sonra kapatılıp yenisinin açıldığını test eder."""
+    handler, port = smtp_server
+    pool = SMTPConnectionPool("127.0.0.1", port, starttls=False, max_size=1, max_messages_per_connection=10)
+    for i in range(25):
+        pool.send(_message(f"user{i}@example.com"))
+    pool.close()
+
+    assert len(handler.messages) == 25
+    assert pool.opened == 3
+
+def test_transient_errors_are_retried_and_permanent_errors_fail(smtp_server):
+    """4xx hatalarının yeniden denendiğini, 5xx hatalarının denenmeden başarısız olduğunu test eder."""
+    handler, port = smtp_server
+    pool = SMTPConnectionPool("127.0.0.1", port, starttls=False, max_size=1)
+    queue = MailQueue(pool, batch_size=10, backoff_base=0.01, backoff_max=0.05)
+    queue.start()
+
+    queue.enqueue_many([_message("busy@example.com"), _message("bad@example.com"), _message("ok@example.com")])
+
+    assert queue.stop(timeout=10)
+    assert sorted(handler.messages) == ["busy@example.com", "ok@example.com"]
+    assert handler.attempts == {"busy@example.com": 2, "bad@example.com": 1, "ok@example.com": 1}
+    assert queue.stats == {"queued": 3, "sent": 2, "failed": 1, "retried": 1, "pending": 0}
+    # Alıcı hataları bağlantıyı bozmaz
+    assert pool.opened == 1
+
+def test_lost_connection_resends_rest_of_batch_on_new_connection(smtp_server):
+    """Parti ortasında kopan bağlantıda kalan mesajların yeni bağlantıyla gönderildiğini test eder."""
+    handler, port = smtp_server
+    pool = SMTPConnectionPool("127.0.0.1", port, starttls=False, max_size=1)
+    queue = MailQueue(pool, batch_size=10, backoff_base=0.01, backoff_max=0.05)
+    queue.start()
+
+    queue.enqueue_many([_message("first@example.com"), _message("drop@example.com"), _message("last@example.com")])
+
+    assert queue.stop(timeout=10)
+    assert sorted(handler.messages) == ["drop@example.com", "first@example.com", "last@example.com"]
+    assert queue.stats["retried"] == 1
+    assert pool.opened == 2
+
+def test_unreachable_server_gives_up_after_max_retries():
+    """Sunucuya bağlanılamadığında mesajların sınırlı sayıda yeniden denendiğini test eder."""
+    pool = SMTPConnectionPool("127.0.0.1", _free_port(), starttls=False, max_size=1, timeout=1)
+    queue = MailQueue(pool, max_retries=2, backoff_base=0.01, backoff_max=0.02)
+    queue.start()
+
+    queue.enqueue_many([_message("a@example.com"), _message("b@example.com")])
+
+    assert queue.stop(timeout=10)
+    assert queue.stats == {"queued": 2, "sent": 0, "failed": 2, "retried": 4, "pending": 0}
+    assert pool.opened == 0
+
+def test_shared_pool_depends_on_password_and_queue_stops_at_exit(monkeypatch):
+    """Parolası farklı havuzların ayrıldığını ve paylaşılan kuyruğun çıkışta durdurulduğunu test eder."""
+    monkeypatch.setattr(mail_queue_module, "_pools", {})
+    monkeypatch.setattr(mail_queue_module, "_queues", {})
+    exit_handlers = []
+    monkeypatch.setattr(mail_queue_module.atexit, "register", lambda func, *args: exit_handlers.append((func, args)))
+
+    pool = get_smtp_pool("127.0.0.1", 2525, "finans", "eski")
+    assert get_smtp_pool("127.0.0.1", 2525, "finans", "eski") is pool
+    rotated = get_smtp_pool("127.0.0.1", 2525, "finans", "yeni")
+    assert rotated is not pool and rotated.password == "yeni"
+
+    queue = get_mail_queue(pool)
+    assert get_mail_queue(pool) is queue
+    rotated_queue = get_mail_queue(rotated)
+    assert rotated_queue is not queue
+    assert [func for func, _ in exit_handlers] == [queue.stop, rotated_queue.stop]
+
+    for func, args in exit_handlers:
+        assert func(*args)
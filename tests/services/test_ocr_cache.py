@@ -0,0 +1,60 @@
+from models.database import User, Receipt, OCRCacheEntry
+from services.ocr_cache import OCRResultCache, find_duplicate_receipt, image_hash, ocr_cache_key
+
+SETTINGS = {"lang": "tur", "config": "", "preprocess": "v1"}
+
+def test_cache_key_depends_on_image_and_settings():
+    """Anahtarın görüntü içeriğine ve ayarlara bağlı, ayar sırasından bağımsız olduğunu test eder."""
+    digest = image_hash(b"receipt")
+
+    assert digest == image_hash(b"receipt") != image_hash(b"receipt2")
+    assert ocr_cache_key(digest, SETTINGS) == ocr_cache_key(digest, dict(reversed(list(SETTINGS.items()))))
+    assert ocr_cache_key(digest, SETTINGS) != ocr_cache_key(digest, {**SETTINGS, "preprocess": "v2"})
+
+def test_cached_text_is_returned_only_for_same_settings(db_session):
+    """Önbelleğe yazılan metnin aynı ayarlarla okunduğunu, farklı ayarlarla okunmadığını test eder."""
+    cache = OCRResultCache(db_session, SETTINGS)
+    first, second = image_hash(b"one"), image_hash(b"two")
+    cache.set(first, "MIGROS TOPLAM 12,50")
+
+    assert cache.get(first) == "MIGROS TOPLAM 12,50"
+    assert cache.get(second) is None
+    assert cache.get_many([first, second, first]) == {first: "MIGROS TOPLAM 12,50"}
+    assert OCRResultCache(db_session, {**SETTINGS, "preprocess": "v2"}).get(first) is None
+
+    # Aynı görüntünün tekrar yazılması hata vermez
+    cache.set(first, "MIGROS TOPLAM 12,50")
+    assert db_session.query(OCRCacheEntry).count() == 1
+
+def test_set_leaves_caller_transaction_alone(db_session):
+    """Önbelleğe yazmanın çağıranın bekleyen değişikliklerini commit veya rollback etmediğini test eder."""
+    cache = OCRResultCache(db_session, SETTINGS)
+    digest = image_hash(b"receipt")
+    cache.set(digest, "ilk")
+    db_session.commit()
+
+    db_session.add(User(username="pending", email="pending@example.com", hashed_password="x"))
+    db_session.flush()
+    cache.set(digest, "ikinci")
+    cache.set(image_hash(b"other"), "diğer")
+    assert db_session.query(User).count() == 1
+
+    db_session.rollback()
+    assert db_session.query(User).count() == 0
+    assert cache.get(digest) == "ilk"
+    assert cache.get(image_hash(b"other")) is None
+
+def test_find_duplicate_receipt_is_per_user(db_session):
+    """Aynı görüntünün yalnızca aynı kullanıcı için tekrar sayıldığını test eder."""
+    owner = User(username="owner", email="owner@example.com", hashed_password="x")
+    other = User(username="other", email="other@example.com", hashed_password="x")
+    db_session.add_all([owner, other])
+    db_session.flush()
+    digest = image_hash(b"receipt")
+    receipt = Receipt(user_id=owner.id, ocr_text="...", image_hash=digest)
+    db_session.add(receipt)
+    db_session.commit()
+
+    assert find_duplicate_receipt(db_session, owner.id, digest).id == receipt.id
+    assert find_duplicate_receipt(db_session, other.id, digest) is None
+    assert find_duplicate_receipt(db_session, owner.id, image_hash(b"different")) is None
@@ -0,0 +1,74 @@
+import io
+import time
+import zipfile
+import pytest
+from services.receipt_batch import iter_receipt_images, process_in_parallel
+
+def sleepy_worker(data: bytes) -> dict:
+    """Baytlardaki süre kadar bekleyip uzunluğu döndüren örnek işçi."""
+    time.sleep(float(data.decode()))
+    return {"length": len(data)}
+
+def failing_worker(data: bytes) -> dict:
+    if data == b"bad":
+        raise ValueError("Görüntü okunamadı")
+    return {"ok": True}
+
+def _zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+def test_iter_receipt_images_expands_zip_and_paths(tmp_path):
+    """Zip arşivlerinin içindeki görüntülerin ve dosya yollarının açıldığını test eder."""
+    path = tmp_path / "fis.jpg"
+    path.write_bytes(b"jpg")
+    archive = _zip({"ocak/1.png": b"one", "ocak/notlar.txt": b"skip", "2.JPG": b"two"})
+
+    images = list(iter_receipt_images([str(path), archive, ("upload.png", b"raw"), b"bare"]))
+
+    assert images == [
+        (str(path), b"jpg"), ("ocak/1.png", b"one"), ("2.JPG", b"two"), ("upload.png", b"raw"), ("receipt_3", b"bare")
+    ]
+    with pytest.raises(ValueError):
+        list(iter_receipt_images([42]))
+
+def test_results_stream_in_completion_order():
+    """Sonuçların bitiş sırasıyla geldiğini ve işlerin paralel yürüdüğünü test eder."""
+    images = [("slow", b"0.6"), ("fast1", b"0.05"), ("fast2", b"0.05"), ("fast3", b"0.05")]
+
+    start = time.perf_counter()
+    results = list(process_in_parallel(images, sleepy_worker, max_workers=4))
+    elapsed = time.perf_counter() - start
+
+    assert [r["name"] for r in results][-1] == "slow"
+    assert sorted(r["index"] for r in results) == [0, 1, 2, 3]
+    assert all(r["error"] is None and r["result"]["length"] == len(dict(images)[r["name"]]) for r in results)
+    assert all(r["elapsed"] > 0 for r in results)
+    # Seri çalışma en az 0.75 saniye sürerdi
+    assert elapsed < 0.75 + 0.5
+
+def test_worker_errors_do_not_stop_batch():
+    """Bir makbuzdaki hatanın diğerlerini etkilemediğini test eder."""
+    results = {r["name"]: r for r in process_in_parallel(
+        [("a", b"good"), ("b", b"bad"), ("c", b"good")], failing_worker, max_workers=2, max_pending=1
+    )}
+
+    assert results["b"]["result"] is None
+    assert "Görüntü okunamadı" in results["b"]["error"]
+    assert results["a"]["result"] == results["c"]["result"] == {"ok": True}
+
+def test_precheck_hits_skip_the_pool():
+    """Ön kontrolün sonuç döndürdüğü görüntülerin havuza gönderilmediğini test eder."""
+    cached = {b"0.5": {"length": -1}}
+
+    start = time.perf_counter()
+    results = {r["name"]: r for r in process_in_parallel(
+        [("cached", b"0.5"), ("new", b"0.01")], sleepy_worker, max_workers=1, precheck=cached.get
+    )}
+
+    assert results["cached"]["result"] == {"length": -1}
+    assert results["new"]["result"] == {"length": 4}
+    assert time.perf_counter() - start < 0.5
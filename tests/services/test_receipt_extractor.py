@@ -0,0 +1,105 @@
+from datetime import date
+import pytest
+from models.database import User, Receipt
+from services.receipt_extractor import extract_fields, extract_many, extract_merchant, find_candidates, parse_amount, reextract_receipts
+
+RECEIPT_TEXT = """MIGROS TICARET A.S.
+TARİH: 15.03.2024 SAAT: 14:35
+FİŞ NO: 0042
+SÜT 1 LT            *32,50
+ARA TOPLAM          *1.042,50
+TOPKDV              *%8 77,22
+TOPLAM 3 ÜRÜN       *1.042,50
+NAKİT               *1.100,00
+PARA ÜSTÜ           *57,50
+"""
+
+@pytest.mark.parametrize("token, expected", [
+    ("1.234,56", 1234.56),
+    ("1,234.56", 1234.56),
+    ("1234,56", 1234.56),
+    ("1.234.567,89", 1234567.89),
+    ("1.234", 1234.0),
+    ("12,5", 12.5),
+    ("45", 45.0)
+])
+def test_parse_amount_handles_thousand_separators(token, expected):
+    """Türkçe ve İngilizce binlik/ondalık ayırıcılarının doğru çözüldüğünü test eder."""
+    assert parse_amount(token) == expected
+
+def test_toplam_line_wins_over_other_amounts():
+    """Ara toplam, KDV, ödeme ve para üstü satırları yerine TOPLAM satırının seçildiğini test eder."""
+    fields = extract_fields(RECEIPT_TEXT)
+
+    assert fields["amount"] == 1042.5
+    assert fields["date"] == date(2024, 3, 15)
+    assert fields["confidence"] == {"amount": 0.9, "date": 0.9}
+
+def test_candidates_carry_position_label_and_confidence():
+    """Tüm adayların konum, satır, etiket ve puanla toplandığını test eder."""
+    amounts, dates = find_candidates(RECEIPT_TEXT)
+    by_label = {c["label"]: c for c in amounts if c["label"]}
+
+    # Oran (%8), saat ve fiş numarası tutar adayı değildir
+    assert [c["value"] for c in amounts] == [32.5, 1042.5, 77.22, 3.0, 1042.5, 1100.0, 57.5]
+    assert by_label["ara toplam"]["confidence"] < by_label["nakit"]["confidence"] < by_label["toplam"]["confidence"]
+    assert by_label["topkdv"]["line"] == 5
+    assert RECEIPT_TEXT[by_label["nakit"]["position"]:].startswith("1.100,00")
+    assert [(d["value"], d["label"]) for d in dates] == [(date(2024, 3, 15), "tarih")]
+
+def test_currency_and_ascii_labels():
+    """Para birimli etiketsiz tutarların ve Türkçe karakteri okunmamış etiketlerin tanındığını test eder."""
+    assert extract_fields("KAFE\n150,75 TL\n2023/12/31")["amount"] == 150.75
+    assert extract_fields("₺ 99,90")["amount"] == 99.9
+    assert extract_fields("ARATOPLAM 20,00\nKREDI KARTI 12,00")["amount"] == 12.0
+    assert extract_fields("Tutar: 45 TL 01-02-2023") == {
+        "amount": 45.0, "date": date(2023, 2, 1), "confidence": {"amount": 0.4, "date": 0.6}
+    }
+
+def test_missing_or_invalid_values():
+    """Tutar veya geçerli tarih yoksa None döndüğünü test eder."""
+    assert extract_fields("FİŞ NO 1234 31.02.2024") == {
+        "amount": None, "date": None, "confidence": {"amount": 0.0, "date": 0.0}
+    }
+    assert extract_fields("")["amount"] is None
+
+def test_merchant_is_first_text_line():
+    """İşyeri adının tarih ve fiş numarası satırları atlanarak ilk metin satırından alındığını test eder."""
+    text = "\n  31.12.2023 14:05\nSTARBUCKS KADIKOY\nFIS NO: 0042\nTOPLAM 85,00"
+
+    assert extract_merchant(text) == "STARBUCKS KADIKOY"
+    assert extract_merchant("12.03.2024\n1234 5678") is None
+    assert extract_merchant("") is None
+
+def test_extract_many_adds_categories():
+    """Toplu çıkarımın sırayı koruduğunu ve kategorileri toplu eklediğini test eder."""
+    results = extract_many(["TOPLAM 10,00", None, "TOPLAM 5,00"], lambda texts: [t[:6] for t in texts])
+
+    assert [r["amount"] for r in results] == [10.0, None, 5.0]
+    assert [r["category"] for r in results] == ["TOPLAM", "", "TOPLAM"]
+
+def test_reextract_receipts_updates_changed_rows(db_session):
+    """Saklanan OCR metinlerinden yalnızca değişen makbuzların güncellendiğini test eder."""
+    owner = User(username="owner", email="owner@example.com", hashed_password="x")
+    other = User(username="other", email="other@example.com", hashed_password="x")
+    db_session.add_all([owner, other])
+    db_session.flush()
+    db_session.add_all([
+        Receipt(user_id=owner.id, ocr_text=RECEIPT_TEXT, amount=1.0, category="Gıda"),
+        Receipt(user_id=owner.id, ocr_text="TOPLAM 12,50 01.01.2024", amount=12.5, date=date(2024, 1, 1)),
+        Receipt(user_id=owner.id, ocr_text="okunamadı", amount=7.0),
+        Receipt(user_id=other.id, ocr_text="TOPLAM 99,00", amount=1.0)
+    ])
+    db_session.commit()
+
+    stats = reextract_receipts(db_session, user_id=owner.id, batch_size=2)
+
+    assert stats == {"scanned": 3, "updated": 1}
+    receipts = db_session.query(Receipt).order_by(Receipt.id).all()
+    assert (receipts[0].amount, receipts[0].date, receipts[0].category) == (1042.5, date(2024, 3, 15), "Gıda")
+    # Değer bulunamayan alan korunur; diğer kullanıcının makbuzuna dokunulmaz
+    assert receipts[2].amount == 7.0
+    assert receipts[3].amount == 1.0
+
+    with pytest.raises(ValueError):
+        reextract_receipts(db_session, batch_size=0)
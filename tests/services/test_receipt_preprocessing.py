@@ -0,0 +1,54 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+import numpy as np
+from services.receipt_preprocessing import ReceiptPreprocessor, estimate_skew, plan_steps
+
+def _receipt(angle=0.0):
+    """Açık renkli, yazılı ve isteğe bağlı döndürülmüş bir makbuz görüntüsü üretir."""
+    receipt = np.full((1400, 600), 240, np.uint8)
+    for row in range(18):
+        cv2.putText(receipt, "TOPLAM      1.234,56", (30, 60 + row * 70), cv2.FONT_HERSHEY_SIMPLEX, 1.1, 20, 2)
+    rotation = cv2.getRotationMatrix2D((300, 700), angle, 1.0)
+    return cv2.warpAffine(receipt, rotation, (600, 1400), borderValue=240)
+
+def _photo(angle=5.0):
+    """Koyu zemin üzerinde döndürülmüş makbuz içeren 12MP fotoğraf üretir."""
+    canvas = np.full((3000, 4000), 60, np.uint8)
+    receipt = cv2.resize(_receipt(), None, fx=1.8, fy=1.8)
+    top, left = (3000 - receipt.shape[0]) // 2, (4000 - receipt.shape[1]) // 2
+    canvas[top:top + receipt.shape[0], left:left + receipt.shape[1]] = receipt
+    rotation = cv2.getRotationMatrix2D((2000, 1500), angle, 1.0)
+    return cv2.cvtColor(cv2.warpAffine(canvas, rotation, (4000, 3000), borderValue=60), cv2.COLOR_GRAY2BGR)
+
+def test_large_photo_is_cropped_and_downscaled():
+    """Büyük fotoğrafın makbuz sınırına kırpılıp hedef DPI genişliğine küçültüldüğünü test eder."""
+    preprocessor = ReceiptPreprocessor(target_dpi=300)
+    image, report = preprocessor(_photo())
+
+    assert report["cropped"]
+    assert image.size[0] == preprocessor.target_width
+    assert image.size[0] * image.size[1] < 3000 * 4000 / 5
+    assert set(report["timings"]) >= {"crop", "resize", "measure", "otsu"}
+
+def test_skewed_receipt_is_deskewed():
+    """Eğik taranmış makbuzun düzeltildiğini test eder."""
+    assert estimate_skew(_receipt(6)) == pytest.approx(-6, abs=0.5)
+
+    image, report = ReceiptPreprocessor()(_receipt(6))
+
+    assert "deskew" in report["steps"]
+    assert abs(estimate_skew(np.array(image))) < 1
+
+def test_noisy_and_unevenly_lit_images_get_extra_steps():
+    """Gürültülü ve dengesiz ışıklı görüntülerde ilgili adımların seçildiğini test eder."""
+    rng = np.random.default_rng(0)
+    noisy = np.clip(_receipt() + rng.normal(0, 25, (1400, 600)), 0, 255).astype(np.uint8)
+    shadow = (_receipt() * np.linspace(0.3, 1.0, 600)[None, :]).astype(np.uint8)
+
+    assert "denoise" in ReceiptPreprocessor()(noisy)[1]["steps"]
+    assert "adaptive_threshold" in ReceiptPreprocessor()(shadow)[1]["steps"]
+
+def test_plan_steps_for_clean_image():
+    """Temiz görüntüde yalnızca eşikleme yapıldığını test eder."""
+    assert plan_steps({"noise": 1.0, "contrast": 60.0, "lighting": 5.0, "skew": 0.1}) == ["otsu"]
@@ -0,0 +1,192 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+from models.database import User, Transaction, RecurringSeries, bulk_insert_transactions
+from services.recurring_service import RecurringService, RECURRING_SOURCE, occurrence_dates
+
+def _add_user(db_session, name):
+    user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    return user.id
+
+def _recurring(user_id, amount, category, day, recurring_type="monthly", type="expense"):
+    return Transaction(user_id=user_id, amount=amount, type=type, category=category, date=day,
+                       is_recurring=True, recurring_type=recurring_type)
+
+def _series(db_session):
+    return {
+        (s.user_id, s.category, s.recurring_type.value): (s.amount, s.last_date, s.next_date)
+        for s in db_session.query(RecurringSeries).all()
+    }
+
+def test_series_follow_insert_update_delete(db_session):
+    """Serinin son işlem ve sonraki tarihinin işlem yazımlarıyla güncellendiğini test eder."""
+    user_id = _add_user(db_session, "alice")
+    march = _recurring(user_id, 9000, "Kira", datetime(2024, 3, 1, 9, 30))
+    db_session.add_all([
+        _recurring(user_id, 8500, "Kira", datetime(2024, 2, 1)),
+        march,
+        _recurring(user_id, 100, "Spor", date(2024, 3, 4), "weekly"),
+        Transaction(user_id=user_id, amount=50, type="expense", category="Kira", date=date(2024, 3, 10))
+    ])
+    db_session.commit()
+
+    assert _series(db_session) == {
+        (user_id, "Kira", "monthly"): (9000, date(2024, 3, 1), date(2024, 4, 1)),
+        (user_id, "Spor", "weekly"): (100, date(2024, 3, 4), date(2024, 3, 11))
+    }
+    rent_id = db_session.query(RecurringSeries.id).filter(RecurringSeries.category == "Kira").scalar()
+
+    # Daha eski işlem eklemek son işlemi değiştirmez
+    db_session.add(_recurring(user_id, 8000, "Kira", date(2024, 1, 1)))
+    db_session.commit()
+    assert _series(db_session)[(user_id, "Kira", "monthly")][1] == date(2024, 3, 1)
+
+    # Son işlem silinince seri bir önceki işleme döner ve kimliğini korur
+    db_session.delete(march)
+    db_session.commit()
+    assert _series(db_session)[(user_id, "Kira", "monthly")] == (8500, date(2024, 2, 1), date(2024, 3, 1))
+    assert db_session.query(RecurringSeries.id).filter(RecurringSeries.category == "Kira").scalar() == rent_id
+
+    # Tekrarlayan işlemi kalmayan seri silinir
+    weekly = db_session.query(Transaction).filter(Transaction.category == "Spor").one()
+    weekly.is_recurring = False
+    db_session.commit()
+    assert (user_id, "Spor", "weekly") not in _series(db_session)
+
+def test_reminders_are_one_range_query_with_one_reminder_per_series(db_session):
+    """Hatırlatmaların tüm kullanıcılar için tek sorguda ve seri başına bir kez üretildiğini test eder."""
+    alice = _add_user(db_session, "alice")
+    bob = _add_user(db_session, "bob")
+    db_session.add_all([
+        # Aynı seride üç işlem: tek hatırlatma
+        _recurring(alice, 9000, "Kira", date(2024, 3, 1)),
+        _recurring(alice, 9000, "Kira", date(2024, 4, 1)),
+        _recurring(alice, 9000, "Kira", date(2024, 5, 1)),
+        # Henüz vadesi gelmedi (sonraki tarih 10 Haziran)
+        _recurring(alice, 40000, "Maaş", date(2024, 5, 10), type="income"),
+        _recurring(bob, 30, "Kahve", date(2024, 5, 30), "daily"),
+        _recurring(bob, 1200, "Sigorta", date(2023, 6, 1), "yearly")
+    ])
+    db_session.commit()
+
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    reminders = RecurringService(db_session).reminders(as_of=date(2024, 6, 1))
+
+    assert len(statements) == 1
+    assert [(r["user_id"], r["category"], r["frequency"], r["last_date"]) for r in reminders] == [
+        (bob, "Kahve", "günlük", date(2024, 5, 30)),
+        (alice, "Kira", "aylık", date(2024, 5, 1)),
+        (bob, "Sigorta", "yıllık", date(2023, 6, 1))
+    ]
+    assert [r["category"] for r in RecurringService(db_session).reminders(bob, as_of=date(2024, 6, 1))] == ["Kahve", "Sigorta"]
+
+def test_bulk_insert_and_rebuild_match_incremental(db_session):
+    """Toplu eklemenin serileri güncellediğini ve yeniden oluşturmanın aynı sonucu verdiğini test eder."""
+    user_id = _add_user(db_session, "carol")
+    db_session.add(_recurring(user_id, 250, "Fatura", date(2024, 1, 15)))
+    db_session.commit()
+    bulk_insert_transactions(db_session, [
+        {"user_id": user_id, "amount": 275, "type": "expense", "category": "Fatura",
+         "date": datetime(2024, 2, 15), "is_recurring": True, "recurring_type": "monthly"},
+        {"user_id": user_id, "amount": 60, "type": "expense", "category": "Market",
+         "date": datetime(2024, 2, 16), "is_recurring": False, "recurring_type": None}
+    ])
+    db_session.commit()
+    incremental = _series(db_session)
+
+    assert incremental == {(user_id, "Fatura", "monthly"): (275, date(2024, 2, 15), date(2024, 3, 15))}
+    assert RecurringService(db_session).rebuild() == 1
+    assert _series(db_session) == incremental
+
+def test_occurrence_dates_catch_up_without_month_end_drift():
+    """Kaçırılan dönemlerin takvim aralıklarıyla ve ay sonu kaymadan üretildiğini test eder."""
+    assert occurrence_dates(date(2024, 1, 31), "monthly", date(2024, 4, 30)) == [
+        date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)
+    ]
+    assert occurrence_dates(date(2024, 3, 4), "weekly", date(2024, 3, 17)) == [date(2024, 3, 4), date(2024, 3, 11)]
+    assert occurrence_dates(date(2024, 6, 2), "daily", date(2024, 6, 1)) == []
+
+def test_materialize_catches_up_and_is_idempotent_per_period(db_session):
+    """Kaçırılan dönemlerin tek seferde üretildiğini, next_date'in ilerlediğini ve tekrar çalıştırmanın işlem eklemediğini test eder."""
+    alice = _add_user(db_session, "alice")
+    bob = _add_user(db_session, "bob")
+    db_session.add_all([
+        _recurring(alice, 9000, "Kira", date(2024, 1, 1)),
+        _recurring(alice, 100, "Spor", date(2024, 3, 25), "weekly"),
+        _recurring(bob, 40000, "Maaş", date(2024, 3, 15), type="income")
+    ])
+    db_session.commit()
+    service = RecurringService(db_session)
+
+    stats = service.materialize_due(as_of=date(2024, 4, 10), batch_size=2)
+
+    assert stats == {"series": 2, "inserted": 5, "skipped": 0}
+    generated = db_session.query(Transaction).filter(Transaction.source == RECURRING_SOURCE).order_by(Transaction.id).all()
+    assert sorted((t.user_id, t.category, t.date.date()) for t in generated) == [
+        (alice, "Kira", date(2024, 2, 1)),
+        (alice, "Kira", date(2024, 3, 1)),
+        (alice, "Kira", date(2024, 4, 1)),
+        (alice, "Spor", date(2024, 4, 1)),
+        (alice, "Spor", date(2024, 4, 8))
+    ]
+    assert all(t.amount == 9000 for t in generated if t.category == "Kira")
+    assert _series(db_session) == {
+        (alice, "Kira", "monthly"): (9000, date(2024, 4, 1), date(2024, 5, 1)),
+        (alice, "Spor", "weekly"): (100, date(2024, 4, 8), date(2024, 4, 15)),
+        (bob, "Maaş", "monthly"): (40000, date(2024, 3, 15), date(2024, 4, 15))
+    }
+
+    # Aynı gün tekrar çalıştırmak yeni işlem üretmez
+    assert service.materialize_due(as_of=date(2024, 4, 10)) == {"series": 0, "inserted": 0, "skipped": 0}
+
+    # Başka bir işçi eski next_date'i görse bile aynı dönem ikinci kez eklenmez
+    kira = db_session.query(RecurringSeries).filter(RecurringSeries.category == "Kira").one()
+    kira.next_date = date(2024, 3, 1)
+    db_session.commit()
+    assert service.materialize_due(as_of=date(2024, 4, 10)) == {"series": 1, "inserted": 0, "skipped": 2}
+    assert db_session.query(Transaction).filter(Transaction.source == RECURRING_SOURCE).count() == 5
+
+def test_daily_runs_keep_month_end_series_on_schedule(db_session):
+    """Her gün çalıştırılan üretimin ay sonu serisini ilk işlemin gününe göre ürettiğini test eder."""
+    user_id = _add_user(db_session, "dave")
+    db_session.add(_recurring(user_id, 5000, "Kira", date(2024, 1, 31)))
+    db_session.commit()
+    service = RecurringService(db_session)
+
+    day = date(2024, 2, 1)
+    while day <= date(2024, 6, 30):
+        service.materialize_due(as_of=day)
+        day += timedelta(days=1)
+
+    generated = db_session.query(Transaction.date).filter(Transaction.source == RECURRING_SOURCE).order_by(Transaction.date)
+    assert [row.date.date() for row in generated] == [
+        date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30), date(2024, 5, 31), date(2024, 6, 30)
+    ]
+    assert _series(db_session)[(user_id, "Kira", "monthly")][2] == date(2024, 7, 31)
+
+    # Yeniden oluşturma takvimi ve üretim sınırını korur
+    RecurringService(db_session).rebuild()
+    assert _series(db_session)[(user_id, "Kira", "monthly")][2] == date(2024, 7, 31)
+
+def test_deleted_generated_occurrence_is_not_materialized_again(db_session):
+    """Kullanıcının sildiği üretilmiş işlemin sonraki çalıştırmada tekrar eklenmediğini test eder."""
+    user_id = _add_user(db_session, "erin")
+    db_session.add(_recurring(user_id, 300, "Fatura", date(2024, 1, 10)))
+    db_session.commit()
+    service = RecurringService(db_session)
+    assert service.materialize_due(as_of=date(2024, 3, 15))["inserted"] == 2
+
+    march = db_session.query(Transaction).filter(
+        Transaction.source == RECURRING_SOURCE, Transaction.date == datetime(2024, 3, 10)
+    ).one()
+    db_session.delete(march)
+    db_session.commit()
+
+    series = _series(db_session)[(user_id, "Fatura", "monthly")]
+    assert series == (300, date(2024, 2, 10), date(2024, 4, 10))
+    assert service.materialize_due(as_of=date(2024, 3, 20)) == {"series": 0, "inserted": 0, "skipped": 0}
+    assert service.materialize_due(as_of=date(2024, 4, 10))["inserted"] == 1
+    assert db_session.query(Transaction).filter(Transaction.source == RECURRING_SOURCE).count() == 2
@@ -294,4 +294,85 @@ def test_create_goal_chart(report_service):
     chart = report_service.create_goal_chart(goal_progress)
     
     # Grafik oluşturuldu mu kontrol et
-    assert chart is not None 
\ No newline at end of file
+    assert chart is not None 
+
+@pytest.fixture
+def isolated_session():
+    """Her test için boş bir bellek içi veritabanı oturumu oluşturur."""
+    isolated_engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.create_all(bind=isolated_engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=isolated_engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        isolated_engine.dispose()
+
+def test_monthly_report_aggregates_without_transactions(isolated_session):
+    """Toplamların SQL tarafında hesaplandığını ve işlemlerin yüklenmediğini test eder."""
+    user = User(username="agg_user", email="agg@example.com", hashed_password="x")
+    isolated_session.add(user)
+    isolated_session.commit()
+    
+    isolated_session.add_all([
+        Transaction(user_id=user.id, amount=2000, type="income", category="Maaş", date=date(2024, 3, 1)),
+        Transaction(user_id=user.id, amount=120, type="expense", category="Gıda", date=date(2024, 3, 2)),
+        Transaction(user_id=user.id, amount=80, type="expense", category="Gıda", date=date(2024, 3, 31)),
+        Transaction(user_id=user.id, amount=50, type="expense", category="Ulaşım", date=date(2024, 3, 15)),
+        # Ay dışında kalan işlem
+        Transaction(user_id=user.id, amount=999, type="expense", category="Gıda", date=date(2024, 4, 1)),
+        Budget(user_id=user.id, name="Market", category="Gıda", amount=150,
+               start_date=date(2024, 3, 1), end_date=date(2024, 3, 31))
+    ])
+    isolated_session.commit()
+    
+    report = ReportService(isolated_session).generate_monthly_report(
+        user.id, 2024, 3, include_transactions=False
+    )
+    
+    assert report["summary"] == {"total_income": 2000, "total_expense": 250, "net_amount": 1750}
+    assert report["expense_by_category"] == {"Gıda": 200, "Ulaşım": 50}
+    assert report["budget_performance"]["Gıda"] == {"limit": 150, "spent": 200, "remaining": -50}
+    assert report["transactions"] == []
+    
+    # Filtreler aynı koşullarla uygulanmalı
+    filtered = ReportService(isolated_session).generate_monthly_report(
+        user.id, 2024, 3, min_amount=100
+    )
+    assert filtered["summary"]["total_expense"] == 120
+    assert len(filtered["transactions"]) == 2
+
+def test_get_trend_data_buckets(isolated_session):
+    """Trend verisinin tek sorguda doğru dönemlere ayrıldığını test eder."""
+    user = User(username="trend_user", email="trend@example.com", hashed_password="x")
+    isolated_session.add(user)
+    isolated_session.commit()
+    
+    isolated_session.add_all([
+        Transaction(user_id=user.id, amount=1000, type="income", category="Maaş", date=date(2024, 1, 15)),
+        Transaction(user_id=user.id, amount=300, type="expense", category="Gıda", date=date(2024, 2, 10)),
+        Transaction(user_id=user.id, amount=200, type="expense", category="Gıda", date=date(2024, 3, 31)),
+        Transaction(user_id=user.id, amount=100, type="expense", category="Gıda", date=date(2024, 4, 2)),
+    ])
+    isolated_session.commit()
+    service = ReportService(isolated_session)
+    
+    monthly = service.get_trend_data(user.id, periods=3, end_date=date(2024, 4, 20))
+    assert [d["label"] for d in monthly] == ["1/2024", "2/2024", "3/2024"]
+    assert [d["net_amount"] for d in monthly] == [1000, -300, -200]
+    
+    quarterly = service.get_trend_data(user.id, periods=2, granularity="quarter", end_date=date(2024, 7, 1))
+    assert [d["date"] for d in quarterly] == [date(2024, 1, 1), date(2024, 4, 1)]
+    assert quarterly[0]["total_expense"] == 500
+    assert quarterly[1]["total_expense"] == 100
+    
+    # 2024-04-02 salı; hafta pazartesi (1 Nisan) başlar
+    weekly = service.get_trend_data(user.id, periods=1, granularity="week", end_date=date(2024, 4, 8))
+    assert weekly[0]["date"] == date(2024, 4, 1)
+    assert weekly[0]["total_expense"] == 100
+    
+    daily = service.get_trend_data(user.id, periods=2, granularity="day", end_date=date(2024, 4, 1))
+    assert [d["total_expense"] for d in daily] == [0, 200]
+    
+    with pytest.raises(ValueError):
+        service.get_trend_data(user.id, granularity="year")
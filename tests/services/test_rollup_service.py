@@ -0,0 +1,80 @@
+import pytest
+from models.database import User, Transaction, MonthlyRollup, bulk_insert_transactions
+from services.rollup_service import RollupService
+from datetime import date
+
+@pytest.fixture
+def test_user(db_session):
+    """Test için kullanıcı oluşturur."""
+    user = User(username="rollup_user", email="rollup@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+def _rollup_rows(db_session):
+    """Özet tablosunu karşılaştırılabilir bir sözlük olarak döndürür."""
+    return {
+        (r.year_month, r.type.value, r.category): (r.total_amount, r.transaction_count)
+        for r in db_session.query(MonthlyRollup).all()
+    }
+
+def test_rollups_follow_insert_update_delete(db_session, test_user):
+    """Özet satırlarının işlem yazımlarıyla artımlı güncellendiğini test eder."""
+    food = Transaction(user_id=test_user.id, amount=100, type="expense", category="Gıda", date=date(2024, 5, 3))
+    salary = Transaction(user_id=test_user.id, amount=5000, type="income", category="Maaş", date=date(2024, 5, 1))
+    db_session.add_all([food, salary])
+    db_session.commit()
+    
+    assert _rollup_rows(db_session) == {
+        ("2024-05", "expense", "Gıda"): (100, 1),
+        ("2024-05", "income", "Maaş"): (5000, 1),
+    }
+    
+    # Kategori ve ay değişikliği eski satırdan düşülüp yenisine eklenmeli
+    food.category = "Market"
+    food.date = date(2024, 6, 2)
+    food.amount = 120
+    db_session.commit()
+    
+    assert _rollup_rows(db_session) == {
+        ("2024-06", "expense", "Market"): (120, 1),
+        ("2024-05", "income", "Maaş"): (5000, 1),
+    }
+    
+    db_session.delete(salary)
+    db_session.commit()
+    
+    assert _rollup_rows(db_session) == {("2024-06", "expense", "Market"): (120, 1)}
+
+def test_rebuild_matches_incremental(db_session, test_user):
+    """Yeniden oluşturulan özetin artımlı özetle aynı olduğunu test eder."""
+    db_session.add_all([
+        Transaction(user_id=test_user.id, amount=amount, type="expense", category=category, date=day)
+        for amount, category, day in [
+            (10, "Gıda", date(2024, 1, 5)),
+            (20, "Gıda", date(2024, 1, 25)),
+            (30, "Ulaşım", date(2024, 2, 1)),
+        ]
+    ])
+    db_session.commit()
+    incremental = _rollup_rows(db_session)
+    
+    assert RollupService(db_session).rebuild() == 2
+    assert _rollup_rows(db_session) == incremental
+
+def test_full_month_range():
+    """Tam ay aralıklarının doğru tanındığını test eder."""
+    assert RollupService.full_month_range(date(2024, 1, 1), date(2024, 2, 1)) == ("2024-01", "2024-01")
+    assert RollupService.full_month_range(date(2024, 1, 1), date(2024, 3, 31)) == ("2024-01", "2024-03")
+    assert RollupService.full_month_range(date(2024, 1, 2), date(2024, 2, 1)) is None
+    assert RollupService.full_month_range(date(2024, 1, 1), date(2024, 1, 15)) is None
+
+def test_bulk_insert_with_many_rollup_keys(db_session, test_user):
+    """Parametre sınırını aşacak kadar farklı özet anahtarının tek seferde yazılabildiğini test eder."""
+    bulk_insert_transactions(db_session, [
+        {"user_id": test_user.id, "amount": 1.0, "type": "expense", "category": f"Kategori {i}", "date": date(2024, 1, 1)}
+        for i in range(45000)
+    ])
+    db_session.commit()
+    
+    assert db_session.query(MonthlyRollup).count() == 45000
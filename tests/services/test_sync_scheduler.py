@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+from models.database import Base, User, BankAccount, Transaction
+from services.banking_service import bank_cache
+from services.sync_scheduler import SyncScheduler, RateLimiter, shared_rate_limiter
+from utils.engine import create_sqlite_engine
+from utils.fake_bank_server import FakeBankServer
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Paralel işçilerin paylaşabileceği dosya tabanlı (WAL) test veritabanı."""
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'sync.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+@pytest.fixture(autouse=True)
+def clear_bank_cache():
+    """Paylaşılan banka önbelleğini testler arasında temizler."""
+    bank_cache.clear()
+    yield
+    bank_cache.clear()
+
+def _add_accounts(session_factory, bank_accounts):
+    """Kullanıcı ve verilen (banka, hesap numarası) çiftleri için hesaplar ekler."""
+    session = session_factory()
+    user = User(username="sync_user", email="sync@example.com", hashed_password="x")
+    session.add(user)
+    session.flush()
+    for bank_name, account_number in bank_accounts:
+        session.add(BankAccount(user_id=user.id, bank_name=bank_name, account_number=account_number))
+    session.commit()
+    user_id = user.id
+    session.close()
+    return user_id
+
+def test_accounts_sync_concurrently(session_factory):
+    """Sekiz hesabın yaklaşık en yavaş hesabın süresinde senkronize edildiğini test eder."""
+    with FakeBankServer(latency=0.3, transactions_per_account=10) as server:
+        user_id = _add_accounts(session_factory, [("fake_bank", f"acc{i}") for i in range(8)])
+        scheduler = SyncScheduler(
+            session_factory=session_factory,
+            max_workers=8,
+            api_endpoints={"fake_bank": server.endpoint(rate_limit=100)}
+        )
+
+        summary = scheduler.sync_user_accounts(user_id)
+
+        assert summary["succeeded"] == 8
+        assert server.peak_concurrency > 1
+        # Seri çalışma en az 8 * 0.3 = 2.4 saniye sürerdi
+        assert summary["elapsed"] < 1.5
+
+    session = session_factory()
+    assert session.query(Transaction).count() == 80
+    session.close()
+
+def test_transient_failures_are_retried(session_factory):
+    """Geçici 503 hatalarının geri çekilmeyle yeniden denendiğini test eder."""
+    delays = []
+    with FakeBankServer(failures={"flaky": 2, "down": 10}) as server:
+        user_id = _add_accounts(session_factory, [("fake_bank", "flaky"), ("fake_bank", "down")])
+        scheduler = SyncScheduler(
+            session_factory=session_factory,
+            api_endpoints={"fake_bank": server.endpoint(rate_limit=1000)},
+            max_retries=3,
+            backoff_base=0.01,
+            sleep=lambda seconds: delays.append(seconds)
+        )
+
+        results = {r["account_id"]: r for r in scheduler.sync_user_accounts(user_id)["results"]}
+
+    flaky, down = sorted(results.values(), key=lambda r: r["account_id"])
+    assert flaky["success"] and flaky["attempts"] == 3
+    assert not down["success"] and down["attempts"] == 4 and down["retryable"]
+    # Full jitter: her bekleme 0 ile üst sınır arasında
+    assert all(0 <= delay <= 0.08 for delay in delays)
+
+def test_unknown_bank_is_not_retried(session_factory):
+    """Kalıcı hataların yeniden denenmediğini test eder."""
+    user_id = _add_accounts(session_factory, [("unknown_bank", "x")])
+    scheduler = SyncScheduler(session_factory=session_factory, api_endpoints={}, sleep=lambda seconds: None)
+
+    result = scheduler.sync_user_accounts(user_id)["results"][0]
+
+    assert not result["success"]
+    assert result["attempts"] == 1
+
+def test_rate_limiter_spaces_requests():
+    """Hız sınırlayıcının istekleri 1/rate aralıklarla dağıttığını test eder."""
+    clock = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+
+    limiter = RateLimiter(rate=4, clock=lambda: clock[0], sleep=sleep)
+    for _ in range(3):
+        limiter.acquire()
+
+    assert waits == [0.25, 0.5]
+
+def test_rate_limiter_is_acquired_for_every_page(session_factory, monkeypatch):
+    """Sayfalı senkronizasyonda her HTTP isteğinden önce hız sınırlayıcının beklendiğini test eder."""
+    acquired = []
+    with FakeBankServer(transactions_per_account=10, page_size=4) as server:
+        user_id = _add_accounts(session_factory, [("paged_bank", "acc0")])
+        scheduler = SyncScheduler(
+            session_factory=session_factory,
+            api_endpoints={"paged_bank": server.endpoint(rate_limit=1000)}
+        )
+        monkeypatch.setattr(shared_rate_limiter("paged_bank", 1000), "acquire", lambda: acquired.append(1) or 0.0)
+
+        summary = scheduler.sync_user_accounts(user_id)
+
+    assert summary["succeeded"] == 1
+    # 10 işlem, sayfa başına 4: üç istek
+    assert len(acquired) == 3
+
+def test_schedulers_share_rate_limiters():
+    """Ayrı SyncScheduler örneklerinin (ör. her banka işi) aynı sınırlayıcıyı kullandığını test eder."""
+    endpoints = {"shared_bank": {"rate_limit": 3}}
+    first = SyncScheduler(api_endpoints=endpoints)
+    second = SyncScheduler(api_endpoints=endpoints)
+
+    assert first._rate_limiter("shared_bank") is second._rate_limiter("shared_bank")
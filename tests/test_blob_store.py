@@ -0,0 +1,77 @@
+import io
+import hashlib
+import pytest
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, undefer
+from models.database import Base, User, Receipt
+from utils.blob_store import BlobStore, make_thumbnail
+from utils.migrate_db import move_receipt_images
+
+def _png(width=800, height=1200):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / "blobs"))
+
+def test_put_is_content_addressed_and_idempotent(store):
+    """Aynı içeriğin tek dosyada, özet adresiyle saklandığını test eder."""
+    digest, size = store.put(b"receipt bytes")
+
+    assert digest == hashlib.sha256(b"receipt bytes").hexdigest()
+    assert size == len(b"receipt bytes")
+    assert store.put(b"receipt bytes") == (digest, size)
+    assert store.path(digest).endswith(f"{digest[:2]}/{digest[2:4]}/{digest}")
+    assert store.read(digest) == b"receipt bytes"
+
+def test_stream_and_mmap_access(store):
+    """İçeriğin akış ve bellek eşleme ile okunabildiğini test eder."""
+    digest, _ = store.put(b"x" * 10000)
+    empty, _ = store.put(b"")
+
+    with store.open(digest) as f:
+        assert f.read(5) == b"xxxxx"
+    with store.mmap(digest) as mapped:
+        assert len(mapped) == 10000 and mapped[:3] == b"xxx"
+    with store.mmap(empty) as mapped:
+        assert len(mapped) == 0
+
+def test_missing_and_invalid_digests(store):
+    """Olmayan ve geçersiz özetlerde ValueError verildiğini test eder."""
+    with pytest.raises(ValueError):
+        store.read("0" * 64)
+    with pytest.raises(ValueError):
+        store.path("../../etc/passwd")
+    assert store.delete("0" * 64) is False
+
+def test_make_thumbnail():
+    """Küçük resmin sınırlandırıldığını ve görüntü olmayan veride None döndüğünü test eder."""
+    thumbnail = Image.open(io.BytesIO(make_thumbnail(_png(), size=100)))
+
+    assert max(thumbnail.size) == 100
+    assert make_thumbnail(b"not an image") is None
+
+def test_move_receipt_images(store):
+    """Satırdaki görüntülerin depoya taşındığını ve satırın boşaltıldığını test eder."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    user = User(username="receipts", email="receipts@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    image = _png()
+    db.add_all([Receipt(user_id=user.id, image=image, ocr_text=str(i)) for i in range(5)])
+    db.commit()
+
+    assert move_receipt_images(db, store, batch_size=2) == 5
+    assert move_receipt_images(db, store, batch_size=2) == 0
+
+    receipts = db.query(Receipt).options(undefer(Receipt.image)).all()
+    assert all(r.image is None and r.image_size == len(image) for r in receipts)
+    assert store.read(receipts[0].image_hash) == image
+    assert store.exists(receipts[0].thumbnail_hash)
+    db.close()
+    engine.dispose()
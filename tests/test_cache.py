@@ -0,0 +1,192 @@
+import threading
+import time
+import pytest
+from datetime import date
+from sqlalchemy import func
+from models.database import User, Transaction, Budget
+from utils.cache import TTLCache, QueryCache, cached_query
+
+class FakeClock:
+    """Testlerde zamanı elle ilerletmek için saat."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def cache():
+    return QueryCache(max_entries=10, ttl=60)
+
+def _summary_service(cache):
+    """Paylaşılan önbelleği kullanan basit bir servis sınıfı oluşturur."""
+
+    class SummaryService:
+        calls = 0
+
+        def __init__(self, db):
+            self.db = db
+
+        @cached_query("expense_total", cache=cache)
+        def expense_total(self, user_id, start_date, end_date=None):
+            SummaryService.calls += 1
+            return {"total": self.db.query(func.sum(Transaction.amount)).filter(
+                Transaction.user_id == user_id,
+                Transaction.date >= start_date
+            ).scalar() or 0}
+
+    return SummaryService
+
+def test_ttl_and_lru_eviction():
+    """Süresi dolan ve kapasiteyi aşan girdilerin çıkarıldığını test eder."""
+    clock = FakeClock()
+    cache = TTLCache(max_entries=2, ttl=10, clock=clock)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" en son kullanılan olur
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    clock.now = 11
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+
+def test_cache_shared_across_instances_and_invalidated_per_user(db_session, cache):
+    """Önbelleğin servis örnekleri arasında paylaşıldığını ve commit'te kullanıcı bazlı temizlendiğini test eder."""
+    alice = User(username="alice", email="alice@example.com", hashed_password="x")
+    bob = User(username="bob", email="bob@example.com", hashed_password="x")
+    db_session.add_all([alice, bob])
+    db_session.flush()
+    db_session.add_all([
+        Transaction(user_id=alice.id, amount=100, type="expense", category="Gıda", date=date(2024, 5, 3)),
+        Transaction(user_id=bob.id, amount=50, type="expense", category="Gıda", date=date(2024, 5, 3)),
+    ])
+    db_session.commit()
+
+    service_class = _summary_service(cache)
+    start = date(2024, 5, 1)
+
+    assert service_class(db_session).expense_total(alice.id, start) == {"total": 100}
+    assert service_class(db_session).expense_total(alice.id, start_date=start) == {"total": 100}
+    assert service_class(db_session).expense_total(bob.id, start) == {"total": 50}
+    assert service_class.calls == 2
+
+    # Dönen sonuçta yapılan değişiklik paylaşılan girdiyi bozmamalı
+    service_class(db_session).expense_total(alice.id, start)["total"] = -1
+    assert service_class(db_session).expense_total(alice.id, start) == {"total": 100}
+
+    # Commit edilmemiş değişiklikleri olan oturum önbelleği atlamalı
+    db_session.add(Transaction(user_id=alice.id, amount=20, type="expense", category="Gıda", date=date(2024, 5, 4)))
+    db_session.flush()
+    assert service_class(db_session).expense_total(alice.id, start) == {"total": 120}
+    assert cache.get(cache.make_key(alice.id, "expense_total", (start, None))) == {"total": 100}
+
+    db_session.commit()
+    assert service_class(db_session).expense_total(alice.id, start) == {"total": 120}
+    assert service_class(db_session).expense_total(bob.id, start) == {"total": 50}
+    assert service_class.calls == 4
+
+    # Bütçe değişikliği de kullanıcının girdilerini temizler
+    db_session.add(Budget(user_id=bob.id, name="Market", category="Gıda", amount=500, end_date=date(2024, 5, 31)))
+    db_session.commit()
+    assert cache.stats()["size"] == 1
+    assert cache.get(cache.make_key(alice.id, "expense_total", (start, None))) == {"total": 120}
+
+def test_rollback_discards_pending_invalidations(db_session, cache):
+    """Geri alınan değişikliklerin önbelleği etkilemediğini test eder."""
+    user = User(username="carol", email="carol@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+
+    service_class = _summary_service(cache)
+    start = date(2024, 5, 1)
+    service_class(db_session).expense_total(user.id, start)
+
+    db_session.add(Transaction(user_id=user.id, amount=20, type="expense", category="Gıda", date=date(2024, 5, 4)))
+    db_session.flush()
+    db_session.rollback()
+
+    assert service_class(db_session).expense_total(user.id, start) == {"total": 0}
+    assert service_class.calls == 1
+    assert cache.stats()["hits"] == 1
+
+def test_result_invalidated_during_computation_is_not_cached(cache):
+    """Hesaplama sırasında geçersiz kılınan (eski) sonucun önbelleğe yazılmadığını test eder."""
+
+    class RacingService:
+        calls = 0
+
+        def __init__(self):
+            self.db = type("FakeSession", (), {"info": {}})()
+
+        @cached_query("balance", cache=cache)
+        def balance(self, user_id):
+            RacingService.calls += 1
+            stale = {"balance": RacingService.calls}
+            # Sorgu okunduktan sonra başka bir oturum commit ediyor
+            if RacingService.calls == 1:
+                cache.invalidate_users([user_id])
+            return stale
+
+    service = RacingService()
+    assert service.balance(7) == {"balance": 1}
+    assert cache.get(cache.make_key(7, "balance")) is None
+    assert service.balance(7) == {"balance": 2}
+    assert service.balance(7) == {"balance": 2}
+    assert RacingService.calls == 2
+
+def test_get_or_load_coalesces_concurrent_misses():
+    """Eşzamanlı ıskalarda yükleyicinin tek kez çalıştığını test eder."""
+    cache = TTLCache(max_entries=10, ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return {"balance": 100}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("balance", loader))) for _ in range(5)]
+    threads[0].start()
+    started.wait(timeout=5)
+    for thread in threads[1:]:
+        thread.start()
+    # Bekleyen çağrıların kuyruğa girmesi için kısa süre tanı
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced_loads"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert results == [{"balance": 100}] * 5
+    assert cache.stats()["coalesced_loads"] == 4
+    assert cache.get_or_load("balance", loader) == {"balance": 100}
+    assert len(calls) == 1
+
+def test_get_or_load_skips_uncacheable_results_and_purges_expired():
+    """Saklanmaması istenen sonuçların ve süresi dolan girdilerin temizlendiğini test eder."""
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl=10, clock=clock)
+
+    failure = cache.get_or_load("sync", lambda: {"success": False}, should_cache=lambda r: r["success"])
+    assert failure == {"success": False}
+    assert len(cache) == 0
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+    clock.now = 15
+    assert cache.purge_expired() == 1
+    assert len(cache) == 1
@@ -1,25 +1,8 @@
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from models.database import Base, User, Transaction, Budget, FinancialGoal
+from models.database import User, Transaction, Budget, FinancialGoal
 from services.report_service import ReportService
 from datetime import date, timedelta
 
-# Test veritabanı oluşturmak için
-TEST_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(TEST_DATABASE_URL)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-@pytest.fixture
-def db_session():
-    """Test veritabanı için oturum oluşturur."""
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @pytest.fixture
 def report_service(db_session):
     """Test için ReportService nesnesi oluşturur."""
@@ -331,4 +314,29 @@ def test_create_trend_chart(report_service, test_data):
     # Veri setlerinin isimlerini kontrol et
     assert chart.data[0].name == "Gelir"
     assert chart.data[1].name == "Gider"
-    assert chart.data[2].name == "Net Durum" 
\ No newline at end of file
+    assert chart.data[2].name == "Net Durum" 
+
+def test_year_over_year_analysis(db_session):
+    """Yıllık karşılaştırmanın tüm dönemleri tek raporda topladığını test eder."""
+    user = User(username="yoy_user", email="yoy@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    
+    db_session.add_all([
+        Transaction(user_id=user.id, amount=100, type="expense", category="Gıda", date=date(2023, 2, 10)),
+        Transaction(user_id=user.id, amount=150, type="expense", category="Gıda", date=date(2024, 2, 10)),
+        Transaction(user_id=user.id, amount=3000, type="income", category="Maaş", date=date(2024, 3, 1)),
+        Transaction(user_id=user.id, amount=2000, type="income", category="Maaş", date=date(2023, 3, 1)),
+    ])
+    db_session.commit()
+    
+    result = ReportService(db_session).generate_year_over_year_analysis(user.id, 2024, 3, months=2)
+    
+    assert set(result["reports"]) == {"2024-02", "2024-03", "2023-02", "2023-03"}
+    assert len(result["comparisons"]) == 2
+    
+    february, march = result["comparisons"]
+    assert february["current_period"]["month"] == 2
+    assert february["category_comparison"]["Gıda"]["change"] == 50
+    assert march["income_change"]["amount"] == 1000
+    assert abs(march["income_change"]["percentage"] - 50.0) < 0.01
@@ -0,0 +1,153 @@
+from datetime import date, datetime
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import utils.migrate_db as migrate_module
+from models.database import Base, User, Transaction, MonthlyRollup, RecurringSeries
+from services.database_service import DatabaseService
+
+@pytest.fixture
+def legacy_db(tmp_path, monkeypatch):
+    """init_db'nin (create_all) oluşturduğu, özet tabloları boş bir dosya veritabanı."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'finance.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(migrate_module, "engine", engine)
+    monkeypatch.setattr(migrate_module, "SessionLocal", session_factory)
+
+    db = session_factory()
+    user = User(username="legacy", email="legacy@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    try:
+        yield engine, db, user.id
+    finally:
+        db.close()
+        engine.dispose()
+
+def _insert_legacy_transactions(engine, rows):
+    """İşlemleri ORM kancalarını atlayarak (eski sürümdeki gibi) ekler."""
+    defaults = {"description": None, "is_recurring": False, "recurring_type": None, "source": None, "external_id": None}
+    with engine.begin() as connection:
+        connection.execute(Transaction.__table__.insert(), [dict(defaults, **row) for row in rows])
+
+def test_backfills_rollups_created_empty_by_create_all(legacy_db):
+    """create_all ile boş oluşturulan özet tablosunun mevcut işlemlerden bir kez doldurulduğunu test eder."""
+    engine, db, user_id = legacy_db
+    _insert_legacy_transactions(engine, [
+        {"user_id": user_id, "amount": 100.0, "type": "expense", "category": "Market", "date": datetime(2024, 1, 5)},
+        {"user_id": user_id, "amount": 50.0, "type": "expense", "category": "Market", "date": datetime(2024, 1, 20)}
+    ])
+
+    assert migrate_module.migrate_db() is True
+    rollup = db.query(MonthlyRollup).one()
+    assert (rollup.year_month, rollup.total_amount, rollup.transaction_count) == ("2024-01", 150.0, 2)
+
+    # İkinci çalıştırma yeniden doldurmaz
+    db.query(MonthlyRollup).delete()
+    db.commit()
+    assert migrate_module.migrate_db() is True
+    assert db.query(MonthlyRollup).count() == 0
+
+def test_rewrites_lowercase_type_values_before_backfills(legacy_db):
+    """Eski sürümün küçük harfle yazdığı tür değerlerinin özet ve seri doldurmasından önce düzeltildiğini test eder."""
+    engine, db, user_id = legacy_db
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO transactions (user_id, amount, type, category, date, is_recurring, recurring_type) VALUES "
+            f"({user_id}, 3000, 'income', 'Maaş', '2025-03-01 00:00:00', 1, 'monthly'), "
+            f"({user_id}, 120, 'expense', 'Market', '2025-03-05 00:00:00', 0, NULL)"
+        )
+
+    assert migrate_module.migrate_db() is True
+    assert DatabaseService(db).get_transaction_summary(user_id, date(2025, 3, 1), date(2025, 4, 1)) == {
+        "total_income": 3000, "total_expense": 120, "net_amount": 2880
+    }
+    assert db.query(RecurringSeries).one().next_date == date(2025, 4, 1)
+
+def test_backfills_recurring_series_created_empty_by_create_all(legacy_db):
+    """create_all ile boş oluşturulan seri tablosunun mevcut tekrarlayan işlemlerden bir kez doldurulduğunu test eder."""
+    engine, db, user_id = legacy_db
+    rent = {"user_id": user_id, "amount": 5000.0, "type": "expense", "category": "Kira",
+            "is_recurring": True, "recurring_type": "monthly"}
+    _insert_legacy_transactions(engine, [
+        dict(rent, date=datetime(2024, 1, 1)),
+        dict(rent, date=datetime(2024, 2, 1))
+    ])
+
+    assert migrate_module.migrate_db() is True
+    series = db.query(RecurringSeries).one()
+    assert (series.category, str(series.last_date), str(series.next_date)) == ("Kira", "2024-02-01", "2024-03-01")
+
+    db.query(RecurringSeries).delete()
+    db.commit()
+    assert migrate_module.migrate_db() is True
+    assert db.query(RecurringSeries).count() == 0
+
+def test_adds_series_schedule_columns_and_rebuilds(legacy_db):
+    """Takvim sütunları olmayan eski seri tablosuna sütunların eklenip serilerin yeniden oluşturulduğunu test eder."""
+    engine, db, user_id = legacy_db
+    # Seri tablosu bir önceki sürümde doldurulmuş
+    assert migrate_module.migrate_db() is True
+
+    _insert_legacy_transactions(engine, [
+        {"user_id": user_id, "amount": 5000.0, "type": "expense", "category": "Kira", "date": datetime(2024, 1, 31),
+         "is_recurring": True, "recurring_type": "monthly"}
+    ])
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE recurring_series")
+        connection.exec_driver_sql(
+            "CREATE TABLE recurring_series (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, type VARCHAR(7) NOT NULL, "
+            "category VARCHAR(100) NOT NULL, recurring_type VARCHAR(7) NOT NULL, amount FLOAT NOT NULL, "
+            "last_date DATE NOT NULL, next_date DATE NOT NULL)"
+        )
+
+    assert migrate_module.migrate_db() is True
+    series = db.query(RecurringSeries).one()
+    assert (str(series.anchor_date), str(series.next_date)) == ("2024-01-31", "2024-02-29")
+
+def test_quarantines_duplicate_bank_rows_before_creating_unique_index(legacy_db):
+    """Tekrar eden banka kayıtlarının karantina tablosuna taşınıp tekil indeksin oluşturulduğunu test eder."""
+    engine, db, user_id = legacy_db
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ux_transactions_user_source_external")
+    bank = {"user_id": user_id, "type": "expense", "category": "Market", "source": "bank_example"}
+    _insert_legacy_transactions(engine, [
+        dict(bank, amount=100.0, date=datetime(2024, 1, 5), external_id="tx_1"),
+        dict(bank, amount=100.0, date=datetime(2024, 1, 5), external_id="tx_1"),
+        dict(bank, amount=40.0, date=datetime(2024, 1, 6), external_id="tx_2"),
+        {"user_id": user_id, "amount": 10.0, "type": "expense", "category": "Market", "date": datetime(2024, 1, 7)},
+        {"user_id": user_id, "amount": 10.0, "type": "expense", "category": "Market", "date": datetime(2024, 1, 7)}
+    ])
+
+    assert migrate_module.migrate_db() is True
+    assert [t.external_id for t in db.query(Transaction).order_by(Transaction.id)] == ["tx_1", "tx_2", None, None]
+    with engine.connect() as connection:
+        indexes = {row[1] for row in connection.exec_driver_sql("PRAGMA index_list(transactions)")}
+        quarantined = connection.exec_driver_sql("SELECT id, external_id, amount FROM transactions_duplicates").all()
+    assert [tuple(row) for row in quarantined] == [(2, "tx_1", 100.0)]
+    assert "ux_transactions_user_source_external" in indexes
+    assert db.query(MonthlyRollup).one().total_amount == 160.0
+
+def test_one_off_steps_do_not_rerun(legacy_db, monkeypatch):
+    """İndeks oluşturma ve görüntü taşıma adımlarının her migration'da tekrar çalışmadığını test eder."""
+    engine, db, user_id = legacy_db
+    assert migrate_module.migrate_db() is True
+
+    def fail(*args, **kwargs):
+        raise AssertionError("tek seferlik adım yeniden çalıştı")
+    monkeypatch.setattr(migrate_module, "create_transaction_indexes", fail)
+    monkeypatch.setattr(migrate_module, "move_receipt_images", fail)
+    assert migrate_module.migrate_db() is True
+
+def test_recreates_dropped_transaction_index(legacy_db):
+    """İşaret konmuş olsa da eksik indeksin yeniden oluşturulduğunu test eder."""
+    engine, db, user_id = legacy_db
+    assert migrate_module.migrate_db() is True
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ux_transactions_user_source_external")
+
+    assert migrate_module.migrate_db() is True
+    with engine.connect() as connection:
+        indexes = {row[1] for row in connection.exec_driver_sql("PRAGMA index_list(transactions)")}
+    assert "ux_transactions_user_source_external" in indexes
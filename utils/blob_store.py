@@ -0,0 +1,110 @@
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+from PIL import Image, UnidentifiedImageError
+from config import settings
+
+# Küçük resimlerin en uzun kenarı (piksel)
+THUMBNAIL_SIZE = 320
+
+class BlobStore:
+    """
+    İçeriğe göre adreslenen dosya deposu.
+
+    Her içerik SHA-256 özetinin adıyla ``root/ab/cd/<özet>`` yoluna bir kez
+    yazılır; aynı içerik tekrar eklendiğinde dosya yeniden yazılmaz. Yazma
+    geçici dosya + yeniden adlandırma ile yapılır, yarım kalan dosya
+    okunmaz. Büyük içerikler akış (``open``) veya bellek eşleme (``mmap``)
+    ile okunabilir.
+    """
+
+    def __init__(self, root: str = settings["receipt_store_dir"]):
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        """Özetin dosya yolunu döndürür."""
+        if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+            raise ValueError(f"Geçersiz içerik özeti: {digest}")
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """
+        İçeriği depoya yazar.
+
+        Returns:
+            (özet, boyut)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        return digest, len(data)
+
+    def open(self, digest: str) -> BinaryIO:
+        """İçeriği akış olarak okumak için dosyayı açar."""
+        try:
+            return open(self.path(digest), "rb")
+        except FileNotFoundError:
+            raise ValueError(f"İçerik bulunamadı: {digest}")
+
+    def read(self, digest: str) -> bytes:
+        """İçeriğin tamamını okur."""
+        with self.open(digest) as f:
+            return f.read()
+
+    @contextmanager
+    def mmap(self, digest: str) -> Iterator[Union[mmap.mmap, bytes]]:
+        """İçeriği belleğe eşler (salt okunur); büyük dosyalar kopyalanmadan okunur."""
+        with self.open(digest) as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Boş dosya eşlenemez
+                yield b""
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mapped
+            finally:
+                mapped.close()
+
+    def delete(self, digest: str) -> bool:
+        """İçeriği siler; dosya yoksa False döner."""
+        try:
+            os.remove(self.path(digest))
+            return True
+        except FileNotFoundError:
+            return False
+
+def make_thumbnail(image_data: bytes, size: int = THUMBNAIL_SIZE) -> Optional[bytes]:
+    """
+    Görüntüden JPEG küçük resim üretir.
+
+    Returns:
+        Küçük resim baytları; görüntü okunamazsa None
+    """
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            image.thumbnail((size, size))
+            output = io.BytesIO()
+            image.convert("RGB").save(output, format="JPEG", quality=80)
+            return output.getvalue()
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
+
+# Makbuz görüntüleri için paylaşılan depo
+receipt_store = BlobStore()
@@ -0,0 +1,325 @@
+import copy
+import functools
+import inspect
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+from config import settings
+
+# Önbellekte bulunamayan değerleri None sonuçlarından ayırmak için
+_MISSING = object()
+
+# Oturum bilgisinde (session.info) commit bekleyen geçersiz kılmaların tutulduğu anahtar
+PENDING_INVALIDATIONS_KEY = "query_cache_pending_users"
+
+# Veri değişikliklerinde geçersiz kılınacak tüm sorgu önbellekleri
+_query_caches: "weakref.WeakSet[QueryCache]" = weakref.WeakSet()
+
+class _InflightLoad:
+    """Aynı anahtar için devam eden yükleme; bekleyenler sonucu paylaşır."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+def _sweep_periodically(cache_ref: "weakref.ref[TTLCache]", interval: float, stop: threading.Event) -> None:
+    """Önbellek yaşadığı sürece süresi dolan girdileri düzenli olarak temizler."""
+    while not stop.wait(interval):
+        cache = cache_ref()
+        if cache is None:
+            return
+        cache.purge_expired()
+        del cache
+
+class TTLCache:
+    """
+    Süre (TTL) ve boyut (LRU) sınırlı, iş parçacığı güvenli önbellek.
+
+    Girdiler eklenme zamanından ``ttl`` saniye sonra geçersiz olur; kapasite
+    dolduğunda en uzun süredir kullanılmayan girdi çıkarılır. ``sweep_interval``
+    verilirse süresi dolan girdiler okunmayı beklemeden arka planda silinir.
+    ``get_or_load`` aynı anahtar için eşzamanlı ıskalarda yükleyiciyi tek kez
+    çalıştırır. İsabet, ıska, çıkarma, süre dolumu ve birleştirilen yükleme
+    sayaçları ``stats()`` ile okunabilir.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 300,
+        clock: Callable[[], float] = time.monotonic,
+        sweep_interval: Optional[float] = None
+    ):
+        if max_entries <= 0:
+            raise ValueError("Önbellek kapasitesi pozitif olmalıdır")
+        if ttl <= 0:
+            raise ValueError("Önbellek süresi pozitif olmalıdır")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _InflightLoad] = {}
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._coalesced = 0
+        self._stop_sweeper = threading.Event()
+
+        if sweep_interval:
+            threading.Thread(
+                target=_sweep_periodically,
+                args=(weakref.ref(self), sweep_interval, self._stop_sweeper),
+                name="cache-sweeper",
+                daemon=True
+            ).start()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Geçerli bir girdi varsa değerini, yoksa ``default`` döndürür."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Değeri önbelleğe ekler; kapasite aşılırsa en eski girdileri çıkarır."""
+        expires_at = self._clock() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        should_cache: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Değeri önbellekten döndürür; yoksa yükleyiciyi çalıştırıp sonucu saklar.
+
+        Aynı anahtar için eşzamanlı çağrılarda yükleyici yalnızca bir kez
+        çalışır; diğer çağrılar onun sonucunu (veya hatasını) bekler.
+
+        Args:
+            key: Önbellek anahtarı
+            loader: Değeri üreten fonksiyon
+            ttl: Bu girdi için süre (varsayılan: önbellek süresi)
+            should_cache: False döndürürse sonuç saklanmaz (örn. başarısız yanıtlar)
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            load = self._inflight.get(key)
+            is_leader = load is None
+            if is_leader:
+                load = self._inflight[key] = _InflightLoad()
+            else:
+                self._coalesced += 1
+
+        if not is_leader:
+            load.done.wait()
+            if load.error is not None:
+                raise load.error
+            return load.value
+
+        try:
+            load.value = loader()
+            if should_cache is None or should_cache(load.value):
+                self.set(key, load.value, ttl)
+            return load.value
+        except BaseException as e:
+            load.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            load.done.set()
+
+    def purge_expired(self) -> int:
+        """Süresi dolan tüm girdileri siler ve silinen sayıyı döndürür."""
+        now = self._clock()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+            self._expirations += len(expired)
+            return len(expired)
+
+    def close(self) -> None:
+        """Arka plan temizleyicisini durdurur."""
+        self._stop_sweeper.set()
+
+    def delete(self, key: Hashable) -> bool:
+        """Girdiyi siler; girdi varsa True döndürür."""
+        with self._lock:
+            return self._entries.pop(key, _MISSING) is not _MISSING
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Anahtarı koşulu sağlayan tüm girdileri siler ve silinen sayıyı döndürür."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Tüm girdileri siler (sayaçlar korunur)."""
+        with self._lock:
+            self._entries.clear()
+
+    def reset_stats(self) -> None:
+        """İsabet/ıska sayaçlarını sıfırlar."""
+        with self._lock:
+            self._hits = self._misses = self._evictions = self._expirations = self._coalesced = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Önbellek boyutunu ve sayaçlarını döndürür."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "coalesced_loads": self._coalesced,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+class QueryCache(TTLCache):
+    """
+    Kullanıcı bazlı sorgu sonucu önbelleği.
+
+    Anahtarlar (user_id, sorgu adı, argümanlar) biçimindedir; bir kullanıcının
+    işlem, bütçe veya hedefleri değiştiğinde yalnızca o kullanıcının girdileri
+    silinir (bkz. models.database._invalidate_query_cache).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Kullanıcı başına geçersiz kılma sayacı; hesaplama sırasında geçersiz
+        # kılınan sonuçların (eski veri) önbelleğe yazılmasını önler
+        self._generations: Dict[int, int] = {}
+        _query_caches.add(self)
+
+    @staticmethod
+    def make_key(user_id: int, name: str, args: Iterable = ()) -> Tuple:
+        return (user_id, name, tuple(args))
+
+    def generation(self, user_id: int) -> int:
+        """Kullanıcının geçerli geçersiz kılma sayacını döndürür."""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def set_if_current(self, key: Tuple, value: Any, generation: int, ttl: Optional[float] = None) -> bool:
+        """
+        Değeri, anahtarın kullanıcısı ``generation`` okunduktan sonra geçersiz
+        kılınmadıysa saklar.
+
+        Returns:
+            Değer saklandıysa True
+        """
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return False
+            self.set(key, value, ttl)
+            return True
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Kullanıcıya ait tüm sorgu sonuçlarını siler."""
+        return self.invalidate_users([user_id])
+
+    def invalidate_users(self, user_ids: Iterable[int]) -> int:
+        """Birden fazla kullanıcının sorgu sonuçlarını tek geçişte siler."""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return 0
+        with self._lock:
+            for user_id in user_ids:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            return self.invalidate(lambda key: key[0] in user_ids)
+
+# Tüm servis örnekleri ve Streamlit oturumları arasında paylaşılan önbellek
+query_cache = QueryCache(
+    max_entries=settings["query_cache"]["max_entries"],
+    ttl=settings["query_cache"]["ttl_seconds"],
+    sweep_interval=settings["query_cache"]["sweep_interval_seconds"]
+)
+
+def invalidate_users(user_ids: Iterable[int]) -> int:
+    """Kullanıcıların girdilerini tüm sorgu önbelleklerinden siler."""
+    user_ids = set(user_ids)
+    return sum(cache.invalidate_users(user_ids) for cache in list(_query_caches))
+
+def cached_query(name: str, cache: QueryCache = query_cache) -> Callable:
+    """
+    Servis metodunun sonucunu kullanıcı bazlı önbelleğe alan dekoratör.
+
+    Metodun ``self``'ten sonraki ilk parametresi ``user_id`` olmalı ve
+    sonucu oturuma bağlı ORM nesneleri değil, düz veri (dict/list) içermelidir.
+    Çağıran tarafın değişiklikleri paylaşılan girdiyi bozmasın diye sonucun
+    kopyası döndürülür. Oturumda commit edilmemiş değişiklikleri olan
+    kullanıcılar için önbellek okunmaz ve yazılmaz.
+
+    Args:
+        name: Önbellek anahtarında kullanılacak sorgu adı
+        cache: Kullanılacak önbellek (varsayılan: paylaşılan query_cache)
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.values())[1:]
+            user_id = arguments[0]
+            key = cache.make_key(user_id, name, arguments[1:])
+
+            # Oturumun commit edilmemiş değişikliklerini görmesi için önbelleği atla
+            if user_id in self.db.info.get(PENDING_INVALIDATIONS_KEY, ()):
+                return func(self, *args, **kwargs)
+
+            result = cache.get(key, _MISSING)
+            if result is _MISSING:
+                # Hesaplama sırasında başka bir oturum commit edip kullanıcıyı
+                # geçersiz kılarsa sonuç eski olabilir; o durumda saklanmaz
+                generation = cache.generation(user_id)
+                result = func(self, *args, **kwargs)
+                cache.set_if_current(key, result, generation)
+
+            return copy.deepcopy(result)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -39,4 +39,48 @@ def month_name(month_number: int) -> str:
         "Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran",
         "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"
     ]
-    return months[month_number - 1] 
\ No newline at end of file
+    return months[month_number - 1] 
+
+# Trend ve karşılaştırma raporlarında desteklenen dönem aralıkları
+PERIOD_GRANULARITIES = ("day", "week", "month", "quarter")
+
+
+def period_start(value: date, granularity: str = "month") -> date:
+    """Tarihin ait olduğu dönemin (gün/hafta/ay/çeyrek) ilk gününü döndürür."""
+    if isinstance(value, datetime):
+        value = value.date()
+    
+    if granularity == "day":
+        return value
+    if granularity == "week":
+        # Haftalar pazartesi başlar
+        return value - timedelta(days=value.weekday())
+    if granularity == "month":
+        return date(value.year, value.month, 1)
+    if granularity == "quarter":
+        return date(value.year, ((value.month - 1) // 3) * 3 + 1, 1)
+    
+    raise ValueError(f"Desteklenmeyen dönem aralığı: {granularity}")
+
+
+def shift_period(value: date, granularity: str = "month", steps: int = 1) -> date:
+    """Dönem başlangıcını verilen adım kadar ileri (veya geri) kaydırır."""
+    start = period_start(value, granularity)
+    
+    if granularity == "day":
+        return start + timedelta(days=steps)
+    if granularity == "week":
+        return start + timedelta(weeks=steps)
+    
+    months = steps if granularity == "month" else steps * 3
+    month_index = start.year * 12 + (start.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def period_label(value: date, granularity: str = "month") -> str:
+    """Dönem başlangıcı için grafik etiketini döndürür."""
+    if granularity == "month":
+        return f"{value.month}/{value.year}"
+    if granularity == "quarter":
+        return f"Ç{(value.month - 1) // 3 + 1}/{value.year}"
+    return value.strftime("%d.%m.%Y")
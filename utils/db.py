@@ -1,23 +1,10 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from contextlib import contextmanager
-import os
 from models.base import Base
+from utils.engine import get_engine
 
-# Veritabanı dosya yolu
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_PATH = os.path.join(BASE_DIR, "data", "finance.db")
-
-# Klasör yoksa oluştur
-os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-
-# SQLite bağlantısı
-DATABASE_URL = f"sqlite:///{DB_PATH}"
-
-# Engine oluştur
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Paylaşılan, ayarlanmış SQLite engine'i
+engine = get_engine()
 
 # Session fabrikası oluştur
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
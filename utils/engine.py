@@ -0,0 +1,69 @@
+import threading
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from config import settings
+
+# Uygulama genelinde paylaşılan engine'ler (veritabanı URL'si -> engine)
+_engines: Dict[str, Engine] = {}
+_engine_lock = threading.Lock()
+
+def _apply_sqlite_pragmas(dbapi_connection, sqlite_settings: Dict[str, Any]) -> None:
+    """Yeni SQLite bağlantısına performans PRAGMA'larını uygular."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(sqlite_settings['busy_timeout_ms'])}")
+        cursor.execute(f"PRAGMA journal_mode = {sqlite_settings['journal_mode']}")
+        cursor.execute(f"PRAGMA synchronous = {sqlite_settings['synchronous']}")
+        # Negatif değer, önbellek boyutunu KB cinsinden belirtir
+        cursor.execute(f"PRAGMA cache_size = {-int(sqlite_settings['cache_size_kb'])}")
+        cursor.execute(f"PRAGMA mmap_size = {int(sqlite_settings['mmap_size'])}")
+        cursor.execute(f"PRAGMA temp_store = {sqlite_settings['temp_store']}")
+    finally:
+        cursor.close()
+
+def create_sqlite_engine(database_url: Optional[str] = None, **overrides) -> Engine:
+    """
+    Ayarlanmış bir SQLite engine'i oluşturur.
+    
+    Her yeni bağlantıda WAL, synchronous, cache_size, mmap_size, temp_store
+    ve busy_timeout PRAGMA'ları config.py'deki değerlerle uygulanır.
+    
+    Args:
+        database_url: Veritabanı URL'si (varsayılan: config.DATABASE_URL)
+        **overrides: config'deki SQLite ayarlarını geçersiz kılan değerler
+        
+    Returns:
+        SQLAlchemy engine
+    """
+    sqlite_settings = {**settings["sqlite"], **overrides}
+    
+    engine = create_engine(
+        database_url or settings["database_url"],
+        connect_args={
+            "check_same_thread": False,
+            "timeout": sqlite_settings["busy_timeout_ms"] / 1000
+        }
+    )
+    
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection, sqlite_settings)
+    
+    return engine
+
+def get_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Veritabanı için tüm servislerin kullandığı paylaşılan engine'i döndürür.
+    
+    Args:
+        database_url: Veritabanı URL'si (varsayılan: config.DATABASE_URL)
+    """
+    database_url = database_url or settings["database_url"]
+    engine = _engines.get(database_url)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(database_url)
+            if engine is None:
+                engine = _engines[database_url] = create_sqlite_engine(database_url)
+    return engine
@@ -0,0 +1,172 @@
+import argparse
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+# /accounts/{hesap}/transactions ve /accounts/{hesap}/balance yolları
+_PATH_PATTERN = re.compile(r"^/accounts/(?P<account>[^/]+)/(?P<resource>transactions|balance)$")
+
+class FakeBankServer:
+    """
+    Banka senkronizasyonunu çevrimdışı denemek için yerel sahte banka API'si.
+
+    Her istek ``latency`` saniye bekletilir; ``failures`` ile hesap başına ilk
+    N işlem isteği 503 döndürür. ``page_size`` verilirse işlemler sayfalanır ve
+    ``next_cursor`` ile sonraki sayfa istenir. Eşzamanlı istek sayısının tepe değeri ve
+    istek zamanları testlerde eşzamanlılık ve hız sınırı kontrolü için tutulur.
+
+    Kullanım:
+        with FakeBankServer(latency=0.2) as server:
+            endpoints = {"fake_bank": server.endpoint()}
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        transactions_per_account: int = 20,
+        failures: Optional[Dict[str, int]] = None,
+        page_size: Optional[int] = None
+    ):
+        self.latency = latency
+        self.transactions_per_account = transactions_per_account
+        self.failures = dict(failures or {})
+        self.page_size = page_size
+        self.request_log: List[Dict] = []
+        self.active_requests = 0
+        self.peak_concurrency = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def endpoint(self, rate_limit: float = 10) -> Dict:
+        """BankingService.api_endpoints için uç nokta tanımını döndürür."""
+        return {
+            "base_url": self.base_url,
+            "accounts": "/accounts",
+            "transactions": "/accounts/{account_id}/transactions",
+            "balance": "/accounts/{account_id}/balance",
+            "rate_limit": rate_limit,
+            "simulate": False
+        }
+
+    def start(self) -> "FakeBankServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeBankServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def transactions_for(self, account: str, since: Optional[str] = None) -> List[Dict]:
+        """Hesap için belirli (deterministik) örnek işlemler üretir."""
+        today = datetime.now().date()
+        since_date = datetime.fromisoformat(since).date() if since else None
+        transactions = []
+        for i in range(self.transactions_per_account):
+            day = today - timedelta(days=i)
+            if since_date and day < since_date:
+                break
+            amount = (i % 6) * 100 - 300
+            transactions.append({
+                "id": f"{account}_{i}",
+                "date": day.isoformat(),
+                "amount": amount,
+                "description": "Maaş ödemesi" if amount > 0 else "Market alışverişi",
+                "currency": "TRY"
+            })
+        return transactions
+
+    def _handle(self, path: str, query: Dict) -> tuple:
+        match = _PATH_PATTERN.match(path)
+        if not match:
+            return 404, {"error": "not found"}
+
+        account = match.group("account")
+        if match.group("resource") == "balance":
+            return 200, {"account_id": account, "balance": 1000.0, "currency": "TRY"}
+
+        with self._lock:
+            remaining = self.failures.get(account, 0)
+            if remaining > 0:
+                self.failures[account] = remaining - 1
+                return 503, {"error": "temporarily unavailable"}
+
+        transactions = self.transactions_for(account, query.get("from", [None])[0])
+        # Devam token'ı "hesap:başlangıç" biçimindedir
+        cursor = query.get("cursor", [None])[0]
+        start = int(cursor.rsplit(":", 1)[1]) if cursor else 0
+        end = start + self.page_size if self.page_size else len(transactions)
+        return 200, {
+            "transactions": transactions[start:end],
+            "next_cursor": f"{account}:{end}" if end < len(transactions) else None
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                with server._lock:
+                    server.active_requests += 1
+                    server.peak_concurrency = max(server.peak_concurrency, server.active_requests)
+                    server.request_log.append({
+                        "path": parsed.path,
+                        "query": parse_qs(parsed.query),
+                        "time": time.monotonic()
+                    })
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    status, payload = server._handle(parsed.path, parse_qs(parsed.query))
+                finally:
+                    with server._lock:
+                        server.active_requests -= 1
+
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Test çıktısını kirletmemek için istek loglarını kapat
+                pass
+
+        return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yerel sahte banka API sunucusu")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="İstek başına gecikme (saniye)")
+    args = parser.parse_args()
+
+    fake_server = FakeBankServer(port=args.port, latency=args.latency)
+    print(f"Sahte banka API'si: {fake_server.base_url}")
+    try:
+        fake_server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake_server._httpd.server_close()
@@ -1,7 +1,13 @@
 import sqlite3
 import os
+import argparse
 from sqlalchemy import create_engine, inspect
-from models.database import Base, get_db, engine, Transaction, Budget, FinancialGoal
+from sqlalchemy.schema import CreateIndex
+from models.database import Base, get_db, engine, SessionLocal, Transaction, Budget, FinancialGoal, MonthlyRollup, Receipt, OCRCacheEntry, Job, BudgetAlertEvent, RecurringSeries, TransactionType, RecurringType
+from services.rollup_service import RollupService
+from services.recurring_service import RecurringService
+from sqlalchemy.orm import undefer
+from utils.blob_store import BlobStore, make_thumbnail, receipt_store
 import logging
 
 # Loglama
@@ -12,8 +18,8 @@ def migrate_db():
     """Veritabanı şemasını günceller ve eksik sütunları ekler."""
     logger.info("Veritabanı migration işlemi başlatılıyor...")
     
-    # SQLite veritabanı yolu
-    db_path = os.path.join(os.getcwd(), "finance.db")
+    # SQLite veritabanı yolu (paylaşılan engine ile aynı dosya)
+    db_path = engine.url.database
     
     if not os.path.exists(db_path):
         logger.error(f"Veritabanı dosyası bulunamadı: {db_path}")
@@ -42,8 +48,80 @@ def migrate_db():
             cursor.execute("ALTER TABLE transactions ADD COLUMN external_id TEXT")
             logger.info("'external_id' sütunu başarıyla eklendi.")
         
+        # Banka hesabı artımlı senkronizasyon sütunları
+        add_missing_columns(cursor, "bank_accounts", {
+            "sync_cursor_date": "DATETIME",
+            "sync_cursor_external_id": "VARCHAR(255)",
+            "sync_cursor_token": "VARCHAR"
+        })
+        
+        # Makbuz görüntü özeti (tekrar yükleme tespiti) ve dosya deposu alanları
+        add_missing_columns(cursor, "receipts", {
+            "image_hash": "VARCHAR(64)",
+            "image_size": "INTEGER",
+            "thumbnail_hash": "VARCHAR(64)"
+        })
+        
         # Değişiklikleri kaydet
         conn.commit()
+        
+        # Eski sürümlerin küçük harfle yazdığı tür değerlerini düzelt; değişen satır varsa
+        # özet ve seri tabloları bu değerlerle doldurulmuş olabileceğinden yeniden doldurulur
+        if not migration_applied(cursor, "transaction_enum_names"):
+            if normalize_enum_names(cursor):
+                reset_migration(cursor, "monthly_rollups_backfill")
+                reset_migration(cursor, "recurring_series_backfill")
+            mark_migration(conn, "transaction_enum_names")
+        
+        # İşlem tablosu indekslerini oluştur (bir kez; modele yeni indeks eklenirse
+        # yeniden). Tekrar eden kayıtlar ayrıldıysa işlemlerden türetilen tablolar
+        # yeniden doldurulur.
+        if not migration_applied(cursor, "transaction_indexes") or missing_transaction_indexes(cursor):
+            if create_transaction_indexes(cursor):
+                reset_migration(cursor, "monthly_rollups_backfill")
+                reset_migration(cursor, "recurring_series_backfill")
+            mark_migration(conn, "transaction_indexes")
+        for index in list(Receipt.__table__.indexes) + list(Budget.__table__.indexes):
+            cursor.execute(str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect)))
+        conn.commit()
+        
+        # OCR metin önbelleği tablosu
+        OCRCacheEntry.__table__.create(bind=engine, checkfirst=True)
+        
+        # Arka plan iş kuyruğu tablosu
+        Job.__table__.create(bind=engine, checkfirst=True)
+        
+        # Bildirilen bütçe eşiği aşımları (tekrar bildirimi önlemek için)
+        BudgetAlertEvent.__table__.create(bind=engine, checkfirst=True)
+        
+        # Satırda tutulan makbuz görüntülerini dosya deposuna bir kez taşı; yeni
+        # makbuzlar doğrudan depoya yazılır
+        if not migration_applied(cursor, "receipt_images_to_blob_store"):
+            move_receipt_images()
+            mark_migration(conn, "receipt_images_to_blob_store")
+        
+        # Aylık özet tablosunu oluştur ve mevcut işlemlerden bir kez doldur. init_db
+        # (create_all) tabloyu boş oluşturmuş olabileceğinden doldurma, tablonun
+        # varlığına değil migration işaretine bağlıdır.
+        MonthlyRollup.__table__.create(bind=engine, checkfirst=True)
+        if not migration_applied(cursor, "monthly_rollups_backfill"):
+            logger.info("'monthly_rollups' tablosu mevcut işlemlerden dolduruluyor...")
+            rebuild_rollups()
+            mark_migration(conn, "monthly_rollups_backfill")
+        
+        # Tekrarlayan işlem serileri tablosunu oluştur ve mevcut işlemlerden bir kez doldur.
+        # Takvim başlangıcı sütunu sonradan eklendiyse seriler yeniden oluşturulur.
+        RecurringSeries.__table__.create(bind=engine, checkfirst=True)
+        cursor.execute("PRAGMA table_info(recurring_series)")
+        if "anchor_date" not in {col[1] for col in cursor.fetchall()}:
+            add_missing_columns(cursor, "recurring_series", {"anchor_date": "DATE", "materialized_through": "DATE"})
+            reset_migration(cursor, "recurring_series_backfill")
+            conn.commit()
+        if not migration_applied(cursor, "recurring_series_backfill"):
+            logger.info("'recurring_series' tablosu mevcut işlemlerden dolduruluyor...")
+            rebuild_recurring_series()
+            mark_migration(conn, "recurring_series_backfill")
+        
         logger.info("Veritabanı migration işlemi başarıyla tamamlandı.")
         return True
     
@@ -57,8 +135,195 @@ def migrate_db():
         cursor.close()
         conn.close()
 
+def _create_migrations_table(cursor) -> None:
+    cursor.execute("CREATE TABLE IF NOT EXISTS schema_migrations (name TEXT PRIMARY KEY, applied_at TEXT NOT NULL)")
+
+def migration_applied(cursor, name: str) -> bool:
+    """Tek seferlik veri migration'ının (ör. geriye dönük doldurma) uygulanıp uygulanmadığını döndürür."""
+    _create_migrations_table(cursor)
+    cursor.execute("SELECT 1 FROM schema_migrations WHERE name = ?", (name,))
+    return cursor.fetchone() is not None
+
+def mark_migration(conn, name: str) -> None:
+    """Tek seferlik veri migration'ını uygulandı olarak işaretler."""
+    conn.execute("INSERT OR IGNORE INTO schema_migrations (name, applied_at) VALUES (?, datetime('now'))", (name,))
+    conn.commit()
+
+def reset_migration(cursor, name: str) -> None:
+    """Tek seferlik veri migration'ının bir sonraki çalıştırmada yeniden uygulanmasını sağlar."""
+    _create_migrations_table(cursor)
+    cursor.execute("DELETE FROM schema_migrations WHERE name = ?", (name,))
+
+def add_missing_columns(cursor, table_name: str, columns: dict) -> None:
+    """Tabloda olmayan sütunları (ad -> SQL tipi) ekler."""
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    existing = {col[1] for col in cursor.fetchall()}
+    
+    for column_name, column_type in columns.items():
+        if column_name not in existing:
+            logger.info(f"'{table_name}.{column_name}' sütunu ekleniyor...")
+            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
+
+def normalize_enum_names(cursor) -> int:
+    """
+    İşlem tablosundaki küçük harfli tür değerlerini ('expense', 'monthly') Enum adlarına çevirir.
+    
+    SQLAlchemy Enum sütunları üye adlarını ('EXPENSE', 'MONTHLY') saklar ve
+    okur; eski sürümlerin yazdığı değerler okunurken LookupError verir.
+    
+    Returns:
+        Güncellenen satır sayısı
+    """
+    updated = 0
+    for column, enum_class in (("type", TransactionType), ("recurring_type", RecurringType)):
+        values = [member.value for member in enum_class]
+        cursor.execute(
+            f"UPDATE transactions SET {column} = UPPER({column}) WHERE {column} IN ({', '.join('?' * len(values))})",
+            values
+        )
+        updated += cursor.rowcount
+    return updated
+
+def missing_transaction_indexes(cursor) -> list:
+    """Transaction modelinde tanımlı olup veritabanında bulunmayan indekslerin adlarını döndürür."""
+    cursor.execute("PRAGMA index_list(transactions)")
+    existing = {row[1] for row in cursor.fetchall()}
+    return [index.name for index in Transaction.__table__.indexes if index.name not in existing]
+
+def quarantine_rows(cursor, source_table: str, where: str) -> int:
+    """
+    Koşula uyan satırları kaynak tablodan '<tablo>_duplicates' tablosuna taşır.
+    
+    Satırlar silinmeden önce kopyalanır; gerekirse elle incelenip geri
+    alınabilir. Kaynak tabloya sonradan eklenen sütunlar karantina
+    tablosuna da eklenir.
+    
+    Returns:
+        Taşınan satır sayısı
+    """
+    quarantine_table = f"{source_table}_duplicates"
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {quarantine_table} AS SELECT * FROM {source_table} WHERE 0")
+    cursor.execute(f"PRAGMA table_info({source_table})")
+    columns = {col[1]: col[2] for col in cursor.fetchall()}
+    add_missing_columns(cursor, quarantine_table, columns)
+    
+    column_list = ", ".join(columns)
+    cursor.execute(f"INSERT INTO {quarantine_table} ({column_list}) SELECT {column_list} FROM {source_table} WHERE {where}")
+    cursor.execute(f"DELETE FROM {source_table} WHERE {where}")
+    return cursor.rowcount
+
+def create_transaction_indexes(cursor) -> int:
+    """
+    Transaction modelinde tanımlı indeksleri mevcut veritabanında oluşturur.
+    
+    Tekil (user_id, source, external_id) indeksinden önce tekrar eden banka
+    kayıtları 'transactions_duplicates' tablosuna taşınır (her anahtar için
+    en küçük ID'li kayıt kalır). Toplu ekleme yolları (banka senkronizasyonu,
+    tekrarlayan işlem üretimi) bu indekse ON CONFLICT ile dayandığından indeks
+    oluşturulamazsa hata yükseltilir ve migration başarısız sayılır.
+    
+    Returns:
+        Karantinaya alınan tekrar eden kayıt sayısı
+    """
+    removed = 0
+    for index in Transaction.__table__.indexes:
+        if index.unique:
+            columns = ", ".join(column.name for column in index.columns)
+            # NULL içeren anahtarlar tekil indekste çakışmaz
+            not_null = " AND ".join(f"{column.name} IS NOT NULL" for column in index.columns)
+            count = quarantine_rows(
+                cursor, "transactions",
+                f"{not_null} AND id NOT IN (SELECT MIN(id) FROM transactions WHERE {not_null} GROUP BY {columns})"
+            )
+            if count:
+                removed += count
+                logger.warning(
+                    f"'{index.name}' için {count} tekrar eden kayıt 'transactions_duplicates' "
+                    f"tablosuna taşındı (ilk kayıtlar korundu)."
+                )
+        
+        ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+        cursor.execute(ddl)
+        logger.info(f"'{index.name}' indeksi kontrol edildi.")
+    return removed
+
+def move_receipt_images(db=None, store: BlobStore = None, batch_size: int = 100) -> int:
+    """
+    Satırda (receipts.image) tutulan makbuz görüntülerini dosya deposuna taşır.
+    
+    Her parti ayrı commit edilir; işlem yarıda kalırsa kaldığı yerden devam
+    eder. Taşınan satırlarda image sütunu boşaltılır, özet, boyut ve küçük
+    resim adresi yazılır. Boşalan alan için ardından VACUUM çalıştırılabilir.
+    
+    Returns:
+        Taşınan makbuz sayısı
+    """
+    store = store or receipt_store
+    session = db or SessionLocal()
+    moved = 0
+    try:
+        while True:
+            receipts = session.query(Receipt).options(undefer(Receipt.image)).filter(
+                Receipt.image.isnot(None)
+            ).order_by(Receipt.id).limit(batch_size).all()
+            if not receipts:
+                break
+            
+            for receipt in receipts:
+                digest, size = store.put(receipt.image)
+                thumbnail = make_thumbnail(receipt.image)
+                receipt.image_hash = digest
+                receipt.image_size = size
+                receipt.thumbnail_hash = store.put(thumbnail)[0] if thumbnail else None
+                receipt.image = None
+            session.commit()
+            moved += len(receipts)
+            logger.info(f"{moved} makbuz görüntüsü dosya deposuna taşındı.")
+        return moved
+    finally:
+        if db is None:
+            session.close()
+
+def rebuild_rollups(user_id=None) -> int:
+    """Aylık özet tablosunu işlem tablosundan yeniden oluşturur."""
+    db = SessionLocal()
+    try:
+        row_count = RollupService(db).rebuild(user_id)
+        logger.info(f"Aylık özet tablosu yeniden oluşturuldu: {row_count} satır.")
+        return row_count
+    finally:
+        db.close()
+
+def rebuild_recurring_series(user_id=None) -> int:
+    """Tekrarlayan işlem serilerini işlem tablosundan yeniden oluşturur."""
+    db = SessionLocal()
+    try:
+        series_count = RecurringService(db).rebuild(user_id)
+        logger.info(f"Tekrarlayan işlem serileri yeniden oluşturuldu: {series_count} seri.")
+        return series_count
+    finally:
+        db.close()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Veritabanı migration araçları")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="Aylık özet tablosunu yeniden oluşturur")
+    parser.add_argument("--rebuild-recurring", action="store_true", help="Tekrarlayan işlem serilerini yeniden oluşturur")
+    parser.add_argument("--user-id", type=int, default=None, help="Sadece bu kullanıcının özetlerini yeniden oluşturur")
+    parser.add_argument("--vacuum", action="store_true", help="Migration sonrası boşalan alanı geri kazanır (VACUUM)")
+    args = parser.parse_args()
+    
+    if args.rebuild_rollups:
+        rebuild_rollups(args.user_id)
+        raise SystemExit(0)
+    
+    if args.rebuild_recurring:
+        rebuild_recurring_series(args.user_id)
+        raise SystemExit(0)
+    
     success = migrate_db()
+    if success and args.vacuum:
+        with sqlite3.connect(engine.url.database) as vacuum_conn:
+            vacuum_conn.execute("VACUUM")
     if success:
         print("Veritabanı güncelleme işlemi başarıyla tamamlandı.")
     else:
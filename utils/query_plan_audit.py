@@ -0,0 +1,186 @@
+import argparse
+import logging
+import sys
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models.database import Base, User, Transaction, Budget, BankAccount
+
+# Loglama
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Tam tarama yapılmaması gereken tablolar
+WATCHED_TABLES = ("transactions", "monthly_rollups", "budgets", "recurring_series", "ocr_cache")
+
+@contextmanager
+def capture_queries(engine):
+    """Engine üzerinde çalışan SELECT sorgularını parametreleriyle birlikte toplar."""
+    captured: List[Tuple[str, tuple]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def explain(engine, statement: str, parameters) -> List[str]:
+    """Sorgu için EXPLAIN QUERY PLAN çıktısını döndürür."""
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [row[-1] for row in rows]
+
+def full_scans(plan: List[str]) -> List[str]:
+    """Plan satırlarından izlenen tablolarda tam tarama yapanları döndürür."""
+    scans = []
+    for detail in plan:
+        if not detail.startswith("SCAN "):
+            continue
+        table = detail.split()[1]
+        if table in WATCHED_TABLES and "COVERING INDEX" not in detail:
+            scans.append(detail)
+    return scans
+
+def service_queries(session) -> Dict[str, Callable[[], object]]:
+    """Denetlenecek servis çağrılarını döndürür."""
+    from services.database_service import DatabaseService
+    from services.report_service import ReportService
+    from services.budget_service import BudgetService
+    from services.rollup_service import RollupService
+    from services.budget_alerts import BudgetAlertEvaluator
+    from services.recurring_service import RecurringService
+    from services.ocr_cache import OCRResultCache
+
+    user = session.query(User).first()
+    budget = session.query(Budget).first()
+    account = session.query(BankAccount).first()
+    today = date.today()
+    month_start = date(today.year, today.month, 1)
+
+    database_service = DatabaseService(session)
+    report_service = ReportService(session)
+    budget_service = BudgetService(session)
+    rollup_service = RollupService(session)
+    budget_alerts = BudgetAlertEvaluator(session)
+    recurring_service = RecurringService(session)
+    ocr_cache = OCRResultCache(session, {"lang": "tur"})
+    source = f"bank_{account.bank_name}"
+
+    return {
+        "DatabaseService.get_user_transactions": lambda: database_service.get_user_transactions(
+            user.id, page=3, category="Gıda", start_date=today - timedelta(days=90)
+        ),
+        "DatabaseService.get_user_transactions_page": lambda: database_service.get_user_transactions_page(
+            user.id,
+            cursor=database_service.get_user_transactions_page(user.id, per_page=20, include_total=False)["next_cursor"],
+            per_page=20
+        ),
+        "DatabaseService.get_transaction_summary": lambda: database_service.get_transaction_summary.__wrapped__(
+            database_service, user.id, today - timedelta(days=10), today
+        ),
+        "DatabaseService.get_category_summary": lambda: database_service.get_category_summary(
+            user.id, today - timedelta(days=10), today
+        ),
+        "DatabaseService.get_user_transaction_categories": lambda: database_service.get_user_transaction_categories(user.id),
+        "ReportService.generate_monthly_report": lambda: report_service.generate_monthly_report(
+            user.id, today.year, today.month, min_amount=10
+        ),
+        "ReportService.get_trend_data(day)": lambda: report_service.get_trend_data(user.id, 30, "day"),
+        "ReportService.get_trend_data(month)": lambda: report_service.get_trend_data(user.id, 12, "month"),
+        "BudgetService.analyze_category_spending": lambda: budget_service.analyze_category_spending(user.id, "Gıda"),
+        "BudgetService.get_budget_performance": lambda: budget_service.get_budget_performance(user.id, budget.id),
+        "RollupService.get_category_totals": lambda: rollup_service.get_category_totals(
+            user.id, RollupService.month_key(month_start), RollupService.month_key(today)
+        ),
+        "BankingService.ingest_bank_transactions (bilinen işlemler)": lambda: session.query(Transaction.external_id).filter(
+            Transaction.user_id == account.user_id,
+            Transaction.source == source,
+            Transaction.date >= today - timedelta(days=30),
+            Transaction.date <= today
+        ).all(),
+        "BudgetAlertEvaluator.evaluate": lambda: budget_alerts.evaluate([user.id]),
+        "BudgetAlertEvaluator.budget_spending(categories)": lambda: budget_alerts.budget_spending(
+            categories=[(user.id, "Gıda"), (user.id, "Ulaşım")]
+        ),
+        "RecurringService.due_series": lambda: recurring_service.due_series(as_of=today),
+        "OCRResultCache.get": lambda: ocr_cache.get("0" * 64),
+    }
+
+def seed(session) -> None:
+    """Plan denetimi için örnek kullanıcı, işlem, bütçe ve hesap ekler."""
+    user = User(username="audit_user", email="audit@example.com", hashed_password="x")
+    session.add(user)
+    session.flush()
+
+    today = date.today()
+    session.add_all([
+        Transaction(
+            user_id=user.id,
+            amount=10 + i,
+            type="expense" if i % 3 else "income",
+            category=["Gıda", "Ulaşım", "Fatura"][i % 3],
+            date=today - timedelta(days=i)
+        )
+        for i in range(60)
+    ])
+    session.add(Budget(
+        user_id=user.id, name="Market", category="Gıda", amount=500,
+        start_date=today - timedelta(days=30), end_date=today + timedelta(days=30)
+    ))
+    session.add(BankAccount(user_id=user.id, bank_name="example_bank", account_number="****1234"))
+    session.commit()
+
+def run_audit(database_url: str) -> int:
+    """
+    Servis sorgularının planlarını çıkarır ve tam tabloları taramaları raporlar.
+
+    Returns:
+        Tam tarama içeren sorgu sayısı
+    """
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    try:
+        if not session.query(User).first():
+            seed(session)
+
+        flagged = 0
+        for name, call in service_queries(session).items():
+            with capture_queries(engine) as captured:
+                call()
+
+            for statement, parameters in captured:
+                scans = full_scans(explain(engine, statement, parameters))
+                if scans:
+                    flagged += 1
+                    logger.warning(f"[TAM TARAMA] {name}: {'; '.join(scans)}")
+                    logger.warning(f"    {' '.join(statement.split())}")
+                else:
+                    logger.info(f"[OK] {name}")
+
+        return flagged
+    finally:
+        session.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servis sorguları için EXPLAIN QUERY PLAN denetimi")
+    parser.add_argument(
+        "--database-url",
+        default="sqlite:///:memory:",
+        help="Denetlenecek veritabanı (varsayılan: örnek verili bellek içi veritabanı)"
+    )
+    args = parser.parse_args()
+
+    flagged_count = run_audit(args.database_url)
+    if flagged_count:
+        print(f"{flagged_count} sorgu tam tablo taraması yapıyor.")
+        sys.exit(1)
+    print("Tam tablo taraması yapan sorgu bulunamadı.")
@@ -0,0 +1,31 @@
+import threading
+import time
+from typing import Callable
+
+class RateLimiter:
+    """
+    Saniyedeki istek sayısını sınırlayan, iş parçacığı güvenli sınırlayıcı.
+
+    Her çağrı bir sonraki boş zaman dilimini ayırır ve o zamana kadar bekler;
+    böylece aynı bankaya giden istekler en az 1/rate saniye aralıklı olur.
+    """
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError("İstek hızı pozitif olmalıdır")
+        self.interval = 1.0 / rate
+        self._clock = clock
+        self._sleep = sleep
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Sıradaki zaman dilimine kadar bekler ve beklenen süreyi döndürür."""
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            self._sleep(wait)
+        return wait